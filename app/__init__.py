@@ -5,6 +5,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import config
+from app.utils.instrumentation import SQLInstrumentation
+from app.utils.compression import ResponseCompression
 
 db = SQLAlchemy()
 jwt = JWTManager()
@@ -19,12 +21,23 @@ def create_app(config_name=None):
     
     db.init_app(app)
     jwt.init_app(app)
+    register_token_versions(app)
+    register_token_scopes(app)
+    register_notification_hub(app)
+    register_notification_dispatcher(app)
+    register_answer_keys(app)
     CORS(app, origins=app.config.get('CORS_ORIGINS', ['http://localhost:3000']))
+    ResponseCompression(app)
+    
+    with app.app_context():
+        SQLInstrumentation(app, db.engine)
     
     setup_logging(app)
     
     register_blueprints(app)
     
+    register_commands(app)
+    
     create_directories(app)
     
     with app.app_context():
@@ -36,6 +49,37 @@ def create_app(config_name=None):
     
     return app
 
+def register_token_versions(app):
+    """Reject tokens issued before a user's token version changed"""
+    from app.utils.decorators import TokenVersionCache
+    
+    TokenVersionCache(app, jwt)
+
+def register_token_scopes(app):
+    """Accept scoped tokens only at the endpoints they were issued for"""
+    from app.utils.decorators import is_token_in_scope, token_out_of_scope
+    
+    jwt.token_verification_loader(is_token_in_scope)
+    jwt.token_verification_failed_loader(token_out_of_scope)
+
+def register_notification_hub(app):
+    """Fan new notifications out to open notification streams"""
+    from app.utils.notification_hub import NotificationHub
+    
+    NotificationHub(app)
+
+def register_notification_dispatcher(app):
+    """Deliver queued notifications from background worker threads"""
+    from app.utils.notification_dispatcher import NotificationDispatcher
+    
+    NotificationDispatcher(app)
+
+def register_answer_keys(app):
+    """Cache compiled quiz answer keys for grading"""
+    from app.utils.answer_keys import AnswerKeyCache
+    
+    AnswerKeyCache(app)
+
 def register_blueprints(app):
     """Register all blueprints"""
     try:
@@ -59,6 +103,55 @@ def register_blueprints(app):
         import traceback
         traceback.print_exc()
 
+def register_commands(app):
+    """Register custom CLI commands"""
+    import click
+    
+    @app.cli.command('repair-counters')
+    def repair_counters():
+        """Recompute the denormalized course, quiz and unread counters and conversation summaries."""
+        from app.services.course_service import CourseService
+        from app.services.counter_service import CounterService
+        from app.services.messaging_service import MessagingService
+        
+        result = CourseService.repair_counters()
+        click.echo(f"✅ Repaired counters for {result['courses']} courses and {result['quizzes']} quizzes")
+        
+        result = CounterService.reconcile_unread_counts()
+        click.echo(f"✅ Created {result['created']} and corrected {result['corrected']} user unread counters")
+        
+        result = MessagingService.rebuild_conversation_summaries()
+        click.echo(f"✅ Rebuilt {result['conversations']} conversation summaries")
+    
+    @app.cli.command('dispatch-notifications')
+    @click.option('--retry-dead', is_flag=True, help='Give dead-lettered entries another set of attempts first.')
+    def dispatch_notifications(retry_dead):
+        """Deliver every queued notification that is due."""
+        from app.services.notification_service import NotificationService
+        
+        if retry_dead:
+            click.echo(f"♻️ Requeued {NotificationService.requeue_dead_notifications()} dead entries")
+        
+        delivered = app.extensions['notification_dispatcher'].flush()
+        click.echo(f"✅ Processed {delivered} notification outbox entries")
+    
+    @app.cli.command('purge-notifications')
+    @click.option('--batch-size', type=int, default=None, help='Rows moved per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+    @click.option('--dry-run', is_flag=True, help='Only count the rows the policies would move.')
+    def purge_notifications(batch_size, max_batches, dry_run):
+        """Archive or delete old notifications according to the retention policies."""
+        metrics = app.extensions['notification_dispatcher'].run_retention(
+            batch_size=batch_size, max_batches=max_batches, dry_run=dry_run
+        )
+        for rule in metrics['rules']:
+            click.echo(f"  {rule['action']} {rule['type']} older than {rule['older_than_days']} days: {rule['rows']}")
+        verb = 'Would move' if dry_run else 'Moved'
+        click.echo(f"✅ {verb} {metrics['archived']} archived, {metrics['deleted']} deleted "
+                   f"in {metrics['batches']} batches ({metrics['duration_ms']} ms)")
+        if not metrics['complete']:
+            click.echo("⚠️ Batch limit reached; run again to continue")
+
 def setup_logging(app):
     """Setup application logging"""
     if not app.debug and not app.testing:
@@ -13,6 +13,65 @@ from flask_login import UserMixin
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 import enum
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql.elements import ClauseElement
+
+class CounterMixin:
+    """Mixin for models that keep denormalized counter columns."""
+    
+    def increment_counter(self, name, amount=1):
+        """Adjust a counter column with an atomic ``column = column + amount`` on flush."""
+        current = self.__dict__.get(name)
+        if isinstance(current, ClauseElement):
+            setattr(self, name, current + amount)
+        elif inspect(self).persistent:
+            setattr(self, name, getattr(type(self), name) + amount)
+        else:
+            setattr(self, name, (current or 0) + amount)
+
+class LoadingProfile:
+    """A named set of eager loads paired with the serializer that relies on them.
+    
+    Relationship paths are given as dotted names (``'course.teacher'``) and are
+    resolved against the model when the profile is applied to a query.
+    """
+    
+    def __init__(self, joined=(), selectin=(), serializer=None):
+        self.joined = tuple(joined)
+        self.selectin = tuple(selectin)
+        self.serializer = serializer or (lambda obj: obj.to_dict())
+    
+    def options(self, model):
+        """Build the loader options for the given model."""
+        return [self._build(model, path, joinedload) for path in self.joined] + \
+               [self._build(model, path, selectinload) for path in self.selectin]
+    
+    @staticmethod
+    def _build(model, path, loader):
+        option = None
+        current = model
+        for name in path.split('.'):
+            attribute = getattr(current, name)
+            option = loader(attribute) if option is None else getattr(option, loader.__name__)(attribute)
+            current = attribute.property.mapper.class_
+        return option
+
+class SerializationMixin:
+    """Mixin for models that expose named loading profiles for list serialization."""
+    
+    serialization_profiles = {'default': LoadingProfile()}
+    
+    @classmethod
+    def with_profile(cls, query, profile='default'):
+        """Apply the eager loads of a profile to a query."""
+        return query.options(*cls.serialization_profiles[profile].options(cls))
+    
+    @classmethod
+    def serialize_many(cls, items, profile='default'):
+        """Serialize rows loaded with the given profile."""
+        serializer = cls.serialization_profiles[profile].serializer
+        return [serializer(item) for item in items]
 
 class UserRole(enum.Enum):
     """Enumeration for user roles in the system."""
@@ -32,9 +91,10 @@ class User(UserMixin, db.Model):
     role = db.Column(db.Enum(UserRole), nullable=False)
     phone = db.Column(db.String(20))
     age = db.Column(db.Integer)
-    created_at = db.Column(db.DateTime, default=datetime.now)
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     is_active = db.Column(db.Boolean, default=True)
+    token_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     taught_courses = db.relationship('Course', backref='teacher', lazy='dynamic', foreign_keys='Course.teacher_id')
     enrollments = db.relationship('Enrollment', backref='student', lazy='dynamic', foreign_keys='Enrollment.student_id')
@@ -51,6 +111,18 @@ class User(UserMixin, db.Model):
         """Verify a password against the stored hash."""
         return check_password_hash(self.password_hash, password)
     
+    def token_claims(self):
+        """Claims embedded in the user's JWTs so requests can be authorized without loading the user."""
+        return {
+            'role': self.role.value,
+            'active': bool(self.is_active),
+            'ver': self.token_version or 0
+        }
+    
+    def revoke_tokens(self):
+        """Invalidate every token issued so far by bumping the token version."""
+        self.token_version = (self.token_version or 0) + 1
+    
     def is_admin(self):
         """Check if the user has admin privileges."""
         return self.role == UserRole.ADMIN
@@ -98,7 +170,23 @@ class User(UserMixin, db.Model):
             'is_active': self.is_active
         }
 
-class Course(db.Model):
+class UserCounter(db.Model):
+    """Per-user unread counters backing the notification and message badges.
+    Kept in their own table so notification fan-outs do not lock user rows; the
+    services adjust them in the same transaction as the rows they count, and
+    ``CounterService.reconcile_unread_counts`` repairs any drift."""
+    __tablename__ = 'user_counters'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    unread_notification_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    unread_message_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+@event.listens_for(User, 'after_insert')
+def _create_user_counters(mapper, connection, user):
+    """Every user created through the ORM starts with a zeroed counters row"""
+    connection.execute(UserCounter.__table__.insert().values(user_id=user.id))
+
+class Course(CounterMixin, db.Model):
     """Courses are created by teachers and can be enrolled in by students.
     Each course contains lessons, quizzes, assignments, and tracks student progress.
     """
@@ -116,6 +204,11 @@ class Course(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     is_published = db.Column(db.Boolean, default=False)
     
+    active_enrollment_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    lesson_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    quiz_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    assignment_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
     lessons = db.relationship('Lesson', backref='course', lazy='dynamic', cascade='all, delete-orphan')
     enrollments = db.relationship('Enrollment', backref='course', lazy='dynamic', cascade='all, delete-orphan')
     quizzes = db.relationship('Quiz', backref='course', lazy='dynamic', cascade='all, delete-orphan')
@@ -124,7 +217,7 @@ class Course(db.Model):
     
     def get_enrollment_count(self):
         """Get the number of currently enrolled students."""
-        return self.enrollments.filter_by(status='active').count()
+        return self.active_enrollment_count or 0
     
     def is_full(self):
         """Check if course has reached maximum enrollment capacity."""
@@ -142,6 +235,9 @@ class Course(db.Model):
             'end_date': self.end_date.isoformat() if self.end_date else None,
             'max_students': self.max_students,
             'current_students': self.get_enrollment_count(),
+            'lesson_count': self.lesson_count or 0,
+            'quiz_count': self.quiz_count or 0,
+            'assignment_count': self.assignment_count or 0,
             'is_published': self.is_published,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -178,7 +274,7 @@ class Lesson(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
-class Enrollment(db.Model):
+class Enrollment(SerializationMixin, db.Model):
     """Student enrollment in a course. Tracks a student's participation in a course, including progress,
     completion status, and enrollment timeline.
     """
@@ -192,7 +288,22 @@ class Enrollment(db.Model):
     status = db.Column(db.Enum('active', 'completed', 'dropped'), default='active')
     progress_percentage = db.Column(db.Float, default=0.0)
     
-    __table_args__ = (db.UniqueConstraint('student_id', 'course_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'course_id'),
+        db.Index('ix_enrollments_course_status', 'course_id', 'status'),
+    )
+    
+    serialization_profiles = {
+        'default': LoadingProfile(joined=('course',)),
+        'with_course': LoadingProfile(
+            joined=('course.teacher',),
+            serializer=lambda e: {**e.to_dict(), 'course': e.course.to_dict()}
+        ),
+        'with_student': LoadingProfile(
+            joined=('course', 'student'),
+            serializer=lambda e: {**e.student.to_dict(), 'enrollment': e.to_dict()}
+        )
+    }
     
     def calculate_progress(self):
         """Calculate overall course progress percentage.
@@ -200,55 +311,25 @@ class Enrollment(db.Model):
         - Completed lessons
         - Passed quizzes (meeting passing score)
         - Submitted assignments
-        """
-        course = self.course
-        total_components = 0
-        completed_components = 0
-        
-        from app.models import QuizAttempt, AssignmentSubmission, LessonProgress, Lesson
-        
-        total_lessons = course.lessons.count()
-        if total_lessons > 0:
-            completed_lessons = LessonProgress.query.filter_by(
-                student_id=self.student_id
-            ).join(Lesson).filter(
-                Lesson.course_id == course.id,
-                LessonProgress.completed_at.isnot(None)
-            ).count()
-            
-            total_components += total_lessons
-            completed_components += completed_lessons
         
-        course_quizzes = course.quizzes.all()
-        for quiz in course_quizzes:
-            total_components += 1
-            
-            best_attempt = QuizAttempt.query.filter_by(
-                student_id=self.student_id,
-                quiz_id=quiz.id,
-                status='completed'
-            ).order_by(QuizAttempt.score.desc()).first()
-            
-            if best_attempt and best_attempt.score is not None and best_attempt.score >= quiz.passing_score:
-                completed_components += 1
-        
-        course_assignments = course.assignments.all()
-        for assignment in course_assignments:
-            total_components += 1
-            
-            submission = AssignmentSubmission.query.filter_by(
-                student_id=self.student_id,
-                assignment_id=assignment.id
-            ).first()
-            
-            if submission and submission.status in ['submitted', 'graded']:
-                completed_components += 1
-        
-        if total_components == 0:
-            return 100.0  
+        Delegates to ProgressService.compute_progress; callers handling many
+        enrollments should call that directly with all their ids at once.
+        """
+        from app.services.progress_service import ProgressService
         
-        progress = (completed_components / total_components) * 100
-        return min(round(progress, 2), 100.0)
+        if self.id is None:
+            db.session.flush()
+        return ProgressService.compute_progress([self.id]).get(self.id, 100.0)
+
+    def set_status(self, status):
+        """Change the enrollment status, keeping the course's active enrollment counter in sync."""
+        if status == self.status:
+            return
+        if self.status == 'active':
+            self.course.increment_counter('active_enrollment_count', -1)
+        if status == 'active':
+            self.course.increment_counter('active_enrollment_count')
+        self.status = status
 
     def to_dict(self):
         return {
@@ -262,7 +343,7 @@ class Enrollment(db.Model):
             'progress_percentage': self.progress_percentage
         }
 
-class Quiz(db.Model):
+class Quiz(CounterMixin, db.Model):
     """Quizzes are assessments within a course that test student knowledge.
     Each quiz can have multiple questions and tracks student attempts and scores.
     """
@@ -277,6 +358,7 @@ class Quiz(db.Model):
     passing_score = db.Column(db.Integer, default=60)
     time_limit_minutes = db.Column(db.Integer)
     max_attempts = db.Column(db.Integer, default=3)
+    question_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
@@ -294,7 +376,7 @@ class Quiz(db.Model):
             'passing_score': self.passing_score,
             'time_limit_minutes': self.time_limit_minutes,
             'max_attempts': self.max_attempts,
-            'question_count': self.questions.count(),
+            'question_count': self.question_count or 0,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -313,7 +395,9 @@ class Question(db.Model):
     answer_options = db.relationship('AnswerOption', backref='question', lazy='dynamic', cascade='all, delete-orphan')
     student_answers = db.relationship('StudentAnswer', backref='question', lazy='dynamic')
     
-    def to_dict(self):
+    def to_dict(self, answer_options=None):
+        if answer_options is None:
+            answer_options = self.answer_options
         return {
             'id': self.id,
             'quiz_id': self.quiz_id,
@@ -321,8 +405,25 @@ class Question(db.Model):
             'question_type': self.question_type,
             'points': self.points,
             'order_number': self.order_number,
-            'answer_options': [opt.to_dict() for opt in self.answer_options]
+            'answer_options': [opt.to_dict() for opt in answer_options]
         }
+    
+    @staticmethod
+    def load_answer_options(questions):
+        """Load the answer options of several questions in one query, keyed by question id."""
+        options = {question.id: [] for question in questions}
+        if options:
+            for option in AnswerOption.query.filter(
+                AnswerOption.question_id.in_(list(options))
+            ).order_by(AnswerOption.id).all():
+                options[option.question_id].append(option)
+        return options
+    
+    @classmethod
+    def serialize_many(cls, questions):
+        """Serialize questions with the answer options of all of them loaded in one query."""
+        options = cls.load_answer_options(questions)
+        return [question.to_dict(options[question.id]) for question in questions]
 
 class AnswerOption(db.Model):
     """Answer options for multiple choice questions in quizzes."""
@@ -355,6 +456,12 @@ class QuizAttempt(db.Model):
     status = db.Column(db.Enum('in_progress', 'completed', 'abandoned'), default='in_progress')
     graded_at = db.Column(db.DateTime, nullable=True)
     student_answers = db.relationship('StudentAnswer', backref='attempt', lazy='dynamic', cascade='all, delete-orphan')
+    result = db.relationship('QuizAttemptResult', backref='attempt', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+    
+    __table_args__ = (
+        db.Index('ix_quiz_attempts_student_quiz_status_score', 'student_id', 'quiz_id', 'status', 'score'),
+        db.Index('ix_quiz_attempts_quiz_status', 'quiz_id', 'status'),
+    )
     
     def to_dict(self):
         return {
@@ -375,7 +482,7 @@ class StudentAnswer(db.Model):
     __tablename__ = 'student_answers'
     
     id = db.Column(db.Integer, primary_key=True)
-    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempts.id'), nullable=False)
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempts.id'), nullable=False, index=True)
     question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
     answer_text = db.Column(db.Text)
     selected_option_id = db.Column(db.Integer, db.ForeignKey('answer_options.id'))
@@ -384,6 +491,21 @@ class StudentAnswer(db.Model):
     
     selected_option = db.relationship('AnswerOption', foreign_keys=[selected_option_id])
 
+class QuizAttemptResult(db.Model):
+    """Frozen results document of a completed quiz attempt: the attempt, the quiz
+    and, per answered question, the correctness, points and the chosen and
+    correct option text. Written by ``QuizService`` when the attempt is
+    submitted and again when it is graded, and served as is by the results page.
+    ``student_id`` and ``quiz_id`` are copied from the attempt for access checks."""
+    __tablename__ = 'quiz_attempt_results'
+    
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempts.id', ondelete='CASCADE'), primary_key=True)
+    student_id = db.Column(db.Integer, nullable=False)
+    quiz_id = db.Column(db.Integer, nullable=False)
+    document = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
 class Assignment(db.Model):
     """Assignments are tasks given to students within a course.
     Each assignment can have a title, description, due date, and total points.
@@ -431,7 +553,11 @@ class AssignmentSubmission(db.Model):
     graded_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     status = db.Column(db.Enum('submitted', 'graded', 'returned'), default='submitted')
     
-    __table_args__ = (db.UniqueConstraint('assignment_id', 'student_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('assignment_id', 'student_id'),
+        db.Index('ix_assignment_submissions_assignment_status', 'assignment_id', 'status'),
+        db.Index('ix_assignment_submissions_student_status', 'student_id', 'status'),
+    )
     
     grader = db.relationship('User', foreign_keys=[graded_by])
     
@@ -461,7 +587,10 @@ class LessonProgress(db.Model):
     completed_at = db.Column(db.DateTime)
     time_spent_minutes = db.Column(db.Integer, default=0)
     
-    __table_args__ = (db.UniqueConstraint('student_id', 'lesson_id'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'lesson_id'),
+        db.Index('ix_lesson_progress_lesson_completed', 'lesson_id', 'completed_at'),
+    )
     
     student = db.relationship('User', backref='lesson_progress')
 
@@ -491,7 +620,7 @@ class StudentAchievement(db.Model):
     
     __table_args__ = (db.UniqueConstraint('student_id', 'achievement_id'),)
 
-class Certificate(db.Model):
+class Certificate(SerializationMixin, db.Model):
     """Certificates are issued to students upon successful completion of a course.
     Each certificate has a unique code, student ID, course ID, and issue date."""
     __tablename__ = 'certificates'
@@ -506,6 +635,10 @@ class Certificate(db.Model):
     
     student = db.relationship('User', backref='certificates')
     
+    serialization_profiles = {
+        'default': LoadingProfile(joined=('course', 'student'))
+    }
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -517,7 +650,7 @@ class Certificate(db.Model):
             'issued_at': self.issued_at.isoformat() if self.issued_at else None
         }
     
-class Message(db.Model):
+class Message(SerializationMixin, db.Model):
     """Message model for communication between users"""
     __tablename__ = 'messages'
     
@@ -535,6 +668,16 @@ class Message(db.Model):
     recipient = db.relationship('User', foreign_keys=[recipient_id], backref='received_messages')
     course = db.relationship('Course', backref='messages')
     
+    __table_args__ = (
+        db.Index('ix_messages_sender_recipient_sent', 'sender_id', 'recipient_id', 'sent_at'),
+        db.Index('ix_messages_recipient_read', 'recipient_id', 'read_at'),
+        db.Index('ix_messages_recipient_sent', 'recipient_id', 'sent_at'),
+    )
+    
+    serialization_profiles = {
+        'default': LoadingProfile(joined=('sender', 'recipient'))
+    }
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -550,6 +693,35 @@ class Message(db.Model):
             'recipient_name': self.recipient.full_name if self.recipient else None
         }
     
+class ConversationSummary(db.Model):
+    """Latest message and unread counts of the conversation between two users.
+    Keyed by the unordered pair, so ``user_low_id`` is always the smaller id;
+    ``low_unread_count`` counts unread messages received by the low user.
+    Maintained by ``MessagingService`` next to the messages it summarizes."""
+    __tablename__ = 'conversation_summaries'
+    
+    user_low_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    user_high_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    last_message_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=False)
+    last_sender_id = db.Column(db.Integer, nullable=False)
+    last_subject = db.Column(db.String(200), nullable=False)
+    snippet = db.Column(db.String(200), nullable=False)
+    last_message_at = db.Column(db.DateTime, nullable=False)
+    low_unread_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    high_unread_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_conversation_summaries_low_last', 'user_low_id', 'last_message_at'),
+        db.Index('ix_conversation_summaries_high_last', 'user_high_id', 'last_message_at'),
+    )
+    
+    SNIPPET_LENGTH = 200
+    
+    @staticmethod
+    def pair(user_id, other_id):
+        """The (low, high) key of the conversation between two users"""
+        return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
 class NotificationType(enum.Enum):
     """Enumeration for different types of notifications in the LMS."""
     MESSAGE = 'message'
@@ -575,7 +747,7 @@ class NotificationPriority(enum.Enum):
     HIGH = 'high'
     URGENT = 'urgent'
 
-class Notification(db.Model):
+class Notification(SerializationMixin, db.Model):
     """Notification model for user notifications"""
     __tablename__ = 'notifications'
     
@@ -589,6 +761,7 @@ class Notification(db.Model):
     message = db.Column(db.Text, nullable=False)
     action_url = db.Column(db.String(500), nullable=True)
     related_id = db.Column(db.Integer, nullable=True)
+    count = db.Column(db.Integer, default=1, server_default='1', nullable=False)  # events merged into this row
     is_read = db.Column(db.Boolean, default=False, nullable=False)
     read_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
@@ -596,12 +769,23 @@ class Notification(db.Model):
     recipient = db.relationship('User', foreign_keys=[recipient_id], backref='received_notifications')
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_notifications')
     
+    __table_args__ = (
+        db.Index('ix_notifications_recipient_read_created', 'recipient_id', 'is_read', 'created_at'),
+        db.Index('ix_notifications_type_created', 'type', 'created_at'),
+        db.Index('ix_notifications_recipient_created', 'recipient_id', 'created_at'),
+    )
+    
+    serialization_profiles = {
+        'default': LoadingProfile(joined=('sender', 'recipient'))
+    }
+    
     def mark_as_read(self):
-        """Mark notification as read"""
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = datetime.now()
-            db.session.commit()
+        """Mark notification as read, returning whether it was unread"""
+        if self.is_read:
+            return False
+        self.is_read = True
+        self.read_at = datetime.now()
+        return True
     
     def to_dict(self):
         return {
@@ -614,13 +798,103 @@ class Notification(db.Model):
             'message': self.message,
             'action_url': self.action_url,
             'related_id': self.related_id,
+            'count': self.count,
             'is_read': self.is_read,
             'read_at': self.read_at.isoformat() if self.read_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'sender_name': self.sender.full_name if self.sender else None,
             'recipient_name': self.recipient.full_name if self.recipient else None
         }
-class CertificateRequest(db.Model):
+
+class NotificationArchive(db.Model):
+    """Notifications moved out of the hot table by the retention job.
+    Rows keep the id they had in ``notifications``."""
+    __tablename__ = 'notifications_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    recipient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    type = db.Column(db.String(40), nullable=False)
+    priority = db.Column(db.String(30), default='normal')
+    
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    action_url = db.Column(db.String(500), nullable=True)
+    related_id = db.Column(db.Integer, nullable=True)
+    count = db.Column(db.Integer, default=1, server_default='1', nullable=False)
+    is_read = db.Column(db.Boolean, default=False, nullable=False)
+    read_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_notifications_archive_recipient_created', 'recipient_id', 'created_at'),
+    )
+
+class NotificationOutbox(db.Model):
+    """Notification waiting to be delivered by the background dispatcher.
+    Entries are written in the same transaction as the change they announce and
+    deleted once their notifications exist; entries that keep failing are kept
+    with the 'dead' status for inspection."""
+    __tablename__ = 'notification_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_ids = db.Column(db.JSON, nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    type = db.Column(db.String(40), nullable=False)
+    priority = db.Column(db.String(30), default='normal')
+
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    action_url = db.Column(db.String(500), nullable=True)
+    related_id = db.Column(db.Integer, nullable=True)
+    summary = db.Column(db.String(500), nullable=True)  # message for a coalesced row, '{count}' is filled in
+
+    status = db.Column(db.Enum('pending', 'processing', 'dead'), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    claim_token = db.Column(db.String(32), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    available_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_notification_outbox_status_available', 'status', 'available_at'),
+        db.Index('ix_notification_outbox_claim_token', 'claim_token'),
+    )
+
+    def notification_rows(self):
+        """Rows for the notifications table, one per recipient, dated when the entry was enqueued"""
+        return [{
+            'recipient_id': recipient_id,
+            'sender_id': self.sender_id,
+            'type': self.type,
+            'priority': self.priority,
+            'title': self.title,
+            'message': self.message,
+            'action_url': self.action_url,
+            'related_id': self.related_id,
+            'count': 1,
+            'is_read': False,
+            'created_at': self.created_at
+        } for recipient_id in self.recipient_ids]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'recipient_ids': self.recipient_ids,
+            'sender_id': self.sender_id,
+            'type': self.type,
+            'priority': self.priority,
+            'title': self.title,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'available_at': self.available_at.isoformat() if self.available_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class CertificateRequest(SerializationMixin, db.Model):
     """Certificate request model for students to request course completion certificates.
     Admins can review and approve or reject requests."""
     __tablename__ = 'certificate_requests'
@@ -640,6 +914,10 @@ class CertificateRequest(db.Model):
     
     __table_args__ = (db.UniqueConstraint('student_id', 'course_id'),)
     
+    serialization_profiles = {
+        'default': LoadingProfile(joined=('student', 'course', 'reviewer'))
+    }
+    
     def to_dict(self):
         return {
             'id': self.id,
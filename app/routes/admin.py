@@ -1,9 +1,8 @@
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, request, jsonify, make_response, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.admin_service import AdminService
-from app.utils.base_controller import BaseController
-from app.utils.decorators import admin_required
-from app.models import User 
+from app.utils.base_controller import BaseController, ValidationException
+from app.utils.decorators import admin_required, get_current_user
 
 bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -22,7 +21,7 @@ def get_dashboard():
         except (ValueError, TypeError):
             return jsonify({'error': 'Invalid user ID'}), 400
         
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -32,10 +31,10 @@ def get_dashboard():
         
         dashboard_data = AdminService.get_dashboard()
         
-        return jsonify({
+        return BaseController.json_response({
             'message': 'Dashboard data retrieved successfully',
             'data': dashboard_data
-        }), 200
+        }, etag=True)
         
     except Exception as e:
         print(f"Dashboard error: {str(e)}")
@@ -58,6 +57,8 @@ def get_users():
     role = request.args.get('role')
     status = request.args.get('status')
     search = request.args.get('search')
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
     
     try:
         data = AdminService.get_users(
@@ -65,9 +66,13 @@ def get_users():
             per_page=per_page,
             role=role,
             status=status,
-            search=search
+            search=search,
+            cursor=cursor,
+            with_total=with_total
         )
         return jsonify(data), 200
+    except ValidationException as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Get users error: {str(e)}")
         return jsonify({
@@ -221,7 +226,7 @@ def get_user_activity_report():
     days = request.args.get('days', 30, type=int)
     try:
         data = AdminService.get_user_activity_report(days)
-        return jsonify(data), 200
+        return BaseController.json_response(data, etag=True)
     except Exception as e:
         print(f"User activity report error: {str(e)}")
         return jsonify({
@@ -237,7 +242,7 @@ def get_course_performance_report():
     """Get course performance report"""
     try:
         data = AdminService.get_course_performance_report()
-        return jsonify(data), 200
+        return BaseController.json_response(data, etag=True)
     except Exception as e:
         print(f"Course performance report error: {str(e)}")
         return jsonify({
@@ -277,7 +282,7 @@ def get_user_activity_overview():
     days = request.args.get('days', 30, type=int)
     try:
         data = AdminService.get_user_overview_chart(days)
-        return jsonify(data), 200
+        return BaseController.json_response(data, etag=True)
     except Exception as e:
         print(f"User activity report error: {str(e)}")
         return jsonify({
@@ -286,13 +291,37 @@ def get_user_activity_overview():
             "active_users": []
         }), 200
 
+@bp.route('/perf/requests', methods=['GET'])
+@admin_required()
+def get_perf_requests():
+    """Get SQL statistics for the most recent requests"""
+    limit = request.args.get('limit', type=int)
+    instrumentation = current_app.extensions['sql_instrumentation']
+    return jsonify(instrumentation.get_recent_requests(limit)), 200
+
+@bp.route('/notifications/retention', methods=['GET'])
+@admin_required()
+def get_notification_retention():
+    """Get notification table sizes, the retention policies and the last run's metrics"""
+    from app.services.retention_service import RetentionService
+    
+    dispatcher = current_app.extensions['notification_dispatcher']
+    data = RetentionService.get_retention_stats()
+    data['policies'] = current_app.config['NOTIFICATION_RETENTION_POLICIES']
+    data['last_run'] = dispatcher.last_retention
+    return jsonify(data), 200
+
 @bp.route('/reports/course-categories', methods=['GET'])
 @admin_required()
 def get_course_categories():
     """Return course category distribution"""
+    etag, not_modified = BaseController.check_version(AdminService.get_course_categories_version)
+    if not_modified is not None:
+        return not_modified
+    
     try:
         data = AdminService.get_course_categories_distribution()
-        return jsonify(data), 200
+        return BaseController.json_response(data, etag=etag)
     except Exception as e:
         print(f"Course category distribution error: {str(e)}")
         return jsonify({}), 500
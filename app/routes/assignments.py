@@ -11,7 +11,7 @@ bp = Blueprint('assignments', __name__, url_prefix='/api/assignments')
 @jwt_required()
 def get_course_assignments(course_id):
     """Get all assignments for a course"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         AssignmentService.get_course_assignments,
         user_id,
@@ -22,7 +22,7 @@ def get_course_assignments(course_id):
 @jwt_required()
 def get_assignment(assignment_id):
     """Get a specific assignment"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         AssignmentService.get_assignment,
         user_id,
@@ -33,7 +33,7 @@ def get_assignment(assignment_id):
 @teacher_required()
 def create_assignment():
     """Create a new assignment"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         AssignmentService.create_assignment,
         user_id,
@@ -46,7 +46,7 @@ def create_assignment():
 @teacher_required()
 def update_assignment(assignment_id):
     """Update an assignment"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         AssignmentService.update_assignment,
         int(user_id),
@@ -59,7 +59,7 @@ def update_assignment(assignment_id):
 @teacher_required()
 def delete_assignment(assignment_id):
     """Delete an assignment"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         AssignmentService.delete_assignment,
         int(user_id),
@@ -71,7 +71,7 @@ def delete_assignment(assignment_id):
 @student_required()
 def submit_assignment(assignment_id):
     """Submit an assignment"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     submission_text = request.form.get('submission_text', '')
     file = request.files.get('file')
     max_file_size = current_app.config.get('MAX_CONTENT_LENGTH', 16777216)
@@ -91,7 +91,7 @@ def submit_assignment(assignment_id):
 @teacher_required()
 def get_assignment_submissions(assignment_id):
     """Get all submissions for an assignment (teacher only)"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         AssignmentService.get_assignment_submissions,
         int(user_id),
@@ -102,7 +102,7 @@ def get_assignment_submissions(assignment_id):
 @teacher_required()
 def grade_submission(submission_id):
     """Grade an assignment submission"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     data = request.get_json()
     
     try:
@@ -128,7 +128,7 @@ def grade_submission(submission_id):
 @teacher_required()
 def return_submission(submission_id):
     """Return submission to student for revision"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     data = request.get_json()
     feedback = data.get('feedback', 'Please revise and resubmit.')
     
@@ -3,8 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 
 from app.services.course_service import CourseService
 from app.utils.base_controller import BaseController
-from app.utils.decorators import teacher_required
-from app.models import User
+from app.utils.decorators import teacher_required, get_current_user
 
 bp = Blueprint('courses', __name__, url_prefix='/api/courses')
 
@@ -12,7 +11,7 @@ bp = Blueprint('courses', __name__, url_prefix='/api/courses')
 @jwt_required()
 def get_courses():
     """Get all courses (filtered based on user role)"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     category = request.args.get('category')
@@ -31,7 +30,7 @@ def get_courses():
 @jwt_required()
 def get_course(course_id):
     """Get a specific course"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         CourseService.get_course,
         user_id,
@@ -42,7 +41,7 @@ def get_course(course_id):
 @teacher_required()
 def create_course():
     """Create a new course (teachers only)"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         CourseService.create_course,
         user_id,
@@ -65,7 +64,7 @@ def update_course(course_id):
             success_message="Course updated successfully"
         )
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user:
         return BaseController.handle_request(
             lambda: (_ for _ in ()).throw(ValueError("User not found")),
@@ -100,7 +99,7 @@ def delete_course(course_id):
             success_message="Course deleted successfully"
         )
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user:
         return BaseController.handle_request(
             lambda: (_ for _ in ()).throw(ValueError("User not found")),
@@ -124,7 +123,7 @@ def delete_course(course_id):
 @jwt_required()
 def enroll_in_course(course_id):
     """Enroll in a course (students only)"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         CourseService.enroll_student,
         user_id,
@@ -137,7 +136,7 @@ def enroll_in_course(course_id):
 @jwt_required()
 def drop_course(course_id):
     """Drop a course (students only)"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         CourseService.drop_course,
         user_id,
@@ -149,7 +148,7 @@ def drop_course(course_id):
 @jwt_required()
 def get_enrolled_courses():
     """Get courses the student is enrolled in"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     status = request.args.get('status', 'active')
@@ -176,7 +175,7 @@ def get_course_students(course_id):
             success_message="Students retrieved successfully"
         )
     
-    user = User.query.get(user_id)
+    user = get_current_user()
     if not user:
         return BaseController.handle_request(
             lambda: (_ for _ in ()).throw(ValueError("User not found")),
@@ -1,15 +1,65 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, make_response
-import requests
+from flask_jwt_extended import decode_token
+from app.models import db, User
+from app.services.auth_service import AuthService
+from app.services.admin_service import AdminService
+from app.services.course_service import CourseService
+from app.services.certificate_service import CertificateService
+from app.utils.base_controller import BaseController
+from app.utils.decorators import is_token_revoked
 
 bp = Blueprint('frontend', __name__)
 
-API_BASE_URL = 'http://localhost:5000/api'
+def session_identity(*roles):
+    """Verify the session's access token in-process and return ``(user_id, denied)``.
 
-def get_auth_headers():
-    """Get authentication headers from session"""
-    if 'access_token' in session:
-        return {'Authorization': f'Bearer {session["access_token"]}'}
-    return {}
+    Pages call the services directly instead of looping back through the API,
+    so the checks the API's JWT decorators made happen here: the token must
+    decode and be unexpired, must not be revoked, and its role claim must be
+    one of ``roles`` when given. ``denied`` is the ``(payload, status_code)``
+    the API would have answered with, or None when the caller is authorized.
+    """
+    token = session.get('access_token')
+    if not token:
+        return None, ({'msg': 'Missing Authorization Header'}, 401)
+
+    try:
+        claims = decode_token(token)
+        user_id = int(claims['sub'])
+    except Exception as e:
+        return None, ({'msg': str(e)}, 401)
+
+    if claims.get('type') != 'access' or is_token_revoked({}, claims):
+        return None, ({'msg': 'Token has been revoked'}, 401)
+
+    if roles:
+        role = claims.get('role')
+        if role is None:
+            user = db.session.get(User, user_id)
+            if not user:
+                return None, ({'error': 'User not found'}, 404)
+            role = user.role.value
+        if role not in roles:
+            return None, ({'error': f"Access denied. {' or '.join(r.title() for r in roles)} role required"}, 403)
+
+    return user_id, None
+
+def call_or_default(default, service_method, *args, **kwargs):
+    """Call a service, falling back to ``default`` on errors like the API's list and report routes do"""
+    try:
+        return service_method(*args, **kwargs)
+    except Exception as e:
+        print(f"{service_method.__name__} error: {str(e)}")
+        db.session.rollback()
+        return default
+
+def call_auth_service(service_method, *args, error_prefix, success_code=200, error_code=400):
+    """Call an AuthService method and shape the result like the /api/auth routes"""
+    try:
+        result = service_method(*args)
+        return {'message': result['message'], 'data': result}, success_code
+    except Exception as e:
+        return {'error': str(e).replace(error_prefix, '')}, error_code
 
 @bp.route('/')
 def index():
@@ -33,14 +83,14 @@ def login():
         remember = 'remember' in request.form
         
         try:
-            response = requests.post(f'{API_BASE_URL}/auth/login', json={
+            payload, status_code = call_auth_service(AuthService.login_user, {
                 'username': username, 
                 'password': password,
                 'remember': remember
-            })
+            }, error_prefix='Login failed: ', error_code=401)
             
-            if response.status_code == 200:
-                data = response.json()['data']
+            if status_code == 200:
+                data = payload['data']
                 session['access_token'] = data['access_token']
                 session['refresh_token'] = data['refresh_token']
                 session['user_id'] = data['user']['id']
@@ -59,7 +109,7 @@ def login():
                     flash('Unknown user role', 'error')
                     return redirect(url_for('frontend.index'))
             else:
-                error_data = response.json()
+                error_data = payload
                 error_message = error_data.get('error', 'Login failed')
                 field_errors = error_data.get('field_errors', {})
                 
@@ -124,17 +174,19 @@ def register():
         }
         
         try:
-            response = requests.post(f'{API_BASE_URL}/auth/register', json=data)
+            payload, status_code = call_auth_service(
+                AuthService.register_user, data, error_prefix='Registration failed: ', success_code=201
+            )
             
-            if response.status_code == 201:
-                login_response = requests.post(f'{API_BASE_URL}/auth/login', json={
+            if status_code == 201:
+                login_payload, login_status = call_auth_service(AuthService.login_user, {
                     'username': data['username'],
                     'password': data['password'],
                     'remember': False
-                })
+                }, error_prefix='Login failed: ', error_code=401)
                 
-                if login_response.status_code == 200:
-                    login_data = login_response.json()['data']
+                if login_status == 200:
+                    login_data = login_payload['data']
                     session['access_token'] = login_data['access_token']
                     session['refresh_token'] = login_data['refresh_token']
                     session['user_id'] = login_data['user']['id']
@@ -153,7 +205,7 @@ def register():
                     flash('Registration successful! Please log in.', 'success')
                     return redirect(url_for('frontend.login'))
             else:
-                error_data = response.json()
+                error_data = payload
                 error_message = error_data.get('error', 'Registration failed')
                 field_errors = error_data.get('field_errors', {})
                 
@@ -181,12 +233,10 @@ def admin_dashboard():
         return redirect(url_for('frontend.index'))
     
     try:
-        headers = get_auth_headers()
-        response = requests.get(f'{API_BASE_URL}/admin/dashboard', headers=headers)
+        _, denied = session_identity('admin')
+        dashboard_data = None if denied else call_or_default(None, AdminService.get_dashboard)
         
-        if response.status_code == 200:
-            response_data = response.json()
-            dashboard_data = response_data.get('data', {})
+        if dashboard_data is not None:
             return render_template('admin/dashboard.html', data=dashboard_data)
         else:
             flash('Failed to load dashboard data', 'error')
@@ -218,19 +268,18 @@ def admin_users():
     search = request.args.get('search', '')
     
     try:
-        headers = get_auth_headers()
-        params = {'page': page, 'per_page': 20}
-        if role:
-            params['role'] = role
-        if status:
-            params['status'] = status
-        if search:
-            params['search'] = search
-            
-        response = requests.get(f'{API_BASE_URL}/admin/users', headers=headers, params=params)
-        
-        if response.status_code == 200:
-            users_data = response.json()
+        _, denied = session_identity('admin')
+        
+        if not denied:
+            users_data = call_or_default(
+                {'users': [], 'total': 0, 'page': 1, 'per_page': 20, 'pages': 1},
+                AdminService.get_users,
+                page=page,
+                per_page=20,
+                role=role or None,
+                status=status or None,
+                search=search or None
+            )
             return render_template('admin/users.html', 
                                  users=users_data.get('users', []),
                                  total=users_data.get('total', 0),
@@ -263,19 +312,18 @@ def admin_courses():
     search = request.args.get('search', '')
     
     try:
-        headers = get_auth_headers()
-        params = {'page': page, 'per_page': 20}
-        if category:
-            params['category'] = category
-        if status:
-            params['status'] = status
-        if search:
-            params['search'] = search
-            
-        response = requests.get(f'{API_BASE_URL}/admin/courses', headers=headers, params=params)
-        
-        if response.status_code == 200:
-            courses_data = response.json()
+        _, denied = session_identity('admin')
+        
+        if not denied:
+            courses_data = call_or_default(
+                {'courses': [], 'total': 0, 'page': 1, 'per_page': 20, 'pages': 1},
+                AdminService.get_all_courses,
+                page=page,
+                per_page=20,
+                category=category or None,
+                status=status or None,
+                search=search or None
+            )
             return render_template('admin/courses.html', 
                                  courses=courses_data.get('courses', []),
                                  total=courses_data.get('total', 0),
@@ -305,39 +353,22 @@ def admin_reports():
     days = request.args.get('days', 30, type=int)
     
     try:
-        headers = get_auth_headers()
+        _, denied = session_identity('admin')
         
-        activity_response = requests.get(
-            f'{API_BASE_URL}/admin/reports/user-activity',
-            headers=headers,
-            params={'days': days}
-        )
-        
-        performance_response = requests.get(
-            f'{API_BASE_URL}/admin/reports/course-performance',
-            headers=headers
-        )
-        
-        activity_data = {}
-        performance_data = {}
+        activity_data = {
+            'period_days': days,
+            'user_registrations': [],
+            'course_enrollments': [],
+            'quiz_attempts': []
+        }
+        performance_data = {
+            'courses': [],
+            'total_courses': 0
+        }
         
-        if activity_response.status_code == 200:
-            activity_data = activity_response.json()
-        else:
-            activity_data = {
-                'period_days': days,
-                'user_registrations': [],
-                'course_enrollments': [],
-                'quiz_attempts': []
-            }
-        
-        if performance_response.status_code == 200:
-            performance_data = performance_response.json()
-        else:
-            performance_data = {
-                'courses': [],
-                'total_courses': 0
-            }
+        if not denied:
+            activity_data = call_or_default(activity_data, AdminService.get_user_activity_report, days)
+            performance_data = call_or_default(performance_data, AdminService.get_course_performance_report)
         
         return render_template('admin/reports.html', 
                              activity_data=activity_data,
@@ -366,14 +397,18 @@ def toggle_user_active(user_id):
         return jsonify({'error': 'Access denied'}), 403
     
     try:
-        headers = get_auth_headers()
-        response = requests.post(f'{API_BASE_URL}/admin/users/{user_id}/toggle-active', headers=headers)
+        admin_id, denied = session_identity('admin')
+        payload, status_code = denied or BaseController.dispatch(
+            AdminService.toggle_user_active,
+            admin_id,
+            user_id,
+            success_message="User status toggled successfully"
+        )
         
-        if response.status_code == 200:
-            return response.json()
+        if status_code == 200:
+            return payload
         else:
-            error_data = response.json()
-            return jsonify({'error': error_data.get('error', 'Failed to toggle user status')}), response.status_code
+            return jsonify({'error': payload.get('error', 'Failed to toggle user status')}), status_code
     except Exception as e:
         return jsonify({'error': f'Connection error: {str(e)}'}), 500
 
@@ -384,14 +419,13 @@ def get_user_details(user_id):
         return jsonify({'error': 'Access denied'}), 403
     
     try:
-        headers = get_auth_headers()
-        response = requests.get(f'{API_BASE_URL}/admin/users/{user_id}', headers=headers)
+        _, denied = session_identity('admin')
+        payload, status_code = denied or BaseController.dispatch(AdminService.get_user, user_id)
         
-        if response.status_code == 200:
-            return response.json()
+        if status_code == 200:
+            return payload
         else:
-            error_data = response.json()
-            return jsonify({'error': error_data.get('error', 'Failed to load user details')}), response.status_code
+            return jsonify({'error': payload.get('error', 'Failed to load user details')}), status_code
     except Exception as e:
         return jsonify({'error': f'Connection error: {str(e)}'}), 500
 
@@ -402,18 +436,21 @@ def edit_user(user_id):
         return jsonify({'error': 'Access denied'}), 403
     
     try:
-        headers = get_auth_headers()
+        admin_id, denied = session_identity('admin')
         data = request.get_json()
         
-        response = requests.put(f'{API_BASE_URL}/admin/users/{user_id}', 
-                              headers=headers, 
-                              json=data)
+        payload, status_code = denied or BaseController.dispatch(
+            AdminService.update_user,
+            admin_id,
+            user_id,
+            data,
+            success_message="User updated successfully"
+        )
         
-        if response.status_code == 200:
-            return response.json()
+        if status_code == 200:
+            return payload
         else:
-            error_data = response.json()
-            return jsonify({'error': error_data.get('error', 'Failed to update user')}), response.status_code
+            return jsonify({'error': payload.get('error', 'Failed to update user')}), status_code
     except Exception as e:
         return jsonify({'error': f'Connection error: {str(e)}'}), 500
 
@@ -425,28 +462,24 @@ def export_users():
         return redirect(url_for('frontend.index'))
     
     try:
-        headers = get_auth_headers()
+        _, denied = session_identity('admin')
         
         role = request.args.get('role', '')
         status = request.args.get('status', '')
         search = request.args.get('search', '')
         
-        params = {}
-        if role:
-            params['role'] = role
-        if status:
-            params['status'] = status
-        if search:
-            params['search'] = search
-        
-        response = requests.get(f'{API_BASE_URL}/admin/users/export', 
-                              headers=headers, 
-                              params=params)
-        
-        if response.status_code == 200:
-            output = make_response(response.content)
-            output.headers["Content-Disposition"] = response.headers.get('Content-Disposition')
-            output.headers["Content-type"] = response.headers.get('Content-Type')
+        result = None if denied else call_or_default(
+            None,
+            AdminService.export_users,
+            role=role or None,
+            status=status or None,
+            search=search or None
+        )
+        
+        if result is not None:
+            output = make_response(result['csv_content'])
+            output.headers["Content-Disposition"] = f'attachment; filename={result["filename"]}'
+            output.headers["Content-type"] = 'text/csv'
             return output
         else:
             flash('Failed to export users', 'error')
@@ -464,14 +497,17 @@ def toggle_course_published(course_id):
         return jsonify({'error': 'Access denied'}), 403
     
     try:
-        headers = get_auth_headers()
-        response = requests.post(f'{API_BASE_URL}/admin/courses/{course_id}/toggle-published', headers=headers)
+        _, denied = session_identity('admin')
+        payload, status_code = denied or BaseController.dispatch(
+            AdminService.toggle_course_published,
+            course_id,
+            success_message="Course status toggled successfully"
+        )
         
-        if response.status_code == 200:
-            return response.json()
+        if status_code == 200:
+            return payload
         else:
-            error_data = response.json()
-            return jsonify({'error': error_data.get('error', 'Failed to toggle course status')}), response.status_code
+            return jsonify({'error': payload.get('error', 'Failed to toggle course status')}), status_code
     except Exception as e:
         return jsonify({'error': f'Connection error: {str(e)}'}), 500
 
@@ -482,14 +518,13 @@ def get_course_details(course_id):
         return jsonify({'error': 'Access denied'}), 403
     
     try:
-        headers = get_auth_headers()
-        response = requests.get(f'{API_BASE_URL}/courses/{course_id}', headers=headers)
+        user_id, denied = session_identity()
+        payload, status_code = denied or BaseController.dispatch(CourseService.get_course, user_id, course_id)
         
-        if response.status_code == 200:
-            return response.json()
+        if status_code == 200:
+            return payload
         else:
-            error_data = response.json()
-            return jsonify({'error': error_data.get('error', 'Failed to load course details')}), response.status_code
+            return jsonify({'error': payload.get('error', 'Failed to load course details')}), status_code
     except Exception as e:
         return jsonify({'error': f'Connection error: {str(e)}'}), 500
 
@@ -501,28 +536,24 @@ def export_courses():
         return redirect(url_for('frontend.index'))
     
     try:
-        headers = get_auth_headers()
+        _, denied = session_identity('admin')
         
         category = request.args.get('category', '')
         status = request.args.get('status', '')
         search = request.args.get('search', '')
         
-        params = {}
-        if category:
-            params['category'] = category
-        if status:
-            params['status'] = status
-        if search:
-            params['search'] = search
-        
-        response = requests.get(f'{API_BASE_URL}/admin/courses/export', 
-                              headers=headers, 
-                              params=params)
-        
-        if response.status_code == 200:
-            output = make_response(response.content)
-            output.headers["Content-Disposition"] = response.headers.get('Content-Disposition')
-            output.headers["Content-type"] = response.headers.get('Content-Type')
+        result = None if denied else call_or_default(
+            None,
+            AdminService.export_courses,
+            category=category or None,
+            status=status or None,
+            search=search or None
+        )
+        
+        if result is not None:
+            output = make_response(result['csv_content'])
+            output.headers["Content-Disposition"] = f'attachment; filename={result["filename"]}'
+            output.headers["Content-type"] = 'text/csv'
             return output
         else:
             flash('Failed to export courses', 'error')
@@ -548,21 +579,26 @@ def update_profile():
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
-        headers = get_auth_headers()
+        user_id, denied = session_identity()
         data = request.get_json()
         
-        response = requests.put(f'{API_BASE_URL}/auth/profile', 
-                              headers=headers, 
-                              json=data)
+        if denied:
+            payload, status_code = denied
+        elif not data:
+            payload, status_code = {'error': 'No data provided'}, 400
+        else:
+            payload, status_code = call_auth_service(
+                AuthService.update_user_profile, user_id, data, error_prefix='Failed to update profile: '
+            )
         
-        if response.status_code == 200:
-            result = response.json()
+        if status_code == 200:
+            result = payload
             if 'data' in result and 'user' in result['data']:
                 session['user_name'] = result['data']['user']['full_name']
             return jsonify(result)
         else:
-            error_data = response.json()
-            return jsonify(error_data), response.status_code
+            error_data = payload
+            return jsonify(error_data), status_code
     except Exception as e:
         return jsonify({'error': f'Connection error: {str(e)}'}), 500
 
@@ -573,18 +609,24 @@ def change_password():
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
-        headers = get_auth_headers()
+        user_id, denied = session_identity()
         data = request.get_json()
         
-        response = requests.post(f'{API_BASE_URL}/auth/change-password', 
-                               headers=headers, 
-                               json=data)
+        if denied:
+            payload, status_code = denied
+        elif not data:
+            payload, status_code = {'error': 'No data provided'}, 400
+        else:
+            try:
+                payload, status_code = AuthService.change_password(user_id, data), 200
+            except Exception as e:
+                payload, status_code = {'error': str(e).replace('Failed to change password: ', '')}, 400
         
-        if response.status_code == 200:
-            return jsonify(response.json())
+        if status_code == 200:
+            return jsonify(payload)
         else:
-            error_data = response.json()
-            return jsonify(error_data), response.status_code
+            error_data = payload
+            return jsonify(error_data), status_code
     except Exception as e:
         return jsonify({'error': f'Connection error: {str(e)}'}), 500
 
@@ -876,10 +918,9 @@ def admin_certificates():
 def verify_certificate_public(certificate_code):
     """Public certificate verification page"""
     try:
-        response = requests.get(f'{API_BASE_URL}/certificates/verify/{certificate_code}')
+        certificate_data, status_code = BaseController.dispatch(CertificateService.verify_certificate, certificate_code)
         
-        if response.status_code == 200:
-            certificate_data = response.json()
+        if status_code == 200:
             return render_template('public/verify_certificate.html', 
                                  certificate=certificate_data.get('data', {}),
                                  verified=True)
@@ -11,7 +11,7 @@ bp = Blueprint('lessons', __name__, url_prefix='/api/lessons')
 @jwt_required()
 def get_course_lessons(course_id):
     """Get all lessons for a course"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         LessonService.get_course_lessons,
         user_id,
@@ -22,7 +22,7 @@ def get_course_lessons(course_id):
 @jwt_required()
 def get_lesson(lesson_id):
     """Get a specific lesson"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         LessonService.get_lesson,
         user_id,
@@ -33,7 +33,7 @@ def get_lesson(lesson_id):
 @teacher_required()
 def create_lesson():
     """Create a new lesson"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         LessonService.create_lesson,
         int(user_id),
@@ -46,7 +46,7 @@ def create_lesson():
 @teacher_required()
 def update_lesson(lesson_id):
     """Update a lesson"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         LessonService.update_lesson,
         int(user_id),
@@ -59,7 +59,7 @@ def update_lesson(lesson_id):
 @teacher_required()
 def delete_lesson(lesson_id):
     """Delete a lesson"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         LessonService.delete_lesson,
         int(user_id),
@@ -71,7 +71,7 @@ def delete_lesson(lesson_id):
 @jwt_required()
 def complete_lesson(lesson_id):
     """Mark a lesson as complete"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     data = request.get_json() or {}
     time_spent = data.get('time_spent_minutes')
     
@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.services.messaging_service import MessagingService
 from app.utils.base_controller import BaseController
+from app.utils.decorators import get_current_user
 from app.models import User, UserRole, Course, Enrollment
 
 bp = Blueprint('messages', __name__, url_prefix='/api/messages')
@@ -31,15 +32,29 @@ def get_messages():
     message_type = request.args.get('type', 'received')  
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
     
     return BaseController.handle_list_request(
         MessagingService.get_messages,
         user_id,
         message_type=message_type,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        cursor=cursor,
+        with_total=with_total
     )
 
+@bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    """Get count of unread messages"""
+    user_id = int(get_jwt_identity())
+    
+    return jsonify({
+        'unread_count': MessagingService.get_unread_count(user_id)
+    })
+
 @bp.route('/<int:message_id>', methods=['GET'])
 @jwt_required()
 def get_message(message_id):
@@ -65,15 +80,33 @@ def mark_as_read(message_id):
         success_message="Message marked as read"
     )
 
+@bp.route('/bulk-read', methods=['POST'])
+@jwt_required()
+def bulk_mark_as_read():
+    """Mark multiple messages as read"""
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    
+    return BaseController.handle_request(
+        MessagingService.bulk_mark_as_read,
+        user_id,
+        data.get('message_ids'),
+        success_message="Messages marked as read"
+    )
+
 @bp.route('/conversations', methods=['GET'])
 @jwt_required()
 def get_conversations():
     """Get conversations for current user"""
     user_id = int(get_jwt_identity())
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
     
     return BaseController.handle_request(
         MessagingService.get_conversations,
-        user_id
+        user_id,
+        page=page,
+        per_page=per_page
     )
 
 @bp.route('/conversations/<int:partner_id>', methods=['GET'])
@@ -83,13 +116,17 @@ def get_conversation_messages(partner_id):
     user_id = int(get_jwt_identity())
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
     
     return BaseController.handle_list_request(
         MessagingService.get_conversation_messages,
         user_id,
         partner_id,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        cursor=cursor,
+        with_total=with_total
     )
 
 @bp.route('/search-users', methods=['GET'])
@@ -97,7 +134,7 @@ def get_conversation_messages(partner_id):
 def search_users():
     """Search for users that the current user can message"""
     current_user_id = int(get_jwt_identity())
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({'error': 'User not found'}), 404
@@ -1,7 +1,10 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, get_jwt_request_location
+from app.models import db
+from app.services.auth_service import AuthService
 from app.services.notification_service import NotificationService
 from app.utils.base_controller import BaseController
+from app.utils.notification_hub import format_event
 
 bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
@@ -13,13 +16,17 @@ def get_notifications():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     unread_only = request.args.get('unread_only', 'false').lower() == 'true'
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', 'false').lower() == 'true'
     
     return BaseController.handle_list_request(
         NotificationService.get_user_notifications,
         user_id,
         page=page,
         per_page=per_page,
-        unread_only=unread_only
+        unread_only=unread_only,
+        cursor=cursor,
+        with_total=with_total
     )
 
 @bp.route('/<int:notification_id>/read', methods=['POST'])
@@ -47,6 +54,20 @@ def mark_all_as_read():
         success_message="All notifications marked as read"
     )
 
+@bp.route('/bulk-read', methods=['POST'])
+@jwt_required()
+def bulk_mark_as_read():
+    """Mark multiple notifications as read"""
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    
+    return BaseController.handle_request(
+        NotificationService.bulk_mark_as_read,
+        user_id,
+        data.get('notification_ids'),
+        success_message="Notifications marked as read"
+    )
+
 @bp.route('/<int:notification_id>', methods=['DELETE'])
 @jwt_required()
 def delete_notification(notification_id):
@@ -66,11 +87,51 @@ def get_unread_count():
     """Get count of unread notifications"""
     user_id = int(get_jwt_identity())
     
-    data = NotificationService.get_user_notifications(user_id, per_page=1)
     return jsonify({
-        'unread_count': data['unread_count']
+        'unread_count': NotificationService.get_unread_count(user_id)
     })
 
+@bp.route('/stream-token', methods=['POST'])
+@jwt_required()
+def create_stream_token():
+    """Issue a short-lived token for opening the notification stream"""
+    user_id = int(get_jwt_identity())
+    
+    return jsonify(AuthService.create_stream_token(user_id, get_jwt().get('ver', 0)))
+
+@bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_notifications():
+    """Stream new notifications and unread count changes as Server-Sent Events.
+    
+    EventSource cannot set headers, so a token from ``/stream-token`` may be
+    passed as ``?jwt=``; access tokens are only accepted in the header, so they
+    never end up in URLs. The current unread count is sent first, then events
+    as they are published.
+    """
+    if get_jwt_request_location() == 'query_string' and get_jwt().get('scope') != 'notification_stream':
+        return jsonify({'error': 'Use a stream token in the query string'}), 401
+    
+    user_id = int(get_jwt_identity())
+    hub = current_app.extensions['notification_hub']
+    unread_count = NotificationService.get_unread_count(user_id)
+    subscription = hub.subscribe(user_id)
+    
+    # Don't hold a pooled connection for the lifetime of the stream
+    db.session.close()
+    
+    def generate():
+        try:
+            yield format_event('unread_count', {'unread_count': unread_count})
+            yield from subscription.stream(hub.heartbeat)
+        finally:
+            hub.unsubscribe(subscription)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @bp.route('/bulk-delete', methods=['POST'])
 @jwt_required()
 def bulk_delete_notifications():
@@ -11,7 +11,7 @@ bp = Blueprint('quizzes', __name__, url_prefix='/api/quizzes')
 @jwt_required()
 def get_course_quizzes(course_id):
     """Get all quizzes for a course"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.get_course_quizzes,
         int(user_id),
@@ -22,7 +22,7 @@ def get_course_quizzes(course_id):
 @jwt_required()
 def get_quiz(quiz_id):
     """Get a specific quiz"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.get_quiz,
         int(user_id),
@@ -33,7 +33,7 @@ def get_quiz(quiz_id):
 @teacher_required()
 def create_quiz():
     """Create a new quiz"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.create_quiz,
         int(user_id),
@@ -46,7 +46,7 @@ def create_quiz():
 @teacher_required()
 def update_quiz(quiz_id):
     """Update a quiz"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.update_quiz,
         int(user_id),
@@ -59,7 +59,7 @@ def update_quiz(quiz_id):
 @teacher_required()
 def delete_quiz(quiz_id):
     """Delete a quiz"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.delete_quiz,
         int(user_id),
@@ -71,7 +71,7 @@ def delete_quiz(quiz_id):
 @teacher_required()
 def add_question(quiz_id):
     """Add a question to a quiz"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.add_question,
         int(user_id),
@@ -85,7 +85,7 @@ def add_question(quiz_id):
 @teacher_required()
 def update_question(quiz_id, question_id):
     """Update a question"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.update_question,
         int(user_id),
@@ -99,7 +99,7 @@ def update_question(quiz_id, question_id):
 @teacher_required()
 def delete_question(quiz_id, question_id):
     """Delete a question"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.delete_question,
         int(user_id),
@@ -112,7 +112,7 @@ def delete_question(quiz_id, question_id):
 @student_required()
 def start_quiz(quiz_id):
     """Start a quiz attempt"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.start_quiz,
         int(user_id),
@@ -124,7 +124,7 @@ def start_quiz(quiz_id):
 @student_required()
 def submit_quiz(attempt_id):
     """Submit quiz answers"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     data = request.get_json()
     answers = data.get('answers', {})
     
@@ -140,7 +140,7 @@ def submit_quiz(attempt_id):
 @jwt_required()
 def get_quiz_results(attempt_id):
     """Get quiz results"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.get_quiz_results,
         int(user_id),
@@ -151,7 +151,7 @@ def get_quiz_results(attempt_id):
 @teacher_required()
 def get_quiz_statistics(quiz_id):
     """Get quiz statistics (teacher only)"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.get_quiz_statistics,
         int(user_id),
@@ -162,7 +162,7 @@ def get_quiz_statistics(quiz_id):
 @teacher_required()
 def get_question(quiz_id, question_id):
     """Get a specific question with its details"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         QuizService.get_question_details,
         int(user_id),
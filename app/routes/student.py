@@ -5,8 +5,8 @@ import io
 from app.services.student_service import StudentService
 from app.services.teacher_service import TeacherService
 from app.utils.base_controller import BaseController
-from app.utils.decorators import student_required
-from app.models import User, Course, Enrollment
+from app.utils.decorators import student_required, get_current_user
+from app.models import Course, Enrollment
 
 bp = Blueprint('student', __name__, url_prefix='/api/student')
 
@@ -14,7 +14,7 @@ bp = Blueprint('student', __name__, url_prefix='/api/student')
 @student_required()
 def get_dashboard():
     """Get student dashboard data"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         StudentService.get_dashboard,
         user_id
@@ -25,7 +25,7 @@ def get_dashboard():
 def get_student_progress():
     """Get student progress - accessible by teachers and the student themselves"""
     current_user_id = int(get_jwt_identity())
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return {'error': 'User not found'}, 404
@@ -81,7 +81,7 @@ def get_student_progress():
 @student_required()
 def get_achievements():
     """Get student achievements"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         StudentService.get_achievements,
         user_id
@@ -91,7 +91,7 @@ def get_achievements():
 @student_required()
 def get_certificates():
     """Get student certificates"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         StudentService.get_certificates,
         user_id
@@ -101,7 +101,7 @@ def get_certificates():
 @student_required()
 def request_certificate(course_id):
     """Request certificate for completed course"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         StudentService.request_certificate,
         user_id,
@@ -114,7 +114,7 @@ def request_certificate(course_id):
 @student_required()
 def get_study_streak():
     """Get student study streak information"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         StudentService.get_study_streak,
         user_id
@@ -124,7 +124,7 @@ def get_study_streak():
 @student_required()
 def get_course_recommendations():
     """Get course recommendations for student"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     return BaseController.handle_request(
         StudentService.get_course_recommendations,
         user_id
@@ -151,7 +151,7 @@ def send_message():
 def get_student_progress_by_teacher():
     """Get student progress - accessible by teachers and the student themselves"""
     current_user_id = int(get_jwt_identity())
-    current_user = User.query.get(current_user_id)
+    current_user = get_current_user()
     
     if not current_user:
         return jsonify({'error': 'User not found'}), 404
@@ -200,7 +200,7 @@ def get_student_progress_by_teacher():
 @student_required()
 def get_student_quiz_attempts():
     """Get student's quiz attempts"""
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     quiz_id = request.args.get('quiz_id', type=int)
     
     from app.services.quiz_service import QuizService
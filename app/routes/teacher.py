@@ -113,6 +113,25 @@ def get_quiz_analytics(quiz_id):
         quiz_id
     )
 
+@bp.route('/quiz/<int:quiz_id>/item-analysis', methods=['GET'])
+@teacher_required()
+def get_quiz_item_analysis(quiz_id):
+    """Get difficulty, discrimination, distractor and reliability statistics of a quiz"""
+    teacher_id_str = get_jwt_identity()
+    try:
+        teacher_id = int(teacher_id_str)
+    except (ValueError, TypeError):
+        return BaseController.handle_request(
+            lambda: (_ for _ in ()).throw(ValueError("Invalid teacher ID")),
+            success_message="Quiz item analysis retrieved"
+        )
+    
+    return BaseController.handle_request(
+        TeacherService.get_quiz_item_analysis,
+        teacher_id,
+        quiz_id
+    )
+
 @bp.route('/course/<int:course_id>/students', methods=['GET'])
 @teacher_required()
 def get_student_progress_report(course_id):
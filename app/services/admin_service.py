@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from sqlalchemy import func, cast, Date, desc, or_
+from sqlalchemy.orm import joinedload
 from app.models import db, User, Course, Enrollment, Quiz, QuizAttempt, Achievement
 from app.utils.base_controller import ValidationException, PermissionException, NotFoundException
-from app.utils.helpers import calculate_course_statistics
+from app.utils.helpers import calculate_course_statistics_many, keyset_paginate
+from app.utils.decorators import invalidate_user_tokens
 import csv
 import io
 
@@ -79,8 +81,14 @@ class AdminService:
     
     @staticmethod
     def get_users(page: int = 1, per_page: int = 20, role: Optional[str] = None,
-                  status: Optional[str] = None, search: Optional[str] = None) -> Dict[str, Any]:
-        """Get all users with filtering and pagination - FIXED FILTERS"""
+                  status: Optional[str] = None, search: Optional[str] = None,
+                  cursor: Optional[str] = None, with_total: bool = False) -> Dict[str, Any]:
+        """Get all users with filtering and pagination - FIXED FILTERS
+        
+        With a ``cursor`` ('' for the first page) users are paged newest first
+        by keyset over ``id``, as ``created_at`` may be NULL for older rows, and
+        the total is only counted with ``with_total``.
+        """
         try:
             query = User.query
             
@@ -106,6 +114,19 @@ class AdminService:
                     )
                 )
             
+            if cursor is not None:
+                result = keyset_paginate(
+                    query, User.id, None,
+                    cursor=cursor, per_page=per_page, with_total=with_total
+                )
+                return {
+                    'users': [user.to_dict() for user in result['items']],
+                    'total': result['total'],
+                    'per_page': per_page,
+                    'next_cursor': result['next_cursor'],
+                    'has_more': result['has_more']
+                }
+            
             query = query.order_by(desc(User.created_at))
             
             total = query.count()
@@ -126,6 +147,8 @@ class AdminService:
                 'per_page': per_page,
                 'pages': pagination.pages
             }
+        except ValidationException:
+            raise
         except Exception as e:
             print(f"Error in get_users: {str(e)}")
             return {
@@ -163,8 +186,8 @@ class AdminService:
                     'total_courses': len(courses),
                     'published_courses': len([c for c in courses if c.is_published]),
                     'total_students': total_students,
-                    'total_quizzes': sum(course.quizzes.count() for course in courses),
-                    'total_assignments': sum(course.assignments.count() for course in courses)
+                    'total_quizzes': sum(course.quiz_count or 0 for course in courses),
+                    'total_assignments': sum(course.assignment_count or 0 for course in courses)
                 }
             else:  
                 user_data['detailed_stats'] = {
@@ -189,6 +212,7 @@ class AdminService:
             raise PermissionException("Cannot edit other admin users")
         
         allowed_fields = ['full_name', 'email', 'phone', 'age', 'is_active']
+        was_active = user.is_active
         
         for field in allowed_fields:
             if field in user_data:
@@ -208,6 +232,9 @@ class AdminService:
                 
                 setattr(user, field, user_data[field])
         
+        if user.is_active != was_active:
+            invalidate_user_tokens(user)
+        
         user.updated_at = datetime.now()
         db.session.commit()
         
@@ -227,6 +254,7 @@ class AdminService:
             raise PermissionException("Cannot deactivate other admin users")
         
         user.is_active = not user.is_active
+        invalidate_user_tokens(user)
         user.updated_at = datetime.now()
         db.session.commit()
         
@@ -329,7 +357,7 @@ class AdminService:
                     )
                 )
             
-            query = query.order_by(desc(Course.created_at))
+            query = query.order_by(desc(Course.created_at)).options(joinedload(Course.teacher))
             
             total = query.count()
             print(f"Total courses found: {total}")
@@ -340,20 +368,22 @@ class AdminService:
                 error_out=False
             )
             
+            try:
+                statistics = calculate_course_statistics_many(pagination.items)
+            except Exception as e:
+                print(f"Error calculating course statistics: {str(e)}")
+                statistics = {}
+            
             courses = []
             for course in pagination.items:
                 course_data = course.to_dict()
-                try:
-                    course_data['statistics'] = calculate_course_statistics(course)
-                except Exception as e:
-                    print(f"Error calculating course statistics for course {course.id}: {str(e)}")
-                    course_data['statistics'] = {
-                        'total_students': 0,
-                        'completion_rate': 0,
-                        'total_lessons': 0,
-                        'total_quizzes': 0,
-                        'total_assignments': 0
-                    }
+                course_data['statistics'] = statistics.get(course.id, {
+                    'total_students': 0,
+                    'completion_rate': 0,
+                    'total_lessons': 0,
+                    'total_quizzes': 0,
+                    'total_assignments': 0
+                })
                 courses.append(course_data)
             
             return {
@@ -399,7 +429,11 @@ class AdminService:
                     )
                 )
             
-            courses = query.order_by(desc(Course.created_at)).all()
+            courses = query.order_by(desc(Course.created_at)).options(joinedload(Course.teacher)).all()
+            try:
+                statistics = calculate_course_statistics_many(courses)
+            except Exception:
+                statistics = {}
             
             output = io.StringIO()
             writer = csv.writer(output)
@@ -410,10 +444,7 @@ class AdminService:
             ])
             
             for course in courses:
-                try:
-                    stats = calculate_course_statistics(course)
-                except:
-                    stats = {'total_students': 0, 'total_lessons': 0, 'total_quizzes': 0, 'total_assignments': 0}
+                stats = statistics.get(course.id, {'total_students': 0, 'total_lessons': 0, 'total_quizzes': 0, 'total_assignments': 0})
                 
                 writer.writerow([
                     course.id,
@@ -523,19 +554,22 @@ class AdminService:
     def get_course_performance_report() -> Dict[str, Any]:
         """Get course performance report"""
         try:
-            courses = Course.query.filter_by(is_published=True).all()
+            courses = Course.query.filter_by(is_published=True).options(joinedload(Course.teacher)).all()
+            course_ids = [course.id for course in courses]
+            
+            statistics = calculate_course_statistics_many(courses)
+            quiz_averages = dict(db.session.query(
+                Quiz.course_id, func.avg(QuizAttempt.score)
+            ).join(Quiz).filter(
+                Quiz.course_id.in_(course_ids),
+                QuizAttempt.status == 'completed'
+            ).group_by(Quiz.course_id).all()) if course_ids else {}
             
             course_performance = []
             for course in courses:
                 try:
-                    stats = calculate_course_statistics(course)
-                    
-                    avg_quiz_score = db.session.query(
-                        func.avg(QuizAttempt.score)
-                    ).join(Quiz).filter(
-                        Quiz.course_id == course.id,
-                        QuizAttempt.status == 'completed'
-                    ).scalar() or 0
+                    stats = statistics[course.id]
+                    avg_quiz_score = quiz_averages.get(course.id) or 0
                     
                     course_performance.append({
                         'course_id': course.id,
@@ -660,6 +694,12 @@ class AdminService:
             }
         
 
+    @staticmethod
+    def get_course_categories_version() -> str:
+        """Cheap version key for the category distribution, changing whenever a course is added, removed or updated"""
+        count, last_updated = db.session.query(func.count(Course.id), func.max(Course.updated_at)).one()
+        return f"courses-{count}-{last_updated.isoformat() if last_updated else 0}"
+
     @staticmethod
     def get_course_categories_distribution() -> Dict[str, int]:
         """Return a mapping of course categories and their counts"""
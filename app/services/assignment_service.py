@@ -118,6 +118,7 @@ class AssignmentService:
         )
         
         db.session.add(assignment)
+        course.increment_counter('assignment_count')
         db.session.commit()
         
         return {
@@ -172,6 +173,7 @@ class AssignmentService:
             if submission.file_path:
                 delete_file(submission.file_path)
         
+        assignment.course.increment_counter('assignment_count', -1)
         db.session.delete(assignment)
         db.session.commit()
         
@@ -246,20 +248,16 @@ class AssignmentService:
             course_completed = LessonService._is_course_fully_completed(student_id, assignment.course_id)
             
             if course_completed and enrollment.status == 'active':
-                enrollment.status = 'completed'
+                enrollment.set_status('completed')
                 enrollment.completed_at = datetime.now()
                 NotificationService.notify_course_completion(assignment.course.teacher_id, student_id, assignment.course_id)
             
+            NotificationService.notify_assignment_submission(
+                assignment.course.teacher_id, 
+                student_id, 
+                assignment_id
+            )
             db.session.commit()
-            
-            try:
-                NotificationService.notify_assignment_submission(
-                    assignment.course.teacher_id, 
-                    student_id, 
-                    assignment_id
-                )
-            except Exception as e:
-                print(f"Failed to send assignment submission notification: {e}")
 
             return {
                 'message': 'Assignment submitted successfully',
@@ -327,21 +325,17 @@ class AssignmentService:
             course_completed = LessonService._is_course_fully_completed(submission.student_id, submission.assignment.course_id)
             
             if course_completed and enrollment.status == 'active':
-                enrollment.status = 'completed'
+                enrollment.set_status('completed')
                 enrollment.completed_at = datetime.now()
                 NotificationService.notify_course_completion(teacher_id, submission.student_id, submission.assignment.course_id)
        
+        NotificationService.notify_assignment_graded(
+            submission.student_id,
+            teacher_id,
+            submission.assignment_id,
+            grade
+        )
         db.session.commit()
-        
-        try:
-            NotificationService.notify_assignment_graded(
-                submission.student_id,
-                teacher_id,
-                submission.assignment_id,
-                grade
-            )
-        except Exception as e:
-            print(f"Failed to send grading notification: {e}")
 
         return {
             'message': 'Assignment graded successfully',
@@ -362,8 +356,6 @@ class AssignmentService:
         submission.status = 'returned'
         submission.graded_at = datetime.now()
         submission.graded_by = teacher_id
-        
-        db.session.commit()
 
         NotificationService.notify_assignment_returned(
             submission.student_id,
@@ -371,6 +363,7 @@ class AssignmentService:
             submission.assignment_id,
             feedback
         )
+        db.session.commit()
         
         return {
             'message': 'Assignment returned to student',
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any
+from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token
 from app.models import db, User, UserRole
 from app.utils.base_controller import ValidationException, NotFoundException
@@ -115,12 +116,15 @@ class AuthService:
                 raise ValidationException('Invalid username or password')
             
             expires_delta = timedelta(days=30) if remember else timedelta(hours=24)
+            claims = user.token_claims()
             access_token = create_access_token(
                 identity=str(user.id),
+                additional_claims=claims,
                 expires_delta=expires_delta
             )
             refresh_token = create_refresh_token(
                 identity=str(user.id),
+                additional_claims=claims,
                 expires_delta=timedelta(days=30)
             )
             
@@ -136,6 +140,25 @@ class AuthService:
         except Exception as e:
             raise Exception(f"Login failed: {str(e)}")
     
+    @staticmethod
+    def create_stream_token(user_id: int, token_version: int) -> Dict[str, Any]:
+        """Issue a short-lived token that only opens the notification stream.
+        
+        EventSource cannot send headers, so this token travels in the URL and
+        ends up in access logs and browser history; it carries no role and is
+        rejected by every other endpoint.
+        """
+        expires_delta = current_app.config.get('NOTIFICATION_STREAM_TOKEN_EXPIRES', timedelta(minutes=1))
+        token = create_access_token(
+            identity=str(user_id),
+            additional_claims={'ver': token_version, 'scope': 'notification_stream'},
+            expires_delta=expires_delta
+        )
+        return {
+            'token': token,
+            'expires_in': int(expires_delta.total_seconds())
+        }
+    
     @staticmethod
     def get_user_profile(user_id: int) -> Dict[str, Any]:
         """Get user profile information"""
@@ -14,14 +14,9 @@ class CertificateService:
         if not user or not user.is_student():
             raise PermissionException("Only students can access certificates")
         
-        certificates = Certificate.query.filter_by(student_id=student_id).all()
+        certificates = Certificate.with_profile(Certificate.query.filter_by(student_id=student_id)).all()
         
-        certificates_data = []
-        for cert in certificates:
-            cert_data = cert.to_dict()
-            certificates_data.append(cert_data)
-        
-        return certificates_data
+        return Certificate.serialize_many(certificates)
     
     @staticmethod
     def generate_certificate(student_id: int, course_id: int) -> Certificate:
@@ -46,7 +41,7 @@ class CertificateService:
         enrollment.progress_percentage = current_progress
         
         if current_progress >= 100 and enrollment.status != 'completed':
-            enrollment.status = 'completed'
+            enrollment.set_status('completed')
             enrollment.completed_at = datetime.now()
         
         if enrollment.status != 'completed':
@@ -167,18 +162,14 @@ class CertificateService:
             pending_request.reviewed_by = admin_id
             pending_request.reviewed_at = datetime.now()
         
+        from app.services.notification_service import NotificationService
+        NotificationService.notify_certificate_issued(
+            student_id=student_id,
+            course_id=course_id,
+            certificate_code=certificate_code
+        )
         db.session.commit()
         
-        try:
-            from app.services.notification_service import NotificationService
-            NotificationService.notify_certificate_issued(
-                student_id=student_id,
-                course_id=course_id,
-                certificate_code=certificate_code
-            )
-        except Exception as e:
-            print(f"Failed to send certificate notification: {e}")
-        
         return {
             'message': 'Certificate issued successfully',
             'certificate': certificate.to_dict() 
@@ -354,20 +345,22 @@ class CertificateService:
         if not user or not user.is_admin():
             raise PermissionException("Only admins can access certificate requests")
         
-        pending_requests = CertificateRequest.query.filter_by(status='pending').all()
+        pending_requests = CertificateRequest.with_profile(
+            CertificateRequest.query.filter_by(status='pending')
+        ).all()
         
         thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_reviewed = CertificateRequest.query.filter(
+        recent_reviewed = CertificateRequest.with_profile(CertificateRequest.query.filter(
             CertificateRequest.status.in_(['approved', 'rejected']),
             CertificateRequest.reviewed_at >= thirty_days_ago
-        ).order_by(CertificateRequest.reviewed_at.desc()).all()
+        ).order_by(CertificateRequest.reviewed_at.desc())).all()
         
         recent_approved_count = len([r for r in recent_reviewed if r.status == 'approved'])
         recent_rejected_count = len([r for r in recent_reviewed if r.status == 'rejected'])
     
         return {
-            'pending_requests': [req.to_dict() for req in pending_requests],
-            'recent_reviewed': [req.to_dict() for req in recent_reviewed],
+            'pending_requests': CertificateRequest.serialize_many(pending_requests),
+            'recent_reviewed': CertificateRequest.serialize_many(recent_reviewed),
             'total_pending': len(pending_requests),
             'total_recent_reviewed': len(recent_reviewed),
             'recent_approved_count': recent_approved_count,
@@ -400,15 +393,13 @@ class CertificateService:
             course_id=cert_request.course_id
         )
         
-        try:
-            from app.services.notification_service import NotificationService
-            NotificationService.notify_certificate_request_approved(
-                student_id=cert_request.student_id,
-                course_id=cert_request.course_id,
-                certificate_code=certificate.certificate_code
-            )
-        except Exception as e:
-            print(f"Error sending certificate approval notification: {e}")
+        from app.services.notification_service import NotificationService
+        NotificationService.notify_certificate_request_approved(
+            student_id=cert_request.student_id,
+            course_id=cert_request.course_id,
+            certificate_code=certificate['certificate']['certificate_code']
+        )
+        db.session.commit()
         
         return {
             'message': 'Certificate request approved and issued',
@@ -435,18 +426,14 @@ class CertificateService:
         cert_request.reviewed_at = datetime.now()
         cert_request.rejection_reason = reason
         
+        from app.services.notification_service import NotificationService
+        NotificationService.notify_certificate_request_rejected(
+            student_id=cert_request.student_id,
+            course_id=cert_request.course_id,
+            reason=reason
+        )
         db.session.commit()
         
-        try:
-            from app.services.notification_service import NotificationService
-            NotificationService.notify_certificate_request_rejected(
-                student_id=cert_request.student_id,
-                course_id=cert_request.course_id,
-                reason=reason
-            )
-        except Exception as e:
-            print(f"Error sending certificate rejection notification: {e}")
-        
         return {
             'message': 'Certificate request rejected',
             'request': cert_request.to_dict()
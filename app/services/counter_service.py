@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func, insert, or_, select, update
+from app.models import db, User, UserCounter, Notification, Message
+
+UNREAD_COLUMNS = {
+    'notifications': 'unread_notification_count',
+    'messages': 'unread_message_count'
+}
+
+class CounterService:
+    """Service for the per-user unread counters behind the badges"""
+    
+    @staticmethod
+    def _unread_sources():
+        """Correlated subqueries counting what each counter column should hold"""
+        return {
+            'unread_notification_count': select(func.count(Notification.id)).where(
+                Notification.recipient_id == UserCounter.user_id,
+                Notification.is_read.is_(False)
+            ).scalar_subquery(),
+            'unread_message_count': select(func.count(Message.id)).where(
+                Message.recipient_id == UserCounter.user_id,
+                Message.read_at.is_(None)
+            ).scalar_subquery()
+        }
+    
+    @staticmethod
+    def get_unread_count(user_id: int, kind: str) -> int:
+        """Read one unread counter by primary key.
+        
+        Users without a counters row (rows loaded outside the ORM before the
+        next reconciliation) are counted from the source table instead.
+        """
+        value = db.session.query(getattr(UserCounter, UNREAD_COLUMNS[kind])).filter(
+            UserCounter.user_id == user_id
+        ).scalar()
+        if value is not None:
+            return max(value, 0)
+        
+        if kind == 'notifications':
+            return Notification.query.filter_by(recipient_id=user_id, is_read=False).count()
+        return Message.query.filter_by(recipient_id=user_id, read_at=None).count()
+    
+    @staticmethod
+    def adjust_unread(kind: str, deltas: Dict[int, int]):
+        """Apply ``user_id -> delta`` changes to an unread counter in the current transaction.
+        
+        Users sharing a delta are updated with one ``column = column + delta``
+        statement, so a fan-out to thousands of recipients costs one UPDATE.
+        """
+        column = getattr(UserCounter, UNREAD_COLUMNS[kind])
+        
+        user_ids_by_delta = defaultdict(list)
+        for user_id, delta in deltas.items():
+            if delta:
+                user_ids_by_delta[delta].append(user_id)
+        
+        for delta, user_ids in user_ids_by_delta.items():
+            db.session.execute(
+                update(UserCounter).where(UserCounter.user_id.in_(user_ids)).values({column: column + delta}),
+                execution_options={'synchronize_session': False}
+            )
+    
+    @staticmethod
+    def increment_unread(kind: str, user_ids: Iterable[int], amount: int = 1):
+        """Add ``amount`` to the counter of each user id, once per occurrence"""
+        deltas = defaultdict(int)
+        for user_id in user_ids:
+            deltas[user_id] += amount
+        CounterService.adjust_unread(kind, deltas)
+    
+    @staticmethod
+    def reconcile_unread_counts(user_ids: Optional[List[int]] = None) -> Dict[str, int]:
+        """Recompute the unread counters from the notification and message tables.
+        
+        Creates missing counter rows, then rewrites only the rows whose stored
+        values drifted from the real counts. Returns how many rows were created
+        and how many were corrected.
+        """
+        missing = select(User.id).where(
+            ~select(UserCounter.user_id).where(UserCounter.user_id == User.id).exists()
+        )
+        if user_ids is not None:
+            missing = missing.where(User.id.in_(user_ids))
+        created = db.session.execute(
+            insert(UserCounter).from_select(['user_id'], missing),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        
+        sources = CounterService._unread_sources()
+        drift = update(UserCounter).values(sources).where(or_(
+            UserCounter.unread_notification_count != sources['unread_notification_count'],
+            UserCounter.unread_message_count != sources['unread_message_count']
+        ))
+        if user_ids is not None:
+            drift = drift.where(UserCounter.user_id.in_(user_ids))
+        corrected = db.session.execute(drift, execution_options={'synchronize_session': False}).rowcount
+        db.session.commit()
+        
+        return {
+            'created': created,
+            'corrected': corrected
+        }
@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from sqlalchemy import or_
-from app.models import db, User, Course, Enrollment
+from sqlalchemy import or_, select, update, func
+from app.models import db, User, Course, Enrollment, Lesson, Quiz, Assignment, Question
 from app.utils.base_controller import ValidationException, PermissionException, NotFoundException
 from app.services.notification_service import NotificationService
+from app.services.progress_service import ProgressService
 
 class CourseService:
     """Service for course-related operations"""
@@ -45,14 +46,6 @@ class CourseService:
         if user.is_student():
             CourseService._add_enrollment_status(courses, user_id)
         
-        for course in courses:
-            db_course = Course.query.get(course['id'])
-            course['lesson_count'] = db_course.lessons.count()
-            course['quiz_count'] = db_course.quizzes.count()
-            course['assignment_count'] = db_course.assignments.count()
-            if db_course.teacher:
-                course['teacher_name'] = f"{db_course.teacher.full_name}".strip()
-                
         return {
             'courses': courses,
             'total': pagination.total,
@@ -84,10 +77,6 @@ class CourseService:
             if enrollment:
                 course_data['enrollment'] = enrollment.to_dict()
         
-        course_data['lesson_count'] = course.lessons.count()
-        course_data['quiz_count'] = course.quizzes.count()
-        course_data['assignment_count'] = course.assignments.count()
-        
         return course_data
     
     @staticmethod
@@ -204,12 +193,11 @@ class CourseService:
             elif existing_enrollment.status == 'completed':
                 raise ValidationException("You have already completed this course")
             elif existing_enrollment.status == 'dropped':
-                existing_enrollment.status = 'active'
+                existing_enrollment.set_status('active')
                 existing_enrollment.enrolled_at = datetime.now()
                 existing_enrollment.progress_percentage = 0.0  
-                db.session.commit()
-                
                 NotificationService.notify_student_enrollment(course.teacher_id, student_id, course_id)
+                db.session.commit()
                 
                 return {
                     'message': 'Re-enrolled in course successfully',
@@ -226,13 +214,10 @@ class CourseService:
         )
         
         db.session.add(enrollment)
+        course.increment_counter('active_enrollment_count')
+        NotificationService.notify_student_enrollment(course.teacher_id, student_id, course_id)
         db.session.commit()
         
-        try:
-            NotificationService.notify_student_enrollment(course.teacher_id, student_id, course_id)
-        except Exception as e:
-            print(f"Failed to send enrollment notification: {e}")        
-        
         return {
             'message': 'Enrolled in course successfully',
             'enrollment': enrollment.to_dict()
@@ -254,7 +239,7 @@ class CourseService:
         if not enrollment:
             raise NotFoundException("Not enrolled in this course")
         
-        enrollment.status = 'dropped'
+        enrollment.set_status('dropped')
         enrollment.progress_percentage = 0.0
         enrollment.completed_at = None
         enrollment.enrolled_at = None 
@@ -273,15 +258,7 @@ class CourseService:
         query = Enrollment.query.filter_by(student_id=student_id)
         
         all_enrollments = query.all()
-        for enrollment in all_enrollments:
-            current_progress = enrollment.calculate_progress()
-            if enrollment.progress_percentage != current_progress:
-                enrollment.progress_percentage = current_progress
-                
-                if current_progress >= 100 and enrollment.status == 'active':
-                    enrollment.status = 'completed'
-                    enrollment.completed_at = datetime.now()
-        
+        ProgressService.refresh_enrollments(all_enrollments)
         db.session.commit()
         
         if status == 'active':
@@ -293,26 +270,13 @@ class CourseService:
         else:
             query = query.filter_by(status=status)
         
-        pagination = query.paginate(
+        pagination = Enrollment.with_profile(query, 'with_course').paginate(
             page=page,
             per_page=per_page,
             error_out=False
         )
         
-        enrollments = []
-        for enrollment in pagination.items:
-            enrollment_data = enrollment.to_dict()
-            course_data = enrollment.course.to_dict()
-            
-            course_data['lesson_count'] = enrollment.course.lessons.count()
-            course_data['quiz_count'] = enrollment.course.quizzes.count()
-            course_data['assignment_count'] = enrollment.course.assignments.count()
-            
-            if enrollment.course.teacher:
-                course_data['teacher_name'] = f"{enrollment.course.teacher.full_name}".strip()
-            
-            enrollment_data['course'] = course_data
-            enrollments.append(enrollment_data)
+        enrollments = Enrollment.serialize_many(pagination.items, 'with_course')
         
         return {
             'enrollments': enrollments,
@@ -332,22 +296,47 @@ class CourseService:
         if course.teacher_id != teacher_id:
             raise PermissionException("Access denied")
         
-        enrollments = Enrollment.query.filter_by(
+        enrollments = Enrollment.with_profile(Enrollment.query.filter_by(
             course_id=course_id,
             status='active'
-        ).all()
+        ), 'with_student').all()
         
-        students = []
-        for enrollment in enrollments:
-            student_data = enrollment.student.to_dict()
-            student_data['enrollment'] = enrollment.to_dict()
-            students.append(student_data)
+        students = Enrollment.serialize_many(enrollments, 'with_student')
         
         return {
             'students': students,
             'total': len(students)
         }
     
+    @staticmethod
+    def repair_counters(course_ids: Optional[List[int]] = None) -> Dict[str, int]:
+        """Recompute the denormalized course and quiz counters in bulk"""
+        course_stmt = update(Course).values(
+            active_enrollment_count=select(func.count(Enrollment.id)).where(
+                Enrollment.course_id == Course.id,
+                Enrollment.status == 'active'
+            ).scalar_subquery(),
+            lesson_count=select(func.count(Lesson.id)).where(Lesson.course_id == Course.id).scalar_subquery(),
+            quiz_count=select(func.count(Quiz.id)).where(Quiz.course_id == Course.id).scalar_subquery(),
+            assignment_count=select(func.count(Assignment.id)).where(Assignment.course_id == Course.id).scalar_subquery()
+        )
+        quiz_stmt = update(Quiz).values(
+            question_count=select(func.count(Question.id)).where(Question.quiz_id == Quiz.id).scalar_subquery()
+        )
+        
+        if course_ids is not None:
+            course_stmt = course_stmt.where(Course.id.in_(course_ids))
+            quiz_stmt = quiz_stmt.where(Quiz.course_id.in_(course_ids))
+        
+        courses_updated = db.session.execute(course_stmt, execution_options={'synchronize_session': False}).rowcount
+        quizzes_updated = db.session.execute(quiz_stmt, execution_options={'synchronize_session': False}).rowcount
+        db.session.commit()
+        
+        return {
+            'courses': courses_updated,
+            'quizzes': quizzes_updated
+        }
+    
     @staticmethod
     def _add_enrollment_status(courses: List[Dict], student_id: int):
         enrollments = Enrollment.query.filter(
@@ -1,5 +1,7 @@
 from datetime import datetime
 from typing import Dict, Any, Optional
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload
 from app.models import AssignmentSubmission, QuizAttempt, db, User, Course, Lesson, LessonProgress, Enrollment
 from app.utils.base_controller import ValidationException, PermissionException, NotFoundException
 from app.services.notification_service import NotificationService
@@ -22,16 +24,35 @@ class LessonService:
             raise PermissionException("Access denied")
         
         lessons = course.lessons.order_by(Lesson.order_number).all()
+        lesson_ids = [lesson.id for lesson in lessons]
         lessons_data = []
         
+        is_course_teacher = user.is_teacher() and course.teacher_id == user_id
+        progress_by_lesson = {}
+        engagement_by_lesson = {}
+        total_students = 0
+        
+        if lesson_ids and user.is_student():
+            for progress in LessonProgress.query.filter(
+                LessonProgress.student_id == user_id,
+                LessonProgress.lesson_id.in_(lesson_ids)
+            ).order_by(LessonProgress.id).all():
+                progress_by_lesson.setdefault(progress.lesson_id, progress)
+        elif lesson_ids and is_course_teacher:
+            total_students = course.enrollments.filter_by(status='active').count()
+            engagement_by_lesson = {
+                lesson_id: (views, int(completions or 0)) for lesson_id, views, completions in db.session.query(
+                    LessonProgress.lesson_id,
+                    func.count(LessonProgress.id),
+                    func.sum(case((LessonProgress.completed_at.isnot(None), 1), else_=0))
+                ).filter(LessonProgress.lesson_id.in_(lesson_ids)).group_by(LessonProgress.lesson_id).all()
+            }
+        
         for lesson in lessons:
             lesson_dict = lesson.to_dict()
             
             if user.is_student():
-                progress = LessonProgress.query.filter_by(
-                    student_id=user_id,
-                    lesson_id=lesson.id
-                ).first()
+                progress = progress_by_lesson.get(lesson.id)
                 
                 lesson_dict['progress'] = {
                     'viewed': progress is not None,
@@ -40,12 +61,8 @@ class LessonService:
                     'last_viewed': progress.viewed_at.isoformat() if progress and progress.viewed_at else None
                 }
             
-            elif user.is_teacher() and course.teacher_id == user_id:
-                total_students = course.enrollments.filter_by(status='active').count()
-                views = LessonProgress.query.filter_by(lesson_id=lesson.id).count()
-                completions = LessonProgress.query.filter_by(
-                    lesson_id=lesson.id
-                ).filter(LessonProgress.completed_at.isnot(None)).count()
+            elif is_course_teacher:
+                views, completions = engagement_by_lesson.get(lesson.id, (0, 0))
                 
                 lesson_dict['engagement'] = {
                     'total_students': total_students,
@@ -160,10 +177,9 @@ class LessonService:
         )
         
         db.session.add(lesson)
-        db.session.commit()
+        course.increment_counter('lesson_count')
         
-        course = Course.query.get(lesson_data['course_id'])
-        enrolled_students = [enrollment.student_id for enrollment in course.enrollments.filter_by(status='active')]
+        enrolled_students = [student_id for student_id, in db.session.query(Enrollment.student_id).filter_by(course_id=course.id, status='active')]
         
         if enrolled_students:
             NotificationService.notify_new_content(
@@ -173,6 +189,8 @@ class LessonService:
                 content_type='lesson',
                 content_title=lesson.title
             )
+        
+        db.session.commit()
 
         return {
             'message': 'Lesson created successfully',
@@ -242,6 +260,7 @@ class LessonService:
         course_id = lesson.course_id
         order_number = lesson.order_number
         
+        lesson.course.increment_counter('lesson_count', -1)
         db.session.delete(lesson)
         
         lessons_to_shift = Lesson.query.filter(
@@ -311,7 +330,7 @@ class LessonService:
         course_completed = LessonService._is_course_fully_completed(student_id, lesson.course_id)
         
         if course_completed and enrollment.status == 'active':
-            enrollment.status = 'completed'
+            enrollment.set_status('completed')
             enrollment.completed_at = datetime.now()
 
             NotificationService.notify_course_completion(
@@ -379,7 +398,9 @@ class LessonService:
         if lesson.course.teacher_id != teacher_id:
             raise PermissionException("Access denied")
         
-        progress_records = LessonProgress.query.filter_by(lesson_id=lesson_id).all()
+        progress_records = LessonProgress.query.filter_by(
+            lesson_id=lesson_id
+        ).options(joinedload(LessonProgress.student)).all()
         
         total_enrolled = lesson.course.enrollments.filter_by(status='active').count()
         total_views = len(progress_records)
@@ -500,6 +521,7 @@ class LessonService:
         )
         
         db.session.add(new_lesson)
+        lesson.course.increment_counter('lesson_count')
         db.session.commit()
         
         return {
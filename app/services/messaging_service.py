@@ -1,8 +1,13 @@
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Any
-from sqlalchemy import or_, desc
-from app.models import db, User, Message, Course, Enrollment
+from typing import Dict, Any, List, Optional
+from sqlalchemy import or_, and_, desc, func, case, delete, insert, select, union_all
+from sqlalchemy.exc import IntegrityError
+from app.models import db, User, Message, Course, Enrollment, ConversationSummary
 from app.utils.base_controller import ValidationException, PermissionException, NotFoundException
+from app.utils.validators import validate_id_list
+from app.utils.helpers import keyset_paginate
+from app.services.counter_service import CounterService
 from app.services.notification_service import NotificationService
 
 class MessagingService:
@@ -39,12 +44,11 @@ class MessagingService:
         )
         
         db.session.add(message)
+        db.session.flush()
+        MessagingService._record_message(message)
+        CounterService.increment_unread('messages', [recipient_id])
+        NotificationService.notify_new_message(sender_id, recipient_id, subject)
         db.session.commit()
-        
-        try:
-            NotificationService.notify_new_message(sender_id, recipient_id, subject)
-        except Exception as e:
-            print(f"Failed to send notification: {e}")
                     
         return {
             'message': 'Message sent successfully',
@@ -52,8 +56,109 @@ class MessagingService:
         }
     
     @staticmethod
-    def get_messages(user_id: int, message_type: str = 'received', page: int = 1, per_page: int = 20) -> Dict[str, Any]:
-        """Get messages for a user"""
+    def _record_message(message: Message):
+        """Make a flushed message the latest of its conversation and count it as unread for the recipient"""
+        low, high = ConversationSummary.pair(message.sender_id, message.recipient_id)
+        unread_key = 'low_unread_count' if message.recipient_id == low else 'high_unread_count'
+        values = {
+            'last_message_id': message.id,
+            'last_sender_id': message.sender_id,
+            'last_subject': message.subject,
+            'snippet': message.content[:ConversationSummary.SNIPPET_LENGTH],
+            'last_message_at': message.sent_at
+        }
+        
+        def update_summary():
+            unread = getattr(ConversationSummary, unread_key)
+            return db.session.query(ConversationSummary).filter_by(user_low_id=low, user_high_id=high).update(
+                {**values, unread_key: unread + 1}, synchronize_session=False
+            )
+        
+        if update_summary():
+            return
+        
+        try:
+            with db.session.begin_nested():
+                db.session.add(ConversationSummary(user_low_id=low, user_high_id=high, **values, **{unread_key: 1}))
+        except IntegrityError:
+            # The first messages of a conversation raced; the other one created the row
+            update_summary()
+    
+    @staticmethod
+    def _adjust_conversation_unread(user_id: int, deltas: Dict[int, int]):
+        """Apply ``partner_id -> delta`` changes to the user's side of their conversation summaries"""
+        partners_by_side = defaultdict(list)
+        for partner_id, delta in deltas.items():
+            if delta:
+                partners_by_side[user_id <= partner_id, delta].append(partner_id)
+        
+        for (is_low, delta), partner_ids in partners_by_side.items():
+            if is_low:
+                own, other, unread_key = ConversationSummary.user_low_id, ConversationSummary.user_high_id, 'low_unread_count'
+            else:
+                own, other, unread_key = ConversationSummary.user_high_id, ConversationSummary.user_low_id, 'high_unread_count'
+            
+            unread = getattr(ConversationSummary, unread_key)
+            db.session.query(ConversationSummary).filter(own == user_id, other.in_(partner_ids)).update(
+                {unread_key: unread + delta}, synchronize_session=False
+            )
+    
+    @staticmethod
+    def rebuild_conversation_summaries() -> Dict[str, int]:
+        """Recompute every conversation summary from the messages table.
+        
+        Needed after messages are loaded outside ``send_message`` (the scale
+        data generator) and to repair drift; the summaries are replaced with
+        one INSERT ... SELECT.
+        """
+        sender_is_low = Message.sender_id <= Message.recipient_id
+        low = case((sender_is_low, Message.sender_id), else_=Message.recipient_id)
+        high = case((sender_is_low, Message.recipient_id), else_=Message.sender_id)
+        unread = Message.read_at.is_(None)
+        
+        pairs = select(
+            low.label('user_low_id'),
+            high.label('user_high_id'),
+            func.max(Message.id).label('last_message_id'),
+            func.sum(case((and_(unread, Message.recipient_id == low), 1), else_=0)).label('low_unread_count'),
+            func.sum(case((and_(unread, Message.recipient_id != low), 1), else_=0)).label('high_unread_count')
+        ).group_by(low, high).subquery()
+        
+        summaries = select(
+            pairs.c.user_low_id,
+            pairs.c.user_high_id,
+            pairs.c.last_message_id,
+            Message.sender_id,
+            Message.subject,
+            func.substr(Message.content, 1, ConversationSummary.SNIPPET_LENGTH),
+            Message.sent_at,
+            pairs.c.low_unread_count,
+            pairs.c.high_unread_count
+        ).join_from(pairs, Message, Message.id == pairs.c.last_message_id)
+        
+        db.session.execute(delete(ConversationSummary))
+        count = db.session.execute(insert(ConversationSummary).from_select([
+            'user_low_id', 'user_high_id', 'last_message_id', 'last_sender_id', 'last_subject',
+            'snippet', 'last_message_at', 'low_unread_count', 'high_unread_count'
+        ], summaries)).rowcount
+        db.session.commit()
+        
+        return {'conversations': count}
+    
+    @staticmethod
+    def get_messages(
+        user_id: int,
+        message_type: str = 'received',
+        page: int = 1,
+        per_page: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = False
+    ) -> Dict[str, Any]:
+        """Get messages for a user.
+        
+        With a ``cursor`` ('' for the first page) the feed is paged by keyset
+        over ``(sent_at, id)``, see ``keyset_paginate``.
+        """
         user = User.query.get(user_id)
         if not user:
             raise NotFoundException("User not found")
@@ -67,13 +172,29 @@ class MessagingService:
                 or_(Message.sender_id == user_id, Message.recipient_id == user_id)
             )
         
-        pagination = query.order_by(desc(Message.sent_at)).paginate(
+        unread_count = MessagingService.get_unread_count(user_id) if message_type == 'received' else 0
+        
+        if cursor is not None:
+            result = keyset_paginate(
+                Message.with_profile(query), Message.sent_at, Message.id,
+                cursor=cursor, per_page=per_page, with_total=with_total
+            )
+            return {
+                'messages': Message.serialize_many(result['items']),
+                'total': result['total'],
+                'per_page': per_page,
+                'next_cursor': result['next_cursor'],
+                'has_more': result['has_more'],
+                'unread_count': unread_count
+            }
+        
+        pagination = Message.with_profile(query.order_by(desc(Message.sent_at))).paginate(
             page=page,
             per_page=per_page,
             error_out=False
         )
         
-        messages = [message.to_dict() for message in pagination.items]
+        messages = Message.serialize_many(pagination.items)
         
         return {
             'messages': messages,
@@ -81,12 +202,14 @@ class MessagingService:
             'page': page,
             'per_page': per_page,
             'pages': pagination.pages,
-            'unread_count': Message.query.filter_by(
-                recipient_id=user_id,
-                read_at=None
-            ).count() if message_type == 'received' else 0
+            'unread_count': unread_count
         }
     
+    @staticmethod
+    def get_unread_count(user_id: int) -> int:
+        """Get a user's unread message count from their counters row"""
+        return CounterService.get_unread_count(user_id, 'messages')
+    
     @staticmethod
     def get_message(user_id: int, message_id: int) -> Dict[str, Any]:
         """Get a specific message"""
@@ -101,11 +224,17 @@ class MessagingService:
         if message.sender_id != user_id and message.recipient_id != user_id:
             raise PermissionException("Access denied")
         
-        if message.recipient_id == user_id and message.read_at is None:
-            message.read_at = datetime.now()
-            db.session.commit()
+        if message.recipient_id != user_id or message.read_at is not None:
+            return message.to_dict()
         
-        return message.to_dict()
+        message.read_at = datetime.now()
+        CounterService.increment_unread('messages', [user_id], -1)
+        MessagingService._adjust_conversation_unread(user_id, {message.sender_id: -1})
+        
+        # Serialized before the commit expires it, so the message is not loaded twice
+        result = message.to_dict()
+        db.session.commit()
+        return result
     
     @staticmethod
     def mark_as_read(user_id: int, message_id: int) -> Dict[str, str]:
@@ -123,59 +252,141 @@ class MessagingService:
         
         if message.read_at is None:
             message.read_at = datetime.now()
+            CounterService.increment_unread('messages', [user_id], -1)
+            MessagingService._adjust_conversation_unread(user_id, {message.sender_id: -1})
             db.session.commit()
         
         return {'message': 'Message marked as read'}
     
     @staticmethod
-    def get_conversations(user_id: int) -> Dict[str, Any]:
-        """Get conversations for a user"""
+    def bulk_mark_as_read(user_id: int, message_ids: List[int]) -> Dict[str, Any]:
+        """Mark a set of messages received by the user as read; other ids are ignored"""
+        valid, error = validate_id_list(message_ids)
+        if not valid:
+            raise ValidationException(error)
+        
+        count = MessagingService._mark_read(user_id, message_ids=message_ids)
+        return {
+            'message': f'{count} messages marked as read',
+            'updated': count
+        }
+    
+    @staticmethod
+    def _mark_read(user_id: int, message_ids: Optional[List[int]] = None, sender_id: Optional[int] = None) -> int:
+        """Mark unread received messages read with one UPDATE and move the counters by the rows changed.
+        
+        Reading one conversation knows its partner up front; for arbitrary ids
+        the unread rows are first counted per sender so each conversation
+        summary is lowered by its own share.
+        """
+        query = db.session.query(Message).filter(
+            Message.recipient_id == user_id,
+            Message.read_at.is_(None)
+        )
+        if message_ids is not None:
+            query = query.filter(Message.id.in_(message_ids))
+        if sender_id is not None:
+            query = query.filter(Message.sender_id == sender_id)
+        else:
+            per_sender = dict(query.with_entities(Message.sender_id, func.count(Message.id)).group_by(Message.sender_id))
+            if not per_sender:
+                return 0
+        
+        count = query.update({'read_at': datetime.now()}, synchronize_session=False)
+        if count:
+            CounterService.increment_unread('messages', [user_id], -count)
+            MessagingService._adjust_conversation_unread(
+                user_id, {sender_id: -count} if sender_id is not None else {k: -v for k, v in per_sender.items()}
+            )
+            db.session.commit()
+        return count
+    
+    @staticmethod
+    def get_conversations(user_id: int, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        """Get a page of the user's conversations, most recently active first.
+        
+        Served from ``conversation_summaries``: the user's rows on either side
+        of the pair are combined and joined to the partner in one query, with
+        the total computed by a window function alongside.
+        """
         user = User.query.get(user_id)
         if not user:
             raise NotFoundException("User not found")
         
-        sent_to = db.session.query(Message.recipient_id).filter_by(sender_id=user_id).distinct().subquery()
-        received_from = db.session.query(Message.sender_id).filter_by(recipient_id=user_id).distinct().subquery()
-        
-        conversation_partners = db.session.query(User).filter(
-            or_(
-                User.id.in_(sent_to),
-                User.id.in_(received_from)
+        summary_columns = (
+            ConversationSummary.last_message_id,
+            ConversationSummary.last_sender_id,
+            ConversationSummary.last_subject,
+            ConversationSummary.snippet,
+            ConversationSummary.last_message_at
+        )
+        inbox = union_all(
+            select(
+                ConversationSummary.user_high_id.label('partner_id'),
+                ConversationSummary.low_unread_count.label('unread_count'),
+                *summary_columns
+            ).where(ConversationSummary.user_low_id == user_id),
+            select(
+                ConversationSummary.user_low_id.label('partner_id'),
+                ConversationSummary.high_unread_count.label('unread_count'),
+                *summary_columns
+            ).where(
+                ConversationSummary.user_high_id == user_id,
+                ConversationSummary.user_low_id != user_id
             )
-        ).all()
+        ).subquery()
+        
+        rows = db.session.query(User, inbox, func.count().over().label('total')).join(
+            inbox, User.id == inbox.c.partner_id
+        ).order_by(
+            desc(inbox.c.last_message_at), desc(inbox.c.last_message_id)
+        ).limit(per_page).offset((page - 1) * per_page).all()
+        
+        if rows:
+            total = rows[0].total
+        elif page > 1:
+            total = db.session.query(func.count()).select_from(inbox).scalar()
+        else:
+            total = 0
         
         conversations = []
-        for partner in conversation_partners:
-            latest_message = Message.query.filter(
-                or_(
-                    db.and_(Message.sender_id == user_id, Message.recipient_id == partner.id),
-                    db.and_(Message.sender_id == partner.id, Message.recipient_id == user_id)
-                )
-            ).order_by(desc(Message.sent_at)).first()
-            
-            unread_count = Message.query.filter_by(
-                sender_id=partner.id,
-                recipient_id=user_id,
-                read_at=None
-            ).count()
-            
-            if latest_message:
-                conversations.append({
-                    'partner': partner.to_dict(),
-                    'latest_message': latest_message.to_dict(),
-                    'unread_count': unread_count
-                })
-        
-        conversations.sort(key=lambda x: x['latest_message']['sent_at'], reverse=True)
+        for row in rows:
+            partner = row.User
+            conversations.append({
+                'partner': partner.to_dict(),
+                'latest_message': {
+                    'id': row.last_message_id,
+                    'sender_id': row.last_sender_id,
+                    'recipient_id': user_id if row.last_sender_id == partner.id else partner.id,
+                    'subject': row.last_subject,
+                    'content': row.snippet,
+                    'sent_at': row.last_message_at.isoformat() if row.last_message_at else None
+                },
+                'unread_count': max(row.unread_count, 0)
+            })
         
         return {
             'conversations': conversations,
-            'total': len(conversations)
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page
         }
     
     @staticmethod
-    def get_conversation_messages(user_id: int, partner_id: int, page: int = 1, per_page: int = 50) -> Dict[str, Any]:
-        """Get messages in a conversation between two users"""
+    def get_conversation_messages(
+        user_id: int,
+        partner_id: int,
+        page: int = 1,
+        per_page: int = 50,
+        cursor: Optional[str] = None,
+        with_total: bool = False
+    ) -> Dict[str, Any]:
+        """Get messages in a conversation between two users, newest first.
+        
+        With a ``cursor`` ('' for the first page) older messages are fetched
+        by keyset over ``(sent_at, id)``, see ``keyset_paginate``.
+        """
         user = User.query.get(user_id)
         partner = User.query.get(partner_id)
         
@@ -189,25 +400,32 @@ class MessagingService:
             )
         )
         
-        pagination = query.order_by(desc(Message.sent_at)).paginate(
+        if cursor is not None:
+            result = keyset_paginate(
+                Message.with_profile(query), Message.sent_at, Message.id,
+                cursor=cursor, per_page=per_page, with_total=with_total
+            )
+            messages = Message.serialize_many(result['items'])
+            MessagingService._mark_read(user_id, sender_id=partner_id)
+            
+            return {
+                'messages': messages,
+                'partner': partner.to_dict(),
+                'total': result['total'],
+                'per_page': per_page,
+                'next_cursor': result['next_cursor'],
+                'has_more': result['has_more']
+            }
+        
+        pagination = Message.with_profile(query.order_by(desc(Message.sent_at))).paginate(
             page=page,
             per_page=per_page,
             error_out=False
         )
         
-        messages = [message.to_dict() for message in pagination.items]
-        
-        unread_messages = Message.query.filter_by(
-            sender_id=partner_id,
-            recipient_id=user_id,
-            read_at=None
-        ).all()
+        messages = Message.serialize_many(pagination.items)
         
-        for message in unread_messages:
-            message.read_at = datetime.now()
-        
-        if unread_messages:
-            db.session.commit()
+        MessagingService._mark_read(user_id, sender_id=partner_id)
         
         return {
             'messages': messages,
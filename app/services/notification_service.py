@@ -1,70 +1,376 @@
-from typing import Dict, Any, List, Optional
-from app.models import Assignment, db, User, Notification, NotificationType, NotificationPriority
-from app.utils.base_controller import PermissionException, NotFoundException
-from sqlalchemy import desc
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from uuid import uuid4
+from flask import current_app
+from app.models import Assignment, db, User, Notification, NotificationOutbox, NotificationType, NotificationPriority
+from app.services.counter_service import CounterService
+from app.utils.base_controller import PermissionException, NotFoundException, ValidationException
+from app.utils.validators import validate_id_list
+from app.utils.helpers import keyset_paginate
+from app.utils.notification_hub import get_notification_hub
+from sqlalchemy import and_, bindparam, desc, func, insert, or_, tuple_, update
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement; keeps bound parameters under SQLite's and MySQL's limits
+NOTIFICATION_INSERT_BATCH = 1000
+
+# Titles of notifications that stand for more than one event
+COALESCED_TITLES = {
+    NotificationType.ENROLLMENT.value: 'New Student Enrollments',
+    NotificationType.ASSIGNMENT_SUBMISSION.value: 'New Assignment Submissions',
+    NotificationType.QUIZ_SUBMISSION.value: 'New Quiz Submissions'
+}
 
 class NotificationService:
     """Service for managing notifications"""
     
     @staticmethod
-    def create_notification(
-        recipient_id: int,
+    def _priority_value(priority) -> str:
+        if isinstance(priority, NotificationPriority):
+            return priority.value
+        return str(priority)
+    
+    @staticmethod
+    def _insert_rows(rows: List[Dict[str, Any]]):
+        for start in range(0, len(rows), NOTIFICATION_INSERT_BATCH):
+            db.session.execute(insert(Notification).values(rows[start:start + NOTIFICATION_INSERT_BATCH]))
+        CounterService.increment_unread('notifications', [row['recipient_id'] for row in rows])
+    
+    @staticmethod
+    def _listening(recipient_ids) -> set:
+        """The recipients among ``recipient_ids`` with an open stream"""
+        hub = get_notification_hub()
+        if hub is None:
+            return set()
+        return {recipient_id for recipient_id in recipient_ids if hub.has_subscribers(recipient_id)}
+    
+    @staticmethod
+    def _last_notification_id(listening: set) -> Optional[int]:
+        """The highest notification id, read before a bulk insert whose rows will be published"""
+        if not listening:
+            return None
+        return db.session.query(func.max(Notification.id)).scalar() or 0
+    
+    @staticmethod
+    def _publish_rows(rows: List[Dict[str, Any]], listening: set, last_id: Optional[int]):
+        """Publish freshly written rows to recipients with open streams.
+        
+        Bulk inserts do not return the new ids, so the inserted rows are read
+        back by id (above ``last_id``, taken before the insert) and merged rows
+        by their own id, only for recipients that are actually listening. Rows
+        other writers inserted meanwhile are left to their own publisher.
+        """
+        if not listening or last_id is None:
+            return
+        
+        written = {
+            (row['recipient_id'], row['type'], row['title'], row['related_id'])
+            for row in rows if row['recipient_id'] in listening
+        }
+        merged_ids = [row['id'] for row in rows if 'id' in row and row['recipient_id'] in listening]
+        if not written:
+            return
+        
+        created = Notification.query.filter(
+            Notification.recipient_id.in_(listening),
+            or_(Notification.id > last_id, Notification.id.in_(merged_ids))
+        ).order_by(Notification.id).all()
+        for notification in created:
+            key = (notification.recipient_id, notification.type, notification.title, notification.related_id)
+            if key in written:
+                NotificationService.publish_notification(notification.recipient_id, notification)
+    
+    @staticmethod
+    def enqueue(
+        recipient_ids: List[int],
         notification_type: NotificationType,
         title: str,
         message: str,
         sender_id: Optional[int] = None,
         priority: NotificationPriority = NotificationPriority.NORMAL,
         action_url: Optional[str] = None,
-        related_id: Optional[int] = None
-    ) -> Notification:
-        """Create a new notification"""
-
-        if isinstance(priority, NotificationPriority):
-            priority_value = priority.value  
-        else:
-            priority_value = str(priority)
-
-        notification = Notification(
-            recipient_id=recipient_id,
+        related_id: Optional[int] = None,
+        summary: Optional[str] = None
+    ) -> Optional[NotificationOutbox]:
+        """Queue a notification for delivery by the background dispatcher.
+        
+        The outbox entry is only added to the session: it is committed together
+        with the caller's own changes, so a rolled back write never announces
+        itself, and the request does not wait for the notification rows.
+        
+        Entries with a ``summary`` and a ``related_id`` may be coalesced on
+        delivery (see ``_coalesce_entries``); the summary replaces the message
+        once a row stands for several events, with ``{count}`` filled in.
+        """
+        recipient_ids = list(dict.fromkeys(recipient_ids))
+        if not recipient_ids:
+            return None
+        
+        entry = NotificationOutbox(
+            recipient_ids=recipient_ids,
             sender_id=sender_id,
             type=notification_type.value,
-            priority=priority_value,
+            priority=NotificationService._priority_value(priority),
             title=title,
             message=message,
             action_url=action_url,
-            related_id=related_id
+            related_id=related_id,
+            summary=summary
+        )
+        db.session.add(entry)
+        db.session.info['notification_outbox'] = True
+        return entry
+    
+    @staticmethod
+    def dispatch_outbox(
+        batch_size: int = 100,
+        max_attempts: int = 5,
+        retry_delay: int = 30,
+        claim_timeout: int = 300,
+        now: Optional[datetime] = None
+    ) -> int:
+        """Deliver one batch of due outbox entries and return how many were claimed.
+        
+        Entries are claimed with a conditional UPDATE so concurrent workers never
+        deliver the same entry twice; entries claimed by a worker that died are
+        reclaimed after ``claim_timeout`` seconds. The whole batch is inserted in
+        one transaction. If that fails the entries are retried one by one so a
+        single bad entry cannot hold back the others; failed entries are retried
+        with exponential backoff and marked dead after ``max_attempts``.
+        """
+        now = now or datetime.now()
+        due = or_(
+            and_(NotificationOutbox.status == 'pending', NotificationOutbox.available_at <= now),
+            and_(NotificationOutbox.status == 'processing',
+                 NotificationOutbox.locked_at < now - timedelta(seconds=claim_timeout))
         )
         
-        db.session.add(notification)
+        ids = [entry_id for entry_id, in db.session.query(NotificationOutbox.id)
+               .filter(due).order_by(NotificationOutbox.id).limit(batch_size)]
+        if not ids:
+            return 0
+        
+        token = uuid4().hex
+        db.session.query(NotificationOutbox).filter(NotificationOutbox.id.in_(ids), due).update(
+            {'status': 'processing', 'claim_token': token, 'locked_at': now},
+            synchronize_session=False
+        )
         db.session.commit()
-        return notification
+        
+        entries = NotificationOutbox.query.filter_by(claim_token=token).order_by(NotificationOutbox.id).all()
+        listening = NotificationService._listening({
+            recipient_id for entry in entries for recipient_id in entry.recipient_ids
+        })
+        last_id = NotificationService._last_notification_id(listening)
+        
+        try:
+            rows = NotificationService._deliver_entries(entries)
+        except Exception:
+            db.session.rollback()
+            rows = []
+            for entry in entries:
+                try:
+                    rows.extend(NotificationService._deliver_entries([entry]))
+                except Exception as e:
+                    db.session.rollback()
+                    NotificationService._fail_outbox_entry(entry, e, max_attempts, retry_delay, now)
+        
+        NotificationService._publish_rows(rows, listening, last_id)
+        return len(entries)
+    
+    @staticmethod
+    def _deliver_entries(entries: List[NotificationOutbox]) -> List[Dict[str, Any]]:
+        """Write the notifications of ``entries`` and delete them from the outbox in one transaction"""
+        rows, merged = NotificationService._coalesce_entries(entries)
+        NotificationService._insert_rows(rows)
+        db.session.query(NotificationOutbox).filter(
+            NotificationOutbox.id.in_([entry.id for entry in entries])
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return rows + merged
+    
+    @staticmethod
+    def _coalesce_entries(entries: List[NotificationOutbox]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Merge repeated events into one notification per recipient and related object.
+        
+        Events of a type in ``NOTIFICATION_COALESCE_TYPES`` for the same
+        recipient and related object are folded into the recipient's newest
+        unread notification for it, if that one is younger than
+        ``NOTIFICATION_COALESCE_WINDOW`` seconds: its count grows, its text
+        becomes the summary and it moves to the top of the list. Events of the
+        same batch are folded together before that. Returns the rows still to
+        insert and the rows that were merged in place; merged rows stay unread,
+        so the unread counters only grow for inserted rows.
+        """
+        window_seconds = current_app.config.get('NOTIFICATION_COALESCE_WINDOW', 0)
+        types = set(current_app.config.get('NOTIFICATION_COALESCE_TYPES', ()))
+        
+        rows = []
+        groups = {}
+        for entry in entries:
+            coalesce = window_seconds and entry.summary and entry.related_id is not None and entry.type in types
+            for row in entry.notification_rows():
+                if coalesce:
+                    key = (row['recipient_id'], row['type'], row['related_id'])
+                    groups.setdefault(key, []).append((row, entry.summary))
+                else:
+                    rows.append(row)
+        
+        if not groups:
+            return rows, []
+        
+        window = timedelta(seconds=window_seconds)
+        existing = {}
+        for notification_id, recipient_id, type_value, related_id, count, created_at in db.session.query(
+            Notification.id, Notification.recipient_id, Notification.type,
+            Notification.related_id, Notification.count, Notification.created_at
+        ).filter(
+            tuple_(Notification.recipient_id, Notification.type, Notification.related_id).in_(list(groups)),
+            Notification.is_read.is_(False),
+            Notification.created_at >= min(row['created_at'] for events in groups.values() for row, _ in events) - window
+        ).order_by(Notification.id):
+            existing[(recipient_id, type_value, related_id)] = (notification_id, count, created_at)
+        
+        merged = []
+        for key, events in groups.items():
+            row, summary = events[-1]
+            previous = existing.get(key)
+            if previous and previous[2] < events[0][0]['created_at'] - window:
+                previous = None
+            
+            count = len(events) + (previous[1] if previous else 0)
+            if count > 1:
+                row = {
+                    **row,
+                    'count': count,
+                    'title': COALESCED_TITLES.get(row['type'], row['title']),
+                    'message': summary.replace('{count}', str(count))
+                }
+            
+            if previous:
+                merged.append({**row, 'id': previous[0], 'added': len(events)})
+            else:
+                rows.append(row)
+        
+        if merged:
+            table = Notification.__table__
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('b_id')).values(
+                    count=table.c['count'] + bindparam('b_added'),
+                    sender_id=bindparam('b_sender_id'),
+                    title=bindparam('b_title'),
+                    message=bindparam('b_message'),
+                    created_at=bindparam('b_created_at')
+                ),
+                [{
+                    'b_id': row['id'],
+                    'b_added': row['added'],
+                    'b_sender_id': row['sender_id'],
+                    'b_title': row['title'],
+                    'b_message': row['message'],
+                    'b_created_at': row['created_at']
+                } for row in merged]
+            )
+        
+        return rows, merged
+    
+    @staticmethod
+    def _fail_outbox_entry(entry: NotificationOutbox, error: Exception, max_attempts: int, retry_delay: int, now: datetime):
+        entry.attempts += 1
+        entry.last_error = f"{type(error).__name__}: {error}"
+        entry.claim_token = None
+        entry.locked_at = None
+        
+        if entry.attempts >= max_attempts:
+            entry.status = 'dead'
+            logger.error(f"Notification outbox entry {entry.id} failed {entry.attempts} times, giving up: {error}")
+        else:
+            entry.status = 'pending'
+            entry.available_at = now + timedelta(seconds=retry_delay * 2 ** (entry.attempts - 1))
+            logger.warning(f"Notification outbox entry {entry.id} failed, retrying: {error}")
+        
+        db.session.commit()
+    
+    @staticmethod
+    def requeue_dead_notifications() -> int:
+        """Give dead outbox entries a fresh set of attempts"""
+        count = db.session.query(NotificationOutbox).filter_by(status='dead').update(
+            {'status': 'pending', 'attempts': 0, 'available_at': datetime.now()},
+            synchronize_session=False
+        )
+        db.session.info['notification_outbox'] = True
+        db.session.commit()
+        return count
+    
+    @staticmethod
+    def publish_notification(recipient_id: int, notification: Notification):
+        """Push a committed notification and the new unread count to the recipient's open streams.
+        
+        Takes the recipient id separately so nothing is reloaded from the
+        expired instance when nobody is listening.
+        """
+        hub = get_notification_hub()
+        if hub is None or not hub.has_subscribers(recipient_id):
+            return
+        
+        hub.publish(recipient_id, 'notification', notification.to_dict())
+        NotificationService.publish_unread_count(recipient_id)
+    
+    @staticmethod
+    def publish_unread_count(user_id: int):
+        """Push a user's unread count to their open streams"""
+        hub = get_notification_hub()
+        if hub is None or not hub.has_subscribers(user_id):
+            return
+        
+        hub.publish(user_id, 'unread_count', {'unread_count': NotificationService.get_unread_count(user_id)})
     
     @staticmethod
     def get_user_notifications(
         user_id: int, 
         page: int = 1, 
         per_page: int = 20,
-        unread_only: bool = False
+        unread_only: bool = False,
+        cursor: Optional[str] = None,
+        with_total: bool = False
     ) -> Dict[str, Any]:
-        """Get notifications for a user"""
+        """Get notifications for a user.
+        
+        With a ``cursor`` ('' for the first page) the feed is paged by keyset
+        and returns ``next_cursor`` instead of page numbers; the total is then
+        only counted with ``with_total``.
+        """
         query = Notification.query.filter_by(recipient_id=user_id)
         
         if unread_only:
             query = query.filter_by(is_read=False)
         
+        if cursor is not None:
+            result = keyset_paginate(
+                Notification.with_profile(query), Notification.created_at, Notification.id,
+                cursor=cursor, per_page=per_page, with_total=with_total
+            )
+            return {
+                'notifications': Notification.serialize_many(result['items']),
+                'total': result['total'],
+                'per_page': per_page,
+                'next_cursor': result['next_cursor'],
+                'has_more': result['has_more'],
+                'unread_count': NotificationService.get_unread_count(user_id)
+            }
+        
         query = query.order_by(desc(Notification.created_at))
         
-        pagination = query.paginate(
+        pagination = Notification.with_profile(query).paginate(
             page=page,
             per_page=per_page,
             error_out=False
         )
         
-        notifications = [notification.to_dict() for notification in pagination.items]
-        unread_count = Notification.query.filter_by(
-            recipient_id=user_id,
-            is_read=False
-        ).count()
+        notifications = Notification.serialize_many(pagination.items)
+        unread_count = NotificationService.get_unread_count(user_id)
         
         return {
             'notifications': notifications,
@@ -75,6 +381,11 @@ class NotificationService:
             'unread_count': unread_count
         }
     
+    @staticmethod
+    def get_unread_count(user_id: int) -> int:
+        """Get a user's unread notification count from their counters row"""
+        return CounterService.get_unread_count(user_id, 'notifications')
+    
     @staticmethod
     def mark_as_read(user_id: int, notification_id: int) -> Dict[str, str]:
         """Mark a notification as read"""
@@ -85,21 +396,47 @@ class NotificationService:
         if notification.recipient_id != user_id:
             raise PermissionException("Access denied")
         
-        notification.mark_as_read()
+        if notification.mark_as_read():
+            CounterService.increment_unread('notifications', [user_id], -1)
+            db.session.commit()
+        NotificationService.publish_unread_count(user_id)
         return {'message': 'Notification marked as read'}
     
     @staticmethod
     def mark_all_as_read(user_id: int) -> Dict[str, str]:
         """Mark all notifications as read for a user"""
-        notifications = Notification.query.filter_by(
-            recipient_id=user_id,
-            is_read=False
-        ).all()
+        count = NotificationService._mark_read(user_id)
+        return {'message': f'{count} notifications marked as read'}
+    
+    @staticmethod
+    def bulk_mark_as_read(user_id: int, notification_ids: List[int]) -> Dict[str, Any]:
+        """Mark a set of the user's notifications as read; ids of other users are ignored"""
+        valid, error = validate_id_list(notification_ids)
+        if not valid:
+            raise ValidationException(error)
         
-        for notification in notifications:
-            notification.mark_as_read()
+        count = NotificationService._mark_read(user_id, notification_ids)
+        return {
+            'message': f'{count} notifications marked as read',
+            'updated': count
+        }
+    
+    @staticmethod
+    def _mark_read(user_id: int, notification_ids: Optional[List[int]] = None) -> int:
+        """Mark unread notifications read with one UPDATE and move the counter by the rows changed"""
+        query = db.session.query(Notification).filter(
+            Notification.recipient_id == user_id,
+            Notification.is_read.is_(False)
+        )
+        if notification_ids is not None:
+            query = query.filter(Notification.id.in_(notification_ids))
         
-        return {'message': f'{len(notifications)} notifications marked as read'}
+        count = query.update({'is_read': True, 'read_at': datetime.now()}, synchronize_session=False)
+        if count:
+            CounterService.increment_unread('notifications', [user_id], -count)
+            db.session.commit()
+            NotificationService.publish_unread_count(user_id)
+        return count
     
     @staticmethod
     def delete_notification(user_id: int, notification_id: int) -> Dict[str, str]:
@@ -111,34 +448,50 @@ class NotificationService:
         if notification.recipient_id != user_id:
             raise PermissionException("Access denied")
         
+        if not notification.is_read:
+            CounterService.increment_unread('notifications', [user_id], -1)
         db.session.delete(notification)
         db.session.commit()
+        NotificationService.publish_unread_count(user_id)
         
         return {'message': 'Notification deleted'}
     
     @staticmethod
     def bulk_delete_notifications(user_id: int, notification_ids: List[int]) -> Dict[str, str]:
-        """Delete multiple notifications"""
-        notifications = Notification.query.filter(
+        """Delete multiple notifications.
+        
+        Unread and read rows are removed by two DELETEs so the unread counter
+        can be adjusted from the row counts without loading anything.
+        """
+        valid, error = validate_id_list(notification_ids)
+        if not valid:
+            raise ValidationException(error)
+        
+        query = db.session.query(Notification).filter(
             Notification.id.in_(notification_ids),
             Notification.recipient_id == user_id
-        ).all()
+        )
         
-        if not notifications:
-            raise NotFoundException("No notifications found")
+        unread = query.filter(Notification.is_read.is_(False)).delete(synchronize_session=False)
+        deleted = unread + query.delete(synchronize_session=False)
         
-        for notification in notifications:
-            db.session.delete(notification)
+        if not deleted:
+            db.session.rollback()
+            raise NotFoundException("No notifications found")
         
+        CounterService.increment_unread('notifications', [user_id], -unread)
         db.session.commit()
-        return {'message': f'{len(notifications)} notifications deleted'}
+        
+        if unread:
+            NotificationService.publish_unread_count(user_id)
+        return {'message': f'{deleted} notifications deleted'}
 
     @staticmethod
     def notify_new_message(sender_id: int, recipient_id: int, subject: str):
         """Notify user about new message"""
         sender = User.query.get(sender_id)
-        return NotificationService.create_notification(
-            recipient_id=recipient_id,
+        return NotificationService.enqueue(
+            recipient_ids=[recipient_id],
             sender_id=sender_id,
             notification_type=NotificationType.MESSAGE,
             title="New Message",
@@ -154,14 +507,15 @@ class NotificationService:
         student = User.query.get(student_id)
         course = Course.query.get(course_id)
         
-        return NotificationService.create_notification(
-            recipient_id=teacher_id,
+        return NotificationService.enqueue(
+            recipient_ids=[teacher_id],
             sender_id=student_id,
             notification_type=NotificationType.ENROLLMENT,
             title="New Student Enrollment",
             message=f"{student.full_name} has enrolled in your course '{course.title}'",
             action_url=f"/teacher/courses/{course_id}/students",
-            related_id=course_id
+            related_id=course_id,
+            summary=f"{{count}} new students enrolled in your course '{course.title}'"
         )
     
     @staticmethod
@@ -171,41 +525,37 @@ class NotificationService:
         student = User.query.get(student_id)
         assignment = Assignment.query.get(assignment_id)
         
-        return NotificationService.create_notification(
-            recipient_id=teacher_id,
+        return NotificationService.enqueue(
+            recipient_ids=[teacher_id],
             sender_id=student_id,
             notification_type=NotificationType.ASSIGNMENT_SUBMISSION,
             title="New Assignment Submission",
             message=f"{student.full_name} has submitted '{assignment.title}'",
             action_url=f"/teacher/assignment/{assignment_id}/submissions",
             related_id=assignment_id,
-            priority=NotificationPriority.HIGH
+            priority=NotificationPriority.HIGH,
+            summary=f"{{count}} new submissions for '{assignment.title}'"
         )
     
     @staticmethod
     def notify_assignment_graded(student_id: int, teacher_id: int, assignment_id: int, grade: float):
         """Notify student about graded assignment"""
         from app.models import Assignment
+        teacher = User.query.get(teacher_id)
+        assignment = Assignment.query.get(assignment_id)
         
-        try:
-            teacher = User.query.get(teacher_id)
-            assignment = Assignment.query.get(assignment_id)
-            
-            if not teacher or not assignment:
-                return
-            
-            return NotificationService.create_notification(
-                recipient_id=student_id,
-                sender_id=teacher_id,
-                notification_type=NotificationType.ASSIGNMENT_GRADED,
-                title="Assignment Graded",
-                message=f"Your assignment '{assignment.title}' has been graded by {teacher.full_name}. Grade: {grade}%",
-                action_url=f"/student/courses/{assignment.course_id}/assignment/{assignment_id}",
-                related_id=assignment_id
-            )
-        except Exception as e:
-            print(f"Error sending assignment graded notification: {e}")
-            return None
+        if not teacher or not assignment:
+            return
+        
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
+            sender_id=teacher_id,
+            notification_type=NotificationType.ASSIGNMENT_GRADED,
+            title="Assignment Graded",
+            message=f"Your assignment '{assignment.title}' has been graded by {teacher.full_name}. Grade: {grade}%",
+            action_url=f"/student/courses/{assignment.course_id}/assignment/{assignment_id}",
+            related_id=assignment_id
+        )
     
     @staticmethod
     def notify_quiz_submission(teacher_id: int, student_id: int, quiz_id: int, score: float):
@@ -214,14 +564,15 @@ class NotificationService:
         student = User.query.get(student_id)
         quiz = Quiz.query.get(quiz_id)
         
-        return NotificationService.create_notification(
-            recipient_id=teacher_id,
+        return NotificationService.enqueue(
+            recipient_ids=[teacher_id],
             sender_id=student_id,
             notification_type=NotificationType.QUIZ_SUBMISSION,
             title="New Quiz Submission",
             message=f"{student.full_name} completed '{quiz.title}' with score: {score}%",
             action_url=f"/teacher/quiz/{quiz_id}/analytics",
-            related_id=quiz_id
+            related_id=quiz_id,
+            summary=f"{{count}} new submissions for quiz '{quiz.title}'"
         )
     
     @staticmethod
@@ -231,8 +582,8 @@ class NotificationService:
         teacher = User.query.get(teacher_id)
         quiz = Quiz.query.get(quiz_id)
         
-        return NotificationService.create_notification(
-            recipient_id=student_id,
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
             sender_id=teacher_id,
             notification_type=NotificationType.QUIZ_GRADED,
             title="Quiz Graded",
@@ -248,8 +599,8 @@ class NotificationService:
         student = User.query.get(student_id)
         course = Course.query.get(course_id)
         
-        return NotificationService.create_notification(
-            recipient_id=teacher_id,
+        return NotificationService.enqueue(
+            recipient_ids=[teacher_id],
             sender_id=student_id,
             notification_type=NotificationType.COURSE_COMPLETION,
             title="Student Completed Course",
@@ -266,26 +617,21 @@ class NotificationService:
         teacher = User.query.get(teacher_id)
         course = Course.query.get(course_id)
         
-        notifications = []
-        for student_id in student_ids:
-            notification = NotificationService.create_notification(
-                recipient_id=student_id,
-                sender_id=teacher_id,
-                notification_type=NotificationType.NEW_CONTENT,
-                title=f"New {content_type.title()} Added",
-                message=f"{teacher.full_name} added a new {content_type} '{content_title}' to '{course.title}'",
-                action_url=f"/student/courses/{course_id}",
-                related_id=course_id
-            )
-            notifications.append(notification)
-        
-        return notifications
+        return NotificationService.enqueue(
+            recipient_ids=student_ids,
+            sender_id=teacher_id,
+            notification_type=NotificationType.NEW_CONTENT,
+            title=f"New {content_type.title()} Added",
+            message=f"{teacher.full_name} added a new {content_type} '{content_title}' to '{course.title}'",
+            action_url=f"/student/courses/{course_id}",
+            related_id=course_id
+        )
     
     @staticmethod
     def notify_achievement_earned(student_id: int, achievement_name: str, points: int):
         """Notify student about achievement earned"""
-        return NotificationService.create_notification(
-            recipient_id=student_id,
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
             notification_type=NotificationType.ACHIEVEMENT_EARNED,
             title="Achievement Unlocked!",
             message=f"Congratulations! You've earned the '{achievement_name}' achievement (+{points} points)",
@@ -295,16 +641,15 @@ class NotificationService:
     
     @staticmethod
     def notify_assignment_returned(student_id, teacher_id, assignment_id, feedback):
-        from app.models import Notification, NotificationType, NotificationPriority
-
+        """Notify student about a submission returned for revision"""
         assignment = Assignment.query.get(assignment_id)
         if not assignment:
             return
 
         message = f"Your submission for '{assignment.title}' was returned for revision."
-        NotificationService.create_notification(
-            recipient_id=student_id,
-            type=NotificationType.ASSIGNMENT_GRADED,
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
+            notification_type=NotificationType.ASSIGNMENT_GRADED,
             title="Assignment Returned",
             message=message,
             sender_id=teacher_id,
@@ -317,48 +662,36 @@ class NotificationService:
     def notify_quiz_graded(student_id: int, teacher_id: int, quiz_id: int, score: float, 
                         attempt_number: int = None, attempt_id: int = None):
         """Notify student when their quiz has been graded"""
-        try:
-            from app.models import Quiz, User, QuizAttempt
-            
-            quiz = Quiz.query.get(quiz_id)
-            teacher = User.query.get(teacher_id)
-            
-            if not quiz or not teacher:
-                return
-            
-            if attempt_id:
-                attempt = QuizAttempt.query.get(attempt_id)
-                if attempt:
-                    attempt_number = attempt.attempt_number
-                    actual_score = attempt.score  
-                else:
-                    actual_score = score
-            else:
-                actual_score = score
-            
-            passed = actual_score >= quiz.passing_score
-            status_text = "passed" if passed else "needs improvement"
-            
-            attempt_text = f" (Attempt #{attempt_number})" if attempt_number else ""
-            
-            notification = Notification(
-                recipient_id=student_id,
-                sender_id=teacher_id,
-                type=NotificationType.QUIZ_GRADED.value,
-                priority=NotificationPriority.HIGH.value if passed else NotificationPriority.NORMAL.value,
-                title=f"Quiz Graded: {quiz.title}",
-                message=f"Your quiz '{quiz.title}'{attempt_text} has been graded by {teacher.full_name}. Score: {actual_score:.1f}% ({status_text})",
-                action_url=f"/student/quiz/{attempt_id}/results" if attempt_id else f"/student/courses/{quiz.course_id}",
-                related_id=attempt_id or quiz_id  
-            )
-            
-            db.session.add(notification)
-            db.session.commit()
-            
-            print(f"Notification sent: attempt_id={attempt_id}, attempt_number={attempt_number}, score={actual_score}")
-            
-        except Exception as e:
-            print(f"Error sending quiz graded notification: {e}")
+        from app.models import Quiz, QuizAttempt
+        
+        quiz = Quiz.query.get(quiz_id)
+        teacher = User.query.get(teacher_id)
+        
+        if not quiz or not teacher:
+            return
+        
+        actual_score = score
+        if attempt_id:
+            attempt = QuizAttempt.query.get(attempt_id)
+            if attempt:
+                attempt_number = attempt.attempt_number
+                actual_score = attempt.score
+        
+        passed = actual_score >= quiz.passing_score
+        status_text = "passed" if passed else "needs improvement"
+        
+        attempt_text = f" (Attempt #{attempt_number})" if attempt_number else ""
+        
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
+            sender_id=teacher_id,
+            notification_type=NotificationType.QUIZ_GRADED,
+            priority=NotificationPriority.HIGH if passed else NotificationPriority.NORMAL,
+            title=f"Quiz Graded: {quiz.title}",
+            message=f"Your quiz '{quiz.title}'{attempt_text} has been graded by {teacher.full_name}. Score: {actual_score:.1f}% ({status_text})",
+            action_url=f"/student/quiz/{attempt_id}/results" if attempt_id else f"/student/courses/{quiz.course_id}",
+            related_id=attempt_id or quiz_id
+        )
 
     @staticmethod
     def notify_certificate_request_submitted(student_id: int, course_id: int):
@@ -371,23 +704,18 @@ class NotificationService:
         if not student or not course:
             return
         
-        admins = User.query.filter_by(role=UserRole.ADMIN, is_active=True).all()
-        
-        notifications = []
-        for admin in admins:
-            notification = NotificationService.create_notification(
-                recipient_id=admin.id,
-                sender_id=student_id,
-                notification_type=NotificationType.CERTIFICATE_REQUEST,
-                title="New Certificate Request",
-                message=f"{student.full_name} has requested a certificate for '{course.title}'",
-                action_url="/admin/certificates",
-                related_id=course_id,
-                priority=NotificationPriority.HIGH
-            )
-            notifications.append(notification)
+        admin_ids = [admin_id for admin_id, in db.session.query(User.id).filter_by(role=UserRole.ADMIN, is_active=True)]
         
-        return notifications
+        return NotificationService.enqueue(
+            recipient_ids=admin_ids,
+            sender_id=student_id,
+            notification_type=NotificationType.CERTIFICATE_REQUEST,
+            title="New Certificate Request",
+            message=f"{student.full_name} has requested a certificate for '{course.title}'",
+            action_url="/admin/certificates",
+            related_id=course_id,
+            priority=NotificationPriority.HIGH
+        )
 
     @staticmethod
     def notify_certificate_request_resubmitted(student_id: int, course_id: int):
@@ -400,23 +728,18 @@ class NotificationService:
         if not student or not course:
             return
         
-        admins = User.query.filter_by(role=UserRole.ADMIN, is_active=True).all()
-        
-        notifications = []
-        for admin in admins:
-            notification = NotificationService.create_notification(
-                recipient_id=admin.id,
-                sender_id=student_id,
-                notification_type=NotificationType.CERTIFICATE_REQUEST,
-                title="Certificate Request Resubmitted",
-                message=f"{student.full_name} has resubmitted their certificate request for '{course.title}'",
-                action_url="/admin/certificates",
-                related_id=course_id,
-                priority=NotificationPriority.HIGH
-            )
-            notifications.append(notification)
+        admin_ids = [admin_id for admin_id, in db.session.query(User.id).filter_by(role=UserRole.ADMIN, is_active=True)]
         
-        return notifications
+        return NotificationService.enqueue(
+            recipient_ids=admin_ids,
+            sender_id=student_id,
+            notification_type=NotificationType.CERTIFICATE_REQUEST,
+            title="Certificate Request Resubmitted",
+            message=f"{student.full_name} has resubmitted their certificate request for '{course.title}'",
+            action_url="/admin/certificates",
+            related_id=course_id,
+            priority=NotificationPriority.HIGH
+        )
 
     @staticmethod
     def notify_certificate_request_approved(student_id: int, course_id: int, certificate_code: str):
@@ -428,8 +751,8 @@ class NotificationService:
         if not course:
             return
         
-        return NotificationService.create_notification(
-            recipient_id=student_id,
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
             notification_type=NotificationType.CERTIFICATE_APPROVED,
             title="Certificate Request Approved",
             message=f"Your certificate request for '{course.title}' has been approved and issued! Certificate ID: {certificate_code}",
@@ -448,8 +771,8 @@ class NotificationService:
         if not course:
             return
         
-        return NotificationService.create_notification(
-            recipient_id=student_id,
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
             notification_type=NotificationType.CERTIFICATE_REJECTED,
             title="Certificate Request Rejected",
             message=f"Your certificate request for '{course.title}' has been rejected. Reason: {reason}",
@@ -464,8 +787,8 @@ class NotificationService:
         from app.models import Course
         course = Course.query.get(course_id)
         
-        return NotificationService.create_notification(
-            recipient_id=student_id,
+        return NotificationService.enqueue(
+            recipient_ids=[student_id],
             notification_type=NotificationType.CERTIFICATE_ISSUED,
             title="Certificate Issued",
             message=f"Your certificate for '{course.title}' has been issued! Certificate ID: {certificate_code}",
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Tuple
+from sqlalchemy import func
+from app.models import db, Enrollment, Lesson, LessonProgress, Quiz, QuizAttempt, Assignment, AssignmentSubmission
+
+class ProgressService:
+    """Set-based course progress calculations.
+
+    Progress for any batch of enrollments is computed with a fixed number of
+    grouped queries, regardless of how many students, quizzes or assignments
+    are involved.
+    """
+
+    @staticmethod
+    def compute_progress(enrollment_ids: Iterable[int]) -> Dict[int, float]:
+        """Get the progress percentage for each enrollment id"""
+        details = ProgressService.compute_progress_details(enrollment_ids)
+        return {enrollment_id: data['percentage'] for enrollment_id, data in details.items()}
+
+    @staticmethod
+    def compute_progress_details(enrollment_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Get the completed/total component counts and percentage for each enrollment id.
+
+        Progress is calculated based on:
+        - Completed lessons
+        - Passed quizzes (best completed attempt meets the passing score)
+        - Submitted or graded assignments
+        """
+        enrollment_ids = {int(enrollment_id) for enrollment_id in enrollment_ids if enrollment_id is not None}
+        if not enrollment_ids:
+            return {}
+
+        pairs = db.session.query(
+            Enrollment.id, Enrollment.student_id, Enrollment.course_id
+        ).filter(Enrollment.id.in_(enrollment_ids)).all()
+        if not pairs:
+            return {}
+
+        student_ids = {student_id for _, student_id, _ in pairs}
+        course_ids = {course_id for _, _, course_id in pairs}
+
+        lesson_totals = ProgressService._count_by_course(Lesson, course_ids)
+        quiz_totals = ProgressService._count_by_course(Quiz, course_ids)
+        assignment_totals = ProgressService._count_by_course(Assignment, course_ids)
+
+        completed_lessons = ProgressService._completed_lessons(student_ids, course_ids)
+        passed_quizzes = ProgressService._passed_quizzes(student_ids, course_ids)
+        submitted_assignments = ProgressService._submitted_assignments(student_ids, course_ids)
+
+        results = {}
+        for enrollment_id, student_id, course_id in pairs:
+            key = (student_id, course_id)
+            data = {
+                'lessons_completed': completed_lessons.get(key, 0),
+                'lessons_total': lesson_totals.get(course_id, 0),
+                'quizzes_passed': passed_quizzes.get(key, 0),
+                'quizzes_total': quiz_totals.get(course_id, 0),
+                'assignments_submitted': submitted_assignments.get(key, 0),
+                'assignments_total': assignment_totals.get(course_id, 0)
+            }
+
+            total_components = data['lessons_total'] + data['quizzes_total'] + data['assignments_total']
+            completed_components = data['lessons_completed'] + data['quizzes_passed'] + data['assignments_submitted']
+
+            if total_components == 0:
+                data['percentage'] = 100.0
+            else:
+                progress = (completed_components / total_components) * 100
+                data['percentage'] = min(round(progress, 2), 100.0)
+
+            results[enrollment_id] = data
+
+        return results
+
+    @staticmethod
+    def refresh_enrollments(enrollments: List[Enrollment]) -> Dict[int, float]:
+        """Store fresh progress on the given enrollments and complete the finished active ones"""
+        progress_map = ProgressService.compute_progress([e.id for e in enrollments])
+        for enrollment in enrollments:
+            current_progress = progress_map.get(enrollment.id, enrollment.progress_percentage)
+            if enrollment.progress_percentage != current_progress:
+                enrollment.progress_percentage = current_progress
+
+                if current_progress >= 100 and enrollment.status == 'active':
+                    enrollment.set_status('completed')
+                    enrollment.completed_at = datetime.now()
+
+        return progress_map
+
+    @staticmethod
+    def _count_by_course(model, course_ids) -> Dict[int, int]:
+        """Count rows of a course-owned model, grouped by course"""
+        rows = db.session.query(
+            model.course_id, func.count(model.id)
+        ).filter(model.course_id.in_(course_ids)).group_by(model.course_id).all()
+        return {course_id: count for course_id, count in rows}
+
+    @staticmethod
+    def _completed_lessons(student_ids, course_ids) -> Dict[Tuple[int, int], int]:
+        """Count completed lessons grouped by (student, course)"""
+        rows = db.session.query(
+            LessonProgress.student_id, Lesson.course_id, func.count(LessonProgress.id)
+        ).join(Lesson, LessonProgress.lesson_id == Lesson.id).filter(
+            LessonProgress.student_id.in_(student_ids),
+            Lesson.course_id.in_(course_ids),
+            LessonProgress.completed_at.isnot(None)
+        ).group_by(LessonProgress.student_id, Lesson.course_id).all()
+        return {(student_id, course_id): count for student_id, course_id, count in rows}
+
+    @staticmethod
+    def _passed_quizzes(student_ids, course_ids) -> Dict[Tuple[int, int], int]:
+        """Count quizzes whose best completed attempt passed, grouped by (student, course)"""
+        best_scores = db.session.query(
+            QuizAttempt.student_id.label('student_id'),
+            QuizAttempt.quiz_id.label('quiz_id'),
+            func.max(QuizAttempt.score).label('best_score')
+        ).join(Quiz, QuizAttempt.quiz_id == Quiz.id).filter(
+            QuizAttempt.student_id.in_(student_ids),
+            Quiz.course_id.in_(course_ids),
+            QuizAttempt.status == 'completed'
+        ).group_by(QuizAttempt.student_id, QuizAttempt.quiz_id).subquery()
+
+        rows = db.session.query(
+            best_scores.c.student_id, Quiz.course_id, func.count(Quiz.id)
+        ).join(Quiz, Quiz.id == best_scores.c.quiz_id).filter(
+            best_scores.c.best_score.isnot(None),
+            best_scores.c.best_score >= Quiz.passing_score
+        ).group_by(best_scores.c.student_id, Quiz.course_id).all()
+        return {(student_id, course_id): count for student_id, course_id, count in rows}
+
+    @staticmethod
+    def _submitted_assignments(student_ids, course_ids) -> Dict[Tuple[int, int], int]:
+        """Count submitted or graded assignments grouped by (student, course)"""
+        rows = db.session.query(
+            AssignmentSubmission.student_id, Assignment.course_id,
+            func.count(func.distinct(AssignmentSubmission.assignment_id))
+        ).join(Assignment, AssignmentSubmission.assignment_id == Assignment.id).filter(
+            AssignmentSubmission.student_id.in_(student_ids),
+            Assignment.course_id.in_(course_ids),
+            AssignmentSubmission.status.in_(['submitted', 'graded'])
+        ).group_by(AssignmentSubmission.student_id, Assignment.course_id).all()
+        return {(student_id, course_id): count for student_id, course_id, count in rows}
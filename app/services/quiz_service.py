@@ -1,10 +1,12 @@
 from datetime import datetime
 from typing import Dict, Any
-from app.models import db, Quiz, QuizAttempt, Question, AnswerOption, StudentAnswer, User, Course, Enrollment
+from sqlalchemy import case, distinct, func, insert
+from app.models import db, Quiz, QuizAttempt, QuizAttemptResult, Question, AnswerOption, StudentAnswer, User, Course, Enrollment
 from app.services.achievement_service import AchievementService
 from app.utils.base_controller import ValidationException, PermissionException, NotFoundException
-from app.utils.helpers import calculate_time_spent, calculate_quiz_statistics
+from app.utils.helpers import calculate_quiz_statistics, calculate_time_spent
 from app.utils.validators import validate_quiz_answers
+from app.utils.answer_keys import get_answer_key, invalidate_answer_key
 from app.services.notification_service import NotificationService
 
 class QuizService:
@@ -25,14 +27,19 @@ class QuizService:
         quizzes = course.quizzes.all()
         quizzes_data = []
         
+        attempts_by_quiz = {quiz.id: [] for quiz in quizzes}
+        if user.is_student() and quizzes:
+            for attempt in QuizAttempt.query.filter(
+                QuizAttempt.student_id == user_id,
+                QuizAttempt.quiz_id.in_(list(attempts_by_quiz))
+            ).all():
+                attempts_by_quiz[attempt.quiz_id].append(attempt)
+        
         for quiz in quizzes:
             quiz_dict = quiz.to_dict()
             
             if user.is_student():
-                attempts = QuizAttempt.query.filter_by(
-                    student_id=user_id,
-                    quiz_id=quiz.id
-                ).all()
+                attempts = attempts_by_quiz[quiz.id]
                 
                 quiz_dict['attempts'] = {
                     'count': len(attempts),
@@ -41,8 +48,6 @@ class QuizService:
                     'has_passed': any(a.score >= quiz.passing_score for a in attempts if a.score is not None)
                 }
             
-            quiz_dict['question_count'] = quiz.questions.count()
-            
             quizzes_data.append(quiz_dict)
         
         return {
@@ -66,6 +71,7 @@ class QuizService:
         
         if user.is_teacher() and quiz.course.teacher_id == user_id:
             questions = quiz.questions.order_by(Question.order_number).all()
+            options = Question.load_answer_options(questions)
             quiz_data['questions'] = [
                 {
                     'id': q.id,
@@ -79,7 +85,7 @@ class QuizService:
                             'option_text': opt.option_text,
                             'is_correct': opt.is_correct
                         }
-                        for opt in q.answer_options
+                        for opt in options[q.id]
                     ] if q.question_type in ['multiple_choice', 'true_false'] else []
                 }
                 for q in questions
@@ -135,9 +141,9 @@ class QuizService:
         )
         
         db.session.add(quiz)
-        db.session.commit()
+        course.increment_counter('quiz_count')
         
-        enrolled_students = [enrollment.student_id for enrollment in course.enrollments.filter_by(status='active')]
+        enrolled_students = [student_id for student_id, in db.session.query(Enrollment.student_id).filter_by(course_id=course.id, status='active')]
     
         if enrolled_students:
             NotificationService.notify_new_content(
@@ -147,6 +153,8 @@ class QuizService:
                 content_type='quiz',
                 content_title=quiz.title
             )
+        
+        db.session.commit()
 
         return {
             'message': 'Quiz created successfully',
@@ -170,6 +178,7 @@ class QuizService:
         
         quiz.updated_at = datetime.now()
         db.session.commit()
+        invalidate_answer_key(quiz_id)
         
         return {
             'message': 'Quiz updated successfully',
@@ -190,6 +199,7 @@ class QuizService:
         if attempt_count > 0:
             raise ValidationException(f'Cannot delete quiz with {attempt_count} student attempts')
         
+        quiz.course.increment_counter('quiz_count', -1)
         db.session.delete(quiz)
         db.session.commit()
         
@@ -254,7 +264,9 @@ class QuizService:
                 )
                 db.session.add(answer_option)
         
+        quiz.increment_counter('question_count')
         db.session.commit()
+        invalidate_answer_key(quiz_id)
         
         question_dict = question.to_dict()
         if question.question_type in ['multiple_choice', 'true_false']:
@@ -302,7 +314,9 @@ class QuizService:
                 )
                 db.session.add(answer_option)
         
+        quiz.updated_at = datetime.now()
         db.session.commit()
+        invalidate_answer_key(quiz_id)
         
         question_dict = question.to_dict()
         if question.question_type in ['multiple_choice', 'true_false']:
@@ -333,6 +347,7 @@ class QuizService:
         
         order_number = question.order_number
         
+        quiz.increment_counter('question_count', -1)
         db.session.delete(question)
         
         questions_to_shift = Question.query.filter(
@@ -344,6 +359,7 @@ class QuizService:
             q.order_number -= 1
         
         db.session.commit()
+        invalidate_answer_key(quiz_id)
         
         return {'message': 'Question deleted successfully'}
     
@@ -395,22 +411,19 @@ class QuizService:
         if attempt.student_id != student_id:
             raise PermissionException("Access denied")
         
-        questions = attempt.quiz.questions.all()
+        questions = get_answer_key(attempt.quiz).questions.values()
         valid, errors = validate_quiz_answers(questions, answers)
         if not valid:
             raise ValidationException(f"Invalid answers: {', '.join(errors)}")
         
         result = QuizService.submit_quiz_attempt(attempt_id, answers)
         
-        try:
-            NotificationService.notify_quiz_submission(
-                attempt.quiz.course.teacher_id,
-                student_id,
-                attempt.quiz_id,
-                attempt.score
-            )
-        except Exception as e:
-            print(f"Failed to send quiz submission notification: {e}")
+        NotificationService.notify_quiz_submission(
+            attempt.quiz.course.teacher_id,
+            student_id,
+            attempt.quiz_id,
+            attempt.score
+        )
 
         achievements = AchievementService.check_quiz_achievement(student_id, attempt_id)
         
@@ -426,7 +439,7 @@ class QuizService:
             course_completed = LessonService._is_course_fully_completed(student_id, attempt.quiz.course_id)
             
             if course_completed and enrollment.status == 'active':
-                enrollment.status = 'completed'
+                enrollment.set_status('completed')
                 enrollment.completed_at = datetime.now()
 
                 NotificationService.notify_course_completion(
@@ -434,8 +447,8 @@ class QuizService:
                     student_id=student_id,
                     course_id=attempt.quiz.course_id
                 )
-                
-                db.session.commit()
+        
+        db.session.commit()
         
         response = {
             'message': 'Quiz submitted successfully',
@@ -456,24 +469,42 @@ class QuizService:
     
     @staticmethod
     def get_quiz_results(user_id: int, attempt_id: int) -> Dict[str, Any]:
-        """Get quiz results"""
+        """Get quiz results from the attempt's frozen results document"""
         user = User.query.get(user_id)
-        attempt = QuizAttempt.query.get(attempt_id)
+        result = QuizAttemptResult.query.get(attempt_id)
+        attempt = None
         
-        if not attempt:
-            raise NotFoundException("Quiz attempt not found")
+        if result is None:
+            attempt = QuizAttempt.query.get(attempt_id)
+            if not attempt:
+                raise NotFoundException("Quiz attempt not found")
         
-        if user.is_student() and attempt.student_id != user_id:
+        student_id = result.student_id if result else attempt.student_id
+        if user.is_student() and student_id != user_id:
             raise PermissionException("Access denied")
-        elif user.is_teacher() and attempt.quiz.course.teacher_id != user_id:
-            raise PermissionException("Access denied")
-        
-        results = QuizService._get_detailed_results(attempt_id)
-        return results
+        elif user.is_teacher():
+            quiz = Quiz.query.get(result.quiz_id) if result else attempt.quiz
+            if quiz.course.teacher_id != user_id:
+                raise PermissionException("Access denied")
+        
+        if result is None:
+            # Attempts completed before results were frozen get their document on first view
+            if attempt.status != 'completed':
+                raise ValueError("Quiz has not been completed")
+            result = QuizService._write_results_snapshot(attempt)
+            document = result.document
+            db.session.commit()
+            return document
+        
+        return result.document
     
     @staticmethod
     def get_quiz_statistics(teacher_id: int, quiz_id: int) -> Dict[str, Any]:
-        """Get quiz statistics"""
+        """Get quiz statistics.
+        
+        Scores and per-question answer counts are aggregated by the database,
+        so the cost does not grow with the number of attempts loaded into Python.
+        """
         quiz = Quiz.query.get(quiz_id)
         if not quiz:
             raise NotFoundException("Quiz not found")
@@ -481,28 +512,38 @@ class QuizService:
         if quiz.course.teacher_id != teacher_id:
             raise PermissionException("Access denied")
         
-        attempts = QuizAttempt.query.filter_by(
-            quiz_id=quiz_id,
-            status='completed'
-        ).all()
+        completed = (QuizAttempt.quiz_id == quiz_id, QuizAttempt.status == 'completed')
+        
+        stats = calculate_quiz_statistics(db.session.query(
+            func.count(QuizAttempt.id).label('total_attempts'),
+            func.count(QuizAttempt.score).label('scored'),
+            func.avg(QuizAttempt.score).label('average_score'),
+            func.max(QuizAttempt.score).label('highest_score'),
+            func.min(QuizAttempt.score).label('lowest_score'),
+            func.sum(case((QuizAttempt.score >= quiz.passing_score, 1), else_=0)).label('passed')
+        ).filter(*completed).one())
+        
+        # Attempts rather than answer rows are counted, as an attempt answers a question once
+        answer_counts = {
+            question_id: (total_answers, correct_answers)
+            for question_id, total_answers, correct_answers in db.session.query(
+                StudentAnswer.question_id,
+                func.count(distinct(StudentAnswer.attempt_id)),
+                func.count(distinct(case((StudentAnswer.is_correct.is_(True), StudentAnswer.attempt_id))))
+            ).join(QuizAttempt, QuizAttempt.id == StudentAnswer.attempt_id).filter(
+                *completed
+            ).group_by(StudentAnswer.question_id)
+        }
         
-        stats = calculate_quiz_statistics(attempts)
+        questions = quiz.questions.all()
         
         question_stats = []
-        for question in quiz.questions:
-            correct_count = 0
-            total_answers = 0
-            
-            for attempt in attempts:
-                answer = next((a for a in attempt.student_answers if a.question_id == question.id), None)
-                if answer:
-                    total_answers += 1
-                    if answer.is_correct:
-                        correct_count += 1
+        for question, question_dict in zip(questions, Question.serialize_many(questions)):
+            total_answers, correct_count = answer_counts.get(question.id, (0, 0))
             
             question_stats.append({
                 'question': {
-                    **question.to_dict(),
+                    **question_dict,
                     'question_type': question.question_type  
                 },
                 'total_answers': total_answers,
@@ -547,6 +588,7 @@ class QuizService:
     def get_quiz_questions(quiz_id: int, include_answers: bool = False):
         """Get all questions for a quiz"""
         questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order_number).all()
+        answer_options = Question.load_answer_options(questions)
         
         questions_data = []
         for question in questions:
@@ -560,7 +602,7 @@ class QuizService:
             
             if question.question_type in ['multiple_choice', 'true_false']:
                 options = []
-                for option in question.answer_options:
+                for option in answer_options[question.id]:
                     opt_data = {
                         'id': option.id,
                         'option_text': option.option_text
@@ -576,7 +618,12 @@ class QuizService:
     
     @staticmethod
     def submit_quiz_attempt(attempt_id: int, answers: Dict[str, Any]):
-        """Submit and grade a quiz attempt"""
+        """Submit and grade a quiz attempt.
+        
+        Answers are graded against the quiz's cached answer key, so grading
+        itself runs no queries, and the answers are written with one batched
+        INSERT.
+        """
         attempt = QuizAttempt.query.get(attempt_id)
         if not attempt:
             raise ValueError("Quiz attempt not found")
@@ -591,63 +638,88 @@ class QuizService:
                 db.session.commit()
                 raise ValueError("Time limit exceeded")
         
+        answer_key = get_answer_key(attempt.quiz)
         total_points = 0
         earned_points = 0
+        rows = []
         
         for question_id, answer_value in answers.items():
-            question = Question.query.get(int(question_id))
-            if not question or question.quiz_id != attempt.quiz_id:
+            try:
+                question = answer_key.questions.get(int(question_id))
+            except (TypeError, ValueError):
+                question = None
+            if not question:
                 continue
             
             total_points += question.points
             
-            student_answer = StudentAnswer(
-                attempt_id=attempt_id,
-                question_id=question.id
-            )
+            row = {
+                'attempt_id': attempt_id,
+                'question_id': question.id,
+                'answer_text': None,
+                'selected_option_id': None,
+                'is_correct': None,
+                'points_earned': 0
+            }
             
             if question.question_type in ['multiple_choice', 'true_false']:
-                student_answer.selected_option_id = answer_value
-                selected_option = AnswerOption.query.get(answer_value)
-                if selected_option and selected_option.is_correct:
-                    student_answer.is_correct = True
-                    student_answer.points_earned = question.points
+                if isinstance(answer_value, int) and answer_value in question.option_ids:
+                    row['selected_option_id'] = answer_value
+                row['is_correct'] = row['selected_option_id'] in question.correct_option_ids
+                if row['is_correct']:
+                    row['points_earned'] = question.points
                     earned_points += question.points
-                else:
-                    student_answer.is_correct = False
-                    student_answer.points_earned = 0
             
             elif question.question_type == 'short_answer':
-                student_answer.answer_text = answer_value
-                student_answer.is_correct = None
-                student_answer.points_earned = 0
+                row['answer_text'] = answer_value
             
-            db.session.add(student_answer)
+            rows.append(row)
+        
+        if rows:
+            db.session.execute(insert(StudentAnswer.__table__), rows)
         
         attempt.score = (earned_points / total_points * 100) if total_points > 0 else 0
         attempt.submitted_at = datetime.now()
         attempt.time_spent_minutes = calculate_time_spent(attempt.started_at, attempt.submitted_at)
         attempt.status = 'completed'
         
-        db.session.commit()
+        QuizService._write_results_snapshot(attempt)
         
-        return {
+        result = {
             'score': attempt.score,
             'earned_points': earned_points,
             'total_points': total_points,
             'passed': attempt.score >= attempt.quiz.passing_score
         }
+        db.session.commit()
+        return result
     
     @staticmethod
-    def _get_detailed_results(attempt_id: int):
-        """Get detailed results for a quiz attempt"""
-        attempt = QuizAttempt.query.get(attempt_id)
-        if not attempt:
-            raise ValueError("Quiz attempt not found")
+    def _write_results_snapshot(attempt, replace: bool = False):
+        """Freeze the results document of a completed attempt in the current transaction.
+        
+        ``replace`` overwrites the document written at submit time, after grading.
+        """
+        document = QuizService._build_results_document(attempt)
         
-        if attempt.status != 'completed':
-            raise ValueError("Quiz has not been completed")
+        result = QuizAttemptResult.query.get(attempt.id) if replace else None
+        if result is None:
+            result = QuizAttemptResult(
+                attempt_id=attempt.id,
+                student_id=attempt.student_id,
+                quiz_id=attempt.quiz_id,
+                document=document
+            )
+            db.session.add(result)
+        else:
+            result.document = document
+            result.updated_at = datetime.now()
         
+        return result
+    
+    @staticmethod
+    def _build_results_document(attempt):
+        """Build the detailed results of an attempt from its answers, questions and options"""
         attempt_data = attempt.to_dict()
         attempt_data['student_name'] = attempt.student.full_name if attempt.student else 'Unknown'
         attempt_data['student_email'] = attempt.student.email if attempt.student else 'Unknown'
@@ -658,8 +730,12 @@ class QuizService:
             'questions': []
         }
         
-        for answer in attempt.student_answers:
-            question = answer.question
+        student_answers = db.session.query(StudentAnswer, Question).join(
+            Question, Question.id == StudentAnswer.question_id
+        ).filter(StudentAnswer.attempt_id == attempt.id).order_by(StudentAnswer.id).all()
+        answer_options = Question.load_answer_options(list({question for _, question in student_answers}))
+        
+        for answer, question in student_answers:
             question_data = {
                 'id': question.id,
                 'question_text': question.question_text,
@@ -673,10 +749,11 @@ class QuizService:
             }
             
             if question.question_type in ['multiple_choice', 'true_false']:
-                if answer.selected_option:
-                    question_data['student_answer'] = answer.selected_option.option_text
+                selected = next((opt for opt in answer_options[question.id] if opt.id == answer.selected_option_id), None)
+                if selected:
+                    question_data['student_answer'] = selected.option_text
                 
-                correct_options = [opt.option_text for opt in question.answer_options if opt.is_correct]
+                correct_options = [opt.option_text for opt in answer_options[question.id] if opt.is_correct]
                 question_data['correct_answer'] = correct_options[0] if correct_options else None
                 
                 question_data['options'] = [
@@ -686,7 +763,7 @@ class QuizService:
                         'is_correct': opt.is_correct,
                         'selected': opt.id == answer.selected_option_id
                     }
-                    for opt in question.answer_options
+                    for opt in answer_options[question.id]
                 ]
             else:
                 question_data['student_answer'] = answer.answer_text
@@ -744,6 +821,7 @@ class QuizService:
 
         answers_map = {a.question_id: a for a in attempt.student_answers}
         questions = attempt.quiz.questions.order_by(Question.order_number).all()
+        answer_options = Question.load_answer_options(questions)
 
         result = []
         for q in questions:
@@ -760,7 +838,7 @@ class QuizService:
                     {
                         'id': opt.id,
                         'option_text': opt.option_text
-                    } for opt in q.answer_options
+                    } for opt in answer_options[q.id]
                 ]
 
             answer = answers_map.get(q.id)
@@ -792,12 +870,13 @@ class QuizService:
         print(f"Grading attempt ID: {attempt_id}, attempt number: {attempt.attempt_number}, student: {attempt.student_id}")
 
         student_answers = attempt.student_answers
+        answer_key = get_answer_key(quiz)
         
         total_possible_points = 0
         total_earned_points = 0
         
         for answer in student_answers:
-            question = Question.query.get(answer.question_id)
+            question = answer_key.questions.get(answer.question_id)
             if not question:
                 continue
             
@@ -824,24 +903,20 @@ class QuizService:
         attempt.graded_at = datetime.now()
         attempt.status = 'completed'
         
+        QuizService._write_results_snapshot(attempt, replace=True)
+        
+        NotificationService.notify_quiz_graded(
+            student_id=attempt.student_id,
+            teacher_id=teacher_id,
+            quiz_id=quiz.id,
+            score=attempt.score,
+            attempt_number=attempt.attempt_number,
+            attempt_id=attempt_id 
+        )
         db.session.commit()
 
         print(f"Score updated from {previous_score} to {attempt.score} for attempt ID {attempt_id} (attempt #{attempt.attempt_number})")
 
-        try:
-            from app.services.notification_service import NotificationService
-            NotificationService.notify_quiz_graded(
-                student_id=attempt.student_id,
-                teacher_id=teacher_id,
-                quiz_id=quiz.id,
-                score=attempt.score,
-                attempt_number=attempt.attempt_number,
-                attempt_id=attempt_id 
-            )
-            print(f"Notification sent for attempt_id={attempt_id}, attempt_number={attempt.attempt_number}")
-        except Exception as e:
-            print(f"Failed to send quiz graded notification: {e}")
-
         return {
             'message': 'Quiz graded successfully',
             'attempt': attempt.to_dict(),
@@ -0,0 +1,155 @@
+import time
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from flask import current_app
+from sqlalchemy import func, insert, literal, select
+from app.models import db, Notification, NotificationArchive, NotificationType
+from app.services.counter_service import CounterService
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = (
+    'id', 'recipient_id', 'sender_id', 'type', 'priority', 'title', 'message',
+    'action_url', 'related_id', 'count', 'is_read', 'read_at', 'created_at'
+)
+
+class RetentionService:
+    """Service for moving old notifications out of the hot table"""
+    
+    @staticmethod
+    def resolve_policies(policies: Dict[str, Dict[str, int]]) -> List[Dict[str, Any]]:
+        """Turn the per-type policy config into the rules the job runs, deletes first.
+        
+        Each rule covers one notification type; the 'default' policy covers every
+        type without its own entry, and a type's entry overrides the default
+        field by field. ``delete_read_after_days`` drops read rows without
+        archiving them and ``archive_after_days`` moves every older row.
+        """
+        known_types = {notification_type.value for notification_type in NotificationType}
+        unknown = set(policies) - known_types - {'default'}
+        if unknown:
+            raise ValueError(f"Unknown notification types in retention policies: {', '.join(sorted(unknown))}")
+        
+        default = policies.get('default', {})
+        explicit = sorted(set(policies) - {'default'})
+        
+        scopes = [(type_value, Notification.type == type_value, {**default, **policies[type_value]})
+                  for type_value in explicit]
+        scopes.append(('default', Notification.type.notin_(explicit) if explicit else None, default))
+        
+        rules = []
+        for action, field in (('delete', 'delete_read_after_days'), ('archive', 'archive_after_days')):
+            for scope, condition, policy in scopes:
+                if policy.get(field) is not None:
+                    rules.append({'scope': scope, 'condition': condition, 'action': action, 'days': policy[field]})
+        return rules
+    
+    @staticmethod
+    def apply_retention(
+        policies: Optional[Dict[str, Dict[str, int]]] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None,
+        dry_run: bool = False,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Apply the retention policies in batches of at most ``batch_size`` rows.
+        
+        Every batch is its own short transaction: the rows are copied to the
+        archive (for archive rules), deleted from ``notifications`` and the
+        recipients' unread counters are lowered for unread rows that left.
+        ``max_batches`` bounds the work of one run; whatever is left is picked up
+        by the next. With ``dry_run`` only the matching rows are counted.
+        """
+        config = current_app.config
+        policies = config['NOTIFICATION_RETENTION_POLICIES'] if policies is None else policies
+        batch_size = batch_size or config.get('NOTIFICATION_RETENTION_BATCH_SIZE', 1000)
+        now = now or datetime.now()
+        started = time.perf_counter()
+        
+        metrics = {'archived': 0, 'deleted': 0, 'batches': 0, 'complete': True, 'dry_run': dry_run, 'rules': []}
+        
+        for rule in RetentionService.resolve_policies(policies):
+            filters = [Notification.created_at < now - timedelta(days=rule['days'])]
+            if rule['condition'] is not None:
+                filters.append(rule['condition'])
+            if rule['action'] == 'delete':
+                filters.append(Notification.is_read.is_(True))
+            
+            moved = 0
+            if dry_run:
+                moved = db.session.query(func.count(Notification.id)).filter(*filters).scalar()
+            else:
+                while True:
+                    if max_batches is not None and metrics['batches'] >= max_batches:
+                        metrics['complete'] = False
+                        break
+                    
+                    count = RetentionService._move_batch(filters, rule['action'] == 'archive', batch_size, now)
+                    if not count:
+                        break
+                    moved += count
+                    metrics['batches'] += 1
+                    if count < batch_size:
+                        break
+            
+            metrics['archived' if rule['action'] == 'archive' else 'deleted'] += moved
+            metrics['rules'].append({
+                'type': rule['scope'],
+                'action': rule['action'],
+                'older_than_days': rule['days'],
+                'rows': moved
+            })
+        
+        metrics['duration_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(
+            f"Notification retention: archived {metrics['archived']}, deleted {metrics['deleted']} "
+            f"in {metrics['batches']} batches ({metrics['duration_ms']} ms)"
+        )
+        return metrics
+    
+    @staticmethod
+    def _move_batch(filters: List[Any], archive: bool, batch_size: int, now: datetime) -> int:
+        rows = db.session.query(Notification.id, Notification.recipient_id, Notification.is_read).filter(
+            *filters
+        ).order_by(Notification.id).limit(batch_size).all()
+        if not rows:
+            return 0
+        
+        ids = [row.id for row in rows]
+        try:
+            if archive:
+                copied = select(
+                    *[getattr(Notification, column) for column in ARCHIVED_COLUMNS], literal(now)
+                ).where(Notification.id.in_(ids))
+                db.session.execute(insert(NotificationArchive).from_select(ARCHIVED_COLUMNS + ('archived_at',), copied))
+            
+            db.session.query(Notification).filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+            
+            unread = Counter(row.recipient_id for row in rows if not row.is_read)
+            CounterService.adjust_unread('notifications', {user_id: -count for user_id, count in unread.items()})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        for user_id in unread:
+            NotificationService.publish_unread_count(user_id)
+        return len(ids)
+    
+    @staticmethod
+    def get_retention_stats() -> Dict[str, Any]:
+        """Sizes of the hot and archive tables and the age of their oldest rows"""
+        hot_count, oldest = db.session.query(func.count(Notification.id), func.min(Notification.created_at)).one()
+        archived_count, last_archived = db.session.query(
+            func.count(NotificationArchive.id), func.max(NotificationArchive.archived_at)
+        ).one()
+        
+        return {
+            'notifications': hot_count,
+            'oldest_notification': oldest.isoformat() if oldest else None,
+            'archived': archived_count,
+            'last_archived_at': last_archived.isoformat() if last_archived else None
+        }
@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
-from sqlalchemy import desc, func
-from app.models import db, User, Enrollment, LessonProgress, QuizAttempt, AssignmentSubmission, Certificate, Assignment
+from sqlalchemy import desc, func, case
+from sqlalchemy.orm import joinedload
+from app.models import db, User, Enrollment, Lesson, LessonProgress, Quiz, QuizAttempt, AssignmentSubmission, Certificate, Assignment
 from app.services.achievement_service import AchievementService
 from app.services.certificate_service import CertificateService
+from app.services.progress_service import ProgressService
 from app.utils.base_controller import ValidationException, PermissionException, NotFoundException
 import io
 class StudentService:
@@ -16,48 +18,35 @@ class StudentService:
         if not user or not user.is_student():
             raise PermissionException("Only students can access dashboard")
         
-        active_enrollments = Enrollment.query.filter_by(
-            student_id=student_id,
-            status='active'
-        ).all()
+        enrollments_query = Enrollment.with_profile(Enrollment.query.filter(
+            Enrollment.student_id == student_id,
+            Enrollment.status.in_(['active', 'completed'])
+        ), 'with_course').order_by(Enrollment.id)
+        enrollments = enrollments_query.all()
         
-        completed_enrollments = Enrollment.query.filter_by(
-            student_id=student_id,
-            status='completed'
-        ).all()
+        active_enrollments = [e for e in enrollments if e.status == 'active']
+        if active_enrollments:
+            ProgressService.refresh_enrollments(active_enrollments)
+            db.session.commit()
+            enrollments = enrollments_query.all()
+        
+        active_enrollments = [e for e in enrollments if e.status == 'active']
+        completed_enrollments = [e for e in enrollments if e.status == 'completed']
         
         total_progress = 0
         if active_enrollments:
-            for enrollment in active_enrollments:
-                current_progress = enrollment.calculate_progress()
-                if enrollment.progress_percentage != current_progress:
-                    enrollment.progress_percentage = current_progress
-                    
-                    if current_progress >= 100:
-                        enrollment.status = 'completed'
-                        enrollment.completed_at = datetime.now()
-            
-            db.session.commit()
-            
-            active_enrollments = Enrollment.query.filter_by(
-                student_id=student_id,
-                status='active'
-            ).all()
-            
-            completed_enrollments = Enrollment.query.filter_by(
-                student_id=student_id,
-                status='completed'
-            ).all()
-            
-            if active_enrollments:
-                total_progress = sum(e.progress_percentage for e in active_enrollments) / len(active_enrollments)
+            total_progress = sum(e.progress_percentage for e in active_enrollments) / len(active_enrollments)
         
         recent_lessons = LessonProgress.query.filter_by(
             student_id=student_id
+        ).options(
+            joinedload(LessonProgress.lesson).joinedload(Lesson.course)
         ).order_by(desc(LessonProgress.viewed_at)).limit(5).all()
         
         recent_quiz_attempts = QuizAttempt.query.filter_by(
             student_id=student_id
+        ).options(
+            joinedload(QuizAttempt.quiz).joinedload(Quiz.course)
         ).order_by(desc(QuizAttempt.started_at)).limit(5).all()
         
         achievements_data = AchievementService.get_student_achievements(student_id)
@@ -105,27 +94,29 @@ class StudentService:
         enrollments = Enrollment.query.filter_by(student_id=student_id).all()
         progress_data = []
         
+        progress_details = ProgressService.compute_progress_details([e.id for e in enrollments])
+        course_ids = [e.course_id for e in enrollments]
+        quiz_progress_by_course = StudentService._get_quiz_progress(student_id, course_ids)
+        assignment_progress_by_course = StudentService._get_assignment_progress(student_id, course_ids)
+        
         for enrollment in enrollments:
             course = enrollment.course
+            details = progress_details.get(enrollment.id)
             
-            current_progress = enrollment.calculate_progress()
+            current_progress = details['percentage'] if details else enrollment.progress_percentage
             if enrollment.progress_percentage != current_progress:
                 enrollment.progress_percentage = current_progress
                 
                 if current_progress >= 100 and enrollment.status != 'completed':
-                    enrollment.status = 'completed'
+                    enrollment.set_status('completed')
                     enrollment.completed_at = datetime.now()
             
-            lesson_progress = StudentService._get_lesson_progress(student_id, course.id)
-            quiz_progress = StudentService._get_quiz_progress(student_id, course)
-            assignment_progress = StudentService._get_assignment_progress(student_id, course)
-            
             progress_data.append({
                 'course': course.to_dict(),
                 'enrollment': enrollment.to_dict(),
-                'lesson_progress': lesson_progress,
-                'quiz_progress': quiz_progress,
-                'assignment_progress': assignment_progress
+                'lesson_progress': StudentService._get_lesson_progress(details),
+                'quiz_progress': quiz_progress_by_course.get(course.id, []),
+                'assignment_progress': assignment_progress_by_course.get(course.id, [])
             })
         
         db.session.commit()
@@ -183,7 +174,7 @@ class StudentService:
         enrollment.progress_percentage = current_progress
         
         if current_progress >= 100 and enrollment.status != 'completed':
-            enrollment.status = 'completed'
+            enrollment.set_status('completed')
             enrollment.completed_at = datetime.now()
             db.session.commit()
         
@@ -308,7 +299,7 @@ class StudentService:
             Enrollment.status.in_(['active', 'completed']),  
             Assignment.due_date <= week_from_now,
             Assignment.due_date >= datetime.now()
-        ).order_by(Assignment.due_date).all()
+        ).options(joinedload(Assignment.course)).order_by(Assignment.due_date).all()
         
         return [
             {
@@ -347,18 +338,10 @@ class StudentService:
         return recent_activity[:10]
     
     @staticmethod
-    def _get_lesson_progress(student_id: int, course_id: int) -> Dict[str, Any]:
-        """Get lesson progress for a course"""
-        from app.models import Course, Lesson
-        course = Course.query.get(course_id)
-        total_lessons = course.lessons.count()
-        
-        completed_lessons = LessonProgress.query.filter_by(
-            student_id=student_id
-        ).join(Lesson).filter(
-            Lesson.course_id == course_id,
-            LessonProgress.completed_at.isnot(None)
-        ).count()
+    def _get_lesson_progress(details: Dict[str, Any]) -> Dict[str, Any]:
+        """Get lesson progress for a course from its progress details"""
+        completed_lessons = details['lessons_completed'] if details else 0
+        total_lessons = details['lessons_total'] if details else 0
         
         return {
             'completed': completed_lessons,
@@ -367,41 +350,57 @@ class StudentService:
         }
     
     @staticmethod
-    def _get_quiz_progress(student_id: int, course) -> List[Dict[str, Any]]:
-        """Get quiz progress for a course"""
-        quiz_progress = []
-        
-        for quiz in course.quizzes.all():
-            best_attempt = QuizAttempt.query.filter_by(
-                student_id=student_id,
-                quiz_id=quiz.id,
-                status='completed'
-            ).order_by(QuizAttempt.score.desc()).first()
-            
-            quiz_progress.append({
+    def _get_quiz_progress(student_id: int, course_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """Get quiz progress for several courses, grouped by course id"""
+        from app.models import Quiz
+        quiz_progress = {course_id: [] for course_id in course_ids}
+        if not course_ids:
+            return quiz_progress
+        
+        quizzes = Quiz.query.filter(Quiz.course_id.in_(course_ids)).order_by(Quiz.id).all()
+        
+        attempt_stats = db.session.query(
+            QuizAttempt.quiz_id,
+            func.max(case((QuizAttempt.status == 'completed', QuizAttempt.score))),
+            func.count(QuizAttempt.id)
+        ).join(Quiz, QuizAttempt.quiz_id == Quiz.id).filter(
+            QuizAttempt.student_id == student_id,
+            Quiz.course_id.in_(course_ids)
+        ).group_by(QuizAttempt.quiz_id).all()
+        stats_by_quiz = {quiz_id: (best_score, attempts) for quiz_id, best_score, attempts in attempt_stats}
+        
+        for quiz in quizzes:
+            best_score, attempts = stats_by_quiz.get(quiz.id, (None, 0))
+            quiz_progress[quiz.course_id].append({
                 'quiz_id': quiz.id,
                 'quiz_title': quiz.title,
-                'best_score': best_attempt.score if best_attempt else None,
-                'passed': best_attempt.score >= quiz.passing_score if best_attempt else False,
-                'attempts': QuizAttempt.query.filter_by(
-                    student_id=student_id, quiz_id=quiz.id
-                ).count()
+                'best_score': best_score,
+                'passed': best_score >= quiz.passing_score if best_score is not None else False,
+                'attempts': attempts
             })
         
         return quiz_progress
     
     @staticmethod
-    def _get_assignment_progress(student_id: int, course) -> List[Dict[str, Any]]:
-        """Get assignment progress for a course"""
-        assignment_progress = []
-        
-        for assignment in course.assignments.all():
-            submission = AssignmentSubmission.query.filter_by(
-                student_id=student_id,
-                assignment_id=assignment.id
-            ).first()
-            
-            assignment_progress.append({
+    def _get_assignment_progress(student_id: int, course_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """Get assignment progress for several courses, grouped by course id"""
+        assignment_progress = {course_id: [] for course_id in course_ids}
+        if not course_ids:
+            return assignment_progress
+        
+        assignments = Assignment.query.filter(Assignment.course_id.in_(course_ids)).order_by(Assignment.id).all()
+        
+        submissions = AssignmentSubmission.query.join(
+            Assignment, AssignmentSubmission.assignment_id == Assignment.id
+        ).filter(
+            AssignmentSubmission.student_id == student_id,
+            Assignment.course_id.in_(course_ids)
+        ).all()
+        submissions_by_assignment = {s.assignment_id: s for s in submissions}
+        
+        for assignment in assignments:
+            submission = submissions_by_assignment.get(assignment.id)
+            assignment_progress[assignment.course_id].append({
                 'assignment_id': assignment.id,
                 'assignment_title': assignment.title,
                 'submitted': submission is not None,
@@ -511,89 +510,3 @@ class StudentService:
         buffer.write(pdf_content)
         buffer.seek(0)
         return buffer
-    
-    @staticmethod
-    def get_dashboard(student_id: int) -> Dict[str, Any]:
-        """Get student dashboard data"""
-        user = User.query.get(student_id)
-        if not user or not user.is_student():
-            raise PermissionException("Only students can access dashboard")
-        
-        active_enrollments = Enrollment.query.filter_by(
-            student_id=student_id,
-            status='active'
-        ).all()
-        
-        completed_enrollments = Enrollment.query.filter_by(
-            student_id=student_id,
-            status='completed'
-        ).all()
-        
-        total_progress = 0
-        if active_enrollments:
-            for enrollment in active_enrollments:
-                current_progress = enrollment.calculate_progress()
-                if enrollment.progress_percentage != current_progress:
-                    enrollment.progress_percentage = current_progress
-                    
-                    if current_progress >= 100:
-                        enrollment.status = 'completed'
-                        enrollment.completed_at = datetime.now()
-            
-            db.session.commit()
-            
-            active_enrollments = Enrollment.query.filter_by(
-                student_id=student_id,
-                status='active'
-            ).all()
-            
-            completed_enrollments = Enrollment.query.filter_by(
-                student_id=student_id,
-                status='completed'
-            ).all()
-            
-            if active_enrollments:
-                total_progress = sum(e.progress_percentage for e in active_enrollments) / len(active_enrollments)
-        
-        recent_lessons = LessonProgress.query.filter_by(
-            student_id=student_id
-        ).order_by(desc(LessonProgress.viewed_at)).limit(5).all()
-        
-        recent_quiz_attempts = QuizAttempt.query.filter_by(
-            student_id=student_id
-        ).order_by(desc(QuizAttempt.started_at)).limit(5).all()
-        
-        achievements_data = AchievementService.get_student_achievements(student_id)
-        
-        upcoming_assignments = StudentService._get_upcoming_assignments(student_id)
-        
-        recent_activity = StudentService._format_recent_activity(recent_lessons, recent_quiz_attempts)
-        
-        all_courses = active_enrollments + completed_enrollments
-        active_courses_data = []
-        
-        for enrollment in all_courses:
-            course_data = {
-                'id': enrollment.course.id,
-                'title': enrollment.course.title,
-                'progress': enrollment.progress_percentage,
-                'teacher': enrollment.course.teacher.full_name if enrollment.course.teacher else 'Unknown',
-                'enrolled_at': enrollment.enrolled_at.isoformat() if enrollment.enrolled_at else None,
-                'status': enrollment.status,
-                'completed_at': enrollment.completed_at.isoformat() if enrollment.completed_at else None
-            }
-            active_courses_data.append(course_data)
-        
-        return {
-            'stats': {
-                'active_courses': len(active_enrollments),
-                'completed_courses': len(completed_enrollments),
-                'overall_progress': round(total_progress, 1),
-                'total_achievements': achievements_data['total_achievements'],
-                'achievement_points': achievements_data['total_points']
-            },
-            'active_courses': active_courses_data, 
-            'recent_activity': recent_activity,
-            'upcoming_assignments': upcoming_assignments,
-            'achievements': achievements_data['achievements'][:5]
-        }
\ No newline at end of file
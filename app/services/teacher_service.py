@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
-from typing import Dict, Any
-from sqlalchemy import desc, func
+from typing import Dict, Any, List
+from sqlalchemy import desc, func, case
+from sqlalchemy.orm import joinedload
 from app.models import AnswerOption, Question, StudentAnswer, db, User, Course, Enrollment, Lesson, Quiz, Assignment, QuizAttempt, AssignmentSubmission, LessonProgress
 from app.utils.base_controller import PermissionException, NotFoundException
-from app.utils.helpers import calculate_course_statistics
+from app.utils.helpers import calculate_course_statistics, calculate_course_statistics_many
+from app.utils.item_analysis import analyze_items
+from app.services.progress_service import ProgressService
 from collections import defaultdict
 import io
 import csv
@@ -19,34 +22,54 @@ class TeacherService:
             raise PermissionException("Only teachers can access this dashboard")
         
         courses = user.taught_courses.all()
+        course_ids = [course.id for course in courses]
         
         total_courses = len(courses)
         published_courses = len([c for c in courses if c.is_published])
         
+        week_ago = datetime.now() - timedelta(days=7)
         total_students = 0
         active_students = 0
-        for course in courses:
-            enrollments = course.enrollments.all()
-            total_students += len(enrollments)
-            active_students += len([e for e in enrollments if e.status == 'active'])
-        
-        week_ago = datetime.now() - timedelta(days=7)
         recent_enrollments = 0
         recent_submissions = 0
-        
-        for course in courses:
-            recent_enrollments += course.enrollments.filter(
-                Enrollment.enrolled_at >= week_ago
+        recent_attempts = []
+        
+        if course_ids:
+            total_students, active_students, recent_enrollments = db.session.query(
+                func.count(Enrollment.id),
+                func.sum(case((Enrollment.status == 'active', 1), else_=0)),
+                func.sum(case((Enrollment.enrolled_at >= week_ago, 1), else_=0))
+            ).filter(Enrollment.course_id.in_(course_ids)).one()
+            
+            recent_submissions = AssignmentSubmission.query.join(Assignment).filter(
+                Assignment.course_id.in_(course_ids),
+                AssignmentSubmission.submitted_at >= week_ago
             ).count()
             
-            for assignment in course.assignments:
-                recent_submissions += assignment.submissions.filter(
-                    AssignmentSubmission.submitted_at >= week_ago
-                ).count()
+            # Rank the week's attempts per quiz in the database so only the
+            # newest five of each quiz are candidates for the ten shown
+            ranked = db.session.query(
+                QuizAttempt.id.label('attempt_id'),
+                func.row_number().over(
+                    partition_by=QuizAttempt.quiz_id,
+                    order_by=(desc(QuizAttempt.submitted_at), desc(QuizAttempt.id))
+                ).label('rank')
+            ).join(Quiz).filter(
+                Quiz.course_id.in_(course_ids),
+                QuizAttempt.submitted_at >= week_ago
+            ).subquery()
+            
+            recent_attempts = QuizAttempt.query.join(
+                ranked, QuizAttempt.id == ranked.c.attempt_id
+            ).filter(ranked.c.rank <= 5).options(
+                joinedload(QuizAttempt.student),
+                joinedload(QuizAttempt.quiz).joinedload(Quiz.course)
+            ).order_by(desc(QuizAttempt.submitted_at), desc(QuizAttempt.id)).limit(10).all()
         
         course_performance = []
+        top_statistics = calculate_course_statistics_many(courses[:5])
         for course in courses[:5]:  
-            stats = calculate_course_statistics(course)
+            stats = top_statistics[course.id]
             course_performance.append({
                 'id': course.id,
                 'title': course.title,
@@ -57,31 +80,23 @@ class TeacherService:
             })
         
         recent_quiz_attempts = []
-        for course in courses:
-            for quiz in course.quizzes:
-                attempts = quiz.attempts.filter(
-                    QuizAttempt.submitted_at >= week_ago
-                ).order_by(desc(QuizAttempt.submitted_at)).limit(5).all()
-                
-                for attempt in attempts:
-                    recent_quiz_attempts.append({
-                        'student_name': attempt.student.full_name,
-                        'quiz_title': quiz.title,
-                        'course_title': course.title,
-                        'score': attempt.score,
-                        'submitted_at': attempt.submitted_at.isoformat() if attempt.submitted_at else None
-                    })
-        
-        recent_quiz_attempts.sort(key=lambda x: x['submitted_at'], reverse=True)
-        recent_quiz_attempts = recent_quiz_attempts[:10]
+        for attempt in recent_attempts:
+            recent_quiz_attempts.append({
+                'student_name': attempt.student.full_name,
+                'quiz_title': attempt.quiz.title,
+                'course_title': attempt.quiz.course.title,
+                'score': attempt.score,
+                'submitted_at': attempt.submitted_at.isoformat() if attempt.submitted_at else None
+            })
+
         
         return {
             'stats': {
                 'total_courses': total_courses,
                 'published_courses': published_courses,
                 'total_students': total_students,
-                'active_students': active_students,
-                'recent_enrollments': recent_enrollments,
+                'active_students': int(active_students or 0),
+                'recent_enrollments': int(recent_enrollments or 0),
                 'recent_submissions': recent_submissions
             },
             'top_courses': course_performance,
@@ -103,10 +118,11 @@ class TeacherService:
             error_out=False
         )
         
+        statistics = calculate_course_statistics_many(pagination.items)
         courses = []
         for course in pagination.items:
             course_data = course.to_dict()
-            course_data['statistics'] = calculate_course_statistics(course)
+            course_data['statistics'] = statistics[course.id]
             courses.append(course_data)
         
         return {
@@ -143,14 +159,17 @@ class TeacherService:
         assignments = course.assignments.all()
         course_data['assignments'] = [assignment.to_dict() for assignment in assignments]
         
-        enrollments = course.enrollments.filter_by(status='active').all()
+        enrollments = Enrollment.with_profile(
+            course.enrollments.filter_by(status='active'), 'with_student'
+        ).all()
+        progress = TeacherService._calculate_student_progress_for_students(
+            [enrollment.student_id for enrollment in enrollments], course
+        )
         students = []
         for enrollment in enrollments:
             student_data = enrollment.student.to_dict()
             student_data['enrollment'] = enrollment.to_dict()
-            student_data['progress'] = TeacherService._calculate_student_progress(
-                enrollment.student_id, course_id
-            )
+            student_data['progress'] = progress[enrollment.student_id]
             students.append(student_data)
         
         course_data['students'] = students
@@ -164,19 +183,8 @@ class TeacherService:
         if not user or not user.is_teacher():
             raise PermissionException("Only teachers can access submissions")
         
-        courses = user.taught_courses.all()
-        
-        pending_submissions = []
-        for course in courses:
-            for assignment in course.assignments:
-                submissions = assignment.submissions.filter_by(status='submitted').all()
-                
-                for submission in submissions:
-                    submission_data = submission.to_dict()
-                    submission_data['student'] = submission.student.to_dict()
-                    submission_data['assignment'] = assignment.to_dict()
-                    submission_data['course'] = course.to_dict()
-                    pending_submissions.append(submission_data)
+        submissions = TeacherService._get_course_submissions(teacher_id, status='submitted')
+        pending_submissions = [TeacherService._serialize_submission(submission) for submission in submissions]
         
         pending_submissions.sort(key=lambda x: x['submitted_at'], reverse=True)
         
@@ -185,6 +193,32 @@ class TeacherService:
             'total': len(pending_submissions)
         }
     
+    @staticmethod
+    def _get_course_submissions(teacher_id: int, status: str = None) -> List[AssignmentSubmission]:
+        """Get the submissions for all assignments of a teacher's courses with their student, assignment and course loaded"""
+        assignment_ids = db.session.query(Assignment.id).join(Course).filter(Course.teacher_id == teacher_id)
+        query = AssignmentSubmission.query.filter(
+            AssignmentSubmission.assignment_id.in_(assignment_ids)
+        ).options(
+            joinedload(AssignmentSubmission.student),
+            joinedload(AssignmentSubmission.assignment).joinedload(Assignment.course).joinedload(Course.teacher)
+        )
+        
+        if status:
+            query = query.filter(AssignmentSubmission.status == status)
+        
+        submissions = query.all()
+        submissions.sort(key=lambda s: (s.assignment.course_id, s.assignment_id, s.id))
+        return submissions
+    
+    @staticmethod
+    def _serialize_submission(submission: AssignmentSubmission) -> Dict[str, Any]:
+        submission_data = submission.to_dict()
+        submission_data['student'] = submission.student.to_dict()
+        submission_data['assignment'] = submission.assignment.to_dict()
+        submission_data['course'] = submission.assignment.course.to_dict()
+        return submission_data
+    
     @staticmethod
     def get_quiz_analytics(teacher_id: int, quiz_id: int) -> Dict[str, Any]:
         """Get detailed quiz analytics with REAL student performance data"""
@@ -203,7 +237,7 @@ class TeacherService:
             QuizAttempt.quiz_id == quiz_id,
             QuizAttempt.status == 'completed',
             QuizAttempt.score.isnot(None)
-        ).join(User, QuizAttempt.student_id == User.id).all()
+        ).join(User, QuizAttempt.student_id == User.id).options(joinedload(QuizAttempt.student)).all()
         
         student_best_attempts = {}
         for attempt in best_attempts:
@@ -233,14 +267,25 @@ class TeacherService:
         
         question_analytics = []
         questions = quiz.questions.order_by(Question.order_number).all()
+        questions_by_id = {question.id: question for question in questions}
+        
+        answers_by_attempt = defaultdict(list)
+        if best_attempts:
+            for answer in StudentAnswer.query.filter(
+                StudentAnswer.attempt_id.in_([attempt.id for attempt in best_attempts])
+            ).order_by(StudentAnswer.id).all():
+                answers_by_attempt[answer.attempt_id].append(answer)
+        
+        option_texts = {}
+        if questions_by_id:
+            option_texts = dict(db.session.query(AnswerOption.id, AnswerOption.option_text).filter(
+                AnswerOption.question_id.in_(list(questions_by_id))
+            ).all())
         
         for question in questions:
             student_answers = []
             for attempt in best_attempts:
-                answer = db.session.query(StudentAnswer).filter(
-                    StudentAnswer.attempt_id == attempt.id,
-                    StudentAnswer.question_id == question.id
-                ).first()
+                answer = next((a for a in answers_by_attempt[attempt.id] if a.question_id == question.id), None)
                 if answer:
                     student_answers.append(answer)
             
@@ -251,9 +296,8 @@ class TeacherService:
             if question.question_type in ['multiple_choice', 'true_false']:
                 for answer in student_answers:
                     if answer.selected_option_id:
-                        option = AnswerOption.query.get(answer.selected_option_id)
-                        if option:
-                            key = option.option_text
+                        key = option_texts.get(answer.selected_option_id)
+                        if key is not None:
                             answer_distribution[key] = answer_distribution.get(key, 0) + 1
             elif question.question_type == 'short_answer':
                 for answer in student_answers:
@@ -277,13 +321,14 @@ class TeacherService:
         
         student_performance = []
         for attempt in best_attempts:
-            answers = db.session.query(StudentAnswer).filter(
-                StudentAnswer.attempt_id == attempt.id
-            ).join(Question).order_by(Question.order_number).all()
+            answers = sorted(
+                (a for a in answers_by_attempt[attempt.id] if a.question_id in questions_by_id),
+                key=lambda a: questions_by_id[a.question_id].order_number
+            )
             
             question_breakdown = []
             for answer in answers:
-                question = answer.question
+                question = questions_by_id[answer.question_id]
                 breakdown_item = {
                     'question_id': question.id,
                     'question_text': question.question_text[:100] + "..." if len(question.question_text) > 100 else question.question_text,
@@ -297,9 +342,8 @@ class TeacherService:
                 if question.question_type == 'short_answer':
                     breakdown_item['student_answer'] = answer.answer_text
                 elif answer.selected_option_id:
-                    option = AnswerOption.query.get(answer.selected_option_id)
-                    if option:
-                        breakdown_item['student_answer'] = option.option_text
+                    if answer.selected_option_id in option_texts:
+                        breakdown_item['student_answer'] = option_texts[answer.selected_option_id]
                 
                 question_breakdown.append(breakdown_item)
             
@@ -332,6 +376,94 @@ class TeacherService:
             'total_students': len(student_performance)
     }
     
+    @staticmethod
+    def get_quiz_item_analysis(teacher_id: int, quiz_id: int) -> Dict[str, Any]:
+        """Get the psychometric item analysis of a quiz.
+        
+        Like ``get_quiz_analytics`` it looks at each student's best completed
+        attempt (the earliest on ties), picked by a window function. The answers
+        of those attempts are loaded with one query and handed to
+        ``analyze_items`` for difficulty, point-biserial discrimination,
+        distractor statistics and Cronbach's alpha.
+        """
+        user = User.query.get(teacher_id)
+        if not user or not user.is_teacher():
+            raise PermissionException("Only teachers can access quiz analytics")
+        
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            raise NotFoundException("Quiz not found")
+        
+        if quiz.course.teacher_id != teacher_id:
+            raise PermissionException("Access denied to this quiz")
+        
+        ranked = db.session.query(
+            QuizAttempt.id.label('attempt_id'),
+            func.row_number().over(
+                partition_by=QuizAttempt.student_id,
+                order_by=(QuizAttempt.score.desc(), QuizAttempt.id)
+            ).label('rank')
+        ).filter(
+            QuizAttempt.quiz_id == quiz_id,
+            QuizAttempt.status == 'completed',
+            QuizAttempt.score.isnot(None)
+        ).subquery()
+        best_attempts = db.session.query(ranked.c.attempt_id).filter(ranked.c.rank == 1).subquery()
+        
+        answers = db.session.query(
+            StudentAnswer.attempt_id, StudentAnswer.question_id,
+            StudentAnswer.points_earned, StudentAnswer.selected_option_id
+        ).join(best_attempts, best_attempts.c.attempt_id == StudentAnswer.attempt_id).all()
+        attempt_ids = [attempt_id for attempt_id, in db.session.query(best_attempts.c.attempt_id)]
+        
+        questions = db.session.query(
+            Question.id, Question.question_text, Question.question_type, Question.points, Question.order_number
+        ).filter(Question.quiz_id == quiz_id).order_by(Question.order_number, Question.id).all()
+        
+        options_by_question = defaultdict(list)
+        if questions:
+            for option in AnswerOption.query.filter(
+                AnswerOption.question_id.in_([question.id for question in questions])
+            ).order_by(AnswerOption.id).all():
+                options_by_question[option.question_id].append(option)
+        
+        analysis = analyze_items(
+            attempt_ids,
+            [(question.id, question.points) for question in questions],
+            answers,
+            [(option.id, option.question_id) for options in options_by_question.values() for option in options]
+        )
+        
+        items = []
+        for question in questions:
+            item = {
+                'question': {
+                    'id': question.id,
+                    'question_text': question.question_text,
+                    'question_type': question.question_type,
+                    'points': question.points,
+                    'order_number': question.order_number
+                },
+                **analysis['items'][question.id]
+            }
+            if question.question_type in ['multiple_choice', 'true_false']:
+                item['options'] = [
+                    {
+                        'id': option.id,
+                        'option_text': option.option_text,
+                        'is_correct': option.is_correct,
+                        **analysis['options'][option.id]
+                    }
+                    for option in options_by_question[question.id]
+                ]
+            items.append(item)
+        
+        return {
+            'quiz': quiz.to_dict(),
+            'summary': analysis['summary'],
+            'items': items
+        }
+    
     @staticmethod
     def get_individual_student_progress(teacher_id: int, student_id: int, course_id: int) -> Dict[str, Any]:
         """Get REAL detailed progress for individual student"""
@@ -374,146 +506,188 @@ class TeacherService:
     def _calculate_detailed_student_progress(student_id: int, course_id: int) -> Dict[str, Any]:
         """Calculate REAL comprehensive student progress with actual database data"""
         course = Course.query.get(course_id)
+        return TeacherService._calculate_detailed_progress_for_students([student_id], course)[student_id]
+    
+    @staticmethod
+    def _calculate_detailed_progress_for_students(student_ids: List[int], course: Course) -> Dict[int, Dict[str, Any]]:
+        """Calculate comprehensive progress for several students of a course with a fixed number of queries"""
+        lessons = course.lessons.order_by(Lesson.order_number).all()
+        quizzes = course.quizzes.all()
+        assignments = course.assignments.all()
+        total_lessons = len(lessons)
+        
+        lesson_records = defaultdict(list)
+        attempts_by_student_quiz = defaultdict(list)
+        submissions_by_student = defaultdict(dict)
+        
+        if student_ids:
+            for lp in db.session.query(LessonProgress).join(Lesson).filter(
+                LessonProgress.student_id.in_(student_ids),
+                Lesson.course_id == course.id
+            ).all():
+                lesson_records[lp.student_id].append(lp)
+            
+            for attempt in QuizAttempt.query.join(Quiz).filter(
+                QuizAttempt.student_id.in_(student_ids),
+                Quiz.course_id == course.id
+            ).order_by(QuizAttempt.attempt_number).all():
+                attempts_by_student_quiz[(attempt.student_id, attempt.quiz_id)].append(attempt)
+            
+            for submission in AssignmentSubmission.query.join(Assignment).filter(
+                AssignmentSubmission.student_id.in_(student_ids),
+                Assignment.course_id == course.id
+            ).all():
+                submissions_by_student[submission.student_id][submission.assignment_id] = submission
         
-        total_lessons = course.lessons.count()
-        lesson_progress_records = db.session.query(LessonProgress).filter(
-            LessonProgress.student_id == student_id
-        ).join(Lesson).filter(
-            Lesson.course_id == course_id
-        ).all()
-        
-        completed_lessons = len([lp for lp in lesson_progress_records if lp.completed_at is not None])
-        viewed_lessons = len(lesson_progress_records)
-        total_lesson_time = sum([lp.time_spent_minutes or 0 for lp in lesson_progress_records])
-        
-        detailed_lessons = []
-        for lesson in course.lessons.order_by(Lesson.order_number).all():
-            progress_record = next((lp for lp in lesson_progress_records if lp.lesson_id == lesson.id), None)
-            detailed_lessons.append({
-                'lesson': lesson.to_dict(),
-                'viewed': progress_record is not None,
-                'completed': progress_record.completed_at is not None if progress_record else False,
-                'time_spent': progress_record.time_spent_minutes or 0 if progress_record else 0,
-                'last_viewed': progress_record.viewed_at.isoformat() if progress_record and progress_record.viewed_at else None
-            })
+        lesson_dicts = [lesson.to_dict() for lesson in lessons]
+        results = {}
         
-        quiz_progress = []
-        quiz_summary = {'total': 0, 'attempted': 0, 'passed': 0, 'average_score': 0}
-        
-        for quiz in course.quizzes.all():
-            attempts = QuizAttempt.query.filter_by(
-                student_id=student_id,
-                quiz_id=quiz.id
-            ).order_by(QuizAttempt.attempt_number).all()
-            
-            best_attempt = None
-            if attempts:
-                completed_attempts = [a for a in attempts if a.status == 'completed' and a.score is not None]
-                if completed_attempts:
-                    best_attempt = max(completed_attempts, key=lambda a: a.score)
-            
-            quiz_data = {
-                'quiz_id': quiz.id,
-                'quiz_title': quiz.title,
-                'total_points': quiz.total_points,
-                'passing_score': quiz.passing_score,
-                'attempts': len(attempts),
-                'max_attempts': quiz.max_attempts,
-                'best_score': best_attempt.score if best_attempt else None,
-                'passed': best_attempt.score >= quiz.passing_score if best_attempt else False,
-                'last_attempt_date': best_attempt.submitted_at.isoformat() if best_attempt and best_attempt.submitted_at else None,
-                'details': [{
-                    'attempt_number': a.attempt_number,
-                    'score': a.score,
-                    'status': a.status,
-                    'submitted_at': a.submitted_at.isoformat() if a.submitted_at else None,
-                    'time_spent': a.time_spent_minutes
-                } for a in attempts]
-            }
+        for student_id in student_ids:
+            lesson_progress_records = lesson_records[student_id]
             
-            quiz_progress.append(quiz_data)
-            quiz_summary['total'] += 1
-            if attempts:
-                quiz_summary['attempted'] += 1
-                if quiz_data['passed']:
-                    quiz_summary['passed'] += 1
-        
-        all_scores = [qp['best_score'] for qp in quiz_progress if qp['best_score'] is not None]
-        quiz_summary['average_score'] = sum(all_scores) / len(all_scores) if all_scores else 0
-        
-        assignment_progress = []
-        assignment_summary = {'total': 0, 'submitted': 0, 'graded': 0, 'average_score': 0}
-        
-        for assignment in course.assignments.all():
-            submission = AssignmentSubmission.query.filter_by(
-                student_id=student_id,
-                assignment_id=assignment.id
-            ).first()
-            
-            assignment_data = {
-                'assignment_id': assignment.id,
-                'assignment_title': assignment.title,
-                'total_points': assignment.total_points,
-                'due_date': assignment.due_date.isoformat() if assignment.due_date else None,
-                'submitted': submission is not None,
-                'submission_date': submission.submitted_at.isoformat() if submission and submission.submitted_at else None,
-                'grade': submission.grade if submission else None,
-                'status': submission.status if submission else 'not_submitted',
-                'feedback': submission.feedback if submission else None,
-                'graded_at': submission.graded_at.isoformat() if submission and submission.graded_at else None,
-                'percentage': (submission.grade / assignment.total_points * 100) if submission and submission.grade is not None else None
-            }
+            completed_lessons = len([lp for lp in lesson_progress_records if lp.completed_at is not None])
+            viewed_lessons = len(lesson_progress_records)
+            total_lesson_time = sum([lp.time_spent_minutes or 0 for lp in lesson_progress_records])
             
-            assignment_progress.append(assignment_data)
-            assignment_summary['total'] += 1
-            if submission:
-                assignment_summary['submitted'] += 1
-                if submission.status == 'graded' and submission.grade is not None:
-                    assignment_summary['graded'] += 1
-        
-        graded_assignments = [ap for ap in assignment_progress if ap['grade'] is not None]
-        if graded_assignments:
-            assignment_summary['average_score'] = sum([ap['percentage'] for ap in graded_assignments]) / len(graded_assignments)
+            records_by_lesson = {lp.lesson_id: lp for lp in lesson_progress_records}
+            detailed_lessons = []
+            for lesson, lesson_dict in zip(lessons, lesson_dicts):
+                progress_record = records_by_lesson.get(lesson.id)
+                detailed_lessons.append({
+                    'lesson': lesson_dict,
+                    'viewed': progress_record is not None,
+                    'completed': progress_record.completed_at is not None if progress_record else False,
+                    'time_spent': progress_record.time_spent_minutes or 0 if progress_record else 0,
+                    'last_viewed': progress_record.viewed_at.isoformat() if progress_record and progress_record.viewed_at else None
+                })
+            
+            quiz_progress = []
+            quiz_summary = {'total': 0, 'attempted': 0, 'passed': 0, 'average_score': 0}
+            
+            for quiz in quizzes:
+                attempts = attempts_by_student_quiz.get((student_id, quiz.id), [])
+                
+                best_attempt = None
+                if attempts:
+                    completed_attempts = [a for a in attempts if a.status == 'completed' and a.score is not None]
+                    if completed_attempts:
+                        best_attempt = max(completed_attempts, key=lambda a: a.score)
+                
+                quiz_data = {
+                    'quiz_id': quiz.id,
+                    'quiz_title': quiz.title,
+                    'total_points': quiz.total_points,
+                    'passing_score': quiz.passing_score,
+                    'attempts': len(attempts),
+                    'max_attempts': quiz.max_attempts,
+                    'best_score': best_attempt.score if best_attempt else None,
+                    'passed': best_attempt.score >= quiz.passing_score if best_attempt else False,
+                    'last_attempt_date': best_attempt.submitted_at.isoformat() if best_attempt and best_attempt.submitted_at else None,
+                    'details': [{
+                        'attempt_number': a.attempt_number,
+                        'score': a.score,
+                        'status': a.status,
+                        'submitted_at': a.submitted_at.isoformat() if a.submitted_at else None,
+                        'time_spent': a.time_spent_minutes
+                    } for a in attempts]
+                }
+                
+                quiz_progress.append(quiz_data)
+                quiz_summary['total'] += 1
+                if attempts:
+                    quiz_summary['attempted'] += 1
+                    if quiz_data['passed']:
+                        quiz_summary['passed'] += 1
+            
+            all_scores = [qp['best_score'] for qp in quiz_progress if qp['best_score'] is not None]
+            quiz_summary['average_score'] = sum(all_scores) / len(all_scores) if all_scores else 0
+            
+            assignment_progress = []
+            assignment_summary = {'total': 0, 'submitted': 0, 'graded': 0, 'average_score': 0}
+            
+            for assignment in assignments:
+                submission = submissions_by_student[student_id].get(assignment.id)
+                
+                assignment_data = {
+                    'assignment_id': assignment.id,
+                    'assignment_title': assignment.title,
+                    'total_points': assignment.total_points,
+                    'due_date': assignment.due_date.isoformat() if assignment.due_date else None,
+                    'submitted': submission is not None,
+                    'submission_date': submission.submitted_at.isoformat() if submission and submission.submitted_at else None,
+                    'grade': submission.grade if submission else None,
+                    'status': submission.status if submission else 'not_submitted',
+                    'feedback': submission.feedback if submission else None,
+                    'graded_at': submission.graded_at.isoformat() if submission and submission.graded_at else None,
+                    'percentage': (submission.grade / assignment.total_points * 100) if submission and submission.grade is not None else None
+                }
+                
+                assignment_progress.append(assignment_data)
+                assignment_summary['total'] += 1
+                if submission:
+                    assignment_summary['submitted'] += 1
+                    if submission.status == 'graded' and submission.grade is not None:
+                        assignment_summary['graded'] += 1
+            
+            graded_assignments = [ap for ap in assignment_progress if ap['grade'] is not None]
+            if graded_assignments:
+                assignment_summary['average_score'] = sum([ap['percentage'] for ap in graded_assignments]) / len(graded_assignments)
+            
+            results[student_id] = {
+                'lessons': {
+                    'completed': completed_lessons,
+                    'total': total_lessons,
+                    'viewed': viewed_lessons,
+                    'percentage': (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
+                },
+                'quizzes': quiz_summary,
+                'assignments': assignment_summary,
+                'detailed_lessons': detailed_lessons,
+                'detailed_quizzes': quiz_progress,
+                'detailed_assignments': assignment_progress,
+                'total_time_spent': total_lesson_time
+            }
         
-        return {
-            'lessons': {
-                'completed': completed_lessons,
-                'total': total_lessons,
-                'viewed': viewed_lessons,
-                'percentage': (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
-            },
-            'quizzes': quiz_summary,
-            'assignments': assignment_summary,
-            'detailed_lessons': detailed_lessons,
-            'detailed_quizzes': quiz_progress,
-            'detailed_assignments': assignment_progress,
-            'total_time_spent': total_lesson_time
-        }
+        return results
     
     @staticmethod
     def _get_last_activity(student_id: int, course_id: int) -> datetime:
         """Get the most recent activity timestamp for a student in a course"""
-        activities = []
-        
-        latest_lesson = db.session.query(func.max(LessonProgress.viewed_at)).filter(
-            LessonProgress.student_id == student_id
-        ).join(Lesson).filter(Lesson.course_id == course_id).scalar()
-        if latest_lesson:
-            activities.append(latest_lesson)
-        
-        latest_quiz = db.session.query(func.max(QuizAttempt.submitted_at)).filter(
-            QuizAttempt.student_id == student_id
-        ).join(Quiz).filter(Quiz.course_id == course_id).scalar()
-        if latest_quiz:
-            activities.append(latest_quiz)
-        
-        latest_assignment = db.session.query(func.max(AssignmentSubmission.submitted_at)).filter(
-            AssignmentSubmission.student_id == student_id
-        ).join(Assignment).filter(Assignment.course_id == course_id).scalar()
-        if latest_assignment:
-            activities.append(latest_assignment)
-        
-        return max(activities) if activities else None
+        return TeacherService._get_last_activities([student_id], course_id).get(student_id)
+    
+    @staticmethod
+    def _get_last_activities(student_ids: List[int], course_id: int) -> Dict[int, datetime]:
+        """Get the most recent activity timestamp for several students in a course"""
+        activities = defaultdict(list)
+        if not student_ids:
+            return {}
+        
+        latest_lessons = db.session.query(
+            LessonProgress.student_id, func.max(LessonProgress.viewed_at)
+        ).join(Lesson).filter(
+            LessonProgress.student_id.in_(student_ids),
+            Lesson.course_id == course_id
+        ).group_by(LessonProgress.student_id).all()
+        
+        latest_quizzes = db.session.query(
+            QuizAttempt.student_id, func.max(QuizAttempt.submitted_at)
+        ).join(Quiz).filter(
+            QuizAttempt.student_id.in_(student_ids),
+            Quiz.course_id == course_id
+        ).group_by(QuizAttempt.student_id).all()
+        
+        latest_assignments = db.session.query(
+            AssignmentSubmission.student_id, func.max(AssignmentSubmission.submitted_at)
+        ).join(Assignment).filter(
+            AssignmentSubmission.student_id.in_(student_ids),
+            Assignment.course_id == course_id
+        ).group_by(AssignmentSubmission.student_id).all()
+        
+        for student_id, latest in latest_lessons + latest_quizzes + latest_assignments:
+            if latest:
+                activities[student_id].append(latest)
+        
+        return {student_id: max(timestamps) for student_id, timestamps in activities.items()}
     
     @staticmethod
     def get_student_progress_report(teacher_id: int, course_id: int) -> Dict[str, Any]:
@@ -534,29 +708,35 @@ class TeacherService:
         ).all()
         
         student_reports = []
+        enrollment_ids = [e.id for e in enrollments]
+        progress_map = ProgressService.compute_progress(enrollment_ids)
         for enrollment in enrollments:
-            student = enrollment.student
-            
-            progress = TeacherService._calculate_detailed_student_progress(student.id, course_id)
-            
-            current_progress = enrollment.calculate_progress()
+            current_progress = progress_map.get(enrollment.id, enrollment.progress_percentage)
             if abs(enrollment.progress_percentage - current_progress) > 0.1:
                 enrollment.progress_percentage = current_progress
                 if current_progress >= 100 and enrollment.status == 'active':
-                    enrollment.status = 'completed'
+                    enrollment.set_status('completed')
                     enrollment.completed_at = datetime.now()
         
         db.session.commit()
         
+        if enrollment_ids:
+            # Reload the enrollments expired by the commit in one query
+            enrollments = Enrollment.query.filter(Enrollment.id.in_(enrollment_ids)).order_by(Enrollment.id).all()
+        
+        student_ids = [enrollment.student_id for enrollment in enrollments]
+        detailed_progress = TeacherService._calculate_detailed_progress_for_students(student_ids, course)
+        last_activities = TeacherService._get_last_activities(student_ids, course_id)
+        students = {s.id: s for s in User.query.filter(User.id.in_(student_ids)).all()} if student_ids else {}
+        
         for enrollment in enrollments:
-            student = enrollment.student
-            progress = TeacherService._calculate_detailed_student_progress(student.id, course_id)
-            last_activity = TeacherService._get_last_activity(student.id, course_id)
+            student = students[enrollment.student_id]
+            last_activity = last_activities.get(student.id)
             
             student_reports.append({
                 'student': student.to_dict(),
                 'enrollment': enrollment.to_dict(),
-                'progress': progress,
+                'progress': detailed_progress[student.id],
                 'last_activity': last_activity.isoformat() if last_activity else None,
                 'overall_progress': enrollment.progress_percentage
             })
@@ -591,22 +771,38 @@ class TeacherService:
         thirty_days_ago = datetime.now() - timedelta(days=30)
         enrollment_data = []
         
+        daily_enrollments = {
+            str(day): count for day, count in db.session.query(
+                func.date(Enrollment.enrolled_at), func.count(Enrollment.id)
+            ).filter(
+                Enrollment.course_id == course_id,
+                Enrollment.enrolled_at >= datetime.combine(thirty_days_ago.date(), datetime.min.time())
+            ).group_by(func.date(Enrollment.enrolled_at)).all()
+        }
+        
         for i in range(30):
             date = thirty_days_ago + timedelta(days=i)
-            count = course.enrollments.filter(
-                func.date(Enrollment.enrolled_at) == date.date()
-            ).count()
             enrollment_data.append({
                 'date': date.strftime('%Y-%m-%d'),
-                'enrollments': count
+                'enrollments': daily_enrollments.get(date.strftime('%Y-%m-%d'), 0)
             })
         
+        lessons = course.lessons.all()
+        lesson_counts = {}
+        if lessons:
+            lesson_counts = {
+                lesson_id: (views, int(completions or 0)) for lesson_id, views, completions in db.session.query(
+                    LessonProgress.lesson_id,
+                    func.count(LessonProgress.id),
+                    func.sum(case((LessonProgress.completed_at.isnot(None), 1), else_=0))
+                ).filter(
+                    LessonProgress.lesson_id.in_([lesson.id for lesson in lessons])
+                ).group_by(LessonProgress.lesson_id).all()
+            }
+        
         lesson_engagement = []
-        for lesson in course.lessons:
-            views = LessonProgress.query.filter_by(lesson_id=lesson.id).count()
-            completions = LessonProgress.query.filter_by(
-                lesson_id=lesson.id
-            ).filter(LessonProgress.completed_at.isnot(None)).count()
+        for lesson in lessons:
+            views, completions = lesson_counts.get(lesson.id, (0, 0))
             
             lesson_engagement.append({
                 'lesson': lesson.to_dict(),
@@ -615,16 +811,30 @@ class TeacherService:
                 'completion_rate': (completions / views * 100) if views > 0 else 0
             })
         
+        quizzes = course.quizzes.all()
+        attempt_stats = {}
+        if quizzes:
+            attempt_stats = {
+                quiz_id: (total, score_sum or 0, int(passed or 0)) for quiz_id, total, score_sum, passed in db.session.query(
+                    QuizAttempt.quiz_id,
+                    func.count(QuizAttempt.id),
+                    func.sum(QuizAttempt.score),
+                    func.sum(case((QuizAttempt.score >= Quiz.passing_score, 1), else_=0))
+                ).join(Quiz, QuizAttempt.quiz_id == Quiz.id).filter(
+                    Quiz.course_id == course_id,
+                    QuizAttempt.status == 'completed'
+                ).group_by(QuizAttempt.quiz_id).all()
+            }
+        
         quiz_performance = []
-        for quiz in course.quizzes:
-            attempts = quiz.attempts.filter_by(status='completed').all()
-            if attempts:
-                avg_score = sum(a.score for a in attempts if a.score) / len(attempts)
+        for quiz in quizzes:
+            if quiz.id in attempt_stats:
+                total_attempts, score_sum, passed = attempt_stats[quiz.id]
                 quiz_performance.append({
                     'quiz': quiz.to_dict(),
-                    'total_attempts': len(attempts),
-                    'average_score': avg_score,
-                    'pass_rate': len([a for a in attempts if a.score >= quiz.passing_score]) / len(attempts) * 100
+                    'total_attempts': total_attempts,
+                    'average_score': float(score_sum) / total_attempts,
+                    'pass_rate': passed / total_attempts * 100
                 })
         
         return {
@@ -639,64 +849,89 @@ class TeacherService:
     def _calculate_student_progress(student_id: int, course_id: int) -> Dict[str, Any]:
         """Calculate comprehensive student progress for a course"""
         course = Course.query.get(course_id)
-        
+        return TeacherService._calculate_student_progress_for_students([student_id], course)[student_id]
+    
+    @staticmethod
+    def _calculate_student_progress_for_students(student_ids: List[int], course: Course) -> Dict[int, Dict[str, Any]]:
+        """Calculate comprehensive progress for several students of a course with a fixed number of queries"""
         total_lessons = course.lessons.count()
-        completed_lessons = LessonProgress.query.filter_by(
-            student_id=student_id
-        ).join(Lesson).filter(
-            Lesson.course_id == course_id,
-            LessonProgress.completed_at.isnot(None)
-        ).count()
-        
-        quiz_scores = []
-        for quiz in course.quizzes:
-            best_attempt = QuizAttempt.query.filter_by(
-                student_id=student_id,
-                quiz_id=quiz.id,
-                status='completed'
-            ).order_by(desc(QuizAttempt.score)).first()
-            
-            if best_attempt:
-                quiz_scores.append({
-                    'quiz_id': quiz.id,
-                    'quiz_title': quiz.title,
-                    'score': best_attempt.score,
-                    'passed': best_attempt.score >= quiz.passing_score
-                })
+        quizzes = course.quizzes.all()
+        assignments = course.assignments.all()
         
-        assignment_grades = []
-        for assignment in course.assignments:
-            submission = AssignmentSubmission.query.filter_by(
-                student_id=student_id,
-                assignment_id=assignment.id
-            ).first()
+        completed_lessons = {}
+        best_scores = {}
+        submissions = {}
+        
+        if student_ids:
+            completed_lessons = dict(db.session.query(
+                LessonProgress.student_id, func.count(LessonProgress.id)
+            ).join(Lesson).filter(
+                LessonProgress.student_id.in_(student_ids),
+                Lesson.course_id == course.id,
+                LessonProgress.completed_at.isnot(None)
+            ).group_by(LessonProgress.student_id).all())
             
-            if submission:
-                assignment_grades.append({
-                    'assignment_id': assignment.id,
-                    'assignment_title': assignment.title,
-                    'grade': submission.grade,
-                    'status': submission.status
-                })
-        
-        lesson_progress = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
-        quiz_average = sum(q['score'] for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-        assignment_average = sum(a['grade'] for a in assignment_grades if a['grade']) / len([a for a in assignment_grades if a['grade']]) if assignment_grades else 0
-        
-        overall_percentage = (lesson_progress + quiz_average + assignment_average) / 3
+            best_scores = {
+                (student_id, quiz_id): score for student_id, quiz_id, score in db.session.query(
+                    QuizAttempt.student_id, QuizAttempt.quiz_id, func.max(QuizAttempt.score)
+                ).join(Quiz).filter(
+                    QuizAttempt.student_id.in_(student_ids),
+                    Quiz.course_id == course.id,
+                    QuizAttempt.status == 'completed'
+                ).group_by(QuizAttempt.student_id, QuizAttempt.quiz_id).all()
+            }
+            
+            for submission in AssignmentSubmission.query.join(Assignment).filter(
+                AssignmentSubmission.student_id.in_(student_ids),
+                Assignment.course_id == course.id
+            ).order_by(AssignmentSubmission.id).all():
+                submissions.setdefault((submission.student_id, submission.assignment_id), submission)
+        
+        results = {}
+        for student_id in student_ids:
+            quiz_scores = []
+            for quiz in quizzes:
+                score = best_scores.get((student_id, quiz.id))
+                if score is not None:
+                    quiz_scores.append({
+                        'quiz_id': quiz.id,
+                        'quiz_title': quiz.title,
+                        'score': score,
+                        'passed': score >= quiz.passing_score
+                    })
+            
+            assignment_grades = []
+            for assignment in assignments:
+                submission = submissions.get((student_id, assignment.id))
+                if submission:
+                    assignment_grades.append({
+                        'assignment_id': assignment.id,
+                        'assignment_title': assignment.title,
+                        'grade': submission.grade,
+                        'status': submission.status
+                    })
+            
+            completed = completed_lessons.get(student_id, 0)
+            graded = [a['grade'] for a in assignment_grades if a['grade']]
+            
+            lesson_progress = (completed / total_lessons * 100) if total_lessons > 0 else 0
+            quiz_average = sum(q['score'] for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
+            assignment_average = sum(graded) / len(graded) if graded else 0
+            
+            results[student_id] = {
+                'lessons': {
+                    'completed': completed,
+                    'total': total_lessons,
+                    'percentage': lesson_progress
+                },
+                'quizzes': quiz_scores,
+                'assignments': assignment_grades,
+                'quiz_average': quiz_average,
+                'assignment_average': assignment_average,
+                'overall_percentage': (lesson_progress + quiz_average + assignment_average) / 3
+            }
         
-        return {
-            'lessons': {
-                'completed': completed_lessons,
-                'total': total_lessons,
-                'percentage': lesson_progress
-            },
-            'quizzes': quiz_scores,
-            'assignments': assignment_grades,
-            'quiz_average': quiz_average,
-            'assignment_average': assignment_average,
-            'overall_percentage': overall_percentage
-        }
+        return results
     
    
     @staticmethod
@@ -707,6 +942,7 @@ class TeacherService:
             raise PermissionException("Only teachers can access this analytics overview")
 
         courses = user.taught_courses.all()
+        course_ids = [course.id for course in courses]
 
         total_students = 0
         total_completion = 0
@@ -718,23 +954,71 @@ class TeacherService:
         enrollment_trends_counter = defaultdict(int)
         start_date = datetime.now() - timedelta(days=30)
 
+        statistics = calculate_course_statistics_many(courses)
         for course in courses:
-            stats = TeacherService.get_course_analytics(teacher_id, course.id)
+            stats = statistics[course.id]
 
-            total_students += stats["overall_stats"].get("total_students", 0)
-            total_completion += stats["overall_stats"].get("completion_rate", 0)
-            total_days += stats["overall_stats"].get("average_completion_days", 0)
+            total_students += stats.get("total_students", 0)
+            total_completion += stats.get("completion_rate", 0)
+            total_days += stats.get("average_completion_days", 0)
             completion_counts += 1
 
-            lesson_engagement += stats.get("lesson_engagement", [])
-            quiz_performance += stats.get("quiz_performance", [])
+        if courses:
+            # Lessons and quizzes of every course are listed course by course,
+            # so sort them by the course's position after loading them together
+            position = {course_id: index for index, course_id in enumerate(course_ids)}
+
+            lessons = Lesson.query.filter(Lesson.course_id.in_(course_ids)).order_by(Lesson.id).all()
+            lessons.sort(key=lambda lesson: position[lesson.course_id])
+            lesson_counts = {
+                lesson_id: (views, int(completions or 0)) for lesson_id, views, completions in db.session.query(
+                    LessonProgress.lesson_id,
+                    func.count(LessonProgress.id),
+                    func.sum(case((LessonProgress.completed_at.isnot(None), 1), else_=0))
+                ).join(Lesson).filter(
+                    Lesson.course_id.in_(course_ids)
+                ).group_by(LessonProgress.lesson_id).all()
+            }
 
-            enrollments = course.enrollments.filter(
+            for lesson in lessons:
+                views, completions = lesson_counts.get(lesson.id, (0, 0))
+                lesson_engagement.append({
+                    'lesson': lesson.to_dict(),
+                    'views': views,
+                    'completions': completions,
+                    'completion_rate': (completions / views * 100) if views > 0 else 0
+                })
+
+            quizzes = Quiz.query.filter(Quiz.course_id.in_(course_ids)).order_by(Quiz.id).all()
+            quizzes.sort(key=lambda quiz: position[quiz.course_id])
+            attempt_stats = {
+                quiz_id: (total, score_sum or 0, int(passed or 0)) for quiz_id, total, score_sum, passed in db.session.query(
+                    QuizAttempt.quiz_id,
+                    func.count(QuizAttempt.id),
+                    func.sum(QuizAttempt.score),
+                    func.sum(case((QuizAttempt.score >= Quiz.passing_score, 1), else_=0))
+                ).join(Quiz, QuizAttempt.quiz_id == Quiz.id).filter(
+                    Quiz.course_id.in_(course_ids),
+                    QuizAttempt.status == 'completed'
+                ).group_by(QuizAttempt.quiz_id).all()
+            }
+
+            for quiz in quizzes:
+                if quiz.id in attempt_stats:
+                    total_attempts, score_sum, passed = attempt_stats[quiz.id]
+                    quiz_performance.append({
+                        'quiz': quiz.to_dict(),
+                        'total_attempts': total_attempts,
+                        'average_score': float(score_sum) / total_attempts,
+                        'pass_rate': passed / total_attempts * 100
+                    })
+
+            enrolled_at_values = db.session.query(Enrollment.enrolled_at).filter(
+                Enrollment.course_id.in_(course_ids),
                 Enrollment.enrolled_at >= start_date
             ).all()
-            for e in enrollments:
-                day = e.enrolled_at.date().isoformat()
-                enrollment_trends_counter[day] += 1
+            for (enrolled_at,) in enrolled_at_values:
+                enrollment_trends_counter[enrolled_at.date().isoformat()] += 1
 
         enrollment_trends = []
         for i in range(30):
@@ -827,18 +1111,8 @@ class TeacherService:
         if not user or not user.is_teacher():
             raise PermissionException("Only teachers can access submissions")
 
-        courses = user.taught_courses.all()
-        all_submissions = []
-
-        for course in courses:
-            for assignment in course.assignments:
-                submissions = assignment.submissions.all() 
-                for submission in submissions:
-                    submission_data = submission.to_dict()
-                    submission_data['student'] = submission.student.to_dict()
-                    submission_data['assignment'] = assignment.to_dict()
-                    submission_data['course'] = course.to_dict()
-                    all_submissions.append(submission_data)
+        submissions = TeacherService._get_course_submissions(teacher_id)
+        all_submissions = [TeacherService._serialize_submission(submission) for submission in submissions]
 
         all_submissions.sort(key=lambda x: x['submitted_at'], reverse=True)
 
@@ -854,28 +1128,30 @@ class TeacherService:
         if not user or not user.is_teacher():
             raise PermissionException("Only teachers can access quiz attempts")
         
-        courses = user.taught_courses.all()
-        all_attempts = []
+        attempts = QuizAttempt.query.join(Quiz).join(Course).filter(
+            Course.teacher_id == teacher_id,
+            QuizAttempt.status.in_(['completed', 'in_progress'])
+        ).options(
+            joinedload(QuizAttempt.student),
+            joinedload(QuizAttempt.quiz).joinedload(Quiz.course).joinedload(Course.teacher)
+        ).order_by(Course.id, Quiz.id, desc(QuizAttempt.submitted_at)).all()
+        
+        questions_by_quiz = defaultdict(list)
+        quiz_ids = {attempt.quiz_id for attempt in attempts}
+        if quiz_ids:
+            questions = Question.query.filter(Question.quiz_id.in_(quiz_ids)).order_by(Question.id).all()
+            for question_data in Question.serialize_many(questions):
+                questions_by_quiz[question_data['quiz_id']].append(question_data)
         
-        for course in courses:
-            for quiz in course.quizzes:
-                attempts = quiz.attempts.filter(
-                    QuizAttempt.status.in_(['completed', 'in_progress'])
-                ).order_by(desc(QuizAttempt.submitted_at)).all()
-                
-                for attempt in attempts:
-                    attempt_data = attempt.to_dict()
-                    attempt_data['student'] = attempt.student.to_dict()
-                    attempt_data['quiz'] = quiz.to_dict()
-                    attempt_data['course'] = course.to_dict()
-                    
-                    questions = []
-                    for question in quiz.questions:
-                        question_data = question.to_dict()
-                        questions.append(question_data)
-                    attempt_data['quiz']['questions'] = questions
-                    
-                    all_attempts.append(attempt_data)
+        all_attempts = []
+        for attempt in attempts:
+            attempt_data = attempt.to_dict()
+            attempt_data['student'] = attempt.student.to_dict()
+            attempt_data['quiz'] = attempt.quiz.to_dict()
+            attempt_data['course'] = attempt.quiz.course.to_dict()
+            attempt_data['quiz']['questions'] = list(questions_by_quiz[attempt.quiz_id])
+            
+            all_attempts.append(attempt_data)
         
         all_attempts.sort(key=lambda x: x.get('submitted_at') or x.get('started_at'), reverse=True)
         
@@ -907,8 +1183,8 @@ class TeacherService:
         questions = []
         student_answers = {sa.question_id: sa for sa in attempt.student_answers}
         
-        for question in quiz.questions.order_by(Question.order_number):
-            question_data = question.to_dict()
+        quiz_questions = quiz.questions.order_by(Question.order_number).all()
+        for question, question_data in zip(quiz_questions, Question.serialize_many(quiz_questions)):
             student_answer = student_answers.get(question.id)
             
             if student_answer:
@@ -934,9 +1210,19 @@ class TeacherService:
         if not user or not user.is_teacher():
             raise PermissionException("Only teachers can access grading summary")
         
-        courses = user.taught_courses.all()
+        attempts = QuizAttempt.query.join(Quiz).join(Course).filter(
+            Course.teacher_id == teacher_id,
+            QuizAttempt.status == 'completed'
+        ).options(joinedload(QuizAttempt.quiz)).all()
         
-        total_attempts = 0
+        short_answer_quizzes = set()
+        if attempts:
+            short_answer_quizzes = {quiz_id for (quiz_id,) in db.session.query(Question.quiz_id).filter(
+                Question.quiz_id.in_({attempt.quiz_id for attempt in attempts}),
+                Question.question_type == 'short_answer'
+            ).distinct().all()}
+        
+        total_attempts = len(attempts)
         pending_grading = 0
         graded_today = 0
         total_score = 0
@@ -945,26 +1231,19 @@ class TeacherService:
         
         today = datetime.now().date()
         
-        for course in courses:
-            for quiz in course.quizzes:
-                attempts = quiz.attempts.filter_by(status='completed').all()
-                total_attempts += len(attempts)
-                
-                has_short_answer = any(q.question_type == 'short_answer' for q in quiz.questions)
+        for attempt in attempts:
+            if attempt.quiz_id in short_answer_quizzes and not attempt.graded_at:
+                pending_grading += 1
+            
+            if attempt.graded_at and attempt.graded_at.date() == today:
+                graded_today += 1
+            
+            if attempt.score is not None:
+                total_score += attempt.score
+                completed_attempts += 1
                 
-                for attempt in attempts:
-                    if has_short_answer and not attempt.graded_at:
-                        pending_grading += 1
-                    
-                    if attempt.graded_at and attempt.graded_at.date() == today:
-                        graded_today += 1
-                    
-                    if attempt.score is not None:
-                        total_score += attempt.score
-                        completed_attempts += 1
-                        
-                        if attempt.score < quiz.passing_score:
-                            failed_attempts += 1
+                if attempt.score < attempt.quiz.passing_score:
+                    failed_attempts += 1
         
         avg_score = total_score / completed_attempts if completed_attempts > 0 else 0
         
@@ -564,6 +564,36 @@ function throttle(func, limit) {
     };
 }
 
+// Conditional GET: send back the last ETag so unchanged data costs a 304 instead of the full body.
+// Resolves to { data, modified }, where data is the cached copy when nothing changed.
+const conditionalCache = {};
+
+function fetchIfChanged(url, options = {}) {
+    const cached = conditionalCache[url];
+    const headers = Object.assign({}, options.headers);
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    
+    return fetch(url, Object.assign({}, options, { headers, cache: 'no-store' }))
+        .then(response => {
+            if (response.status === 304 && cached) {
+                return { data: cached.data, modified: false };
+            }
+            if (!response.ok) {
+                throw new Error(`Request failed with status ${response.status}`);
+            }
+            
+            return response.json().then(data => {
+                const etag = response.headers.get('ETag');
+                if (etag) {
+                    conditionalCache[url] = { etag, data };
+                }
+                return { data, modified: true };
+            });
+        });
+}
+
 // Export functions for global use
 window.EduPlatform = {
     showAlert,
@@ -574,5 +604,6 @@ window.EduPlatform = {
     formatDateTime,
     formatFileSize,
     debounce,
-    throttle
+    throttle,
+    fetchIfChanged
 };
\ No newline at end of file
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, has_app_context
+from app import db
+from app.models import Question, AnswerOption
+
+# One question of a compiled answer key; ``id`` and ``question_type`` make it
+# usable wherever validation expects a Question
+AnswerKeyQuestion = namedtuple('AnswerKeyQuestion', 'id question_type points option_ids correct_option_ids')
+
+AnswerKey = namedtuple('AnswerKey', 'quiz_id version questions')
+
+class AnswerKeyCache:
+    """Process-local cache of compiled quiz answer keys used for grading.
+
+    A key maps each question id of a quiz to its type, points, option ids and
+    correct option ids, compiled with one query. Keys are tagged with the quiz's
+    ``updated_at``, which every quiz and question edit bumps, so a key built
+    before an edit in another process is recompiled as soon as a grader sees the
+    newer quiz row; edits in this process also drop the key immediately through
+    ``invalidate``. Entries expire after ``ANSWER_KEY_CACHE_TTL`` seconds.
+    """
+
+    def __init__(self, app=None):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.ttl = 600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('ANSWER_KEY_CACHE_TTL', 600)
+        app.extensions['answer_keys'] = self
+
+    def get(self, quiz):
+        """Get the answer key of a loaded quiz, compiling it if missing or stale"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(quiz.id)
+        if entry and entry[0] > now and entry[1].version == quiz.updated_at:
+            return entry[1]
+
+        key = compile_answer_key(quiz.id, quiz.updated_at)
+        with self.lock:
+            self.entries[quiz.id] = (now + self.ttl, key)
+        return key
+
+    def invalidate(self, quiz_id):
+        with self.lock:
+            self.entries.pop(quiz_id, None)
+
+def compile_answer_key(quiz_id, version=None):
+    """Build the answer key of a quiz from its questions and options in one query"""
+    rows = db.session.query(
+        Question.id, Question.question_type, Question.points, AnswerOption.id, AnswerOption.is_correct
+    ).outerjoin(AnswerOption, AnswerOption.question_id == Question.id).filter(
+        Question.quiz_id == quiz_id
+    ).order_by(Question.order_number, Question.id, AnswerOption.id).all()
+
+    questions = {}
+    options = {}
+    for question_id, question_type, points, option_id, is_correct in rows:
+        if question_id not in questions:
+            questions[question_id] = (question_type, points or 0)
+            options[question_id] = ([], [])
+        if option_id is not None:
+            options[question_id][0].append(option_id)
+            if is_correct:
+                options[question_id][1].append(option_id)
+
+    return AnswerKey(quiz_id, version, {
+        question_id: AnswerKeyQuestion(
+            question_id, question_type, points,
+            frozenset(options[question_id][0]), frozenset(options[question_id][1])
+        )
+        for question_id, (question_type, points) in questions.items()
+    })
+
+def get_answer_key(quiz):
+    """Get a quiz's answer key through the app's cache, or compile it when none is registered"""
+    cache = current_app.extensions.get('answer_keys') if has_app_context() else None
+    if cache is None:
+        return compile_answer_key(quiz.id, quiz.updated_at)
+    return cache.get(quiz)
+
+def invalidate_answer_key(quiz_id):
+    """Drop a quiz's cached answer key after its questions or settings changed"""
+    cache = current_app.extensions.get('answer_keys') if has_app_context() else None
+    if cache is not None:
+        cache.invalidate(quiz_id)
@@ -1,5 +1,6 @@
-from flask import jsonify
+from flask import jsonify, request
 from app.models import db
+import hashlib
 import logging
 import traceback
 
@@ -9,49 +10,68 @@ class BaseController:
     """Base controller with common request handling patterns"""
     
     @staticmethod
-    def handle_request(service_method, *args, success_message="Success", success_code=200, **kwargs):
-        """Generic request handler with error handling"""
+    def handle_request(service_method, *args, success_message="Success", success_code=200, etag=False, **kwargs):
+        """Generic request handler with error handling.
+        
+        Pass ``etag`` to support conditional GETs, see ``json_response``.
+        """
+        etag, not_modified = BaseController.check_version(etag)
+        if not_modified is not None:
+            return not_modified
+        
+        payload, status_code = BaseController.dispatch(
+            service_method, *args, success_message=success_message, success_code=success_code, **kwargs
+        )
+        return BaseController.json_response(payload, status_code, etag)
+    
+    @staticmethod
+    def dispatch(service_method, *args, success_message="Success", success_code=200, **kwargs):
+        """Call a service method and return the payload and status code handle_request would respond with"""
         try:
             result = service_method(*args, **kwargs)
             
             if isinstance(result, dict) and 'message' in result:
-                return jsonify(result), success_code
+                return result, success_code
             
-            return jsonify({
+            return {
                 'message': success_message,
                 'data': result
-            }), success_code
+            }, success_code
             
         except ValidationException as e:
             logger.warning(f"Validation error: {str(e)}")
-            return jsonify({'error': str(e)}), 400
+            return {'error': str(e)}, 400
         except PermissionException as e:
             logger.warning(f"Permission error: {str(e)}")
-            return jsonify({'error': str(e)}), 403
+            return {'error': str(e)}, 403
         except NotFoundException as e:
             logger.warning(f"Not found error: {str(e)}")
-            return jsonify({'error': str(e)}), 404
+            return {'error': str(e)}, 404
         except ValueError as e:
             logger.warning(f"Value error: {str(e)}")
-            return jsonify({'error': str(e)}), 400
+            return {'error': str(e)}, 400
         except PermissionError as e:
             logger.warning(f"Permission error: {str(e)}")
-            return jsonify({'error': str(e)}), 403
+            return {'error': str(e)}, 403
         except FileNotFoundError as e:
             logger.warning(f"Not found error: {str(e)}")
-            return jsonify({'error': str(e)}), 404
+            return {'error': str(e)}, 404
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             db.session.rollback()
-            return jsonify({'error': 'Internal server error'}), 500
+            return {'error': 'Internal server error'}, 500
     
     @staticmethod
-    def handle_list_request(service_method, *args, **kwargs):
+    def handle_list_request(service_method, *args, etag=False, **kwargs):
         """Handle paginated list requests"""
+        etag, not_modified = BaseController.check_version(etag)
+        if not_modified is not None:
+            return not_modified
+        
         try:
             result = service_method(*args, **kwargs)
-            return jsonify(result), 200
+            return BaseController.json_response(result, 200, etag)
         except ValidationException as e:
             logger.warning(f"Validation error: {str(e)}")
             return jsonify({'error': str(e)}), 400
@@ -66,6 +86,51 @@ class BaseController:
             logger.error(f"Traceback: {traceback.format_exc()}")
             return jsonify({'error': 'Internal server error'}), 500
 
+    @staticmethod
+    def json_response(payload, status_code=200, etag=False):
+        """Serialize a payload, tagging successful GET responses for conditional requests.
+        
+        With ``etag=True`` the tag is a hash of the serialized body: a client
+        sending it back in ``If-None-Match`` gets an empty 304 instead of the
+        same body again, though the payload is still built. A string tag (such
+        as a version key from ``check_version``) is used as is.
+        """
+        response = jsonify(payload)
+        response.status_code = status_code
+        
+        if etag and status_code == 200 and request.method in ('GET', 'HEAD'):
+            if etag is True:
+                etag = hashlib.sha1(response.get_data()).hexdigest()
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            response.make_conditional(request)
+        
+        return response
+    
+    @staticmethod
+    def check_version(etag):
+        """Resolve a version-key callable into a tag before any work is done.
+        
+        Returns ``(etag, not_modified)``; ``not_modified`` is a ready 304
+        response when the client already has this version, so the service is
+        never called. Anything that is not callable passes through unchanged.
+        """
+        if not callable(etag) or request.method not in ('GET', 'HEAD'):
+            return etag, None
+        
+        try:
+            etag = str(etag())
+        except Exception as e:
+            logger.warning(f"Version key error: {str(e)}")
+            return True, None
+        
+        if request.if_none_match.contains_weak(etag):
+            response = BaseController.json_response({}, 200, etag)
+            return etag, response
+        
+        return etag, None
+
 class ServiceException(Exception):
     """Base exception for service layer"""
     pass
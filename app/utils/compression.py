@@ -0,0 +1,97 @@
+import zlib
+from flask import request
+
+# wbits selecting the gzip container and the zlib container HTTP calls "deflate"
+ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS
+}
+
+# text/html is left out: server-rendered pages embed the session's access
+# token next to reflected input, so compressing them would open them to
+# BREACH-style length attacks
+DEFAULT_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'text/javascript',
+    'text/event-stream'
+)
+
+class ResponseCompression:
+    """Transparent gzip/deflate compression of responses.
+
+    Only the types in ``COMPRESS_MIMETYPES`` are compressed, so binary downloads
+    that are already compressed (certificate PDFs, ZIP archives, images) and
+    the HTML pages that carry the access token pass through untouched.
+    Buffered bodies smaller than ``COMPRESS_MIN_SIZE`` are left alone; streamed
+    bodies are compressed chunk by chunk and flushed after each chunk so events
+    still reach the client as they are produced.
+    """
+
+    def __init__(self, app=None):
+        self.level = 6
+        self.min_size = 500
+        self.mimetypes = set(DEFAULT_MIMETYPES)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('COMPRESS_ENABLED', True):
+            return
+
+        self.level = app.config.get('COMPRESS_LEVEL', 6)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES))
+
+        app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    def compress_response(self, response):
+        if (response.mimetype not in self.mimetypes
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = request.accept_encodings.best_match(list(ENCODINGS))
+        if encoding is None or request.method == 'HEAD':
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, ENCODINGS[encoding])
+            response.set_data(compressor.compress(data) + compressor.flush())
+
+        response.headers['Content-Encoding'] = encoding
+
+        # The compressed bytes differ from what a strong ETag promised, but
+        # the content is the same; weak tags still match If-None-Match.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
+
+    def _compress_stream(self, chunks, encoding):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, ENCODINGS[encoding])
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
@@ -0,0 +1,325 @@
+import random
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from sqlalchemy import func, select
+from app.models import (
+    User, UserRole, Course, Lesson, Enrollment, Quiz, Question, AnswerOption, QuizAttempt,
+    StudentAnswer, Assignment, AssignmentSubmission, LessonProgress, Notification, Message,
+    CertificateRequest
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCALE_PROFILES = {
+    'tiny': {
+        'teachers': 2, 'students': 12, 'courses': 4,
+        'lessons_per_course': 4, 'quizzes_per_course': 1, 'questions_per_quiz': 4,
+        'assignments_per_course': 1, 'enrollments_per_student': 2,
+        'notifications_per_student': 3, 'messages_per_student': 2
+    },
+    'small': {
+        'teachers': 10, 'students': 500, 'courses': 50,
+        'lessons_per_course': 10, 'quizzes_per_course': 2, 'questions_per_quiz': 8,
+        'assignments_per_course': 2, 'enrollments_per_student': 4,
+        'notifications_per_student': 20, 'messages_per_student': 4
+    },
+    'medium': {
+        'teachers': 100, 'students': 5000, 'courses': 500,
+        'lessons_per_course': 15, 'quizzes_per_course': 2, 'questions_per_quiz': 10,
+        'assignments_per_course': 3, 'enrollments_per_student': 5,
+        'notifications_per_student': 40, 'messages_per_student': 6
+    },
+    'large': {
+        'teachers': 500, 'students': 20000, 'courses': 2000,
+        'lessons_per_course': 20, 'quizzes_per_course': 2, 'questions_per_quiz': 10,
+        'assignments_per_course': 3, 'enrollments_per_student': 8,
+        'notifications_per_student': 60, 'messages_per_student': 6
+    }
+}
+
+CATEGORIES = ['Programming', 'Web Development', 'Data Science', 'Database', 'AI/ML', 'Design', 'Mathematics', 'Languages']
+
+# Default anchor time every generated timestamp is relative to, fixed so the
+# same seed gives the same dataset whatever day it is generated on
+DEFAULT_ANCHOR = datetime(2026, 1, 1, 12, 0, 0)
+
+NOTIFICATION_TYPES = ['new_content', 'assignment_graded', 'quiz_graded', 'message', 'enrollment', 'course_completion']
+
+class ScaleDataGenerator:
+    """Deterministic bulk data generator for benchmarking.
+
+    Rows are built from a seeded ``random.Random`` with explicit primary keys and
+    written with Core ``insert()`` executemany batches, so the same seed and
+    anchor time (``DEFAULT_ANCHOR`` unless ``now`` is given) always produce the
+    same database on SQLite and MySQL alike.
+    The target database must be empty.
+    """
+
+    TABLE_ORDER = [
+        User, Course, Lesson, Quiz, Question, AnswerOption, Assignment, Enrollment, LessonProgress,
+        QuizAttempt, StudentAnswer, AssignmentSubmission, CertificateRequest, Message, Notification
+    ]
+
+    def __init__(self, engine, profile='small', seed=42, batch_size=5000, now=None):
+        if profile not in SCALE_PROFILES:
+            raise ValueError(f"Unknown scale profile '{profile}'. Choose from: {', '.join(SCALE_PROFILES)}")
+        self.engine = engine
+        self.profile = SCALE_PROFILES[profile]
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = (now or DEFAULT_ANCHOR).replace(microsecond=0)
+        self.buffers = {model: [] for model in self.TABLE_ORDER}
+        self.counts = {model.__tablename__: 0 for model in self.TABLE_ORDER}
+        self.next_ids = {model: 1 for model in self.TABLE_ORDER}
+        self.connection = None
+
+    def generate(self):
+        """Generate the whole dataset and return the number of rows written per table"""
+        with self.engine.connect() as connection:
+            if connection.execute(select(func.count()).select_from(User.__table__)).scalar():
+                raise ValueError("Scale data can only be generated into an empty database")
+
+            if connection.dialect.name == 'sqlite':
+                connection.exec_driver_sql('PRAGMA synchronous = OFF')
+
+            self.connection = connection
+            try:
+                teacher_ids, student_ids = self._generate_users()
+                courses = self._generate_courses(teacher_ids)
+                self._generate_enrollments(student_ids, courses)
+                self._generate_messages(student_ids)
+                self.flush()
+            finally:
+                self.connection = None
+
+        return dict(self.counts)
+
+    def add(self, model, **values):
+        """Queue a row for insertion and return its primary key"""
+        row_id = self.next_ids[model]
+        self.next_ids[model] += 1
+        values['id'] = row_id
+        self.buffers[model].append(values)
+
+        if len(self.buffers[model]) >= self.batch_size:
+            self.flush()
+        return row_id
+
+    def flush(self):
+        """Write every buffered row, parents before children, and commit"""
+        for model in self.TABLE_ORDER:
+            rows = self.buffers[model]
+            if rows:
+                self.connection.execute(model.__table__.insert(), rows)
+                self.counts[model.__tablename__] += len(rows)
+                self.buffers[model] = []
+        self.connection.commit()
+
+    def _ago(self, max_days, min_days=0):
+        return self.now - timedelta(days=self.rng.randint(min_days, max_days), minutes=self.rng.randint(0, 1439))
+
+    def _generate_users(self):
+        profile = self.profile
+        admin_hash = generate_password_hash('Admin123!')
+        teacher_hash = generate_password_hash('Teacher123!')
+        student_hash = generate_password_hash('Student123!')
+
+        self.add(User, username='admin', email='admin@lms.com', password_hash=admin_hash,
+                 full_name='System Administrator', role=UserRole.ADMIN, phone=None, age=35,
+                 created_at=self._ago(720, 365), updated_at=self.now, is_active=True)
+
+        teacher_ids = [
+            self.add(User, username=f'teacher{i}', email=f'teacher{i}@lms.com', password_hash=teacher_hash,
+                     full_name=f'Teacher {i}', role=UserRole.TEACHER, phone=None, age=self.rng.randint(28, 65),
+                     created_at=self._ago(720, 180), updated_at=self.now, is_active=True)
+            for i in range(profile['teachers'])
+        ]
+        student_ids = [
+            self.add(User, username=f'student{i}', email=f'student{i}@student.com', password_hash=student_hash,
+                     full_name=f'Student {i}', role=UserRole.STUDENT, phone=None, age=self.rng.randint(17, 45),
+                     created_at=self._ago(365, 30), updated_at=self.now, is_active=self.rng.random() > 0.02)
+            for i in range(profile['students'])
+        ]
+        return teacher_ids, student_ids
+
+    def _generate_courses(self, teacher_ids):
+        """Create courses with their lessons, quizzes, questions and assignments"""
+        profile = self.profile
+        courses = []
+
+        for i in range(profile['courses']):
+            category = CATEGORIES[i % len(CATEGORIES)]
+            teacher_id = teacher_ids[i % len(teacher_ids)]
+            is_published = i == 0 or self.rng.random() < 0.9
+            created_at = self._ago(400, 200)
+            start_date = (self.now - timedelta(days=self.rng.randint(0, 180))).date()
+            course_id = self.add(Course, title=f'{category} Course {i + 1}',
+                                 description=f'Generated {category.lower()} course number {i + 1}.',
+                                 category=category, teacher_id=teacher_id, start_date=start_date,
+                                 end_date=start_date + timedelta(days=self.rng.choice([60, 90, 120])),
+                                 max_students=self.rng.choice([50, 100, 200, 500]), created_at=created_at,
+                                 updated_at=created_at, is_published=is_published)
+
+            lesson_ids = [
+                self.add(Lesson, course_id=course_id, title=f'Lesson {n + 1}', order_number=n + 1,
+                         content=f'Content of lesson {n + 1} in course {i + 1}.',
+                         lesson_type=self.rng.choice(['text', 'video', 'mixed']), video_url=None,
+                         duration_minutes=self.rng.randint(10, 60), created_at=created_at, updated_at=created_at)
+                for n in range(profile['lessons_per_course'])
+            ]
+
+            quizzes = [self._generate_quiz(course_id, lesson_ids, n, created_at) for n in range(profile['quizzes_per_course'])]
+
+            assignment_ids = [
+                self.add(Assignment, course_id=course_id, lesson_id=self.rng.choice(lesson_ids),
+                         title=f'Assignment {n + 1}', description='Generated assignment.',
+                         due_date=self.now + timedelta(days=self.rng.randint(-60, 30)), total_points=100,
+                         created_at=created_at, updated_at=created_at)
+                for n in range(profile['assignments_per_course'])
+            ]
+
+            courses.append({
+                'id': course_id,
+                'teacher_id': teacher_id,
+                'is_published': is_published,
+                'lesson_ids': lesson_ids,
+                'quizzes': quizzes,
+                'assignment_ids': assignment_ids
+            })
+
+        return courses
+
+    def _generate_quiz(self, course_id, lesson_ids, number, created_at):
+        questions = []
+        question_count = self.profile['questions_per_quiz']
+        quiz_id = self.add(Quiz, course_id=course_id, lesson_id=self.rng.choice(lesson_ids),
+                           title=f'Quiz {number + 1}', description='Generated quiz.',
+                           total_points=question_count * 10, passing_score=60,
+                           time_limit_minutes=self.rng.choice([None, 15, 30]), max_attempts=3,
+                           question_count=0, created_at=created_at, updated_at=created_at)
+
+        for order in range(question_count):
+            roll = self.rng.random()
+            question_type = 'short_answer' if roll < 0.1 else 'true_false' if roll < 0.3 else 'multiple_choice'
+            question_id = self.add(Question, quiz_id=quiz_id, question_text=f'Question {order + 1} of quiz {quiz_id}?',
+                                   question_type=question_type, points=10, order_number=order + 1,
+                                   created_at=created_at)
+
+            option_ids = []
+            correct_id = None
+            if question_type != 'short_answer':
+                texts = ['True', 'False'] if question_type == 'true_false' else [f'Option {k + 1}' for k in range(4)]
+                correct_index = self.rng.randrange(len(texts))
+                for k, text in enumerate(texts):
+                    option_id = self.add(AnswerOption, question_id=question_id, option_text=text, is_correct=k == correct_index)
+                    option_ids.append(option_id)
+                    if k == correct_index:
+                        correct_id = option_id
+
+            questions.append((question_id, option_ids, correct_id))
+
+        return {'id': quiz_id, 'questions': questions}
+
+    def _generate_enrollments(self, student_ids, courses):
+        """Enroll students and generate their progress, attempts, submissions and notifications"""
+        profile = self.profile
+        published = [course for course in courses if course['is_published']]
+        per_student = min(profile['enrollments_per_student'], len(published))
+        self.student_teachers = {}
+
+        for student_id in student_ids:
+            ability = self.rng.uniform(0.35, 0.95)
+            enrolled = self.rng.sample(published, self.rng.randint(max(1, per_student // 2), per_student))
+            self.student_teachers[student_id] = [course['teacher_id'] for course in enrolled]
+
+            for course in enrolled:
+                self._generate_enrollment(student_id, course, ability)
+
+            for _ in range(profile['notifications_per_student']):
+                course = self.rng.choice(enrolled)
+                notification_type = self.rng.choice(NOTIFICATION_TYPES)
+                is_read = self.rng.random() < 0.6
+                created_at = self._ago(120)
+                self.add(Notification, recipient_id=student_id, sender_id=course['teacher_id'],
+                         type=notification_type, priority='normal', title=notification_type.replace('_', ' ').title(),
+                         message=f'Update in course {course["id"]}', action_url=None, related_id=course['id'],
+                         is_read=is_read, read_at=created_at + timedelta(hours=1) if is_read else None,
+                         created_at=created_at)
+
+    def _generate_messages(self, student_ids):
+        """Exchange messages between students and the teachers of their courses"""
+        for student_id in student_ids:
+            teacher_ids = self.student_teachers[student_id]
+            for n in range(self.profile['messages_per_student']):
+                teacher_id = self.rng.choice(teacher_ids)
+                from_student = n % 2 == 0
+                sent_at = self._ago(90)
+                is_read = self.rng.random() < 0.7
+                self.add(Message, sender_id=student_id if from_student else teacher_id,
+                         recipient_id=teacher_id if from_student else student_id, course_id=None,
+                         subject='Question about the course' if from_student else 'Re: Question about the course',
+                         content='Generated message.', sent_at=sent_at,
+                         read_at=sent_at + timedelta(hours=2) if is_read else None, is_announcement=False)
+
+    def _generate_enrollment(self, student_id, course, ability):
+        roll = self.rng.random()
+        status = 'completed' if roll < 0.15 else 'dropped' if roll < 0.2 else 'active'
+        enrolled_at = self._ago(180, 1)
+        lesson_ids = course['lesson_ids']
+        completed_lessons = len(lesson_ids) if status == 'completed' else self.rng.randint(0, len(lesson_ids))
+
+        self.add(Enrollment, student_id=student_id, course_id=course['id'], enrolled_at=enrolled_at,
+                 completed_at=self.now - timedelta(days=self.rng.randint(0, 30)) if status == 'completed' else None,
+                 status=status, progress_percentage=round(completed_lessons / len(lesson_ids) * 100, 2))
+
+        viewed_at = enrolled_at
+        for index, lesson_id in enumerate(lesson_ids[:completed_lessons + 1]):
+            viewed_at = min(viewed_at + timedelta(hours=self.rng.randint(1, 72)), self.now)
+            completed = index < completed_lessons
+            self.add(LessonProgress, student_id=student_id, lesson_id=lesson_id, viewed_at=viewed_at,
+                     completed_at=viewed_at + timedelta(minutes=30) if completed else None,
+                     time_spent_minutes=self.rng.randint(5, 60))
+
+        for quiz in course['quizzes']:
+            if self.rng.random() < 0.8:
+                for attempt_number in range(1, self.rng.randint(1, 2) + 1):
+                    self._generate_attempt(student_id, quiz, attempt_number, ability)
+
+        for assignment_id in course['assignment_ids']:
+            if self.rng.random() < 0.6:
+                graded = self.rng.random() < 0.7
+                submitted_at = self._ago(60)
+                self.add(AssignmentSubmission, assignment_id=assignment_id, student_id=student_id,
+                         submission_text='Generated submission.', file_path=None, submitted_at=submitted_at,
+                         grade=round(ability * 100 * self.rng.uniform(0.8, 1.05), 1) if graded else None,
+                         feedback='Good work.' if graded else None,
+                         graded_at=submitted_at + timedelta(days=2) if graded else None,
+                         graded_by=course['teacher_id'] if graded else None,
+                         status='graded' if graded else 'submitted')
+
+        if status == 'completed' and self.rng.random() < 0.5:
+            self.add(CertificateRequest, student_id=student_id, course_id=course['id'], requested_at=self._ago(30),
+                     status='pending', reviewed_by=None, reviewed_at=None, rejection_reason=None)
+
+    def _generate_attempt(self, student_id, quiz, attempt_number, ability):
+        questions = quiz['questions']
+        answers = [self.rng.random() < ability for _ in questions]
+        started_at = self._ago(90)
+        time_spent = self.rng.randint(3, 30)
+        submitted_at = started_at + timedelta(minutes=time_spent)
+
+        attempt_id = self.add(QuizAttempt, quiz_id=quiz['id'], student_id=student_id, attempt_number=attempt_number,
+                              score=round(sum(answers) / len(questions) * 100, 2), started_at=started_at,
+                              submitted_at=submitted_at, time_spent_minutes=time_spent, status='completed',
+                              graded_at=submitted_at)
+
+        for (question_id, option_ids, correct_id), is_correct in zip(questions, answers):
+            if option_ids:
+                selected_id = correct_id if is_correct else self.rng.choice([o for o in option_ids if o != correct_id])
+                answer_text = None
+            else:
+                selected_id = None
+                answer_text = 'Generated answer.'
+            self.add(StudentAnswer, attempt_id=attempt_id, question_id=question_id, answer_text=answer_text,
+                     selected_option_id=selected_id, is_correct=is_correct, points_earned=10 if is_correct else 0)
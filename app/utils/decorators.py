@@ -1,79 +1,140 @@
+import time
+import threading
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import User, UserRole
+from flask import jsonify, g, current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.models import db, User, UserRole
 
-def teacher_required():
-    """Decorator to require teacher role"""
+# Endpoints that accept tokens issued with a ``scope`` claim; unscoped tokens work everywhere
+TOKEN_SCOPES = {
+    'notification_stream': {'notifications.stream_notifications'}
+}
+
+class TokenVersionCache:
+    """Process-local cache of each user's token version and active flag.
+
+    Tokens carry the ``ver`` claim they were issued with; a token is revoked once
+    the user's ``token_version`` moves past it or the user is deactivated. The
+    current version is read from the database at most once per ``ttl`` seconds
+    per user, and changes made in this process are picked up immediately via
+    ``invalidate``. Other processes see them within ``JWT_TOKEN_VERSION_TTL``.
+    """
+
+    def __init__(self, app=None, jwt=None):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.ttl = 30
+        if app is not None:
+            self.init_app(app, jwt)
+
+    def init_app(self, app, jwt):
+        self.ttl = app.config.get('JWT_TOKEN_VERSION_TTL', 30)
+        app.extensions['token_versions'] = self
+        jwt.token_in_blocklist_loader(is_token_revoked)
+
+    def get(self, user_id):
+        """Get ``(token_version, is_active)`` for a user, or None if the user does not exist"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        row = db.session.query(User.token_version, User.is_active).filter(User.id == user_id).first()
+        state = (row.token_version or 0, bool(row.is_active)) if row else None
+        with self.lock:
+            self.entries[user_id] = (now + self.ttl, state)
+        return state
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """Check a decoded token against its user's current token version and active flag"""
+    try:
+        user_id = int(jwt_payload['sub'])
+    except (KeyError, ValueError, TypeError):
+        return False
+
+    state = current_app.extensions['token_versions'].get(user_id)
+    if state is None:
+        return True
+
+    version, is_active = state
+    return not is_active or jwt_payload.get('ver', 0) != version
+
+def is_token_in_scope(jwt_header, jwt_payload):
+    """Check a scoped token is only used at the endpoints its scope allows"""
+    scope = jwt_payload.get('scope')
+    return scope is None or request.endpoint in TOKEN_SCOPES.get(scope, ())
+
+def token_out_of_scope(jwt_header, jwt_payload):
+    return jsonify({'error': 'Token is not valid for this endpoint'}), 403
+
+def invalidate_user_tokens(user):
+    """Bump the user's token version so tokens issued before now stop working"""
+    user.revoke_tokens()
+    token_versions = current_app.extensions.get('token_versions')
+    if token_versions is not None:
+        token_versions.invalidate(user.id)
+
+def get_current_user():
+    """Get the authenticated user, loading it at most once per request.
+
+    The instance lives in the request's session, so services that later call
+    ``User.query.get`` for the same id get it from the identity map instead of
+    issuing another query.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+    except (ValueError, TypeError):
+        return None
+
+    cached = g.get('current_user')
+    if cached is None or cached[0] != user_id:
+        cached = g.current_user = (user_id, db.session.get(User, user_id))
+    return cached[1]
+
+def _current_role():
+    """Get the caller's role from the token claims, falling back to the database for tokens without them"""
+    claims = get_jwt()
+    if 'role' in claims:
+        return UserRole(claims['role'])
+
+    user = get_current_user()
+    return user.role if user else None
+
+def _role_required(allowed_roles, error_message, invalid_id_message='Invalid user ID'):
     def decorator(f):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user = get_jwt_identity()
-            
             try:
-                user_id = int(current_user)
+                int(get_jwt_identity())
             except (ValueError, TypeError):
-                return jsonify({'error': 'Invalid user ID format'}), 400
-            
-            user = User.query.get(user_id)
-            
-            if not user:
+                return jsonify({'error': invalid_id_message}), 400
+
+            role = _current_role()
+
+            if role is None:
                 return jsonify({'error': 'User not found'}), 404
-                
-            if not (user.role == UserRole.TEACHER or user.role == UserRole.ADMIN):
-                return jsonify({'error': 'Teacher or admin access required'}), 403
-            
+
+            if role not in allowed_roles:
+                return jsonify({'error': error_message}), 403
+
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+def teacher_required():
+    """Decorator to require teacher role"""
+    return _role_required((UserRole.TEACHER, UserRole.ADMIN), 'Teacher or admin access required', 'Invalid user ID format')
+
 def admin_required():
     """Decorator to require admin role"""
-    def decorator(f):
-        @wraps(f)
-        @jwt_required()
-        def decorated_function(*args, **kwargs):
-            user_id_str = get_jwt_identity()
-            
-            try:
-                user_id = int(user_id_str)
-            except (ValueError, TypeError):
-                return jsonify({'error': 'Invalid user ID'}), 400
-            
-            user = User.query.get(user_id)
-            
-            if not user:
-                return jsonify({'error': 'User not found'}), 404
-            
-            if not user.is_admin():
-                return jsonify({'error': 'Access denied. Admin role required'}), 403
-            
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+    return _role_required((UserRole.ADMIN,), 'Access denied. Admin role required')
 
 def student_required():
     """Decorator to require student role"""
-    def decorator(f):
-        @wraps(f)
-        @jwt_required()
-        def decorated_function(*args, **kwargs):
-            user_id_str = get_jwt_identity()
-            
-            try:
-                user_id = int(user_id_str)
-            except (ValueError, TypeError):
-                return jsonify({'error': 'Invalid user ID'}), 400
-            
-            user = User.query.get(user_id)
-            
-            if not user:
-                return jsonify({'error': 'User not found'}), 404
-            
-            if not user.is_student():
-                return jsonify({'error': 'Access denied. Student role required'}), 403
-            
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
\ No newline at end of file
+    return _role_required((UserRole.STUDENT,), 'Access denied. Student role required')
@@ -1,9 +1,14 @@
 import os
+import json
+import base64
 import random
 import string
 from datetime import datetime
 import hashlib
 from flask import current_app
+from sqlalchemy import Integer, case, func, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 import logging
 
 logger = logging.getLogger(__name__)
@@ -75,66 +80,92 @@ def delete_file(filepath):
         logger.error(f"Error deleting file {filepath}: {str(e)}")
     return False
 
-def calculate_quiz_statistics(quiz_attempts):
-    """Calculate statistics for quiz attempts"""
-    if not quiz_attempts:
-        return {
-            'total_attempts': 0,
-            'average_score': 0,
-            'highest_score': 0,
-            'lowest_score': 0,
-            'pass_rate': 0
-        }
+def calculate_quiz_statistics(totals):
+    """Format the aggregates of a quiz's attempts as statistics.
     
-    scores = [attempt.score for attempt in quiz_attempts if attempt.score is not None]
-    
-    if not scores:
+    ``totals`` is the row of ``total_attempts``, ``scored`` (attempts with a
+    score), ``average_score``, ``highest_score``, ``lowest_score`` and
+    ``passed`` aggregated by the database; score statistics are 0 until an
+    attempt has a score.
+    """
+    if not totals.scored:
         return {
-            'total_attempts': len(quiz_attempts),
+            'total_attempts': totals.total_attempts or 0,
             'average_score': 0,
             'highest_score': 0,
             'lowest_score': 0,
             'pass_rate': 0
         }
     
-    passing_score = quiz_attempts[0].quiz.passing_score
-    passing_attempts = sum(1 for score in scores if score >= passing_score)
-    
     return {
-        'total_attempts': len(quiz_attempts),
-        'average_score': sum(scores) / len(scores),
-        'highest_score': max(scores),
-        'lowest_score': min(scores),
-        'pass_rate': (passing_attempts / len(scores)) * 100
+        'total_attempts': totals.total_attempts,
+        'average_score': float(totals.average_score),
+        'highest_score': totals.highest_score,
+        'lowest_score': totals.lowest_score,
+        'pass_rate': (int(totals.passed or 0) / totals.scored) * 100
     }
 
+class days_between(FunctionElement):
+    """Whole days from ``start`` to ``end``, like ``(end - start).days`` in Python
+    when ``end`` is not before ``start``."""
+    type = Integer()
+    name = 'days_between'
+    inherit_cache = True
+
+@compiles(days_between)
+def _days_between(element, compiler, **kw):
+    start, end = [compiler.process(clause, **kw) for clause in element.clauses]
+    return f"TIMESTAMPDIFF(DAY, {start}, {end})"
+
+@compiles(days_between, 'sqlite')
+def _days_between_sqlite(element, compiler, **kw):
+    start, end = [compiler.process(clause, **kw) for clause in element.clauses]
+    return f"((CAST(strftime('%s', {end}) AS INTEGER) - CAST(strftime('%s', {start}) AS INTEGER)) / 86400)"
+
 def calculate_course_statistics(course):
     """Calculate statistics for a course"""
-    active_enrollments = course.enrollments.filter_by(status='active').all()
-    completed_enrollments = course.enrollments.filter_by(status='completed').all()
-    
-    total_lessons = course.lessons.count()
-    total_quizzes = course.quizzes.count()
-    total_assignments = course.assignments.count()
+    return calculate_course_statistics_many([course])[course.id]
+
+def calculate_course_statistics_many(courses):
+    """Calculate the statistics of several courses, keyed by course id.
     
-    completion_times = []
-    for enrollment in completed_enrollments:
-        if enrollment.enrolled_at and enrollment.completed_at:
-            days = (enrollment.completed_at - enrollment.enrolled_at).days
-            completion_times.append(days)
+    The enrollment counts and completion times of all of them are grouped by
+    course in one query, so the cost does not grow with the number of courses.
+    """
+    from app.models import db, Enrollment
     
-    avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else 0
+    enrollment_stats = {}
+    if courses:
+        enrollment_stats = {
+            course_id: (int(active or 0), int(completed or 0), average_days)
+            for course_id, active, completed, average_days in db.session.query(
+                Enrollment.course_id,
+                func.sum(case((Enrollment.status == 'active', 1), else_=0)),
+                func.sum(case((Enrollment.status == 'completed', 1), else_=0)),
+                func.avg(case((
+                    Enrollment.status == 'completed',
+                    days_between(Enrollment.enrolled_at, Enrollment.completed_at)
+                )))
+            ).filter(
+                Enrollment.course_id.in_({course.id for course in courses}),
+                Enrollment.status.in_(['active', 'completed'])
+            ).group_by(Enrollment.course_id)
+        }
     
-    return {
-        'total_students': len(active_enrollments) + len(completed_enrollments),
-        'active_students': len(active_enrollments),
-        'completed_students': len(completed_enrollments),
-        'completion_rate': (len(completed_enrollments) / (len(active_enrollments) + len(completed_enrollments)) * 100) if (active_enrollments or completed_enrollments) else 0,
-        'total_lessons': total_lessons,
-        'total_quizzes': total_quizzes,
-        'total_assignments': total_assignments,
-        'average_completion_days': avg_completion_time
-    }
+    statistics = {}
+    for course in courses:
+        active, completed, average_days = enrollment_stats.get(course.id, (0, 0, None))
+        statistics[course.id] = {
+            'total_students': active + completed,
+            'active_students': active,
+            'completed_students': completed,
+            'completion_rate': (completed / (active + completed) * 100) if active + completed else 0,
+            'total_lessons': course.lesson_count or 0,
+            'total_quizzes': course.quiz_count or 0,
+            'total_assignments': course.assignment_count or 0,
+            'average_completion_days': float(average_days) if average_days is not None else 0
+        }
+    return statistics
 
 def paginate_query(query, page, per_page):
     """Helper function to paginate SQLAlchemy queries"""
@@ -149,6 +180,66 @@ def paginate_query(query, page, per_page):
         'pages': (total + per_page - 1) // per_page
     }
 
+def encode_cursor(*values):
+    """Pack the sort key of the last row of a page into an opaque URL-safe token"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, *columns):
+    """Unpack a token from ``encode_cursor`` into values typed like ``columns``.
+    Raises ValidationException for anything that is not such a token."""
+    from app.utils.base_controller import ValidationException
+    
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValidationException("Invalid cursor")
+
+def keyset_paginate(query, sort_column, id_column, cursor='', per_page=20, with_total=False):
+    """Page a query newest first by ``(sort_column, id_column)`` without OFFSET.
+    
+    ``cursor`` is the ``next_cursor`` of the previous page, or empty for the
+    first one; each page seeks past the last key it was given, so page 500
+    costs what page 1 does when an index covers the filter and the key. The
+    sort column must not be NULL; pass ``id_column=None`` when it is unique
+    itself (a primary key). The exact total needs a COUNT over the whole
+    filter and is only computed with ``with_total``.
+    """
+    total = query.order_by(None).count() if with_total else None
+    columns = [sort_column] if id_column is None else [sort_column, id_column]
+    
+    if cursor:
+        last = decode_cursor(cursor, *columns)
+        if id_column is None:
+            query = query.filter(sort_column < last[0])
+        else:
+            query = query.filter(
+                sort_column <= last[0],
+                or_(sort_column < last[0], id_column < last[1])
+            )
+    
+    items = query.order_by(None).order_by(*[column.desc() for column in columns]).limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(*[getattr(items[-1], column.key) for column in columns])
+    
+    return {
+        'items': items,
+        'total': total,
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    }
+
 def check_achievement_criteria(user, achievement):
     """Check if user meets achievement criteria"""
     from app.models import QuizAttempt, Enrollment, LessonProgress
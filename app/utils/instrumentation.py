@@ -0,0 +1,157 @@
+import time
+import threading
+from collections import deque
+from datetime import datetime
+from flask import g, request, has_request_context
+from sqlalchemy import event
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RequestStats:
+    """SQL statistics collected while serving a single request"""
+
+    def __init__(self, max_slow_statements=5):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.max_slow_statements = max_slow_statements
+        self.slowest = []
+
+    def record(self, statement, duration):
+        """Record one executed statement"""
+        self.query_count += 1
+        self.db_time += duration
+
+        if len(self.slowest) < self.max_slow_statements or duration > self.slowest[-1][1]:
+            self.slowest.append((statement, duration))
+            self.slowest.sort(key=lambda item: item[1], reverse=True)
+            del self.slowest[self.max_slow_statements:]
+
+    def to_dict(self):
+        return {
+            'query_count': self.query_count,
+            'db_time_ms': round(self.db_time * 1000, 3),
+            'slowest': [
+                {'statement': statement, 'duration_ms': round(duration * 1000, 3)}
+                for statement, duration in self.slowest
+            ]
+        }
+
+class SQLInstrumentation:
+    """Per-request SQL instrumentation.
+
+    Counts and times every statement executed on the engine while a request is
+    being served, optionally exposes the totals in ``X-DB-Queries``/``X-DB-Time``
+    response headers and keeps the last requests in a ring buffer.
+    """
+
+    def __init__(self, app=None, engine=None):
+        self.requests = deque()
+        self.lock = threading.Lock()
+        self.max_slow_statements = 5
+        self.headers_enabled = False
+        if app is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app, engine):
+        """Attach the engine listeners and request hooks to the app"""
+        self.requests = deque(maxlen=app.config.get('PERF_REQUEST_BUFFER_SIZE', 200))
+        self.max_slow_statements = app.config.get('PERF_SLOW_STATEMENTS', 5)
+        self.headers_enabled = app.config.get('SQL_INSTRUMENTATION_HEADERS', False)
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+        app.extensions['sql_instrumentation'] = self
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._record(conn, statement)
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; pop its start
+        # time here so the stack of the pooled connection stays balanced
+        if exception_context.connection is not None and exception_context.statement is not None:
+            self._record(exception_context.connection, exception_context.statement)
+
+    def _record(self, conn, statement):
+        start_times = conn.info.get('query_start_time')
+        if not start_times:
+            return
+        duration = time.perf_counter() - start_times.pop()
+
+        if has_request_context():
+            stats = g.get('sql_stats')
+            if stats is not None:
+                stats.record(statement, duration)
+
+    def _start_request(self):
+        g.sql_stats = RequestStats(self.max_slow_statements)
+        g.request_started_at = time.perf_counter()
+
+    def _finish_request(self, response):
+        stats = g.get('sql_stats')
+        if stats is None:
+            return response
+
+        if self.headers_enabled:
+            response.headers['X-DB-Queries'] = str(stats.query_count)
+            response.headers['X-DB-Time'] = f"{stats.db_time * 1000:.3f}"
+
+        entry = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'blueprint': request.blueprint,
+            'status_code': response.status_code,
+            'duration_ms': round((time.perf_counter() - g.request_started_at) * 1000, 3),
+            'timestamp': datetime.now().isoformat(),
+            **stats.to_dict()
+        }
+        with self.lock:
+            self.requests.append(entry)
+
+        return response
+
+    def get_recent_requests(self, limit=None):
+        """Get the buffered requests (newest first) with per-blueprint aggregates"""
+        with self.lock:
+            entries = list(self.requests)
+
+        blueprints = {}
+        for entry in entries:
+            name = entry['blueprint'] or 'app'
+            data = blueprints.setdefault(name, {
+                'requests': 0,
+                'total_queries': 0,
+                'max_queries': 0,
+                'total_db_time_ms': 0.0,
+                'max_db_time_ms': 0.0
+            })
+            data['requests'] += 1
+            data['total_queries'] += entry['query_count']
+            data['max_queries'] = max(data['max_queries'], entry['query_count'])
+            data['total_db_time_ms'] += entry['db_time_ms']
+            data['max_db_time_ms'] = max(data['max_db_time_ms'], entry['db_time_ms'])
+
+        for data in blueprints.values():
+            data['avg_queries'] = round(data['total_queries'] / data['requests'], 2)
+            data['avg_db_time_ms'] = round(data['total_db_time_ms'] / data['requests'], 3)
+            data['total_db_time_ms'] = round(data['total_db_time_ms'], 3)
+
+        entries.reverse()
+        if limit:
+            entries = entries[:limit]
+
+        return {
+            'requests': entries,
+            'blueprints': blueprints,
+            'buffer_size': self.requests.maxlen,
+            'total': len(self.requests)
+        }
@@ -0,0 +1,213 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def analyze_items(attempt_ids, questions, answers, options=()):
+    """Classical test theory item analysis of a set of quiz attempts.
+
+    ``questions`` are ``(question_id, max_points)`` pairs, ``answers`` are
+    ``(attempt_id, question_id, points_earned, selected_option_id)`` rows and
+    ``options`` are ``(option_id, question_id)`` pairs of the choice questions.
+    Unanswered questions score 0. Returns the test summary (score mean and
+    spread, Cronbach's alpha, standard error of measurement) and, keyed by id,
+    the item statistics (difficulty, corrected point-biserial discrimination,
+    alpha if the item were deleted) and the option statistics (how often each
+    option was chosen and how choosing it correlates with the rest score).
+
+    With NumPy installed the answers are loaded into an attempts x questions
+    matrix and every statistic is computed vectorized; without it the same
+    numbers are computed in pure Python.
+    """
+    attempt_ids = sorted(set(attempt_ids))
+    questions = sorted(questions)
+    if not attempt_ids or not questions:
+        return {
+            'summary': _summary(len(attempt_ids), len(questions), questions, None, None, None),
+            'items': {question_id: _item(0, None, None, None) for question_id, _ in questions},
+            'options': {option_id: _option(0, None, None) for option_id, _ in options}
+        }
+
+    if np is None:
+        return _analyze_python(attempt_ids, questions, answers, options)
+    return _analyze_numpy(attempt_ids, questions, answers, options)
+
+def _analyze_numpy(attempt_ids, questions, answers, options):
+    attempt_ids = np.asarray(attempt_ids, dtype=np.int64)
+    question_ids = np.asarray([question_id for question_id, _ in questions], dtype=np.int64)
+    max_points = np.asarray([max_points or 0 for _, max_points in questions], dtype=float)
+    n, k = len(attempt_ids), len(question_ids)
+
+    points = np.zeros((n, k))
+    selected = np.zeros((n, k), dtype=np.int64)
+    answered = np.zeros((n, k), dtype=bool)
+
+    if answers:
+        # Plain tuples convert in C; NumPy would probe database rows key by key.
+        # None (ungraded points, no selected option) becomes NaN, then 0
+        data = np.nan_to_num(np.array(list(map(tuple, answers)), dtype=float))
+        answer_attempts = data[:, 0].astype(np.int64)
+        answer_questions = data[:, 1].astype(np.int64)
+        rows = np.minimum(np.searchsorted(attempt_ids, answer_attempts), n - 1)
+        cols = np.minimum(np.searchsorted(question_ids, answer_questions), k - 1)
+        keep = (attempt_ids[rows] == answer_attempts) & (question_ids[cols] == answer_questions)
+        rows, cols = rows[keep], cols[keep]
+        points[rows, cols] = data[keep, 2]
+        selected[rows, cols] = data[keep, 3].astype(np.int64)
+        answered[rows, cols] = True
+
+    total = points.sum(axis=1)
+    rest = total[:, None] - points
+    item_variance = points.var(axis=0)
+    total_variance = total.var()
+
+    difficulty = np.full(k, np.nan)
+    np.divide(points.mean(axis=0), max_points, out=difficulty, where=max_points > 0)
+    discrimination = _pearson(points, rest)
+
+    alpha = np.nan
+    if k > 1 and total_variance > 0:
+        alpha = k / (k - 1) * (1 - item_variance.sum() / total_variance)
+
+    alpha_if_deleted = np.full(k, np.nan)
+    if k > 2:
+        rest_variance = rest.var(axis=0)
+        np.divide(item_variance.sum() - item_variance, rest_variance, out=alpha_if_deleted, where=rest_variance > 0)
+        alpha_if_deleted = (k - 1) / (k - 2) * (1 - alpha_if_deleted)
+
+    answered_counts = answered.sum(axis=0)
+    items = {
+        int(question_ids[col]): _item(int(answered_counts[col]), difficulty[col], discrimination[col], alpha_if_deleted[col])
+        for col in range(k)
+    }
+
+    option_stats = {}
+    if options:
+        option_ids = np.asarray([option_id for option_id, _ in options], dtype=np.int64)
+        option_questions = np.asarray([question_id for _, question_id in options], dtype=np.int64)
+        option_cols = np.minimum(np.searchsorted(question_ids, option_questions), k - 1)
+        known = question_ids[option_cols] == option_questions
+        chosen = (selected[:, option_cols] == option_ids) & known
+        counts = chosen.sum(axis=0)
+        option_discrimination = _pearson(chosen.astype(float), rest[:, option_cols])
+        option_stats = {
+            int(option_ids[index]): _option(int(counts[index]), counts[index] / n, option_discrimination[index])
+            for index in range(len(option_ids))
+        }
+
+    return {
+        'summary': _summary(n, k, questions, total.mean(), total.std(), alpha),
+        'items': items,
+        'options': option_stats
+    }
+
+def _pearson(a, b):
+    """Column-wise Pearson correlation of two matrices, NaN where a column is constant"""
+    a = a - a.mean(axis=0)
+    b = b - b.mean(axis=0)
+    denominator = np.sqrt((a * a).sum(axis=0) * (b * b).sum(axis=0))
+    result = np.full(denominator.shape, np.nan)
+    np.divide((a * b).sum(axis=0), denominator, out=result, where=denominator > 0)
+    return result
+
+def _analyze_python(attempt_ids, questions, answers, options):
+    rows = {attempt_id: row for row, attempt_id in enumerate(attempt_ids)}
+    cols = {question_id: col for col, (question_id, _) in enumerate(questions)}
+    n, k = len(attempt_ids), len(questions)
+
+    points = [[0.0] * k for _ in range(n)]
+    selected = [[0] * k for _ in range(n)]
+    answered = set()
+    for attempt_id, question_id, points_earned, selected_option_id in answers:
+        row, col = rows.get(attempt_id), cols.get(question_id)
+        if row is None or col is None:
+            continue
+        points[row][col] = float(points_earned or 0)
+        selected[row][col] = selected_option_id or 0
+        answered.add((row, col))
+
+    answered_counts = [0] * k
+    for _, col in answered:
+        answered_counts[col] += 1
+
+    total = [sum(row) for row in points]
+    columns = [[row[col] for row in points] for col in range(k)]
+    rests = [[total[row] - columns[col][row] for row in range(n)] for col in range(k)]
+    item_variance = [_variance(column) for column in columns]
+    total_variance = _variance(total)
+
+    alpha = None
+    if k > 1 and total_variance > 0:
+        alpha = k / (k - 1) * (1 - sum(item_variance) / total_variance)
+
+    items = {}
+    for col, (question_id, max_points) in enumerate(questions):
+        difficulty = sum(columns[col]) / n / max_points if max_points else None
+        alpha_if_deleted = None
+        rest_variance = _variance(rests[col])
+        if k > 2 and rest_variance > 0:
+            alpha_if_deleted = (k - 1) / (k - 2) * (1 - (sum(item_variance) - item_variance[col]) / rest_variance)
+        items[question_id] = _item(answered_counts[col], difficulty, _pearson_python(columns[col], rests[col]), alpha_if_deleted)
+
+    option_stats = {}
+    for option_id, question_id in options:
+        col = cols.get(question_id)
+        if col is None:
+            option_stats[option_id] = _option(0, 0, None)
+            continue
+        chosen = [1.0 if selected[row][col] == option_id else 0.0 for row in range(n)]
+        count = int(sum(chosen))
+        option_stats[option_id] = _option(count, count / n, _pearson_python(chosen, rests[col]))
+
+    mean = sum(total) / n
+    return {
+        'summary': _summary(n, k, questions, mean, math.sqrt(total_variance), alpha),
+        'items': items,
+        'options': option_stats
+    }
+
+def _variance(values):
+    mean = sum(values) / len(values)
+    return sum((value - mean) ** 2 for value in values) / len(values)
+
+def _pearson_python(xs, ys):
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    denominator = math.sqrt(sum((x - mean_x) ** 2 for x in xs) * sum((y - mean_y) ** 2 for y in ys))
+    return covariance / denominator if denominator > 0 else None
+
+def _number(value):
+    """Round a statistic for JSON, mapping undefined (None or NaN) values to None"""
+    if value is None or math.isnan(value):
+        return None
+    return round(float(value), 4)
+
+def _summary(attempts, items, questions, mean, std_dev, alpha):
+    alpha = _number(alpha)
+    std_dev = _number(std_dev)
+    return {
+        'attempts': attempts,
+        'items': items,
+        'max_score': sum(max_points or 0 for _, max_points in questions),
+        'mean_score': _number(mean),
+        'std_dev': std_dev,
+        'cronbach_alpha': alpha,
+        'standard_error': _number(std_dev * math.sqrt(1 - alpha)) if alpha is not None and std_dev is not None else None
+    }
+
+def _item(answered, difficulty, discrimination, alpha_if_deleted):
+    return {
+        'answered': answered,
+        'difficulty': _number(difficulty),
+        'discrimination': _number(discrimination),
+        'alpha_if_deleted': _number(alpha_if_deleted)
+    }
+
+def _option(count, proportion, discrimination):
+    return {
+        'count': count,
+        'proportion': _number(proportion),
+        'discrimination': _number(discrimination)
+    }
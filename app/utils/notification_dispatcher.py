@@ -0,0 +1,172 @@
+import threading
+import logging
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from app import db
+
+logger = logging.getLogger(__name__)
+
+class NotificationDispatcher:
+    """Background delivery of the notification outbox.
+
+    Services only add outbox entries to their own transaction; a pool of
+    ``NOTIFICATION_OUTBOX_WORKERS`` daemon threads turns them into notification
+    rows. Workers are started with the first request or the first committed
+    entry, woken as soon as an entry is committed in this process, and otherwise
+    poll every ``NOTIFICATION_OUTBOX_POLL_INTERVAL`` seconds so entries written
+    by other processes are delivered too. With no workers (the test setup)
+    nothing happens until ``flush`` is called.
+
+    Between batches one worker at a time also applies the notification
+    retention policies every ``NOTIFICATION_RETENTION_INTERVAL`` seconds; the
+    metrics of the last run are kept in ``last_retention``.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.workers = 2
+        self.batch_size = 100
+        self.max_attempts = 5
+        self.retry_delay = 30
+        self.claim_timeout = 300
+        self.poll_interval = 5
+        self.retention_interval = 3600
+        self.next_retention = 0
+        self.last_retention = None
+        self.retention_lock = threading.Lock()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get('NOTIFICATION_OUTBOX_WORKERS', 2)
+        self.batch_size = app.config.get('NOTIFICATION_OUTBOX_BATCH_SIZE', 100)
+        self.max_attempts = app.config.get('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+        self.retry_delay = app.config.get('NOTIFICATION_OUTBOX_RETRY_DELAY', 30)
+        self.claim_timeout = app.config.get('NOTIFICATION_OUTBOX_CLAIM_TIMEOUT', 300)
+        self.poll_interval = app.config.get('NOTIFICATION_OUTBOX_POLL_INTERVAL', 5)
+        self.retention_interval = app.config.get('NOTIFICATION_RETENTION_INTERVAL', 3600)
+        app.extensions['notification_dispatcher'] = self
+
+        if self.workers:
+            app.before_request(self.start)
+
+        if not event.contains(db.session, 'after_commit', _wake_after_commit):
+            event.listen(db.session, 'after_commit', _wake_after_commit)
+            event.listen(db.session, 'after_rollback', _forget_after_rollback)
+
+    def start(self):
+        """Start the worker threads if they are not running yet"""
+        if not self.workers or self.threads:
+            return
+
+        with self.lock:
+            if self.threads:
+                return
+            self.stopping.clear()
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'notification-dispatcher-{number + 1}', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def stop(self, timeout=5):
+        self.stopping.set()
+        self.wakeup.set()
+        with self.lock:
+            threads, self.threads = self.threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def wake(self):
+        """Tell the workers new entries were committed"""
+        if not self.workers:
+            return
+        self.start()
+        self.wakeup.set()
+
+    def dispatch_batch(self, now=None):
+        """Deliver one batch in the calling thread and return the number of entries claimed"""
+        from app.services.notification_service import NotificationService
+
+        return NotificationService.dispatch_outbox(
+            batch_size=self.batch_size,
+            max_attempts=self.max_attempts,
+            retry_delay=self.retry_delay,
+            claim_timeout=self.claim_timeout,
+            now=now
+        )
+
+    def flush(self, now=None):
+        """Deliver every entry that is due at ``now``, in the calling thread.
+
+        Used by tests and the ``dispatch-notifications`` command; entries waiting
+        for a retry are only included once ``now`` is past their backoff.
+        """
+        total = 0
+        while True:
+            claimed = self.dispatch_batch(now)
+            if not claimed:
+                return total
+            total += claimed
+
+    def run_retention(self, **options):
+        """Apply the retention policies in the calling thread and remember the metrics"""
+        from app.services.retention_service import RetentionService
+
+        self.last_retention = RetentionService.apply_retention(**options)
+        self.last_retention['finished_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        return self.last_retention
+
+    def _retention_due(self):
+        if not self.retention_interval or time.monotonic() < self.next_retention:
+            return False
+        if not self.retention_lock.acquire(blocking=False):
+            return False
+        self.next_retention = time.monotonic() + self.retention_interval
+        return True
+
+    def _run(self):
+        with self.app.app_context():
+            while not self.stopping.is_set():
+                try:
+                    claimed = self.dispatch_batch()
+                except Exception:
+                    logger.exception("Notification dispatcher batch failed")
+                    claimed = 0
+                finally:
+                    db.session.remove()
+
+                if self._retention_due():
+                    try:
+                        self.run_retention()
+                    except Exception:
+                        logger.exception("Notification retention run failed")
+                    finally:
+                        db.session.remove()
+                        self.retention_lock.release()
+
+                if not claimed:
+                    self.wakeup.wait(self.poll_interval)
+                    self.wakeup.clear()
+
+def _wake_after_commit(session):
+    if not session.info.pop('notification_outbox', False):
+        return
+
+    dispatcher = get_notification_dispatcher()
+    if dispatcher is not None:
+        dispatcher.wake()
+
+def _forget_after_rollback(session):
+    session.info.pop('notification_outbox', None)
+
+def get_notification_dispatcher():
+    """Get the app's dispatcher, or None outside an app context or when none is registered"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('notification_dispatcher')
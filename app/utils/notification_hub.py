@@ -0,0 +1,109 @@
+import json
+import queue
+import threading
+from flask import current_app, has_app_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """One open notification stream for a user"""
+
+    def __init__(self, user_id, max_queue=100):
+        self.user_id = user_id
+        self.events = queue.Queue(maxsize=max_queue)
+        self.closed = False
+
+    def put(self, event, data):
+        """Queue an event, closing the subscription if the client cannot keep up"""
+        try:
+            self.events.put_nowait((event, data))
+        except queue.Full:
+            self.close()
+
+    def close(self):
+        self.closed = True
+        try:
+            self.events.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def stream(self, heartbeat=15):
+        """Yield Server-Sent Events until the subscription is closed.
+
+        A comment line is sent every ``heartbeat`` seconds without events so
+        proxies keep the connection open and dead clients are noticed.
+        """
+        while not self.closed:
+            try:
+                item = self.events.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+
+            if item is None:
+                break
+            event, data = item
+            yield format_event(event, data)
+
+class NotificationHub:
+    """In-process publish/subscribe hub for notification streams.
+
+    Services publish to a user after committing; every open stream of that user
+    gets the event. Subscribers live in this process only, so with several
+    workers a client connected to another worker misses the push and relies on
+    its polling fallback instead.
+    """
+
+    def __init__(self, app=None):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.max_queue = 100
+        self.heartbeat = 15
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_queue = app.config.get('NOTIFICATION_STREAM_MAX_QUEUE', 100)
+        self.heartbeat = app.config.get('NOTIFICATION_STREAM_HEARTBEAT', 15)
+        app.extensions['notification_hub'] = self
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.max_queue)
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self.lock:
+            subscriptions = self.subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id):
+        with self.lock:
+            return bool(self.subscribers.get(user_id))
+
+    def publish(self, user_id, event, data):
+        """Send an event to every open stream of a user"""
+        with self.lock:
+            subscriptions = list(self.subscribers.get(user_id, ()))
+
+        for subscription in subscriptions:
+            subscription.put(event, data)
+            if subscription.closed:
+                logger.warning(f"Dropping slow notification stream for user {user_id}")
+                self.unsubscribe(subscription)
+
+def format_event(event, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def get_notification_hub():
+    """Get the app's hub, or None outside an app context or when none is registered"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('notification_hub')
@@ -109,4 +109,15 @@ def validate_grade(grade, max_grade):
             return False, f"Grade cannot exceed maximum of {max_grade}"
         return True, "Grade is valid"
     except (TypeError, ValueError):
-        return False, "Grade must be a number"
\ No newline at end of file
+        return False, "Grade must be a number"
+
+
+def validate_id_list(ids, max_length=10000):
+    """Validate a list of record IDs sent for a bulk operation"""
+    if not isinstance(ids, list) or not ids:
+        return False, "A non-empty list of IDs is required"
+    if len(ids) > max_length:
+        return False, f"At most {max_length} IDs can be processed at once"
+    if not all(isinstance(item, int) and not isinstance(item, bool) and item > 0 for item in ids):
+        return False, "IDs must be positive integers"
+    return True, "IDs are valid"
@@ -0,0 +1,4 @@
+"""Offline benchmarks for the service-layer hot paths.
+
+Run ``python -m benchmarks.run --help`` for usage.
+"""
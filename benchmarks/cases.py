@@ -0,0 +1,108 @@
+from datetime import datetime
+from sqlalchemy import func, desc
+from app.models import db, User, UserRole, Course, Enrollment, Quiz, Question, QuizAttempt, Message
+from app.services.student_service import StudentService
+from app.services.teacher_service import TeacherService
+from app.services.admin_service import AdminService
+from app.services.quiz_service import QuizService
+from app.services.messaging_service import MessagingService
+from app.services.notification_service import NotificationService
+
+class BenchmarkCase:
+    """A timed service call.
+
+    ``setup`` runs once against the dataset and returns ``prepare(iteration)``,
+    which does any untimed per-iteration work and returns the zero-argument
+    callable that is actually timed.
+    """
+
+    registry = []
+
+    def __init__(self, name, setup):
+        self.name = name
+        self.setup = setup
+
+    @classmethod
+    def register(cls, name):
+        def decorator(setup):
+            cls.registry.append(cls(name, setup))
+            return setup
+        return decorator
+
+def _busiest_student_id():
+    return db.session.query(Enrollment.student_id).filter(
+        Enrollment.status == 'active'
+    ).group_by(Enrollment.student_id).order_by(desc(func.count(Enrollment.id)), Enrollment.student_id).limit(1).scalar()
+
+def _busiest_course():
+    course_id = db.session.query(Enrollment.course_id).filter(
+        Enrollment.status == 'active'
+    ).group_by(Enrollment.course_id).order_by(desc(func.count(Enrollment.id)), Enrollment.course_id).limit(1).scalar()
+    return Course.query.get(course_id)
+
+def _busiest_quiz(course_id):
+    return db.session.query(QuizAttempt.quiz_id).join(Quiz).filter(
+        Quiz.course_id == course_id
+    ).group_by(QuizAttempt.quiz_id).order_by(desc(func.count(QuizAttempt.id)), QuizAttempt.quiz_id).limit(1).scalar()
+
+@BenchmarkCase.register('StudentService.get_dashboard')
+def student_dashboard():
+    student_id = _busiest_student_id()
+    return lambda iteration: lambda: StudentService.get_dashboard(student_id)
+
+@BenchmarkCase.register('TeacherService.get_quiz_analytics')
+def teacher_quiz_analytics():
+    course = _busiest_course()
+    teacher_id, quiz_id = course.teacher_id, _busiest_quiz(course.id)
+    return lambda iteration: lambda: TeacherService.get_quiz_analytics(teacher_id, quiz_id)
+
+@BenchmarkCase.register('TeacherService.get_student_progress_report')
+def teacher_progress_report():
+    course = _busiest_course()
+    teacher_id, course_id = course.teacher_id, course.id
+    return lambda iteration: lambda: TeacherService.get_student_progress_report(teacher_id, course_id)
+
+@BenchmarkCase.register('AdminService.get_dashboard')
+def admin_dashboard():
+    return lambda iteration: lambda: AdminService.get_dashboard()
+
+@BenchmarkCase.register('QuizService.submit_quiz_attempt')
+def submit_quiz_attempt():
+    course = _busiest_course()
+    quiz_id = _busiest_quiz(course.id)
+    student_ids = [
+        student_id for (student_id,) in db.session.query(Enrollment.student_id).filter(
+            Enrollment.course_id == course.id, Enrollment.status == 'active'
+        ).order_by(Enrollment.student_id)
+    ]
+
+    answers = {}
+    for question in Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order_number):
+        if question.question_type == 'short_answer':
+            answers[str(question.id)] = 'Benchmark answer'
+        else:
+            answers[str(question.id)] = question.answer_options.filter_by(is_correct=True).first().id
+
+    def prepare(iteration):
+        student_id = student_ids[iteration % len(student_ids)]
+        previous = QuizAttempt.query.filter_by(quiz_id=quiz_id, student_id=student_id).count()
+        attempt = QuizAttempt(quiz_id=quiz_id, student_id=student_id, attempt_number=previous + 1,
+                              started_at=datetime.now(), status='in_progress')
+        db.session.add(attempt)
+        db.session.commit()
+        attempt_id = attempt.id
+        return lambda: QuizService.submit_quiz_attempt(attempt_id, dict(answers))
+
+    return prepare
+
+@BenchmarkCase.register('MessagingService.get_conversations')
+def messaging_conversations():
+    teacher_id = db.session.query(Message.recipient_id).join(User, User.id == Message.recipient_id).filter(
+        User.role == UserRole.TEACHER
+    ).group_by(Message.recipient_id).order_by(desc(func.count(Message.id)), Message.recipient_id).limit(1).scalar()
+    return lambda iteration: lambda: MessagingService.get_conversations(teacher_id)
+
+@BenchmarkCase.register('NotificationService.get_user_notifications')
+def user_notifications():
+    student_id = _busiest_student_id()
+    return lambda iteration: lambda: NotificationService.get_user_notifications(student_id)
@@ -0,0 +1,260 @@
+"""Run the service-layer benchmarks against a generated SQLite dataset.
+
+Record a baseline::
+
+    python -m benchmarks.run --scale small --output benchmarks/baseline-small.json
+
+Compare the working tree against it, failing on regressions::
+
+    python -m benchmarks.run --scale small --compare benchmarks/baseline-small.json --threshold 0.25
+
+The dataset is generated once per scale, seed and schema into ``benchmarks/.data``
+and copied before every run, so write benchmarks never change the cached copy.
+A change to the models (tables, columns or indexes) changes the schema
+fingerprint in the file name, so a stale dataset is never reused.
+"""
+import os
+import sys
+import json
+import glob
+import hashlib
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy
+from sqlalchemy import event
+from config import config, TestingConfig
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+@contextmanager
+def count_queries(engine):
+    """Count the statements executed on the engine inside the block"""
+    counter = {'queries': 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter['queries'] += 1
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def create_benchmark_app(database_path):
+    """Create an app bound to the given SQLite file"""
+    from app import create_app
+
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath(database_path)}'
+        SQL_INSTRUMENTATION_HEADERS = False
+
+    config['benchmark'] = BenchmarkConfig
+    return create_app('benchmark')
+
+def schema_fingerprint():
+    """Short hash of the SQLite DDL of every table and index in the models"""
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateIndex, CreateTable
+    from app.models import db
+
+    dialect = sqlite.dialect()
+    statements = []
+    for table in db.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)))
+        statements.extend(sorted(str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes))
+    return hashlib.sha256('\n'.join(statements).encode('utf-8')).hexdigest()[:12]
+
+def build_dataset(scale, seed, rebuild=False):
+    """Generate (or reuse) the cached dataset for a scale, seed and schema and return its path"""
+    from app.models import db
+    from app.utils.data_generator import ScaleDataGenerator
+    from app.services.course_service import CourseService
+    from app.services.counter_service import CounterService
+    from app.services.messaging_service import MessagingService
+
+    prefix = os.path.join(DATA_DIR, f'{scale}-seed{seed}')
+    path = f'{prefix}-{schema_fingerprint()}.db'
+    if os.path.exists(path) and not rebuild:
+        return path
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    # Datasets of the same scale and seed built for an older schema are stale
+    for stale in glob.glob(f'{prefix}.db') + glob.glob(f'{prefix}-*.db'):
+        os.remove(stale)
+
+    print(f"Generating '{scale}' dataset into {path}...")
+    started = time.perf_counter()
+    app = create_benchmark_app(path)
+    with app.app_context():
+        ScaleDataGenerator(db.engine, scale, seed=seed).generate()
+        CourseService.repair_counters()
+        CounterService.reconcile_unread_counts()
+        MessagingService.rebuild_conversation_summaries()
+        db.session.remove()
+        db.engine.dispose()
+    print(f"Dataset generated in {time.perf_counter() - started:.1f}s")
+    return path
+
+def run_benchmarks(app, iterations=20, warmup=2, names=None):
+    """Time each benchmark case inside the app and return its latency and query statistics"""
+    from app.models import db
+    from benchmarks.cases import BenchmarkCase
+
+    results = {}
+    with app.app_context():
+        for case in BenchmarkCase.registry:
+            if names and not any(name.lower() in case.name.lower() for name in names):
+                continue
+
+            prepare = case.setup()
+            timings = []
+            query_counts = []
+
+            for iteration in range(warmup + iterations):
+                call = prepare(iteration)
+                db.session.remove()
+
+                with count_queries(db.engine) as counter:
+                    started = time.perf_counter()
+                    call()
+                    elapsed = time.perf_counter() - started
+
+                if iteration >= warmup:
+                    timings.append(elapsed * 1000)
+                    query_counts.append(counter['queries'])
+
+            db.session.remove()
+            results[case.name] = {
+                'p50_ms': round(percentile(timings, 50), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+                'mean_ms': round(sum(timings) / len(timings), 3),
+                'min_ms': round(min(timings), 3),
+                'max_ms': round(max(timings), 3),
+                'queries': max(query_counts)
+            }
+            print(f"  {case.name}: p50 {results[case.name]['p50_ms']:.2f}ms, "
+                  f"p95 {results[case.name]['p95_ms']:.2f}ms, {results[case.name]['queries']} queries")
+
+    return results
+
+def compare_results(baseline, current, threshold=0.2, min_delta_ms=1.0):
+    """Compare current results with a baseline and return the list of regressions.
+
+    A case regresses when its p50 latency grows by more than ``threshold`` (a
+    fraction) and by at least ``min_delta_ms``, or when it issues more queries.
+    p95 is reported but not gated on; with a few dozen iterations it is too noisy.
+    """
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        delta = result['p50_ms'] - base['p50_ms']
+        if delta > base['p50_ms'] * threshold and delta >= min_delta_ms:
+            regressions.append(
+                f"{name}: p50 {base['p50_ms']:.2f}ms -> {result['p50_ms']:.2f}ms "
+                f"(+{delta / base['p50_ms'] * 100 if base['p50_ms'] else float('inf'):.0f}%)"
+            )
+
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: queries {base['queries']} -> {result['queries']}")
+
+    return regressions
+
+def print_comparison(baseline, current):
+    print(f"\n{'case':<48} {'p50 base':>10} {'p50 now':>10} {'p95 base':>10} {'p95 now':>10} {'queries':>10}")
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<48} {'-':>10} {result['p50_ms']:>10.2f} {'-':>10} {result['p95_ms']:>10.2f} {result['queries']:>10}")
+            continue
+        queries = f"{base['queries']}->{result['queries']}"
+        print(f"{name:<48} {base['p50_ms']:>10.2f} {result['p50_ms']:>10.2f} "
+              f"{base['p95_ms']:>10.2f} {result['p95_ms']:>10.2f} {queries:>10}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark LMS service hot paths')
+    parser.add_argument('--scale', default='small', help='dataset profile from app.utils.data_generator (default: small)')
+    parser.add_argument('--seed', type=int, default=42, help='dataset seed (default: 42)')
+    parser.add_argument('--iterations', '-n', type=int, default=20, help='timed iterations per case (default: 20)')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed iterations per case (default: 2)')
+    parser.add_argument('--case', '-k', action='append', dest='cases', help='only run cases whose name contains this text')
+    parser.add_argument('--output', '-o', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed p50 latency growth as a fraction (default: 0.2)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='ignore latency changes smaller than this (default: 1.0)')
+    parser.add_argument('--rebuild', action='store_true', help='regenerate the cached dataset')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    dataset = build_dataset(args.scale, args.seed, args.rebuild)
+    workdir = tempfile.mkdtemp(prefix='lms-bench-')
+    database_path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(dataset, database_path)
+
+    try:
+        app = create_benchmark_app(database_path)
+        print(f"Running benchmarks ({args.iterations} iterations, {args.warmup} warmup)...")
+        results = run_benchmarks(app, args.iterations, args.warmup, args.cases)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'metadata': {
+            'scale': args.scale,
+            'seed': args.seed,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        if (baseline['metadata']['scale'], baseline['metadata']['seed']) != (args.scale, args.seed):
+            print(f"⚠️ Baseline was recorded with scale '{baseline['metadata']['scale']}' "
+                  f"and seed {baseline['metadata']['seed']}")
+
+        print_comparison(baseline['results'], results)
+        regressions = compare_results(baseline['results'], results, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\n✅ No regressions")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
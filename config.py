@@ -20,6 +20,7 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     JWT_ALGORITHM = 'HS256'
+    JWT_TOKEN_VERSION_TTL = 30  # seconds a cached token version is trusted before re-reading it
     
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or 'uploads'
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH') or 16 * 1024 * 1024)  # 16MB
@@ -27,6 +28,8 @@ class Config:
     
     ITEMS_PER_PAGE = 20
     
+    ANSWER_KEY_CACHE_TTL = 600  # seconds a compiled quiz answer key is kept without being rebuilt
+    
     SESSION_COOKIE_SECURE = False 
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
@@ -40,6 +43,33 @@ class Config:
     
     LOG_FILE = 'logs/app.log'
     LOG_LEVEL = 'INFO'
+    
+    SQL_INSTRUMENTATION_HEADERS = True  # X-DB-Queries / X-DB-Time response headers
+    PERF_REQUEST_BUFFER_SIZE = 200
+    PERF_SLOW_STATEMENTS = 5
+    
+    NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds between keepalive comments on idle streams
+    NOTIFICATION_STREAM_MAX_QUEUE = 100  # pending events before a slow stream is dropped
+    NOTIFICATION_STREAM_TOKEN_EXPIRES = timedelta(minutes=1)  # lifetime of the stream-only ?jwt= token
+    
+    NOTIFICATION_OUTBOX_WORKERS = 2  # dispatcher threads per process; 0 leaves delivery to flush()
+    NOTIFICATION_OUTBOX_BATCH_SIZE = 100  # outbox entries claimed per transaction
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 5  # failed deliveries before an entry is marked dead
+    NOTIFICATION_OUTBOX_RETRY_DELAY = 30  # seconds before the first retry, doubled on each failure
+    NOTIFICATION_OUTBOX_CLAIM_TIMEOUT = 300  # seconds before entries of a crashed worker are reclaimed
+    NOTIFICATION_OUTBOX_POLL_INTERVAL = 5  # seconds between idle polls for entries from other processes
+    NOTIFICATION_COALESCE_WINDOW = 3600  # seconds an unread notification keeps absorbing repeats; 0 disables
+    NOTIFICATION_COALESCE_TYPES = ('enrollment', 'assignment_submission', 'quiz_submission')  # types that coalesce
+    NOTIFICATION_RETENTION_POLICIES = {  # per NotificationType value; 'default' covers types without an entry
+        'default': {'archive_after_days': 180},
+        'new_content': {'delete_read_after_days': 30}
+    }
+    NOTIFICATION_RETENTION_BATCH_SIZE = 1000  # rows moved per retention transaction
+    NOTIFICATION_RETENTION_INTERVAL = 3600  # seconds between runs in the dispatcher; 0 leaves it to the CLI
+    
+    COMPRESS_ENABLED = True  # gzip/deflate responses for clients that accept it
+    COMPRESS_LEVEL = 6  # zlib level, 1 (fastest) to 9 (smallest)
+    COMPRESS_MIN_SIZE = 500  # bytes; smaller bodies are sent as is
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -51,6 +81,7 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     SESSION_COOKIE_SECURE = True
+    SQL_INSTRUMENTATION_HEADERS = False
     
 class TestingConfig(Config):
     """Testing configuration"""
@@ -59,6 +90,7 @@ class TestingConfig(Config):
     SQLALCHEMY_ENGINE_OPTIONS = {} 
     WTF_CSRF_ENABLED = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
+    NOTIFICATION_OUTBOX_WORKERS = 0
 
 config = {
     'development': DevelopmentConfig,
@@ -1,5 +1,7 @@
 import os
 import sys
+import time
+import argparse
 from datetime import datetime, date, timedelta
 import random
 import string
@@ -13,10 +15,57 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 from app.models import db, User, UserRole, Course, Lesson, Enrollment, Quiz, Question, AnswerOption, Assignment, Achievement
+from app.services.course_service import CourseService
+from app.services.counter_service import CounterService
+from app.services.messaging_service import MessagingService
+from app.utils.data_generator import ScaleDataGenerator, SCALE_PROFILES
 from config import config
 
 load_dotenv()
 
+ACHIEVEMENTS = [
+    {
+        'name': 'First Steps',
+        'description': 'Complete your first lesson',
+        'badge_icon': 'first-steps.png',
+        'points_value': 10,
+        'criteria_type': 'participation',
+        'criteria_value': 1
+    },
+    {
+        'name': 'Quiz Master',
+        'description': 'Score 90% or higher on a quiz',
+        'badge_icon': 'quiz-master.png',
+        'points_value': 25,
+        'criteria_type': 'quiz_score',
+        'criteria_value': 90
+    },
+    {
+        'name': 'Course Completer',
+        'description': 'Complete an entire course',
+        'badge_icon': 'course-complete.png',
+        'points_value': 100,
+        'criteria_type': 'course_completion',
+        'criteria_value': 100
+    },
+    {
+        'name': 'Week Streak',
+        'description': 'Study for 7 days in a row',
+        'badge_icon': 'week-streak.png',
+        'points_value': 50,
+        'criteria_type': 'streak',
+        'criteria_value': 7
+    },
+    {
+        'name': 'Perfect Score',
+        'description': 'Get 100% on a quiz',
+        'badge_icon': 'perfect-score.png',
+        'points_value': 50,
+        'criteria_type': 'quiz_score',
+        'criteria_value': 100
+    }
+]
+
 def create_database():
     """Create the database if it doesn't exist"""
     db_name = os.environ.get('DB_NAME')
@@ -304,55 +353,17 @@ def init_database(app):
         print(f"Created {assignment_count} assignments")
         
         print("Creating achievements...")
-        achievements_data = [
-            {
-                'name': 'First Steps',
-                'description': 'Complete your first lesson',
-                'badge_icon': 'first-steps.png',
-                'points_value': 10,
-                'criteria_type': 'participation',
-                'criteria_value': 1
-            },
-            {
-                'name': 'Quiz Master',
-                'description': 'Score 90% or higher on a quiz',
-                'badge_icon': 'quiz-master.png',
-                'points_value': 25,
-                'criteria_type': 'quiz_score',
-                'criteria_value': 90
-            },
-            {
-                'name': 'Course Completer',
-                'description': 'Complete an entire course',
-                'badge_icon': 'course-complete.png',
-                'points_value': 100,
-                'criteria_type': 'course_completion',
-                'criteria_value': 100
-            },
-            {
-                'name': 'Week Streak',
-                'description': 'Study for 7 days in a row',
-                'badge_icon': 'week-streak.png',
-                'points_value': 50,
-                'criteria_type': 'streak',
-                'criteria_value': 7
-            },
-            {
-                'name': 'Perfect Score',
-                'description': 'Get 100% on a quiz',
-                'badge_icon': 'perfect-score.png',
-                'points_value': 50,
-                'criteria_type': 'quiz_score',
-                'criteria_value': 100
-            }
-        ]
-        
-        for achievement_info in achievements_data:
+        for achievement_info in ACHIEVEMENTS:
             achievement = Achievement(**achievement_info)
             db.session.add(achievement)
         
         db.session.commit()
-        print(f"Created {len(achievements_data)} achievements")
+        print(f"Created {len(ACHIEVEMENTS)} achievements")
+        
+        print("Recomputing course and unread counters and conversation summaries...")
+        CourseService.repair_counters()
+        CounterService.reconcile_unread_counts()
+        MessagingService.rebuild_conversation_summaries()
         
         print("\nDatabase initialization completed successfully!")
         print("\nSample login credentials:")
@@ -360,19 +371,69 @@ def init_database(app):
         print("Teacher: email='john.smith@lms.com', password='Teacher123!'")
         print("Student: email='alice.martin@student.com', password='Student123!'")
 
+def init_scale_database(app, scale, seed=42, batch_size=5000):
+    """Fill an empty database with a deterministic, generated dataset for benchmarking"""
+    with app.app_context():
+        db.create_all()
+        print("All tables created successfully!")
+        
+        if User.query.first():
+            print("Database already contains data. Skipping scale generation.")
+            return
+        
+        print(f"Generating '{scale}' dataset (seed={seed}, batch size={batch_size})...")
+        started = time.perf_counter()
+        counts = ScaleDataGenerator(db.engine, scale, seed=seed, batch_size=batch_size).generate()
+        
+        for table, count in counts.items():
+            print(f"  {table}: {count}")
+        
+        db.session.execute(Achievement.__table__.insert(), ACHIEVEMENTS)
+        db.session.commit()
+        print(f"Created {len(ACHIEVEMENTS)} achievements")
+        
+        print("Recomputing course and unread counters and conversation summaries...")
+        CourseService.repair_counters()
+        CounterService.reconcile_unread_counts()
+        MessagingService.rebuild_conversation_summaries()
+        
+        print(f"\nScale dataset generated in {time.perf_counter() - started:.1f}s")
+        print("\nLogin credentials:")
+        print("Admin: email='admin@lms.com', password='Admin123!'")
+        print("Teacher: email='teacher0@lms.com', password='Teacher123!'")
+        print("Student: email='student0@student.com', password='Student123!'")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Create and initialize the LMS database')
+    parser.add_argument('--scale', choices=list(SCALE_PROFILES),
+                        help='generate a deterministic benchmark dataset of the given size instead of the sample data')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for --scale (default: 42)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per bulk insert for --scale (default: 5000)')
+    parser.add_argument('--database-url', help='database URL to use instead of the configured MySQL database, e.g. sqlite:///bench.db')
+    return parser.parse_args()
+
 def main():
     """Main function to create and initialize the database"""
+    args = parse_args()
+    
     app = Flask(__name__)
     app.config.from_object(config['development'])
+    if args.database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+        if args.database_url.startswith('sqlite'):
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
     
     db.init_app(app)
     migrate = Migrate(app, db)
     
-    if not create_database():
+    if not args.database_url and not create_database():
         print("Failed to create database. Exiting.")
         return
     
-    init_database(app)
+    if args.scale:
+        init_scale_database(app, args.scale, seed=args.seed, batch_size=args.batch_size)
+    else:
+        init_database(app)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
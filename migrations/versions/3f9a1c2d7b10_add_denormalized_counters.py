@@ -0,0 +1,51 @@
+"""add denormalized course and quiz counters
+
+Revision ID: 3f9a1c2d7b10
+Revises: 
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('active_enrollment_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('lesson_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('quiz_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('assignment_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE courses SET "
+        "active_enrollment_count = (SELECT COUNT(*) FROM enrollments "
+        "WHERE enrollments.course_id = courses.id AND enrollments.status = 'active'), "
+        "lesson_count = (SELECT COUNT(*) FROM lessons WHERE lessons.course_id = courses.id), "
+        "quiz_count = (SELECT COUNT(*) FROM quizzes WHERE quizzes.course_id = courses.id), "
+        "assignment_count = (SELECT COUNT(*) FROM assignments WHERE assignments.course_id = courses.id)"
+    )
+    op.execute(
+        "UPDATE quizzes SET "
+        "question_count = (SELECT COUNT(*) FROM questions WHERE questions.quiz_id = quizzes.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('quizzes', schema=None) as batch_op:
+        batch_op.drop_column('question_count')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_column('assignment_count')
+        batch_op.drop_column('quiz_count')
+        batch_op.drop_column('lesson_count')
+        batch_op.drop_column('active_enrollment_count')
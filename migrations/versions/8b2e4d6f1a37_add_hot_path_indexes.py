@@ -0,0 +1,39 @@
+"""add composite indexes for hot query paths
+
+Revision ID: 8b2e4d6f1a37
+Revises: 3f9a1c2d7b10
+Create Date: 2026-10-18 11:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f1a37'
+down_revision = '3f9a1c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_quiz_attempts_student_quiz_status_score', 'quiz_attempts', ['student_id', 'quiz_id', 'status', 'score']),
+    ('ix_quiz_attempts_quiz_status', 'quiz_attempts', ['quiz_id', 'status']),
+    ('ix_notifications_recipient_read_created', 'notifications', ['recipient_id', 'is_read', 'created_at']),
+    ('ix_messages_sender_recipient_sent', 'messages', ['sender_id', 'recipient_id', 'sent_at']),
+    ('ix_messages_recipient_read', 'messages', ['recipient_id', 'read_at']),
+    ('ix_enrollments_course_status', 'enrollments', ['course_id', 'status']),
+    ('ix_lesson_progress_lesson_completed', 'lesson_progress', ['lesson_id', 'completed_at']),
+    ('ix_assignment_submissions_assignment_status', 'assignment_submissions', ['assignment_id', 'status']),
+    ('ix_assignment_submissions_student_status', 'assignment_submissions', ['student_id', 'status']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
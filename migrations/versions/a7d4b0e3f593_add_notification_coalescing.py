@@ -0,0 +1,38 @@
+"""add notification count and outbox summary for coalesced notifications
+
+Revision ID: a7d4b0e3f593
+Revises: f6c3a9d2e482
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4b0e3f593'
+down_revision = 'f6c3a9d2e482'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('count', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('notifications_archive', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('count', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('summary', sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('notification_outbox', schema=None) as batch_op:
+        batch_op.drop_column('summary')
+
+    with op.batch_alter_table('notifications_archive', schema=None) as batch_op:
+        batch_op.drop_column('count')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_column('count')
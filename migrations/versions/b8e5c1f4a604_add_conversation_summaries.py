@@ -0,0 +1,61 @@
+"""add conversation_summaries table with the latest message and unread counts per user pair
+
+Revision ID: b8e5c1f4a604
+Revises: a7d4b0e3f593
+Create Date: 2026-10-18 20:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e5c1f4a604'
+down_revision = 'a7d4b0e3f593'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'conversation_summaries',
+        sa.Column('user_low_id', sa.Integer(), nullable=False),
+        sa.Column('user_high_id', sa.Integer(), nullable=False),
+        sa.Column('last_message_id', sa.Integer(), nullable=False),
+        sa.Column('last_sender_id', sa.Integer(), nullable=False),
+        sa.Column('last_subject', sa.String(length=200), nullable=False),
+        sa.Column('snippet', sa.String(length=200), nullable=False),
+        sa.Column('last_message_at', sa.DateTime(), nullable=False),
+        sa.Column('low_unread_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('high_unread_count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_low_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_high_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['last_message_id'], ['messages.id']),
+        sa.PrimaryKeyConstraint('user_low_id', 'user_high_id')
+    )
+    op.create_index('ix_conversation_summaries_low_last', 'conversation_summaries',
+                    ['user_low_id', 'last_message_at'], unique=False)
+    op.create_index('ix_conversation_summaries_high_last', 'conversation_summaries',
+                    ['user_high_id', 'last_message_at'], unique=False)
+
+    op.execute(
+        "INSERT INTO conversation_summaries (user_low_id, user_high_id, last_message_id, last_sender_id, "
+        "last_subject, snippet, last_message_at, low_unread_count, high_unread_count) "
+        "SELECT pairs.user_low_id, pairs.user_high_id, pairs.last_message_id, messages.sender_id, "
+        "messages.subject, SUBSTR(messages.content, 1, 200), messages.sent_at, "
+        "pairs.low_unread_count, pairs.high_unread_count "
+        "FROM (SELECT "
+        "CASE WHEN sender_id <= recipient_id THEN sender_id ELSE recipient_id END AS user_low_id, "
+        "CASE WHEN sender_id <= recipient_id THEN recipient_id ELSE sender_id END AS user_high_id, "
+        "MAX(id) AS last_message_id, "
+        "SUM(CASE WHEN read_at IS NULL AND recipient_id <= sender_id THEN 1 ELSE 0 END) AS low_unread_count, "
+        "SUM(CASE WHEN read_at IS NULL AND recipient_id > sender_id THEN 1 ELSE 0 END) AS high_unread_count "
+        "FROM messages GROUP BY 1, 2) AS pairs "
+        "JOIN messages ON messages.id = pairs.last_message_id"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_conversation_summaries_high_last', table_name='conversation_summaries')
+    op.drop_index('ix_conversation_summaries_low_last', table_name='conversation_summaries')
+    op.drop_table('conversation_summaries')
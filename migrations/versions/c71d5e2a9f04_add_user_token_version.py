@@ -0,0 +1,26 @@
+"""add token_version to users
+
+Revision ID: c71d5e2a9f04
+Revises: 8b2e4d6f1a37
+Create Date: 2026-10-18 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71d5e2a9f04'
+down_revision = '8b2e4d6f1a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
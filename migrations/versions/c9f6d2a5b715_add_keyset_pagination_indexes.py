@@ -0,0 +1,31 @@
+"""add indexes covering the (created_at/sent_at, id) keys of the paginated feeds
+
+Revision ID: c9f6d2a5b715
+Revises: b8e5c1f4a604
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9f6d2a5b715'
+down_revision = 'b8e5c1f4a604'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_notifications_recipient_created', 'notifications', ['recipient_id', 'created_at']),
+    ('ix_messages_recipient_sent', 'messages', ['recipient_id', 'sent_at']),
+    ('ix_users_created_at', 'users', ['created_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,36 @@
+"""add quiz_attempt_results table with the frozen results document of each completed attempt
+
+Revision ID: d0a7e3b6c826
+Revises: c9f6d2a5b715
+Create Date: 2026-10-18 22:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0a7e3b6c826'
+down_revision = 'c9f6d2a5b715'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing completed attempts get their document the first time their
+    # results are viewed, see QuizService.get_quiz_results
+    op.create_table(
+        'quiz_attempt_results',
+        sa.Column('attempt_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('document', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['attempt_id'], ['quiz_attempts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('attempt_id')
+    )
+
+
+def downgrade():
+    op.drop_table('quiz_attempt_results')
@@ -0,0 +1,48 @@
+"""add notification_outbox table
+
+Revision ID: d4a8e1b7c260
+Revises: c71d5e2a9f04
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8e1b7c260'
+down_revision = 'c71d5e2a9f04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('recipient_ids', sa.JSON(), nullable=False),
+        sa.Column('sender_id', sa.Integer(), nullable=True),
+        sa.Column('type', sa.String(length=40), nullable=False),
+        sa.Column('priority', sa.String(length=30), nullable=True),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('action_url', sa.String(length=500), nullable=True),
+        sa.Column('related_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('pending', 'processing', 'dead'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_outbox_status_available', 'notification_outbox', ['status', 'available_at'], unique=False)
+    op.create_index('ix_notification_outbox_claim_token', 'notification_outbox', ['claim_token'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notification_outbox_claim_token', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_status_available', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
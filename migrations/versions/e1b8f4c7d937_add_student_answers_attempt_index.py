@@ -0,0 +1,40 @@
+"""add an index on student_answers.attempt_id
+
+Revision ID: e1b8f4c7d937
+Revises: d0a7e3b6c826
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b8f4c7d937'
+down_revision = 'd0a7e3b6c826'
+branch_labels = None
+depends_on = None
+
+
+def _attempt_indexes():
+    inspector = sa.inspect(op.get_bind())
+    return [index['name'] for index in inspector.get_indexes('student_answers')
+            if index['column_names'] == ['attempt_id']]
+
+
+def upgrade():
+    # MySQL already indexes the foreign key column (as `attempt_id`); SQLite
+    # does not, and every answer lookup by attempt scanned the table
+    existing = _attempt_indexes()
+    if 'ix_student_answers_attempt_id' in existing:
+        return
+    op.create_index('ix_student_answers_attempt_id', 'student_answers', ['attempt_id'], unique=False)
+    for name in existing:
+        op.drop_index(name, table_name='student_answers')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        # The foreign key needs an index on the column at all times
+        op.create_index('attempt_id', 'student_answers', ['attempt_id'], unique=False)
+    op.drop_index('ix_student_answers_attempt_id', table_name='student_answers')
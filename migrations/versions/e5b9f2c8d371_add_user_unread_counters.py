@@ -0,0 +1,41 @@
+"""add user_counters table with unread notification and message counts
+
+Revision ID: e5b9f2c8d371
+Revises: d4a8e1b7c260
+Create Date: 2026-10-18 17:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9f2c8d371'
+down_revision = 'd4a8e1b7c260'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread_notification_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('unread_message_count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    op.execute(
+        "INSERT INTO user_counters (user_id, unread_notification_count, unread_message_count) "
+        "SELECT users.id, "
+        "(SELECT COUNT(*) FROM notifications "
+        "WHERE notifications.recipient_id = users.id AND notifications.is_read = 0), "
+        "(SELECT COUNT(*) FROM messages "
+        "WHERE messages.recipient_id = users.id AND messages.read_at IS NULL) "
+        "FROM users"
+    )
+
+
+def downgrade():
+    op.drop_table('user_counters')
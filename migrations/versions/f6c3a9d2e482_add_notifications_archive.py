@@ -0,0 +1,49 @@
+"""add notifications_archive table and type/created_at index for retention
+
+Revision ID: f6c3a9d2e482
+Revises: e5b9f2c8d371
+Create Date: 2026-10-18 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c3a9d2e482'
+down_revision = 'e5b9f2c8d371'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notifications_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('recipient_id', sa.Integer(), nullable=False),
+        sa.Column('sender_id', sa.Integer(), nullable=True),
+        sa.Column('type', sa.String(length=40), nullable=False),
+        sa.Column('priority', sa.String(length=30), nullable=True),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('action_url', sa.String(length=500), nullable=True),
+        sa.Column('related_id', sa.Integer(), nullable=True),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('read_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_notifications_archive_recipient_created', 'notifications_archive',
+        ['recipient_id', 'created_at'], unique=False
+    )
+    op.create_index('ix_notifications_type_created', 'notifications', ['type', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notifications_type_created', table_name='notifications')
+    op.drop_index('ix_notifications_archive_recipient_created', table_name='notifications_archive')
+    op.drop_table('notifications_archive')
@@ -50,15 +50,34 @@ CREATE TABLE IF NOT EXISTS `mylms`.`users` (
   `created_at` DATETIME NULL DEFAULT NULL,
   `updated_at` DATETIME NULL DEFAULT NULL,
   `is_active` TINYINT(1) NULL DEFAULT NULL,
+  `token_version` INT NOT NULL DEFAULT '0',
   PRIMARY KEY (`id`),
   UNIQUE INDEX `username` (`username` ASC) VISIBLE,
-  UNIQUE INDEX `email` (`email` ASC) VISIBLE)
+  UNIQUE INDEX `email` (`email` ASC) VISIBLE,
+  INDEX `ix_users_created_at` (`created_at` ASC) VISIBLE)
 ENGINE = InnoDB
 AUTO_INCREMENT = 48
 DEFAULT CHARACTER SET = utf8mb4
 COLLATE = utf8mb4_0900_ai_ci;
 
 
+-- -----------------------------------------------------
+-- Table `mylms`.`user_counters`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `mylms`.`user_counters` (
+  `user_id` INT NOT NULL,
+  `unread_notification_count` INT NOT NULL DEFAULT 0,
+  `unread_message_count` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`user_id`),
+  CONSTRAINT `user_counters_ibfk_1`
+    FOREIGN KEY (`user_id`)
+    REFERENCES `mylms`.`users` (`id`)
+    ON DELETE CASCADE)
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+
 -- -----------------------------------------------------
 -- Table `mylms`.`courses`
 -- -----------------------------------------------------
@@ -74,6 +93,10 @@ CREATE TABLE IF NOT EXISTS `mylms`.`courses` (
   `created_at` DATETIME NULL DEFAULT NULL,
   `updated_at` DATETIME NULL DEFAULT NULL,
   `is_published` TINYINT(1) NULL DEFAULT NULL,
+  `active_enrollment_count` INT NOT NULL DEFAULT '0',
+  `lesson_count` INT NOT NULL DEFAULT '0',
+  `quiz_count` INT NOT NULL DEFAULT '0',
+  `assignment_count` INT NOT NULL DEFAULT '0',
   PRIMARY KEY (`id`),
   INDEX `teacher_id` (`teacher_id` ASC) VISIBLE,
   CONSTRAINT `courses_ibfk_1`
@@ -123,6 +146,7 @@ CREATE TABLE IF NOT EXISTS `mylms`.`quizzes` (
   `passing_score` INT NULL DEFAULT NULL,
   `time_limit_minutes` INT NULL DEFAULT NULL,
   `max_attempts` INT NULL DEFAULT NULL,
+  `question_count` INT NOT NULL DEFAULT '0',
   `created_at` DATETIME NULL DEFAULT NULL,
   `updated_at` DATETIME NULL DEFAULT NULL,
   PRIMARY KEY (`id`),
@@ -228,6 +252,8 @@ CREATE TABLE IF NOT EXISTS `mylms`.`assignment_submissions` (
   UNIQUE INDEX `assignment_id` (`assignment_id` ASC, `student_id` ASC) VISIBLE,
   INDEX `student_id` (`student_id` ASC) VISIBLE,
   INDEX `graded_by` (`graded_by` ASC) VISIBLE,
+  INDEX `ix_assignment_submissions_assignment_status` (`assignment_id` ASC, `status` ASC) VISIBLE,
+  INDEX `ix_assignment_submissions_student_status` (`student_id` ASC, `status` ASC) VISIBLE,
   CONSTRAINT `assignment_submissions_ibfk_1`
     FOREIGN KEY (`assignment_id`)
     REFERENCES `mylms`.`assignments` (`id`),
@@ -313,6 +339,7 @@ CREATE TABLE IF NOT EXISTS `mylms`.`enrollments` (
   PRIMARY KEY (`id`),
   UNIQUE INDEX `student_id` (`student_id` ASC, `course_id` ASC) VISIBLE,
   INDEX `course_id` (`course_id` ASC) VISIBLE,
+  INDEX `ix_enrollments_course_status` (`course_id` ASC, `status` ASC) VISIBLE,
   CONSTRAINT `enrollments_ibfk_1`
     FOREIGN KEY (`student_id`)
     REFERENCES `mylms`.`users` (`id`),
@@ -338,6 +365,7 @@ CREATE TABLE IF NOT EXISTS `mylms`.`lesson_progress` (
   PRIMARY KEY (`id`),
   UNIQUE INDEX `student_id` (`student_id` ASC, `lesson_id` ASC) VISIBLE,
   INDEX `lesson_id` (`lesson_id` ASC) VISIBLE,
+  INDEX `ix_lesson_progress_lesson_completed` (`lesson_id` ASC, `completed_at` ASC) VISIBLE,
   CONSTRAINT `lesson_progress_ibfk_1`
     FOREIGN KEY (`student_id`)
     REFERENCES `mylms`.`users` (`id`),
@@ -367,6 +395,9 @@ CREATE TABLE IF NOT EXISTS `mylms`.`messages` (
   INDEX `sender_id` (`sender_id` ASC) VISIBLE,
   INDEX `recipient_id` (`recipient_id` ASC) VISIBLE,
   INDEX `course_id` (`course_id` ASC) VISIBLE,
+  INDEX `ix_messages_sender_recipient_sent` (`sender_id` ASC, `recipient_id` ASC, `sent_at` ASC) VISIBLE,
+  INDEX `ix_messages_recipient_read` (`recipient_id` ASC, `read_at` ASC) VISIBLE,
+  INDEX `ix_messages_recipient_sent` (`recipient_id` ASC, `sent_at` ASC) VISIBLE,
   CONSTRAINT `messages_ibfk_1`
     FOREIGN KEY (`sender_id`)
     REFERENCES `mylms`.`users` (`id`),
@@ -382,6 +413,39 @@ DEFAULT CHARACTER SET = utf8mb4
 COLLATE = utf8mb4_0900_ai_ci;
 
 
+-- -----------------------------------------------------
+-- Table `mylms`.`conversation_summaries`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `mylms`.`conversation_summaries` (
+  `user_low_id` INT NOT NULL,
+  `user_high_id` INT NOT NULL,
+  `last_message_id` INT NOT NULL,
+  `last_sender_id` INT NOT NULL,
+  `last_subject` VARCHAR(200) NOT NULL,
+  `snippet` VARCHAR(200) NOT NULL,
+  `last_message_at` DATETIME NOT NULL,
+  `low_unread_count` INT NOT NULL DEFAULT 0,
+  `high_unread_count` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`user_low_id`, `user_high_id`),
+  INDEX `ix_conversation_summaries_low_last` (`user_low_id` ASC, `last_message_at` ASC) VISIBLE,
+  INDEX `ix_conversation_summaries_high_last` (`user_high_id` ASC, `last_message_at` ASC) VISIBLE,
+  INDEX `last_message_id` (`last_message_id` ASC) VISIBLE,
+  CONSTRAINT `conversation_summaries_ibfk_1`
+    FOREIGN KEY (`user_low_id`)
+    REFERENCES `mylms`.`users` (`id`)
+    ON DELETE CASCADE,
+  CONSTRAINT `conversation_summaries_ibfk_2`
+    FOREIGN KEY (`user_high_id`)
+    REFERENCES `mylms`.`users` (`id`)
+    ON DELETE CASCADE,
+  CONSTRAINT `conversation_summaries_ibfk_3`
+    FOREIGN KEY (`last_message_id`)
+    REFERENCES `mylms`.`messages` (`id`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+
 -- -----------------------------------------------------
 -- Table `mylms`.`notifications`
 -- -----------------------------------------------------
@@ -395,12 +459,16 @@ CREATE TABLE IF NOT EXISTS `mylms`.`notifications` (
   `message` TEXT NOT NULL,
   `action_url` VARCHAR(500) NULL DEFAULT NULL,
   `related_id` INT NULL DEFAULT NULL,
+  `count` INT NOT NULL DEFAULT 1,
   `created_at` DATETIME NULL DEFAULT NULL,
   `read_at` DATETIME NULL DEFAULT NULL,
   `is_read` TINYINT(1) NULL DEFAULT NULL,
   PRIMARY KEY (`id`),
   INDEX `recipient_id` (`recipient_id` ASC) VISIBLE,
   INDEX `sender_id` (`sender_id` ASC) VISIBLE,
+  INDEX `ix_notifications_recipient_read_created` (`recipient_id` ASC, `is_read` ASC, `created_at` ASC) VISIBLE,
+  INDEX `ix_notifications_type_created` (`type` ASC, `created_at` ASC) VISIBLE,
+  INDEX `ix_notifications_recipient_created` (`recipient_id` ASC, `created_at` ASC) VISIBLE,
   CONSTRAINT `notifications_ibfk_1`
     FOREIGN KEY (`recipient_id`)
     REFERENCES `mylms`.`users` (`id`),
@@ -413,6 +481,71 @@ DEFAULT CHARACTER SET = utf8mb4
 COLLATE = utf8mb4_0900_ai_ci;
 
 
+-- -----------------------------------------------------
+-- Table `mylms`.`notifications_archive`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `mylms`.`notifications_archive` (
+  `id` INT NOT NULL,
+  `recipient_id` INT NOT NULL,
+  `sender_id` INT NULL DEFAULT NULL,
+  `type` VARCHAR(40) NOT NULL,
+  `priority` VARCHAR(30) NULL DEFAULT 'normal',
+  `title` VARCHAR(200) NOT NULL,
+  `message` TEXT NOT NULL,
+  `action_url` VARCHAR(500) NULL DEFAULT NULL,
+  `related_id` INT NULL DEFAULT NULL,
+  `count` INT NOT NULL DEFAULT 1,
+  `is_read` TINYINT(1) NOT NULL DEFAULT 0,
+  `read_at` DATETIME NULL DEFAULT NULL,
+  `created_at` DATETIME NOT NULL,
+  `archived_at` DATETIME NOT NULL,
+  PRIMARY KEY (`id`),
+  INDEX `sender_id` (`sender_id` ASC) VISIBLE,
+  INDEX `ix_notifications_archive_recipient_created` (`recipient_id` ASC, `created_at` ASC) VISIBLE,
+  CONSTRAINT `notifications_archive_ibfk_1`
+    FOREIGN KEY (`recipient_id`)
+    REFERENCES `mylms`.`users` (`id`),
+  CONSTRAINT `notifications_archive_ibfk_2`
+    FOREIGN KEY (`sender_id`)
+    REFERENCES `mylms`.`users` (`id`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+
+-- -----------------------------------------------------
+-- Table `mylms`.`notification_outbox`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `mylms`.`notification_outbox` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `recipient_ids` JSON NOT NULL,
+  `sender_id` INT NULL DEFAULT NULL,
+  `type` VARCHAR(40) NOT NULL,
+  `priority` VARCHAR(30) NULL DEFAULT 'normal',
+  `title` VARCHAR(200) NOT NULL,
+  `message` TEXT NOT NULL,
+  `action_url` VARCHAR(500) NULL DEFAULT NULL,
+  `related_id` INT NULL DEFAULT NULL,
+  `summary` VARCHAR(500) NULL DEFAULT NULL,
+  `status` ENUM('pending', 'processing', 'dead') NOT NULL DEFAULT 'pending',
+  `attempts` INT NOT NULL DEFAULT 0,
+  `last_error` TEXT NULL DEFAULT NULL,
+  `claim_token` VARCHAR(32) NULL DEFAULT NULL,
+  `locked_at` DATETIME NULL DEFAULT NULL,
+  `available_at` DATETIME NOT NULL,
+  `created_at` DATETIME NOT NULL,
+  PRIMARY KEY (`id`),
+  INDEX `sender_id` (`sender_id` ASC) VISIBLE,
+  INDEX `ix_notification_outbox_status_available` (`status` ASC, `available_at` ASC) VISIBLE,
+  INDEX `ix_notification_outbox_claim_token` (`claim_token` ASC) VISIBLE,
+  CONSTRAINT `notification_outbox_ibfk_1`
+    FOREIGN KEY (`sender_id`)
+    REFERENCES `mylms`.`users` (`id`))
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+
 -- -----------------------------------------------------
 -- Table `mylms`.`quiz_attempts`
 -- -----------------------------------------------------
@@ -430,6 +563,8 @@ CREATE TABLE IF NOT EXISTS `mylms`.`quiz_attempts` (
   PRIMARY KEY (`id`),
   INDEX `quiz_id` (`quiz_id` ASC) VISIBLE,
   INDEX `student_id` (`student_id` ASC) VISIBLE,
+  INDEX `ix_quiz_attempts_student_quiz_status_score` (`student_id` ASC, `quiz_id` ASC, `status` ASC, `score` ASC) VISIBLE,
+  INDEX `ix_quiz_attempts_quiz_status` (`quiz_id` ASC, `status` ASC) VISIBLE,
   CONSTRAINT `quiz_attempts_ibfk_1`
     FOREIGN KEY (`quiz_id`)
     REFERENCES `mylms`.`quizzes` (`id`),
@@ -442,6 +577,26 @@ DEFAULT CHARACTER SET = utf8mb4
 COLLATE = utf8mb4_0900_ai_ci;
 
 
+-- -----------------------------------------------------
+-- Table `mylms`.`quiz_attempt_results`
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `mylms`.`quiz_attempt_results` (
+  `attempt_id` INT NOT NULL,
+  `student_id` INT NOT NULL,
+  `quiz_id` INT NOT NULL,
+  `document` JSON NOT NULL,
+  `created_at` DATETIME NOT NULL,
+  `updated_at` DATETIME NOT NULL,
+  PRIMARY KEY (`attempt_id`),
+  CONSTRAINT `quiz_attempt_results_ibfk_1`
+    FOREIGN KEY (`attempt_id`)
+    REFERENCES `mylms`.`quiz_attempts` (`id`)
+    ON DELETE CASCADE)
+ENGINE = InnoDB
+DEFAULT CHARACTER SET = utf8mb4
+COLLATE = utf8mb4_0900_ai_ci;
+
+
 -- -----------------------------------------------------
 -- Table `mylms`.`student_achievements`
 -- -----------------------------------------------------
@@ -476,7 +631,7 @@ CREATE TABLE IF NOT EXISTS `mylms`.`student_answers` (
   `is_correct` TINYINT(1) NULL DEFAULT NULL,
   `points_earned` FLOAT NULL DEFAULT NULL,
   PRIMARY KEY (`id`),
-  INDEX `attempt_id` (`attempt_id` ASC) VISIBLE,
+  INDEX `ix_student_answers_attempt_id` (`attempt_id` ASC) VISIBLE,
   INDEX `question_id` (`question_id` ASC) VISIBLE,
   INDEX `selected_option_id` (`selected_option_id` ASC) VISIBLE,
   CONSTRAINT `student_answers_ibfk_1`
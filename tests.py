@@ -1,6 +1,8 @@
 import pytest
 import sys
 import os
+import re
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 from io import BytesIO
@@ -13,7 +15,8 @@ from app.models import (
     QuizAttempt, StudentAnswer, Assignment, AssignmentSubmission, 
     Enrollment, LessonProgress, Achievement, StudentAchievement,
     Certificate, CertificateRequest, Message, Notification,
-    NotificationType, NotificationPriority
+    NotificationOutbox, NotificationArchive, NotificationType, NotificationPriority, UserCounter,
+    ConversationSummary
 )
 
 from app.services.auth_service import AuthService
@@ -28,8 +31,15 @@ from app.services.messaging_service import MessagingService
 from app.services.notification_service import NotificationService
 from app.services.achievement_service import AchievementService
 from app.services.certificate_service import CertificateService
+from app.services.progress_service import ProgressService
+from app.services.counter_service import CounterService
+from app.services.retention_service import RetentionService
 
 from app.utils.base_controller import ValidationException, PermissionException, NotFoundException
+from app.utils.answer_keys import get_answer_key
+from app.utils import item_analysis
+from app.utils.data_generator import ScaleDataGenerator
+from sqlalchemy import event, create_engine, select
 
 @pytest.fixture(scope='function')
 def app():
@@ -155,6 +165,187 @@ def enrolled_student(app, sample_users, sample_course):
         return enrollment
 
 
+HOT_TABLES = {
+    'quiz_attempts', 'notifications', 'messages',
+    'enrollments', 'lesson_progress', 'assignment_submissions'
+}
+
+
+@contextmanager
+def capture_statements():
+    """Collect the SELECT statements (with parameters) issued inside the block"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def full_table_scans(statements, tables=HOT_TABLES):
+    """Run EXPLAIN QUERY PLAN for each statement and return the full scans of the given tables"""
+    connection = db.session.connection()
+    scans = []
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+        for row in plan:
+            match = re.match(r'SCAN (\w+?)(?:_\d+)?(?: |$)', row[-1])
+            if match and match.group(1) in tables:
+                scans.append(f"{row[-1]} <- {statement}")
+    return scans
+
+
+@contextmanager
+def assert_max_queries(max_queries, label='block'):
+    """Fail if the block executes more than max_queries SQL statements"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    
+    assert len(statements) <= max_queries, (
+        f"Expected {label} to run at most {max_queries} queries, got {len(statements)}:\n" + "\n".join(statements)
+    )
+
+
+def deliver_notification(recipient_ids, title, message='Message', notification_type=NotificationType.MESSAGE, **kwargs):
+    """Queue a notification, commit it and deliver it through the outbox as the services do"""
+    NotificationService.enqueue(recipient_ids, notification_type, title, message, **kwargs)
+    db.session.commit()
+    NotificationService.dispatch_outbox()
+    return Notification.query.filter_by(recipient_id=recipient_ids[0], title=title).order_by(Notification.id.desc()).first()
+
+
+def seed_budget_data(teacher_id, num_students=50, num_quizzes=10, num_lessons=5):
+    """Seed a course with students, quizzes, attempts and activity for query budget tests"""
+    students = []
+    for i in range(num_students):
+        student = User(
+            username=f'budget_student{i}',
+            email=f'budget_student{i}@test.com',
+            full_name=f'Budget Student {i}',
+            role=UserRole.STUDENT,
+            is_active=True,
+            password_hash='x'
+        )
+        students.append(student)
+    
+    course = Course(title='Budget Course', category='Testing', teacher_id=teacher_id,
+                    is_published=True, max_students=num_students + 10)
+    other_course = Course(title='Other Course', category='Testing', teacher_id=teacher_id,
+                          is_published=True, max_students=num_students + 10)
+    db.session.add_all(students + [course, other_course])
+    db.session.flush()
+    
+    lessons = [
+        Lesson(course_id=course.id, title=f'Lesson {i}', content='Content', order_number=i + 1)
+        for i in range(num_lessons)
+    ]
+    assignments = [
+        Assignment(course_id=course.id, title=f'Assignment {i}', due_date=datetime.now() + timedelta(days=7))
+        for i in range(2)
+    ]
+    quizzes = [
+        Quiz(course_id=course.id, title=f'Quiz {i}', passing_score=60, max_attempts=3)
+        for i in range(num_quizzes)
+    ]
+    db.session.add_all(lessons + assignments + quizzes)
+    db.session.flush()
+    
+    questions = []
+    for quiz in quizzes:
+        for order in range(3):
+            questions.append(Question(quiz_id=quiz.id, question_text=f'Question {order}',
+                                      question_type='multiple_choice', points=10, order_number=order + 1))
+        questions.append(Question(quiz_id=quiz.id, question_text='Explain',
+                                  question_type='short_answer', points=10, order_number=4))
+    db.session.add_all(questions)
+    db.session.flush()
+    
+    options = {}
+    for question in questions:
+        if question.question_type == 'multiple_choice':
+            options[question.id] = [
+                AnswerOption(question_id=question.id, option_text=f'Option {i}', is_correct=(i == 0))
+                for i in range(4)
+            ]
+            db.session.add_all(options[question.id])
+    db.session.flush()
+    
+    attempts = []
+    for index, student in enumerate(students):
+        db.session.add(Enrollment(student_id=student.id, course_id=course.id, status='active'))
+        for lesson in lessons[:index % (num_lessons + 1)]:
+            db.session.add(LessonProgress(student_id=student.id, lesson_id=lesson.id,
+                                          completed_at=datetime.now(), time_spent_minutes=10))
+        db.session.add(AssignmentSubmission(
+            assignment_id=assignments[0].id, student_id=student.id, submission_text='Answer',
+            status='graded' if index % 2 else 'submitted', grade=80 if index % 2 else None
+        ))
+        db.session.add(Message(sender_id=student.id, recipient_id=teacher_id, subject='Question', content='Hello'))
+        db.session.add(Message(sender_id=teacher_id, recipient_id=student.id, subject='Answer', content='Hi'))
+        db.session.add(Notification(recipient_id=student.id, sender_id=teacher_id, type='message',
+                                    title='New message', message='Hi'))
+        for quiz in quizzes:
+            attempts.append(QuizAttempt(
+                quiz_id=quiz.id, student_id=student.id, attempt_number=1, score=(index * 7) % 100,
+                status='completed', submitted_at=datetime.now(), time_spent_minutes=5
+            ))
+    db.session.add_all(attempts)
+    db.session.flush()
+    
+    questions_by_quiz = {}
+    for question in questions:
+        questions_by_quiz.setdefault(question.quiz_id, []).append(question)
+    for attempt in attempts:
+        for question in questions_by_quiz[attempt.quiz_id]:
+            if question.question_type == 'multiple_choice':
+                selected = options[question.id][attempt.student_id % 4]
+                db.session.add(StudentAnswer(attempt_id=attempt.id, question_id=question.id,
+                                             selected_option_id=selected.id, is_correct=selected.is_correct,
+                                             points_earned=10 if selected.is_correct else 0))
+            else:
+                db.session.add(StudentAnswer(attempt_id=attempt.id, question_id=question.id,
+                                             answer_text='Because', is_correct=None, points_earned=0))
+    
+    db.session.commit()
+    CourseService.repair_counters()
+    CounterService.reconcile_unread_counts()
+    MessagingService.rebuild_conversation_summaries()
+    
+    return {
+        'course_id': course.id,
+        'other_course_id': other_course.id,
+        'student_id': students[0].id,
+        'student_ids': [student.id for student in students],
+        'quiz_id': quizzes[0].id,
+        'question_id': questions_by_quiz[quizzes[0].id][0].id,
+        'attempt_id': attempts[0].id,
+        'lesson_id': lessons[0].id
+    }
+
+
+@pytest.fixture
+def budget_data(app, sample_users):
+    """Seed 50 students and 10 quizzes taught by the sample teacher"""
+    with app.app_context():
+        data = seed_budget_data(sample_users['teacher'].id)
+        data['teacher_id'] = sample_users['teacher'].id
+        data['admin_id'] = sample_users['admin'].id
+        return data
+
+
 class TestAuthService:
     """Test AuthService functionality"""
     
@@ -381,6 +572,55 @@ class TestCourseService:
             assert 'enrollments' in result
             assert result['total'] >= 1
             assert result['enrollments'][0]['course']['title'] == 'Test Course'
+    
+    def test_course_counters_maintained(self, app, sample_users, sample_course):
+        """Test denormalized course counters follow enrollments and content"""
+        with app.app_context():
+            teacher_id = sample_users['teacher'].id
+            CourseService.enroll_student(sample_users['student'].id, sample_course.id)
+            CourseService.enroll_student(sample_users['student2'].id, sample_course.id)
+            CourseService.drop_course(sample_users['student2'].id, sample_course.id)
+            
+            lesson = LessonService.create_lesson(teacher_id, {
+                'course_id': sample_course.id,
+                'title': 'Counted Lesson',
+                'content': 'Content',
+                'order_number': 1
+            })
+            QuizService.create_quiz(teacher_id, {'course_id': sample_course.id, 'title': 'Counted Quiz'})
+            AssignmentService.create_assignment(teacher_id, {
+                'course_id': sample_course.id,
+                'title': 'Counted Assignment',
+                'description': 'Description'
+            })
+            LessonService.delete_lesson(teacher_id, lesson['lesson']['id'])
+            
+            course = CourseService.get_course(teacher_id, sample_course.id)
+            
+            assert course['current_students'] == 1
+            assert course['lesson_count'] == 0
+            assert course['quiz_count'] == 1
+            assert course['assignment_count'] == 1
+    
+    def test_repair_counters(self, app, sample_users, sample_course):
+        """Test bulk recomputation of drifted counters"""
+        with app.app_context():
+            db.session.add(Enrollment(student_id=sample_users['student'].id, course_id=sample_course.id, status='active'))
+            db.session.add(Lesson(course_id=sample_course.id, title='Raw Lesson', order_number=1))
+            quiz = Quiz(course_id=sample_course.id, title='Raw Quiz')
+            db.session.add(quiz)
+            db.session.flush()
+            db.session.add(Question(quiz_id=quiz.id, question_text='Q?', question_type='short_answer', order_number=1))
+            db.session.commit()
+            
+            result = CourseService.repair_counters()
+            
+            course = Course.query.get(sample_course.id)
+            assert result['courses'] == 1
+            assert course.active_enrollment_count == 1
+            assert course.lesson_count == 1
+            assert course.quiz_count == 1
+            assert Quiz.query.get(quiz.id).to_dict()['question_count'] == 1
 
 class TestLessonService:
     """Test LessonService functionality"""
@@ -641,6 +881,131 @@ class TestQuizService:
             
             assert result['message'] == 'Quiz submitted successfully'
             assert result['result']['score'] == 100.0 
+    
+    def test_answer_key_follows_question_edits(self, app, sample_users, sample_course, enrolled_student):
+        """Test the cached answer key is reused and recompiled after an edit"""
+        with app.app_context():
+            teacher_id = sample_users['teacher'].id
+            quiz_id = QuizService.create_quiz(teacher_id, {'course_id': sample_course.id, 'title': 'Key Quiz'})['quiz']['id']
+            question = QuizService.add_question(teacher_id, quiz_id, {
+                'question_text': 'What is 2 + 2?',
+                'question_type': 'multiple_choice',
+                'points': 10,
+                'order_number': 1,
+                'options': [{'text': '3', 'is_correct': False}, {'text': '4', 'is_correct': True}]
+            })['question']
+            
+            quiz = Quiz.query.get(quiz_id)
+            key = get_answer_key(quiz)
+            assert get_answer_key(quiz) is key
+            assert key.questions[question['id']].points == 10
+            
+            QuizService.update_question(teacher_id, quiz_id, question['id'], {
+                'points': 20,
+                'options': [{'text': '3', 'is_correct': True}, {'text': '4', 'is_correct': False}]
+            })
+            db.session.expire_all()
+            
+            quiz = Quiz.query.get(quiz_id)
+            edited = get_answer_key(quiz)
+            assert edited is not key
+            assert edited.questions[question['id']].points == 20
+            
+            options = Question.query.get(question['id']).answer_options
+            correct = next(option for option in options if option.is_correct)
+            assert edited.questions[question['id']].correct_option_ids == {correct.id}
+            
+            attempt_id = QuizService.start_quiz(sample_users['student'].id, quiz_id)['attempt_id']
+            result = QuizService.submit_quiz_with_achievements(
+                sample_users['student'].id, attempt_id, {str(question['id']): correct.id}
+            )
+            assert result['result']['score'] == 100.0
+    
+    def test_results_snapshot_frozen_at_submit_and_grade(self, app, sample_users, sample_course, enrolled_student):
+        """Test results are served from the document written at submit and rewritten at grading"""
+        with app.app_context():
+            teacher_id = sample_users['teacher'].id
+            student_id = sample_users['student'].id
+            quiz_id = QuizService.create_quiz(teacher_id, {'course_id': sample_course.id, 'title': 'Snapshot Quiz'})['quiz']['id']
+            choice = QuizService.add_question(teacher_id, quiz_id, {
+                'question_text': 'What is 2 + 2?',
+                'question_type': 'multiple_choice',
+                'points': 10,
+                'order_number': 1,
+                'options': [{'text': '3', 'is_correct': False}, {'text': '4', 'is_correct': True}]
+            })['question']
+            essay = QuizService.add_question(teacher_id, quiz_id, {
+                'question_text': 'Why?',
+                'question_type': 'short_answer',
+                'points': 10,
+                'order_number': 2
+            })['question']
+            
+            attempt_id = QuizService.start_quiz(student_id, quiz_id)['attempt_id']
+            wrong = next(option for option in choice['answer_options'] if not option['is_correct'])
+            QuizService.submit_quiz_with_achievements(student_id, attempt_id, {
+                str(choice['id']): wrong['id'], str(essay['id']): 'Because'
+            })
+            db.session.expunge_all()
+            
+            with capture_statements() as statements:
+                results = QuizService.get_quiz_results(student_id, attempt_id)
+            assert len(statements) == 2
+            assert not any('student_answers' in sql or 'answer_options' in sql for sql, _ in statements)
+            
+            by_id = {question['id']: question for question in results['questions']}
+            assert by_id[choice['id']]['student_answer'] == '3'
+            assert by_id[choice['id']]['correct_answer'] == '4'
+            assert by_id[choice['id']]['is_correct'] is False
+            assert by_id[essay['id']]['student_answer'] == 'Because'
+            assert results['attempt']['score'] == 0
+            
+            QuizService.grade_attempt(teacher_id, attempt_id, {str(by_id[essay['id']]['answer_id']): True})
+            
+            graded = QuizService.get_quiz_results(teacher_id, attempt_id)
+            graded_by_id = {question['id']: question for question in graded['questions']}
+            assert graded_by_id[essay['id']]['is_correct'] is True
+            assert graded_by_id[essay['id']]['points_earned'] == 10
+            assert graded['attempt']['score'] == 50.0
+            assert graded['attempt']['graded_at'] is not None
+    
+    def test_quiz_statistics_aggregates(self, app, budget_data):
+        """Test the aggregated quiz statistics match the completed attempts and answers"""
+        with app.app_context():
+            quiz = Quiz.query.get(budget_data['quiz_id'])
+            attempts = QuizAttempt.query.filter_by(quiz_id=quiz.id, status='completed').all()
+            attempts[0].score = None
+            db.session.add(QuizAttempt(quiz_id=quiz.id, student_id=budget_data['student_id'],
+                                       attempt_number=2, score=100, status='in_progress'))
+            db.session.commit()
+            
+            result = QuizService.get_quiz_statistics(budget_data['teacher_id'], quiz.id)
+            
+            scores = [attempt.score for attempt in attempts if attempt.score is not None]
+            assert result['statistics'] == {
+                'total_attempts': len(attempts),
+                'average_score': pytest.approx(sum(scores) / len(scores)),
+                'highest_score': max(scores),
+                'lowest_score': min(scores),
+                'pass_rate': pytest.approx(sum(score >= quiz.passing_score for score in scores) / len(scores) * 100)
+            }
+            
+            for entry in result['question_statistics']:
+                answers = StudentAnswer.query.filter(
+                    StudentAnswer.question_id == entry['question']['id'],
+                    StudentAnswer.attempt_id.in_([attempt.id for attempt in attempts])
+                ).all()
+                assert entry['total_answers'] == len(answers) > 0
+                assert entry['correct_answers'] == sum(1 for answer in answers if answer.is_correct)
+            
+            empty_quiz_id = QuizService.create_quiz(budget_data['teacher_id'], {
+                'course_id': budget_data['course_id'], 'title': 'Unattempted'
+            })['quiz']['id']
+            empty = QuizService.get_quiz_statistics(budget_data['teacher_id'], empty_quiz_id)
+            assert empty['statistics'] == {
+                'total_attempts': 0, 'average_score': 0, 'highest_score': 0, 'lowest_score': 0, 'pass_rate': 0
+            }
+            assert empty['question_statistics'] == []
 
 
 class TestAssignmentService:
@@ -891,6 +1256,85 @@ class TestTeacherService:
             assert 'total_students' in result
             assert 'summary' in result
             assert result['total_students'] >= 1
+    
+    def test_item_analysis_statistics(self):
+        """Test difficulty, discrimination, alpha and distractors against hand-computed values"""
+        answers = [
+            (1, 10, 1, 100), (1, 11, 1, None), (1, 12, 1, None),
+            (2, 10, 1, 100), (2, 11, 1, None), (2, 12, 0, None),
+            (3, 10, 1, 100), (3, 11, 0, None),
+            (4, 10, 0, 101)
+        ]
+        result = item_analysis.analyze_items(
+            [1, 2, 3, 4], [(10, 1), (11, 1), (12, 1)], answers, [(100, 10), (101, 10), (102, 10)]
+        )
+        
+        assert result['summary']['cronbach_alpha'] == 0.75
+        assert result['summary']['mean_score'] == 1.5
+        assert [result['items'][q]['difficulty'] for q in (10, 11, 12)] == [0.75, 0.5, 0.25]
+        assert result['items'][10]['discrimination'] == 0.5222
+        assert result['items'][10]['alpha_if_deleted'] == 0.7273
+        assert result['items'][12]['answered'] == 2
+        assert result['options'][100] == {'count': 3, 'proportion': 0.75, 'discrimination': 0.5222}
+        assert result['options'][101]['discrimination'] == -0.5222
+        assert result['options'][102] == {'count': 0, 'proportion': 0.0, 'discrimination': None}
+        
+        empty = item_analysis.analyze_items([], [(10, 1)], [], [(100, 10)])
+        assert empty['summary']['cronbach_alpha'] is None
+        assert empty['items'][10]['difficulty'] is None
+    
+    def test_item_analysis_engines_agree(self, app, budget_data):
+        """Test the NumPy and pure Python item analysis give the same numbers"""
+        pytest.importorskip('numpy')
+        with app.app_context():
+            attempts = [attempt.id for attempt in QuizAttempt.query.filter_by(quiz_id=budget_data['quiz_id'])]
+            questions = [(question.id, question.points) for question in Question.query.filter_by(quiz_id=budget_data['quiz_id'])]
+            answers = db.session.query(
+                StudentAnswer.attempt_id, StudentAnswer.question_id,
+                StudentAnswer.points_earned, StudentAnswer.selected_option_id
+            ).filter(StudentAnswer.attempt_id.in_(attempts)).all()
+            options = [(option.id, option.question_id) for option in AnswerOption.query.filter(
+                AnswerOption.question_id.in_([question_id for question_id, _ in questions])
+            )]
+            
+            assert item_analysis._analyze_numpy(sorted(attempts), sorted(questions), answers, options) == \
+                item_analysis._analyze_python(sorted(attempts), sorted(questions), answers, options)
+    
+    def test_get_quiz_item_analysis(self, app, budget_data):
+        """Test the quiz item analysis of each student's best attempt"""
+        with app.app_context():
+            attempts = QuizAttempt.query.filter_by(quiz_id=budget_data['quiz_id'], status='completed').all()
+            
+            # A lower scoring retake must not count next to the student's best attempt
+            retake = QuizAttempt(quiz_id=budget_data['quiz_id'], student_id=attempts[0].student_id, attempt_number=2,
+                                 score=-1, status='completed', submitted_at=datetime.now())
+            db.session.add(retake)
+            db.session.flush()
+            for question in Question.query.filter_by(quiz_id=budget_data['quiz_id']):
+                db.session.add(StudentAnswer(attempt_id=retake.id, question_id=question.id, points_earned=0))
+            db.session.commit()
+            
+            with assert_max_queries(7, 'TeacherService.get_quiz_item_analysis'):
+                result = TeacherService.get_quiz_item_analysis(budget_data['teacher_id'], budget_data['quiz_id'])
+            
+            assert result['summary']['attempts'] == len({attempt.student_id for attempt in attempts})
+            assert result['summary']['items'] == len(result['items'])
+            
+            for item in result['items']:
+                answers = StudentAnswer.query.filter(
+                    StudentAnswer.question_id == item['question']['id'],
+                    StudentAnswer.attempt_id.in_([attempt.id for attempt in attempts])
+                ).all()
+                assert item['answered'] == len(answers)
+                earned = sum(answer.points_earned or 0 for answer in answers)
+                assert item['difficulty'] == round(earned / len(attempts) / item['question']['points'], 4)
+                
+                if item['question']['question_type'] == 'multiple_choice':
+                    assert sum(option['count'] for option in item['options']) == len(answers)
+                    assert sum(option['is_correct'] for option in item['options']) == 1
+            
+            with pytest.raises(PermissionException):
+                TeacherService.get_quiz_item_analysis(budget_data['student_id'], budget_data['quiz_id'])
 
 
 class TestAdminService:
@@ -1060,6 +1504,50 @@ class TestMessagingService:
             assert 'total' in result
             assert isinstance(result['conversations'], list)
     
+    def test_conversation_summaries_follow_sends_and_reads(self, app, sample_users, enrolled_student):
+        """Test the inbox is one paginated query over summaries kept in step with sends and reads"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            teacher_id = sample_users['teacher'].id
+            admin_id = sample_users['admin'].id
+            
+            def send(sender_id, recipient_id, subject):
+                data = {'recipient_id': recipient_id, 'subject': subject, 'content': f'{subject} body'}
+                return MessagingService.send_message(sender_id, data)['message_data']['id']
+            
+            send(student_id, teacher_id, 'Question')
+            send(student_id, teacher_id, 'Follow-up')
+            admin_message_id = send(admin_id, teacher_id, 'Notice')
+            send(teacher_id, student_id, 'Answer')
+            
+            with assert_max_queries(2, 'get_conversations'):
+                first_page = MessagingService.get_conversations(teacher_id, page=1, per_page=1)
+            assert (first_page['total'], first_page['pages']) == (2, 2)
+            conversation = first_page['conversations'][0]
+            assert conversation['partner']['id'] == student_id
+            assert conversation['latest_message']['subject'] == 'Answer'
+            assert conversation['latest_message']['recipient_id'] == student_id
+            assert conversation['unread_count'] == 2
+            
+            second_page = MessagingService.get_conversations(teacher_id, page=2, per_page=1)
+            assert [(c['partner']['id'], c['unread_count']) for c in second_page['conversations']] == [(admin_id, 1)]
+            assert MessagingService.get_conversations(teacher_id, page=3, per_page=1)['total'] == 2
+            
+            MessagingService.get_conversation_messages(teacher_id, student_id)
+            MessagingService.bulk_mark_as_read(teacher_id, [admin_message_id])
+            assert [c['unread_count'] for c in MessagingService.get_conversations(teacher_id)['conversations']] == [0, 0]
+            assert MessagingService.get_conversations(student_id)['conversations'][0]['unread_count'] == 1
+            
+            def snapshot():
+                return sorted(
+                    (row.user_low_id, row.user_high_id, row.last_message_id, row.low_unread_count, row.high_unread_count)
+                    for row in ConversationSummary.query
+                )
+            
+            maintained = snapshot()
+            assert MessagingService.rebuild_conversation_summaries() == {'conversations': 2}
+            assert snapshot() == maintained
+    
     def test_mark_message_as_read(self, app, sample_users, sample_course, enrolled_student):
         """Test marking message as read"""
         with app.app_context():
@@ -1079,31 +1567,56 @@ class TestMessagingService:
 class TestNotificationService:
     """Test NotificationService functionality"""
     
-    def test_create_notification_success(self, app, sample_users):
-        """Test notification creation"""
+    def test_deliver_notification_success(self, app, sample_users):
+        """Test a queued notification is delivered with its fields"""
         with app.app_context():
-            notification = NotificationService.create_notification(
-                recipient_id=sample_users['student'].id,
-                notification_type=NotificationType.MESSAGE,
-                title='Test Notification',
-                message='This is a test notification',
+            notification = deliver_notification(
+                [sample_users['student'].id],
+                'Test Notification',
+                'This is a test notification',
                 sender_id=sample_users['teacher'].id,
                 priority=NotificationPriority.NORMAL
             )
             
             assert notification.title == 'Test Notification'
             assert notification.recipient_id == sample_users['student'].id
+            assert notification.sender_id == sample_users['teacher'].id
             assert notification.type == NotificationType.MESSAGE.value
     
+    def test_dispatch_writes_notifications_in_bulk(self, app, sample_users):
+        """Test delivery writes multi-row INSERTs and one counter UPDATE in one commit, skipping duplicate recipients"""
+        from app.services import notification_service
+        
+        with app.app_context():
+            recipient_ids = [sample_users['student'].id, sample_users['teacher'].id, sample_users['admin'].id]
+            NotificationService.enqueue(
+                recipient_ids + recipient_ids[:1],
+                NotificationType.NEW_CONTENT,
+                'New Lesson Added',
+                'A lesson was added',
+                sender_id=sample_users['teacher'].id,
+                related_id=7
+            )
+            db.session.commit()
+            
+            with patch.object(notification_service, 'NOTIFICATION_INSERT_BATCH', 2):
+                with assert_max_queries(7, 'dispatch_outbox') as statements:
+                    assert NotificationService.dispatch_outbox() == 1
+            
+            inserts = [s for s in statements if s.startswith('INSERT INTO notifications')]
+            assert len(inserts) == 2
+            assert inserts[0].count('(?, ?') == 2
+            assert sum(s.startswith('UPDATE user_counters') for s in statements) == 1
+            
+            rows = Notification.query.filter_by(related_id=7).all()
+            assert sorted(n.recipient_id for n in rows) == sorted(recipient_ids)
+            assert all(n.title == 'New Lesson Added' and not n.is_read for n in rows)
+            assert NotificationService.enqueue([], NotificationType.NEW_CONTENT, 'Empty', 'None') is None
+    
     def test_get_user_notifications_success(self, app, sample_users):
         """Test user notifications retrieval"""
         with app.app_context():
-            NotificationService.create_notification(
-                recipient_id=sample_users['student'].id,
-                notification_type=NotificationType.MESSAGE,
-                title='Test Notification',
-                message='Test message'
-            )
+            deliver_notification([sample_users['student'].id], 'Test Notification', 'Test message')
             
             result = NotificationService.get_user_notifications(sample_users['student'].id)
             
@@ -1115,12 +1628,7 @@ class TestNotificationService:
     def test_mark_notification_as_read(self, app, sample_users):
         """Test marking notification as read"""
         with app.app_context():
-            notification = NotificationService.create_notification(
-                recipient_id=sample_users['student'].id,
-                notification_type=NotificationType.MESSAGE,
-                title='Read Test',
-                message='Mark this as read'
-            )
+            notification = deliver_notification([sample_users['student'].id], 'Read Test', 'Mark this as read')
             
             result = NotificationService.mark_as_read(sample_users['student'].id, notification.id)
             
@@ -1130,12 +1638,7 @@ class TestNotificationService:
         """Test marking all notifications as read"""
         with app.app_context():
             for i in range(3):
-                NotificationService.create_notification(
-                    recipient_id=sample_users['student'].id,
-                    notification_type=NotificationType.MESSAGE,
-                    title=f'Test {i}',
-                    message=f'Message {i}'
-                )
+                deliver_notification([sample_users['student'].id], f'Test {i}', f'Message {i}')
             
             result = NotificationService.mark_all_as_read(sample_users['student'].id)
             
@@ -1144,16 +1647,59 @@ class TestNotificationService:
     def test_delete_notification_success(self, app, sample_users):
         """Test notification deletion"""
         with app.app_context():
-            notification = NotificationService.create_notification(
-                recipient_id=sample_users['student'].id,
-                notification_type=NotificationType.MESSAGE,
-                title='Delete Test',
-                message='Delete this notification'
-            )
+            notification = deliver_notification([sample_users['student'].id], 'Delete Test', 'Delete this notification')
             
             result = NotificationService.delete_notification(sample_users['student'].id, notification.id)
             
             assert result['message'] == 'Notification deleted'
+    
+    def test_bulk_read_and_delete_are_set_based(self, app, client, sample_users):
+        """Test marking read and deleting many notifications or messages takes a fixed number of statements"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            teacher_id = sample_users['teacher'].id
+            NotificationService.enqueue([teacher_id], NotificationType.MESSAGE, 'Other', 'Not yours')
+            for index in range(30):
+                NotificationService.enqueue([student_id], NotificationType.MESSAGE, f'N{index}', 'Unread')
+            db.session.commit()
+            NotificationService.dispatch_outbox()
+            ids = [n.id for n in Notification.query.filter_by(recipient_id=student_id).order_by(Notification.id)]
+            other_id = Notification.query.filter_by(recipient_id=teacher_id).one().id
+            
+            with assert_max_queries(2, 'bulk_mark_as_read') as statements:
+                result = NotificationService.bulk_mark_as_read(student_id, ids[:10] + [other_id])
+            assert result['updated'] == 10
+            assert statements[0].startswith('UPDATE notifications')
+            
+            with assert_max_queries(3, 'bulk_delete_notifications'):
+                result = NotificationService.bulk_delete_notifications(student_id, ids[5:15] + [other_id])
+            assert result['message'] == '10 notifications deleted'
+            assert NotificationService.get_unread_count(student_id) == 15
+            
+            with assert_max_queries(2, 'mark_all_as_read'):
+                assert NotificationService.mark_all_as_read(student_id)['message'] == '15 notifications marked as read'
+            assert NotificationService.get_unread_count(student_id) == 0
+            assert NotificationService.get_unread_count(teacher_id) == 1
+            assert Notification.query.get(other_id).is_read is False
+            
+            with pytest.raises(ValidationException):
+                NotificationService.bulk_mark_as_read(student_id, ['1'])
+            
+            for index in range(3):
+                db.session.add(Message(sender_id=teacher_id, recipient_id=student_id, subject=f'M{index}', content='Hi'))
+            db.session.commit()
+            CounterService.reconcile_unread_counts()
+            MessagingService.rebuild_conversation_summaries()
+            message_ids = [m.id for m in Message.query.filter_by(recipient_id=student_id)]
+            headers = TestTokenClaims.login('student', 'Student123!')
+        
+        response = client.post('/api/messages/bulk-read', json={'message_ids': message_ids[:2]}, headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['updated'] == 2
+        assert client.get('/api/messages/unread-count', headers=headers).get_json() == {'unread_count': 1}
+        
+        response = client.post('/api/notifications/bulk-read', json={'notification_ids': []}, headers=headers)
+        assert response.status_code == 400
 
 
 class TestAchievementService:
@@ -1307,6 +1853,1380 @@ class TestCertificateService:
                 CertificateService.verify_certificate('INVALID_CODE')
 
 
+class TestProgressService:
+    """Test ProgressService functionality"""
+    
+    def test_compute_progress_batch(self, app, sample_users, sample_course, enrolled_student):
+        """Test set-based progress for several enrollments at once"""
+        with app.app_context():
+            enrollment_id = Enrollment.query.filter_by(student_id=sample_users['student'].id).first().id
+            other_enrollment = Enrollment(
+                student_id=sample_users['student2'].id,
+                course_id=sample_course.id,
+                status='active'
+            )
+            db.session.add(other_enrollment)
+            
+            lessons = [
+                Lesson(course_id=sample_course.id, title=f'Lesson {i}', order_number=i)
+                for i in range(1, 3)
+            ]
+            quiz = Quiz(course_id=sample_course.id, title='Quiz', passing_score=60)
+            assignment = Assignment(course_id=sample_course.id, title='Assignment')
+            db.session.add_all(lessons + [quiz, assignment])
+            db.session.commit()
+            
+            student_id = sample_users['student'].id
+            db.session.add_all([
+                LessonProgress(student_id=student_id, lesson_id=lessons[0].id, completed_at=datetime.now()),
+                LessonProgress(student_id=student_id, lesson_id=lessons[1].id),
+                QuizAttempt(quiz_id=quiz.id, student_id=student_id, attempt_number=1, score=40, status='completed'),
+                QuizAttempt(quiz_id=quiz.id, student_id=student_id, attempt_number=2, score=80, status='completed'),
+                QuizAttempt(quiz_id=quiz.id, student_id=sample_users['student2'].id, attempt_number=1, score=90, status='in_progress')
+            ])
+            db.session.commit()
+            
+            result = ProgressService.compute_progress([enrollment_id, other_enrollment.id])
+            
+            assert result[enrollment_id] == 50.0
+            assert result[other_enrollment.id] == 0.0
+            assert Enrollment.query.get(enrollment_id).calculate_progress() == 50.0
+    
+    def test_compute_progress_details(self, app, sample_users, sample_course, enrolled_student):
+        """Test component counts returned with the progress percentage"""
+        with app.app_context():
+            enrollment_id = Enrollment.query.filter_by(student_id=sample_users['student'].id).first().id
+            assignment = Assignment(course_id=sample_course.id, title='Assignment')
+            db.session.add(assignment)
+            db.session.commit()
+            db.session.add(AssignmentSubmission(
+                assignment_id=assignment.id,
+                student_id=sample_users['student'].id,
+                submission_text='Done',
+                status='graded'
+            ))
+            db.session.commit()
+            
+            details = ProgressService.compute_progress_details([enrollment_id])[enrollment_id]
+            
+            assert details['assignments_submitted'] == 1
+            assert details['assignments_total'] == 1
+            assert details['lessons_total'] == 0
+            assert details['percentage'] == 100.0
+    
+    def test_compute_progress_empty_course(self, app, sample_users, sample_course, enrolled_student):
+        """Test that a course without components counts as complete"""
+        with app.app_context():
+            enrollment_id = Enrollment.query.filter_by(student_id=sample_users['student'].id).first().id
+            assert ProgressService.compute_progress([enrollment_id]) == {enrollment_id: 100.0}
+            assert ProgressService.compute_progress([]) == {}
+
+
+@pytest.fixture
+def hot_path_data(app, sample_users, sample_course, enrolled_student):
+    """Create one row in each hot table so every service query path runs"""
+    with app.app_context():
+        student_id = sample_users['student'].id
+        teacher_id = sample_users['teacher'].id
+        
+        lesson = Lesson(course_id=sample_course.id, title='Lesson', order_number=1)
+        quiz = Quiz(course_id=sample_course.id, title='Quiz')
+        assignment = Assignment(course_id=sample_course.id, title='Assignment')
+        db.session.add_all([lesson, quiz, assignment])
+        db.session.flush()
+        
+        db.session.add_all([
+            LessonProgress(student_id=student_id, lesson_id=lesson.id, completed_at=datetime.now()),
+            QuizAttempt(quiz_id=quiz.id, student_id=student_id, attempt_number=1, score=80, status='completed'),
+            AssignmentSubmission(assignment_id=assignment.id, student_id=student_id, status='submitted'),
+            Message(sender_id=teacher_id, recipient_id=student_id, subject='Hello', content='Welcome'),
+            Notification(recipient_id=student_id, type='message', title='New message', message='Hello')
+        ])
+        db.session.commit()
+        
+        return {'quiz_id': quiz.id}
+
+
+class TestKeysetPagination:
+    """Test cursor pagination of the notification, message and user feeds"""
+    
+    def test_cursor_walks_feed_without_gaps(self, app, client, sample_users):
+        """Test pages follow (created_at, id) newest first across ties, and the total is optional"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            same_time = datetime.now() - timedelta(hours=1)
+            for index in range(7):
+                db.session.add(Notification(
+                    recipient_id=student_id, type='message', title=f'N{index}', message='Hi',
+                    created_at=same_time if index < 4 else same_time + timedelta(minutes=index)
+                ))
+            db.session.commit()
+            expected = [n.id for n in Notification.query.filter_by(recipient_id=student_id).order_by(
+                Notification.created_at.desc(), Notification.id.desc())]
+            
+            seen = []
+            cursor = ''
+            while True:
+                page = NotificationService.get_user_notifications(student_id, per_page=3, cursor=cursor)
+                seen.extend(n['id'] for n in page['notifications'])
+                assert page['total'] is None
+                if not page['has_more']:
+                    assert page['next_cursor'] is None
+                    break
+                cursor = page['next_cursor']
+            assert seen == expected
+            
+            page = NotificationService.get_user_notifications(student_id, per_page=3, cursor=cursor, with_total=True)
+            assert page['total'] == 7
+            
+            for index in range(2):
+                legacy = User(username=f'legacy{index}', email=f'legacy{index}@test.com',
+                              full_name=f'Legacy {index}', role=UserRole.STUDENT)
+                legacy.set_password('password123')
+                db.session.add(legacy)
+            db.session.flush()
+            User.query.filter(User.username.like('legacy%')).update({'created_at': None}, synchronize_session=False)
+            db.session.commit()
+            
+            with assert_max_queries(2, 'get_users by cursor'):
+                users = AdminService.get_users(per_page=2, cursor='')
+            seen = [u['id'] for u in users['users']]
+            while users['has_more']:
+                users = AdminService.get_users(per_page=2, cursor=users['next_cursor'])
+                seen += [u['id'] for u in users['users']]
+            assert seen == [user.id for user in User.query.order_by(User.id.desc())]
+            
+            with pytest.raises(ValidationException):
+                MessagingService.get_messages(student_id, cursor='not-a-cursor')
+            headers = TestTokenClaims.login('student', 'Student123!')
+        
+        response = client.get(f'/api/notifications/?per_page=3&cursor={cursor}', headers=headers)
+        assert response.status_code == 200
+        assert [n['id'] for n in response.get_json()['notifications']] == expected[6:]
+        assert client.get('/api/messages/?cursor=e30', headers=headers).status_code == 400
+
+
+class TestQueryPlans:
+    """Test that hot service queries are served by indexes (EXPLAIN QUERY PLAN)"""
+    
+    def test_notification_queries_use_indexes(self, app, sample_users, hot_path_data):
+        """Test notification list and unread count queries"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            with capture_statements() as statements:
+                NotificationService.get_user_notifications(student_id)
+                NotificationService.get_user_notifications(student_id, unread_only=True)
+                first = NotificationService.get_user_notifications(student_id, per_page=1, cursor='')
+                NotificationService.get_user_notifications(student_id, per_page=1, cursor=first['next_cursor'])
+            
+            assert full_table_scans(statements) == []
+    
+    def test_message_queries_use_indexes(self, app, sample_users, hot_path_data):
+        """Test inbox, outbox and conversation queries"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            teacher_id = sample_users['teacher'].id
+            with capture_statements() as statements:
+                MessagingService.get_messages(student_id, 'received')
+                MessagingService.get_messages(teacher_id, 'sent')
+                MessagingService.get_conversations(student_id)
+                MessagingService.get_conversation_messages(student_id, teacher_id)
+                first = MessagingService.get_messages(student_id, 'received', per_page=1, cursor='')
+                MessagingService.get_messages(student_id, 'received', per_page=1, cursor=first['next_cursor'])
+            
+            assert full_table_scans(statements) == []
+    
+    def test_progress_queries_use_indexes(self, app, sample_users, sample_course, hot_path_data):
+        """Test quiz attempt, lesson progress and enrollment queries behind progress reports"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            teacher_id = sample_users['teacher'].id
+            with capture_statements() as statements:
+                QuizService.get_quiz(student_id, hot_path_data['quiz_id'])
+                QuizService.get_quiz_statistics(teacher_id, hot_path_data['quiz_id'])
+                StudentService.get_progress(student_id)
+                TeacherService.get_student_progress_report(teacher_id, sample_course.id)
+            
+            assert full_table_scans(statements) == []
+    
+    def test_course_management_queries_use_indexes(self, app, sample_users, sample_course, hot_path_data):
+        """Test enrollment, lesson engagement and pending submission queries"""
+        with app.app_context():
+            teacher_id = sample_users['teacher'].id
+            with capture_statements() as statements:
+                CourseService.get_course_students(teacher_id, sample_course.id)
+                LessonService.get_course_lessons(teacher_id, sample_course.id)
+                TeacherService.get_pending_submissions(teacher_id)
+            
+            assert full_table_scans(statements) == []
+
+
+@pytest.fixture
+def crowded_inbox(app, sample_users, sample_course):
+    """Create a page worth of messages, notifications and certificate requests from distinct users"""
+    with app.app_context():
+        student_id = sample_users['student'].id
+        admin_id = sample_users['admin'].id
+        
+        senders = [
+            User(username=f'sender{i}', email=f'sender{i}@test.com', full_name=f'Sender {i}', role=UserRole.STUDENT)
+            for i in range(15)
+        ]
+        for sender in senders:
+            sender.set_password('password123')
+        db.session.add_all(senders)
+        db.session.flush()
+        
+        for sender in senders:
+            db.session.add_all([
+                Message(sender_id=sender.id, recipient_id=student_id, subject='Hi', content='Hello'),
+                Message(sender_id=student_id, recipient_id=sender.id, subject='Re: Hi', content='Hello back'),
+                Notification(recipient_id=student_id, sender_id=sender.id, type='message', title='New message', message='Hello'),
+                CertificateRequest(student_id=sender.id, course_id=sample_course.id, status='pending'),
+            ])
+        db.session.add(CertificateRequest(
+            student_id=student_id, course_id=sample_course.id, status='approved',
+            reviewed_by=admin_id, reviewed_at=datetime.now()
+        ))
+        db.session.commit()
+
+
+class TestSerializationProfiles:
+    """Test that list endpoints load related rows eagerly instead of per item"""
+    
+    def test_notification_page_query_count(self, app, sample_users, crowded_inbox):
+        """Test that a page of notifications is fetched in at most three queries"""
+        with app.app_context():
+            with capture_statements() as statements:
+                result = NotificationService.get_user_notifications(sample_users['student'].id, per_page=15)
+            
+            assert len(result['notifications']) == 15
+            assert all(n['sender_name'] for n in result['notifications'])
+            assert len(statements) <= 3
+    
+    def test_message_page_query_count(self, app, sample_users, crowded_inbox):
+        """Test that message pages do not issue a query per message"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            with capture_statements() as statements:
+                result = MessagingService.get_messages(student_id, 'sent', per_page=15)
+            
+            assert len(result['messages']) == 15
+            assert all(m['recipient_name'] for m in result['messages'])
+            assert len(statements) <= 3
+            
+            counts = []
+            for per_page in (2, 20):
+                db.session.expunge_all()
+                with capture_statements() as statements:
+                    MessagingService.get_messages(student_id, 'received', per_page=per_page)
+                counts.append(len(statements))
+            assert counts[0] == counts[1]
+    
+    def test_certificate_requests_query_count(self, app, sample_users, crowded_inbox):
+        """Test that the admin certificate request listing is fetched in at most three queries"""
+        with app.app_context():
+            with capture_statements() as statements:
+                result = CertificateService.get_certificate_requests(sample_users['admin'].id)
+            
+            assert result['total_pending'] == 15
+            assert result['recent_reviewed'][0]['reviewer_name'] == 'Test Admin'
+            assert len(statements) <= 3
+    
+    def test_enrollment_profiles_keep_payload_shape(self, app, sample_users, sample_course, enrolled_student):
+        """Test that enrollment listings keep their nested course and student data"""
+        with app.app_context():
+            students = CourseService.get_course_students(sample_users['teacher'].id, sample_course.id)
+            assert students['students'][0]['username'] == sample_users['student'].username
+            assert students['students'][0]['enrollment']['course_id'] == sample_course.id
+            
+            enrolled = CourseService.get_enrolled_courses(sample_users['student'].id, status='all')
+            assert enrolled['enrollments'][0]['course']['title'] == sample_course.title
+
+
+class TestSQLInstrumentation:
+    """Test per-request SQL instrumentation and the admin perf endpoint"""
+    
+    @staticmethod
+    def auth_headers(user_id):
+        from flask_jwt_extended import create_access_token
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+    
+    def test_request_headers(self, app, client, sample_users, hot_path_data):
+        """Test that API responses carry the query count and DB time"""
+        with app.app_context():
+            headers = self.auth_headers(sample_users['student'].id)
+        
+        response = client.get('/api/notifications/', headers=headers)
+        
+        assert response.status_code == 200
+        assert int(response.headers['X-DB-Queries']) >= 1
+        assert float(response.headers['X-DB-Time']) >= 0
+    
+    def test_perf_requests_endpoint(self, app, client, sample_users, hot_path_data):
+        """Test that recent requests are aggregated per blueprint for admins only"""
+        with app.app_context():
+            student_headers = self.auth_headers(sample_users['student'].id)
+            admin_headers = self.auth_headers(sample_users['admin'].id)
+        
+        client.get('/api/notifications/', headers=student_headers)
+        assert client.get('/api/admin/perf/requests', headers=student_headers).status_code == 403
+        
+        response = client.get('/api/admin/perf/requests', headers=admin_headers)
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        notification_requests = [r for r in data['requests'] if r['blueprint'] == 'notifications']
+        assert notification_requests[0]['query_count'] >= 1
+        assert notification_requests[0]['slowest']
+        assert data['blueprints']['notifications']['requests'] == 1
+    
+    def test_failed_statement_pops_start_time(self, app):
+        """Test a statement that raises does not leave its start time on the connection"""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+        with app.app_context():
+            with db.engine.connect() as connection:
+                with pytest.raises(OperationalError):
+                    connection.execute(text('SELECT * FROM missing_table'))
+                connection.execute(text('SELECT 1'))
+                assert connection.info.get('query_start_time') == []
+
+
+class TestTokenClaims:
+    """Test role claims in JWTs, the request-scoped user and token revocation"""
+    
+    @staticmethod
+    def login(username, password):
+        return {'Authorization': f"Bearer {AuthService.login_user({'username': username, 'password': password})['access_token']}"}
+    
+    def test_login_embeds_role_claims(self, app, sample_users):
+        """Test login tokens carry the role, active flag and token version"""
+        from flask_jwt_extended import decode_token
+        
+        with app.app_context():
+            result = AuthService.login_user({'username': 'teacher', 'password': 'Teacher123!'})
+            
+            for token in (result['access_token'], result['refresh_token']):
+                claims = decode_token(token)
+                assert claims['role'] == 'teacher'
+                assert claims['active'] is True
+                assert claims['ver'] == 0
+    
+    def test_decorators_authorize_from_claims(self, app, client, sample_users, hot_path_data):
+        """Test role checks need no user query and services reuse the request's user"""
+        with app.app_context():
+            student_headers = self.login('student', 'Student123!')
+            teacher_headers = self.login('teacher', 'Teacher123!')
+        
+        assert client.get('/api/admin/users', headers=student_headers).status_code == 403
+        assert client.get('/api/student/dashboard', headers=teacher_headers).status_code == 403
+        
+        with app.app_context():
+            with capture_statements() as statements:
+                response = client.get('/api/student/achievements', headers=student_headers)
+            user_queries = [s for s, _ in statements if re.search(r'FROM users\s+WHERE users.id', s)]
+        
+        assert response.status_code == 200
+        assert len(user_queries) == 1
+    
+    def test_deactivation_revokes_existing_tokens(self, app, client, sample_users):
+        """Test toggling a user inactive rejects their tokens on the next request"""
+        with app.app_context():
+            admin_id = sample_users['admin'].id
+            student_id = sample_users['student'].id
+            headers = self.login('student', 'Student123!')
+        
+        assert client.get('/api/student/dashboard', headers=headers).status_code == 200
+        
+        with app.app_context():
+            AdminService.toggle_user_active(admin_id, student_id)
+        
+        assert client.get('/api/student/dashboard', headers=headers).status_code == 401
+        
+        with app.app_context():
+            AdminService.toggle_user_active(admin_id, student_id)
+            new_headers = self.login('student', 'Student123!')
+        
+        assert client.get('/api/student/dashboard', headers=headers).status_code == 401
+        assert client.get('/api/student/dashboard', headers=new_headers).status_code == 200
+
+
+class TestFrontendRoutes:
+    """Test the server-rendered pages call the services in-process with the session's identity"""
+    
+    @pytest.fixture
+    def frontend_client(self, app):
+        from app.routes import frontend
+        app.register_blueprint(frontend.bp)
+        return app.test_client()
+    
+    def test_admin_pages_use_session_identity(self, app, frontend_client, sample_users):
+        """Test login stores the session and admin pages and actions work without an HTTP loopback"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+        
+        response = frontend_client.post('/login', data={'username': 'admin', 'password': 'Admin123!'})
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith('/admin/dashboard')
+        
+        response = frontend_client.get('/admin/dashboard')
+        assert response.status_code == 200
+        assert b'Failed to load dashboard data' not in response.data
+        
+        response = frontend_client.get(f'/admin/users/{student_id}/details')
+        assert response.status_code == 200
+        assert response.get_json()['data']['username'] == 'student'
+        
+        response = frontend_client.post(f'/admin/users/{student_id}/toggle-active')
+        assert response.status_code == 200
+        assert response.get_json()['message'] == 'User deactivated successfully'
+        
+        response = frontend_client.get('/admin/users/export?search=student')
+        assert response.status_code == 200
+        assert response.headers['Content-type'].startswith('text/csv')
+        assert b'student@test.com' in response.data
+    
+    def test_revoked_session_token_is_rejected(self, app, frontend_client, sample_users):
+        """Test a session whose token was revoked gets the API's error instead of the data"""
+        from app.utils.decorators import invalidate_user_tokens
+        
+        frontend_client.post('/login', data={'username': 'admin', 'password': 'Admin123!'})
+        
+        with app.app_context():
+            student_id = sample_users['student'].id
+            invalidate_user_tokens(db.session.get(User, sample_users['admin'].id))
+            db.session.commit()
+        
+        response = frontend_client.post(f'/admin/users/{student_id}/toggle-active')
+        assert response.status_code == 401
+        assert response.get_json() == {'error': 'Failed to toggle user status'}
+        
+        response = frontend_client.post('/login', data={'username': 'admin', 'password': 'wrong-password'})
+        assert response.status_code == 200
+        assert b'Invalid username or password' in response.data
+
+
+class TestNotificationStream:
+    """Test the notification pub/sub hub and the Server-Sent Events stream"""
+    
+    def test_hub_fans_out_and_drops_slow_streams(self):
+        """Test events reach every stream of the recipient only and full queues close the stream"""
+        from app.utils.notification_hub import NotificationHub
+        
+        hub = NotificationHub()
+        hub.max_queue = 2
+        first = hub.subscribe(1)
+        second = hub.subscribe(1)
+        other = hub.subscribe(2)
+        
+        hub.publish(1, 'unread_count', {'unread_count': 3})
+        assert first.events.get_nowait() == ('unread_count', {'unread_count': 3})
+        assert second.events.get_nowait() == ('unread_count', {'unread_count': 3})
+        assert other.events.empty()
+        
+        for count in range(3):
+            hub.publish(2, 'unread_count', {'unread_count': count})
+        assert other.closed
+        assert not hub.has_subscribers(2)
+        
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        assert not hub.has_subscribers(1)
+    
+    def test_stream_pushes_created_notifications(self, app, client, sample_users):
+        """Test the stream sends the unread count, then new notifications and count changes"""
+        import json
+        
+        with app.app_context():
+            student_id = sample_users['student'].id
+            access_token = AuthService.login_user({'username': 'student', 'password': 'Student123!'})['access_token']
+            deliver_notification([student_id], 'Earlier', 'Already there')
+        
+        token = client.post('/api/notifications/stream-token',
+                            headers={'Authorization': f'Bearer {access_token}'}).get_json()['token']
+        hub = app.extensions['notification_hub']
+        response = client.get(f'/api/notifications/stream?jwt={token}', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert hub.has_subscribers(student_id)
+        
+        def next_event(chunks):
+            event, data = next(chunks).decode().strip().split('\n')
+            return event[len('event: '):], json.loads(data[len('data: '):])
+        
+        chunks = iter(response.response)
+        assert next_event(chunks) == ('unread_count', {'unread_count': 1})
+        
+        with app.app_context():
+            notification = deliver_notification(
+                [student_id], 'New lesson', 'A lesson was added', NotificationType.NEW_CONTENT
+            )
+            notification_id = notification.id
+        
+        event, data = next_event(chunks)
+        assert event == 'notification'
+        assert data['id'] == notification_id
+        assert data['title'] == 'New lesson'
+        assert next_event(chunks) == ('unread_count', {'unread_count': 2})
+        
+        with app.app_context():
+            NotificationService.mark_all_as_read(student_id)
+        assert next_event(chunks) == ('unread_count', {'unread_count': 0})
+        
+        with app.app_context():
+            deliver_notification(
+                [student_id, sample_users['teacher'].id], 'New quiz', 'A quiz was added', NotificationType.NEW_CONTENT
+            )
+        event, data = next_event(chunks)
+        assert (event, data['title'], data['recipient_id']) == ('notification', 'New quiz', student_id)
+        assert next_event(chunks) == ('unread_count', {'unread_count': 1})
+        
+        response.close()
+        assert not hub.has_subscribers(student_id)
+        
+        assert client.get('/api/notifications/stream').status_code == 401
+    
+    def test_stream_accepts_only_stream_tokens_in_the_url(self, app, client, sample_users):
+        """Test access tokens are refused in the query string and stream tokens everywhere but the stream"""
+        from app.utils.decorators import invalidate_user_tokens
+        
+        with app.app_context():
+            access_token = AuthService.login_user({'username': 'student', 'password': 'Student123!'})['access_token']
+        headers = {'Authorization': f'Bearer {access_token}'}
+        
+        response = client.post('/api/notifications/stream-token', headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['expires_in'] == 60
+        token = response.get_json()['token']
+        
+        response = client.get(f'/api/notifications/stream?jwt={access_token}')
+        assert response.status_code == 401
+        
+        assert client.get('/api/notifications/unread-count', headers={'Authorization': f'Bearer {token}'}).status_code == 403
+        assert client.get(f'/api/notifications/unread-count?jwt={token}').status_code == 401
+        assert client.post('/api/notifications/stream-token',
+                           headers={'Authorization': f'Bearer {token}'}).status_code == 403
+        
+        response = client.get(f'/api/notifications/stream?jwt={token}', buffered=False)
+        assert response.status_code == 200
+        response.close()
+        
+        with app.app_context():
+            invalidate_user_tokens(db.session.get(User, sample_users['student'].id))
+            db.session.commit()
+        assert client.get(f'/api/notifications/stream?jwt={token}').status_code == 401
+
+    
+    def test_publish_reads_delivered_rows_back_by_id(self, app, sample_users):
+        """Test delivered rows are published even if the database rounds created_at, and only they are"""
+        created_at = datetime(2026, 1, 1, 12, 0, 0, 600000)
+        stored_at = datetime(2026, 1, 1, 12, 0, 1)
+        insert_rows = NotificationService._insert_rows
+        
+        def insert_rows_to_the_second(rows):
+            # MySQL DATETIME columns have no fractional seconds and round the value
+            insert_rows(rows)
+            Notification.query.filter(Notification.created_at == created_at).update(
+                {'created_at': stored_at}, synchronize_session=False
+            )
+        
+        hub = app.extensions['notification_hub']
+        with app.app_context():
+            student_id = sample_users['student'].id
+            db.session.add(Notification(recipient_id=student_id, type='message', title='Same time',
+                                        message='Already there', created_at=created_at))
+            CounterService.increment_unread('notifications', [student_id])
+            db.session.commit()
+            
+            subscription = hub.subscribe(student_id)
+            try:
+                entry = NotificationService.enqueue(
+                    [student_id, sample_users['teacher'].id], NotificationType.NEW_CONTENT, 'Bulk', 'Inserted'
+                )
+                entry.created_at = created_at
+                db.session.commit()
+                with patch.object(NotificationService, '_insert_rows', insert_rows_to_the_second):
+                    NotificationService.dispatch_outbox()
+                
+                event, data = subscription.events.get_nowait()
+                assert (event, data['title'], data['created_at']) == ('notification', 'Bulk', stored_at.isoformat())
+                assert subscription.events.get_nowait() == ('unread_count', {'unread_count': 2})
+                assert subscription.events.empty()
+            finally:
+                hub.unsubscribe(subscription)
+
+
+class TestNotificationOutbox:
+    """Test queued notifications and their delivery by the dispatcher"""
+    
+    def test_enqueue_commits_with_caller_and_flush_delivers(self, app, sample_users, sample_course):
+        """Test entries are written with the caller's transaction and turned into notifications on flush"""
+        dispatcher = app.extensions['notification_dispatcher']
+        
+        with app.app_context():
+            student_id = sample_users['student'].id
+            teacher_id = sample_users['teacher'].id
+            
+            NotificationService.enqueue([student_id], NotificationType.MESSAGE, 'Dropped', 'Rolled back')
+            db.session.rollback()
+            assert NotificationOutbox.query.count() == 0
+            
+            CourseService.enroll_student(student_id, sample_course.id)
+            NotificationService.enqueue([student_id, teacher_id, student_id], NotificationType.NEW_CONTENT, 'Queued', 'Later')
+            db.session.commit()
+            
+            assert Notification.query.count() == 0
+            assert NotificationOutbox.query.count() == 2
+            
+            assert dispatcher.flush() == 2
+            assert NotificationOutbox.query.count() == 0
+            
+            enrollment = Notification.query.filter_by(type=NotificationType.ENROLLMENT.value).one()
+            assert enrollment.recipient_id == teacher_id
+            assert 'Test Student' in enrollment.message
+            assert sorted(n.recipient_id for n in Notification.query.filter_by(title='Queued')) == sorted([student_id, teacher_id])
+    
+    def test_failed_entries_retry_then_dead_letter(self, app, sample_users):
+        """Test a failing entry is retried with backoff, marked dead and does not block the rest of its batch"""
+        dispatcher = app.extensions['notification_dispatcher']
+        dispatcher.max_attempts = 2
+        insert_rows = NotificationService._insert_rows
+        
+        def fail_bad_rows(rows):
+            if any(row['title'] == 'Bad' for row in rows):
+                raise RuntimeError('insert failed')
+            insert_rows(rows)
+        
+        with app.app_context():
+            student_id = sample_users['student'].id
+            NotificationService.enqueue([student_id], NotificationType.MESSAGE, 'Bad', 'Fails')
+            NotificationService.enqueue([student_id], NotificationType.MESSAGE, 'Good', 'Works')
+            db.session.commit()
+            
+            with patch.object(NotificationService, '_insert_rows', side_effect=fail_bad_rows):
+                assert dispatcher.flush() == 2
+                assert Notification.query.filter_by(title='Good').count() == 1
+                
+                entry = NotificationOutbox.query.one()
+                assert (entry.status, entry.attempts) == ('pending', 1)
+                assert entry.last_error == 'RuntimeError: insert failed'
+                assert entry.available_at > datetime.now()
+                assert dispatcher.flush() == 0
+                
+                assert dispatcher.flush(now=datetime.now() + timedelta(hours=1)) == 1
+                entry = NotificationOutbox.query.one()
+                assert (entry.status, entry.attempts) == ('dead', 2)
+                assert dispatcher.flush(now=datetime.now() + timedelta(days=1)) == 0
+            
+            assert NotificationService.requeue_dead_notifications() == 1
+            assert dispatcher.flush() == 1
+            assert NotificationOutbox.query.count() == 0
+            assert Notification.query.filter_by(title='Bad').count() == 1
+    
+    def test_repeated_events_coalesce_into_one_row(self, app, sample_users):
+        """Test submissions for the same object merge into one counted row until read or out of the window"""
+        dispatcher = app.extensions['notification_dispatcher']
+        
+        def submit(related_id=7):
+            NotificationService.enqueue(
+                [teacher_id], NotificationType.ASSIGNMENT_SUBMISSION, 'New Assignment Submission', 'One submission',
+                sender_id=student_id, related_id=related_id, summary="{count} new submissions for 'Essay'"
+            )
+            db.session.commit()
+        
+        with app.app_context():
+            teacher_id = sample_users['teacher'].id
+            student_id = sample_users['student'].id
+            
+            submit()
+            submit()
+            submit(related_id=8)
+            dispatcher.flush()
+            merged = Notification.query.filter_by(related_id=7).one()
+            assert (merged.count, merged.title) == (2, 'New Assignment Submissions')
+            assert merged.message == "2 new submissions for 'Essay'"
+            assert Notification.query.filter_by(related_id=8).one().message == 'One submission'
+            
+            submit()
+            with assert_max_queries(7, 'coalesced delivery') as statements:
+                dispatcher.flush()
+            assert not any(statement.startswith('INSERT INTO notifications ') for statement in statements)
+            db.session.refresh(merged)
+            assert (merged.count, merged.message) == (3, "3 new submissions for 'Essay'")
+            assert NotificationService.get_unread_count(teacher_id) == 2
+            
+            NotificationService.mark_as_read(teacher_id, merged.id)
+            submit()
+            dispatcher.flush()
+            fresh = Notification.query.filter_by(related_id=7, is_read=False).one()
+            assert (fresh.count, fresh.message) == (1, 'One submission')
+            
+            fresh.created_at = datetime.now() - timedelta(hours=2)
+            db.session.commit()
+            submit()
+            dispatcher.flush()
+            assert Notification.query.filter_by(related_id=7, is_read=False).count() == 2
+            assert NotificationService.get_unread_count(teacher_id) == 3
+            assert CounterService.reconcile_unread_counts() == {'created': 0, 'corrected': 0}
+
+
+
+class TestUnreadCounters:
+    """Test the per-user unread counters behind the notification and message badges"""
+    
+    def test_counters_follow_writes_and_reads(self, app, sample_users, sample_course):
+        """Test counters move with created, read and deleted rows and are read with one query"""
+        dispatcher = app.extensions['notification_dispatcher']
+        
+        with app.app_context():
+            student_id = sample_users['student'].id
+            teacher_id = sample_users['teacher'].id
+            
+            first = deliver_notification([student_id], 'One', 'First').id
+            second = deliver_notification([student_id], 'Two', 'Second').id
+            deliver_notification([student_id, teacher_id], 'Three', 'Third', NotificationType.NEW_CONTENT)
+            assert NotificationService.get_unread_count(student_id) == 3
+            
+            NotificationService.mark_as_read(student_id, first)
+            NotificationService.mark_as_read(student_id, first)
+            NotificationService.delete_notification(student_id, first)
+            NotificationService.delete_notification(student_id, second)
+            assert NotificationService.get_unread_count(student_id) == 1
+            
+            NotificationService.mark_all_as_read(student_id)
+            assert NotificationService.get_unread_count(student_id) == 0
+            assert NotificationService.get_unread_count(teacher_id) == 1
+            
+            CourseService.enroll_student(student_id, sample_course.id)
+            for subject in ('Question', 'Follow-up'):
+                MessagingService.send_message(student_id, {'recipient_id': teacher_id, 'subject': subject, 'content': 'Hi'})
+            dispatcher.flush()
+            assert MessagingService.get_unread_count(teacher_id) == 2
+            assert NotificationService.get_unread_count(teacher_id) == 4
+            
+            MessagingService.get_conversation_messages(teacher_id, student_id)
+            
+            with assert_max_queries(1, 'get_unread_count') as statements:
+                assert MessagingService.get_unread_count(teacher_id) == 0
+            assert 'user_counters' in statements[0]
+            
+            assert CounterService.reconcile_unread_counts() == {'created': 0, 'corrected': 0}
+    
+    def test_reconcile_fixes_drift(self, app, client, sample_users):
+        """Test reconciliation creates missing rows and corrects drifted ones"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            teacher_id = sample_users['teacher'].id
+            
+            db.session.add(Notification(recipient_id=student_id, type='message', title='Raw', message='Unseen'))
+            db.session.add(Message(sender_id=teacher_id, recipient_id=student_id, subject='Raw', content='Unseen'))
+            db.session.query(UserCounter).filter_by(user_id=teacher_id).delete()
+            db.session.commit()
+            
+            assert NotificationService.get_unread_count(student_id) == 0
+            
+            assert CounterService.reconcile_unread_counts() == {'created': 1, 'corrected': 1}
+            counter = db.session.get(UserCounter, student_id)
+            assert (counter.unread_notification_count, counter.unread_message_count) == (1, 1)
+            assert db.session.get(UserCounter, teacher_id) is not None
+            headers = TestTokenClaims.login('student', 'Student123!')
+        
+        assert client.get('/api/messages/unread-count', headers=headers).get_json() == {'unread_count': 1}
+        assert client.get('/api/notifications/unread-count', headers=headers).get_json() == {'unread_count': 1}
+
+
+class TestNotificationRetention:
+    """Test the retention job that keeps the notifications table small"""
+    
+    @staticmethod
+    def add_notification(recipient_id, notification_type, days_old, is_read):
+        notification = Notification(
+            recipient_id=recipient_id, type=notification_type.value, title='Old', message='Old',
+            is_read=is_read, created_at=datetime.now() - timedelta(days=days_old)
+        )
+        db.session.add(notification)
+        return notification
+    
+    def test_policies_archive_and_delete_in_batches(self, app, client, sample_users):
+        """Test per-type rules, bounded batches, archived copies and unread counter updates"""
+        with app.app_context():
+            student_id = sample_users['student'].id
+            
+            for _ in range(3):
+                self.add_notification(student_id, NotificationType.MESSAGE, 200, is_read=False)
+            kept = self.add_notification(student_id, NotificationType.MESSAGE, 10, is_read=False)
+            stale_content = self.add_notification(student_id, NotificationType.NEW_CONTENT, 40, is_read=True)
+            self.add_notification(student_id, NotificationType.NEW_CONTENT, 40, is_read=False)
+            self.add_notification(student_id, NotificationType.NEW_CONTENT, 5, is_read=True)
+            db.session.commit()
+            CounterService.reconcile_unread_counts()
+            stale_content_id = stale_content.id
+            
+            preview = RetentionService.apply_retention(dry_run=True)
+            assert (preview['archived'], preview['deleted'], Notification.query.count()) == (3, 1, 7)
+            
+            metrics = RetentionService.apply_retention(batch_size=2, max_batches=1)
+            assert (metrics['batches'], metrics['complete']) == (1, False)
+            assert metrics['deleted'] == 1
+            
+            metrics = RetentionService.apply_retention(batch_size=2)
+            assert (metrics['archived'], metrics['deleted'], metrics['batches']) == (3, 0, 2)
+            assert {(rule['type'], rule['action'], rule['rows']) for rule in metrics['rules']} == {
+                ('new_content', 'delete', 0), ('new_content', 'archive', 0), ('default', 'archive', 3)
+            }
+            
+            assert Notification.query.count() == 3
+            assert db.session.get(Notification, kept.id) is not None
+            assert NotificationArchive.query.count() == 3
+            assert db.session.get(NotificationArchive, stale_content_id) is None
+            assert all(row.type == 'message' and not row.is_read for row in NotificationArchive.query)
+            
+            assert NotificationService.get_unread_count(student_id) == 2
+            assert CounterService.reconcile_unread_counts() == {'created': 0, 'corrected': 0}
+            headers = TestTokenClaims.login('admin', 'Admin123!')
+        
+        response = client.get('/api/admin/notifications/retention', headers=headers)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data['notifications'], data['archived']) == (3, 3)
+        assert data['policies']['new_content'] == {'delete_read_after_days': 30}
+    
+    def test_unknown_policy_type_is_rejected(self, app):
+        """Test a policy for a type that does not exist fails instead of being ignored"""
+        with app.app_context():
+            with pytest.raises(ValueError):
+                RetentionService.apply_retention(policies={'newcontent': {'delete_read_after_days': 30}})
+
+
+class TestConditionalRequests:
+    """Test ETag generation and If-None-Match handling in BaseController"""
+    
+    def test_body_hash_etag(self, app):
+        """Test opted-in GETs are tagged with a body hash and matching requests get an empty 304"""
+        from app.utils.base_controller import BaseController
+        
+        service = lambda: {'courses': [], 'total_courses': 0}
+        
+        with app.test_request_context('/report'):
+            response = BaseController.handle_list_request(service, etag=True)
+            etag = response.headers['ETag']
+            assert response.status_code == 200
+            assert response.headers['Cache-Control'] == 'private, no-cache'
+            assert 'Authorization' in response.headers['Vary']
+        
+        with app.test_request_context('/report', headers={'If-None-Match': etag}):
+            response = BaseController.handle_list_request(service, etag=True)
+            assert response.status_code == 304
+            
+            response = BaseController.handle_request(service, etag=True)
+            assert response.status_code == 200
+        
+        with app.test_request_context('/report', method='POST', headers={'If-None-Match': etag}):
+            response = BaseController.handle_list_request(service, etag=True)
+            assert response.status_code == 200
+            assert 'ETag' not in response.headers
+            
+            response = BaseController.handle_list_request(service)
+            assert 'ETag' not in response.headers
+    
+    def test_version_key_skips_the_service(self, app, client, sample_users, sample_course):
+        """Test a matching version key answers 304 without running the report, and changes invalidate it"""
+        with app.app_context():
+            headers = TestTokenClaims.login('admin', 'Admin123!')
+            admin_id = sample_users['admin'].id
+            course_id = sample_course.id
+        
+        response = client.get('/api/admin/reports/course-categories', headers=headers)
+        etag = response.headers['ETag']
+        assert response.status_code == 200
+        assert response.get_json() == {'Testing': 1}
+        
+        with app.app_context():
+            with capture_statements() as statements:
+                response = client.get('/api/admin/reports/course-categories',
+                                      headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert not [s for s, _ in statements if 'GROUP BY' in s]
+        
+        with app.app_context():
+            AdminService.toggle_course_published(course_id)
+        
+        response = client.get('/api/admin/reports/course-categories',
+                              headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json() == {}
+        assert response.headers['ETag'] != etag
+
+
+class TestResponseCompression:
+    """Test gzip/deflate negotiation, thresholds and skipped types in the app factory"""
+    
+    def test_negotiates_encoding_and_threshold(self, app, client, sample_users):
+        """Test large JSON is compressed per Accept-Encoding while small bodies and refusals are not"""
+        import gzip
+        import zlib
+        
+        with app.app_context():
+            headers = TestTokenClaims.login('admin', 'Admin123!')
+        
+        plain = client.get('/api/admin/users', headers=headers)
+        assert 'Content-Encoding' not in plain.headers
+        assert 'Accept-Encoding' in plain.headers['Vary']
+        assert len(plain.data) >= app.config['COMPRESS_MIN_SIZE']
+        
+        response = client.get('/api/admin/users', headers={**headers, 'Accept-Encoding': 'gzip, deflate'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert int(response.headers['Content-Length']) == len(response.data) < len(plain.data)
+        assert gzip.decompress(response.data) == plain.data
+        
+        response = client.get('/api/admin/users', headers={**headers, 'Accept-Encoding': 'gzip;q=0, deflate'})
+        assert response.headers['Content-Encoding'] == 'deflate'
+        assert zlib.decompress(response.data) == plain.data
+        
+        response = client.get('/api/admin/users', headers={**headers, 'Accept-Encoding': 'br'})
+        assert 'Content-Encoding' not in response.headers
+        
+        response = client.get('/api/notifications/unread-count', headers={**headers, 'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_skips_binary_and_keeps_etags_working(self, app, client, sample_users):
+        """Test PDFs pass through untouched and compressed responses still revalidate with 304"""
+        from flask import Response
+        
+        app.add_url_rule('/certificate.pdf', 'test_pdf', lambda: Response(b'%PDF-1.4' * 200, mimetype='application/pdf'))
+        app.add_url_rule('/page.html', 'test_page', lambda: Response('<p>token</p>' * 200, mimetype='text/html'))
+        app.extensions['compression'].min_size = 0
+        
+        response = client.get('/certificate.pdf', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        assert response.data == b'%PDF-1.4' * 200
+        
+        response = client.get('/page.html', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        
+        with app.app_context():
+            headers = {**TestTokenClaims.login('admin', 'Admin123!'), 'Accept-Encoding': 'gzip'}
+        
+        response = client.get('/api/admin/reports/course-performance', headers=headers)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['ETag'].startswith('W/')
+        
+        response = client.get('/api/admin/reports/course-performance',
+                              headers={**headers, 'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+    
+    def test_streams_are_compressed_per_chunk(self, app, client, sample_users):
+        """Test streamed responses are compressed incrementally so each event is readable on arrival"""
+        import zlib
+        
+        with app.app_context():
+            student_id = sample_users['student'].id
+            access_token = AuthService.login_user({'username': 'student', 'password': 'Student123!'})['access_token']
+        
+        token = client.post('/api/notifications/stream-token',
+                            headers={'Authorization': f'Bearer {access_token}'}).get_json()['token']
+        response = client.get(f'/api/notifications/stream?jwt={token}', headers={'Accept-Encoding': 'gzip'},
+                              buffered=False)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = iter(response.response)
+        assert decompressor.decompress(next(chunks)) == b'event: unread_count\ndata: {"unread_count": 0}\n\n'
+        
+        with app.app_context():
+            deliver_notification([student_id], 'Hello', 'World')
+        assert decompressor.decompress(next(chunks)).startswith(b'event: notification\n')
+        
+        response.close()
+        assert not app.extensions['notification_hub'].has_subscribers(student_id)
+
+
+class TestQueryBudgets:
+    """Pin the number of queries each public service method may issue.
+    
+    Budgets are measured against budget_data (50 students, 10 quizzes) and must
+    not grow with the number of rows; a method that starts issuing a query per
+    student, quiz or question will exceed its budget here.
+    """
+    
+    @staticmethod
+    def check_budgets(budgets, data):
+        for name, max_queries, call in budgets:
+            db.session.expunge_all()
+            with assert_max_queries(max_queries, name):
+                call(data)
+    
+    @staticmethod
+    def quiz_answers(quiz_id):
+        answers = {}
+        for question in Question.query.filter_by(quiz_id=quiz_id).all():
+            if question.question_type == 'short_answer':
+                answers[str(question.id)] = 'Because'
+            else:
+                answers[str(question.id)] = question.answer_options.first().id
+        return answers
+    
+    @staticmethod
+    def unused_quiz(course_id):
+        quiz = Quiz(course_id=course_id, title='Draft Quiz')
+        db.session.add(quiz)
+        db.session.commit()
+        return quiz.id
+    
+    def test_student_service_budgets(self, app, budget_data):
+        """Test StudentService query budgets"""
+        def request_certificate(d):
+            with pytest.raises(ValidationException):
+                StudentService.request_certificate(d['student_id'], d['course_id'])
+        
+        with app.app_context():
+            self.check_budgets([
+                ('StudentService.get_dashboard', 16, lambda d: StudentService.get_dashboard(d['student_id'])),
+                ('StudentService.get_progress', 15, lambda d: StudentService.get_progress(d['student_id'])),
+                ('StudentService.get_achievements', 3, lambda d: StudentService.get_achievements(d['student_id'])),
+                ('StudentService.get_certificates', 2, lambda d: StudentService.get_certificates(d['student_id'])),
+                ('StudentService.request_certificate', 9, request_certificate),
+                ('StudentService.get_study_streak', 2, lambda d: StudentService.get_study_streak(d['student_id'])),
+                ('StudentService.get_course_recommendations', 5,
+                 lambda d: StudentService.get_course_recommendations(d['student_id'])),
+            ], budget_data)
+    
+    def test_teacher_service_budgets(self, app, budget_data):
+        """Test TeacherService query budgets"""
+        with app.app_context():
+            self.check_budgets([
+                ('TeacherService.get_dashboard', 6, lambda d: TeacherService.get_dashboard(d['teacher_id'])),
+                ('TeacherService.get_teacher_courses', 4, lambda d: TeacherService.get_teacher_courses(d['teacher_id'])),
+                ('TeacherService.get_course_details', 14,
+                 lambda d: TeacherService.get_course_details(d['teacher_id'], d['course_id'])),
+                ('TeacherService.get_pending_submissions', 2,
+                 lambda d: TeacherService.get_pending_submissions(d['teacher_id'])),
+                ('TeacherService.get_quiz_analytics', 7,
+                 lambda d: TeacherService.get_quiz_analytics(d['teacher_id'], d['quiz_id'])),
+                ('TeacherService.get_individual_student_progress', 20,
+                 lambda d: TeacherService.get_individual_student_progress(d['teacher_id'], d['student_id'], d['course_id'])),
+                ('TeacherService.get_student_progress_report', 24,
+                 lambda d: TeacherService.get_student_progress_report(d['teacher_id'], d['course_id'])),
+                ('TeacherService.get_course_analytics', 9,
+                 lambda d: TeacherService.get_course_analytics(d['teacher_id'], d['course_id'])),
+                ('TeacherService.get_teacher_analytics_overview', 8,
+                 lambda d: TeacherService.get_teacher_analytics_overview(d['teacher_id'])),
+                ('TeacherService.export_course_students', 23,
+                 lambda d: TeacherService.export_course_students(d['teacher_id'], d['course_id'])),
+                ('TeacherService.get_all_submissions', 2, lambda d: TeacherService.get_all_submissions(d['teacher_id'])),
+                ('TeacherService.get_all_quiz_attempts', 4, lambda d: TeacherService.get_all_quiz_attempts(d['teacher_id'])),
+                ('TeacherService.get_quiz_attempt_details', 11,
+                 lambda d: TeacherService.get_quiz_attempt_details(d['teacher_id'], d['attempt_id'])),
+                ('TeacherService.get_quiz_grading_summary', 3,
+                 lambda d: TeacherService.get_quiz_grading_summary(d['teacher_id'])),
+            ], budget_data)
+    
+    def test_admin_service_budgets(self, app, budget_data):
+        """Test AdminService query budgets"""
+        achievement = {'name': 'Ace', 'description': 'Score 90', 'criteria_type': 'quiz_score', 'criteria_value': 90}
+        
+        with app.app_context():
+            self.check_budgets([
+                ('AdminService.get_dashboard', 15, lambda d: AdminService.get_dashboard()),
+                ('AdminService.get_users', 3, lambda d: AdminService.get_users()),
+                ('AdminService.get_user', 5, lambda d: AdminService.get_user(d['student_id'])),
+                ('AdminService.update_user', 3,
+                 lambda d: AdminService.update_user(d['admin_id'], d['student_id'], {'full_name': 'Renamed Student'})),
+                ('AdminService.toggle_user_active', 3,
+                 lambda d: AdminService.toggle_user_active(d['admin_id'], d['student_ids'][-1])),
+                ('AdminService.export_users', 1, lambda d: AdminService.export_users()),
+                ('AdminService.get_all_courses', 4, lambda d: AdminService.get_all_courses()),
+                ('AdminService.export_courses', 2, lambda d: AdminService.export_courses()),
+                ('AdminService.toggle_course_published', 4,
+                 lambda d: AdminService.toggle_course_published(d['other_course_id'])),
+                ('AdminService.get_user_activity_report', 3, lambda d: AdminService.get_user_activity_report()),
+                ('AdminService.get_course_performance_report', 3, lambda d: AdminService.get_course_performance_report()),
+                ('AdminService.get_achievements', 1, lambda d: AdminService.get_achievements()),
+                ('AdminService.create_achievement', 2, lambda d: AdminService.create_achievement(dict(achievement))),
+                ('AdminService.get_user_overview_chart', 1, lambda d: AdminService.get_user_overview_chart()),
+                ('AdminService.get_course_categories_distribution', 1,
+                 lambda d: AdminService.get_course_categories_distribution()),
+            ], budget_data)
+    
+    @staticmethod
+    def add_courses(data, count=10):
+        """Add published courses with a lesson, a quiz, enrollments and attempts to the budget teacher"""
+        for i in range(count):
+            course = Course(title=f'Extra Course {i}', category='Testing', teacher_id=data['teacher_id'],
+                            is_published=True, max_students=100)
+            db.session.add(course)
+            db.session.flush()
+            lesson = Lesson(course_id=course.id, title='Extra Lesson', content='Content', order_number=1)
+            quiz = Quiz(course_id=course.id, title='Extra Quiz', passing_score=60)
+            db.session.add_all([lesson, quiz])
+            db.session.flush()
+            for index, student_id in enumerate(data['student_ids'][:5]):
+                completed = index % 2 == 0
+                db.session.add(Enrollment(
+                    student_id=student_id, course_id=course.id,
+                    status='completed' if completed else 'active',
+                    enrolled_at=datetime.now() - timedelta(days=3),
+                    completed_at=datetime.now() if completed else None
+                ))
+                db.session.add(LessonProgress(student_id=student_id, lesson_id=lesson.id, completed_at=datetime.now()))
+                db.session.add(QuizAttempt(quiz_id=quiz.id, student_id=student_id, attempt_number=1, score=70,
+                                           status='completed', submitted_at=datetime.now()))
+        db.session.commit()
+        CourseService.repair_counters()
+    
+    def test_course_listings_do_not_grow_with_courses(self, app, budget_data):
+        """Test course listings and reports issue the same queries for 2 and 12 courses"""
+        calls = [
+            ('TeacherService.get_dashboard', lambda d: TeacherService.get_dashboard(d['teacher_id'])),
+            ('TeacherService.get_teacher_courses', lambda d: TeacherService.get_teacher_courses(d['teacher_id'])),
+            ('TeacherService.get_teacher_analytics_overview',
+             lambda d: TeacherService.get_teacher_analytics_overview(d['teacher_id'])),
+            ('AdminService.get_all_courses', lambda d: AdminService.get_all_courses()),
+            ('AdminService.export_courses', lambda d: AdminService.export_courses()),
+            ('AdminService.get_course_performance_report', lambda d: AdminService.get_course_performance_report()),
+        ]
+        
+        def count_queries(data):
+            counts = {}
+            for name, call in calls:
+                db.session.expunge_all()
+                with assert_max_queries(1000, name) as statements:
+                    call(data)
+                counts[name] = len(statements)
+            return counts
+        
+        with app.app_context():
+            before = count_queries(budget_data)
+            self.add_courses(budget_data)
+            assert count_queries(budget_data) == before
+    
+    def test_quiz_service_budgets(self, app, budget_data):
+        """Test QuizService query budgets"""
+        with app.app_context():
+            budget_data['answers'] = self.quiz_answers(budget_data['quiz_id'])
+            budget_data['draft_quiz_id'] = self.unused_quiz(budget_data['course_id'])
+            question = {'question_text': 'New question', 'question_type': 'multiple_choice', 'order_number': 1,
+                        'options': [{'text': 'Yes', 'is_correct': True}, {'text': 'No'}]}
+            
+            def start_quiz(d):
+                d['new_attempt_id'] = QuizService.start_quiz(d['student_id'], d['quiz_id'])['attempt_id']
+                return d['new_attempt_id']
+            
+            self.check_budgets([
+                ('QuizService.get_course_quizzes (student)', 5,
+                 lambda d: QuizService.get_course_quizzes(d['student_id'], d['course_id'])),
+                ('QuizService.get_course_quizzes (teacher)', 3,
+                 lambda d: QuizService.get_course_quizzes(d['teacher_id'], d['course_id'])),
+                ('QuizService.get_quiz (student)', 8, lambda d: QuizService.get_quiz(d['student_id'], d['quiz_id'])),
+                ('QuizService.get_quiz (teacher)', 5, lambda d: QuizService.get_quiz(d['teacher_id'], d['quiz_id'])),
+                ('QuizService.get_quiz_questions', 2, lambda d: QuizService.get_quiz_questions(d['quiz_id'], True)),
+                ('QuizService.get_student_quiz_attempts', 1,
+                 lambda d: QuizService.get_student_quiz_attempts(d['student_id'])),
+                ('QuizService.can_retake_quiz', 3, lambda d: QuizService.can_retake_quiz(d['student_id'], d['quiz_id'])),
+                ('QuizService.get_quiz_statistics', 6,
+                 lambda d: QuizService.get_quiz_statistics(d['teacher_id'], d['quiz_id'])),
+                ('QuizService.get_question_details', 7,
+                 lambda d: QuizService.get_question_details(d['teacher_id'], d['quiz_id'], d['question_id'])),
+                ('QuizService.get_quiz_results (first view)', 7,
+                 lambda d: QuizService.get_quiz_results(d['student_id'], d['attempt_id'])),
+                ('QuizService.get_quiz_results', 2,
+                 lambda d: QuizService.get_quiz_results(d['student_id'], d['attempt_id'])),
+                ('QuizService.get_quiz_results (teacher)', 4,
+                 lambda d: QuizService.get_quiz_results(d['teacher_id'], d['attempt_id'])),
+                ('QuizService.start_quiz', 12, start_quiz),
+                ('QuizService.submit_quiz_with_achievements', 26,
+                 lambda d: QuizService.submit_quiz_with_achievements(d['student_id'], d['new_attempt_id'], d['answers'])),
+                ('QuizService.grade_attempt', 15,
+                 lambda d: QuizService.grade_attempt(d['teacher_id'], d['new_attempt_id'], {})),
+                ('QuizService.create_quiz_attempt', 4,
+                 lambda d: d.update(second_attempt_id=QuizService.create_quiz_attempt(d['quiz_id'], d['student_ids'][1]).id)),
+                ('QuizService.submit_quiz_attempt', 8,
+                 lambda d: QuizService.submit_quiz_attempt(d['second_attempt_id'], d['answers'])),
+                ('QuizService.update_quiz', 4,
+                 lambda d: QuizService.update_quiz(d['teacher_id'], d['quiz_id'], {'title': 'Renamed Quiz'})),
+                ('QuizService.add_question', 10,
+                 lambda d: d.update(new_question_id=QuizService.add_question(
+                     d['teacher_id'], d['draft_quiz_id'], dict(question))['question']['id'])),
+                ('QuizService.update_question', 8,
+                 lambda d: QuizService.update_question(
+                     d['teacher_id'], d['draft_quiz_id'], d['new_question_id'], {'question_text': 'Edited'})),
+                ('QuizService.delete_question', 11,
+                 lambda d: QuizService.delete_question(d['teacher_id'], d['draft_quiz_id'], d['new_question_id'])),
+                ('QuizService.delete_quiz', 9, lambda d: QuizService.delete_quiz(d['teacher_id'], d['draft_quiz_id'])),
+                ('QuizService.create_quiz', 9,
+                 lambda d: QuizService.create_quiz(d['teacher_id'], {'course_id': d['course_id'], 'title': 'New Quiz'})),
+            ], budget_data)
+    
+    def test_lesson_service_budgets(self, app, budget_data):
+        """Test LessonService query budgets"""
+        with app.app_context():
+            draft = Lesson(course_id=budget_data['course_id'], title='Draft Lesson', content='Draft', order_number=99)
+            db.session.add(draft)
+            db.session.commit()
+            budget_data['draft_lesson_id'] = draft.id
+            
+            self.check_budgets([
+                ('LessonService.get_course_lessons (student)', 5,
+                 lambda d: LessonService.get_course_lessons(d['student_id'], d['course_id'])),
+                ('LessonService.get_course_lessons (teacher)', 5,
+                 lambda d: LessonService.get_course_lessons(d['teacher_id'], d['course_id'])),
+                ('LessonService.get_lesson', 8, lambda d: LessonService.get_lesson(d['student_id'], d['lesson_id'])),
+                ('LessonService.complete_lesson', 17,
+                 lambda d: LessonService.complete_lesson(d['student_ids'][1], d['lesson_id'])),
+                ('LessonService.get_lesson_analytics', 4,
+                 lambda d: LessonService.get_lesson_analytics(d['teacher_id'], d['lesson_id'])),
+                ('LessonService.update_lesson', 4,
+                 lambda d: LessonService.update_lesson(d['teacher_id'], d['draft_lesson_id'], {'title': 'Renamed Lesson'})),
+                ('LessonService.duplicate_lesson', 6,
+                 lambda d: LessonService.duplicate_lesson(d['teacher_id'], d['lesson_id'])),
+                ('LessonService.delete_lesson', 11,
+                 lambda d: LessonService.delete_lesson(d['teacher_id'], d['draft_lesson_id'])),
+                ('LessonService.create_lesson', 10,
+                 lambda d: LessonService.create_lesson(d['teacher_id'], {
+                     'course_id': d['course_id'], 'title': 'New Lesson', 'content': 'Content', 'order_number': 50})),
+            ], budget_data)
+    
+    def test_messaging_service_budgets(self, app, budget_data):
+        """Test MessagingService query budgets"""
+        with app.app_context():
+            budget_data['message_id'] = Message.query.filter_by(recipient_id=budget_data['student_id']).first().id
+            message = {'recipient_id': budget_data['teacher_id'], 'subject': 'Question', 'content': 'Hello',
+                       'course_id': budget_data['course_id']}
+            
+            self.check_budgets([
+                ('MessagingService.send_message', 10,
+                 lambda d: MessagingService.send_message(d['student_id'], dict(message))),
+                ('MessagingService.get_messages', 4, lambda d: MessagingService.get_messages(d['student_id'])),
+                ('MessagingService.get_message', 7,
+                 lambda d: MessagingService.get_message(d['student_id'], d['message_id'])),
+                ('MessagingService.mark_as_read', 2,
+                 lambda d: MessagingService.mark_as_read(d['student_id'], d['message_id'])),
+                ('MessagingService.get_conversations', 2, lambda d: MessagingService.get_conversations(d['teacher_id'])),
+                ('MessagingService.get_conversation_messages', 8,
+                 lambda d: MessagingService.get_conversation_messages(d['teacher_id'], d['student_id'])),
+            ], budget_data)
+
+
+class TestScaleDataGenerator:
+    """Test the deterministic benchmark data generator"""
+    
+    GENERATED_AT = datetime(2026, 1, 1, 12, 0, 0)
+    
+    @staticmethod
+    def dump(engine, tables):
+        """Read every generated row except the salted password hashes"""
+        with engine.connect() as connection:
+            return {
+                table.name: connection.execute(
+                    select(*[column for column in table.c if column.name != 'password_hash']).order_by(table.c.id)
+                ).fetchall()
+                for table in tables
+            }
+    
+    def test_generates_same_dataset_for_same_seed(self, app):
+        """Test two runs with the same seed produce identical rows in small batches"""
+        with app.app_context():
+            counts = ScaleDataGenerator(db.engine, 'tiny', seed=7, batch_size=10, now=self.GENERATED_AT).generate()
+            
+            other_engine = create_engine('sqlite://')
+            db.metadata.create_all(other_engine)
+            # Without an explicit anchor the generator uses its fixed default one
+            assert ScaleDataGenerator(other_engine, 'tiny').now == self.GENERATED_AT
+            ScaleDataGenerator(other_engine, 'tiny', seed=7, batch_size=1000).generate()
+            
+            tables = [model.__table__ for model in ScaleDataGenerator.TABLE_ORDER]
+            assert self.dump(db.engine, tables) == self.dump(other_engine, tables)
+            assert counts['users'] == User.query.count() == 15
+            assert counts['student_answers'] == StudentAnswer.query.count() > 0
+            assert counts['notifications'] == Notification.query.count() == 36
+    
+    def test_generated_rows_are_consistent(self, app):
+        """Test generated attempts, answers and enrollments reference matching rows"""
+        with app.app_context():
+            ScaleDataGenerator(db.engine, 'tiny', seed=3, now=self.GENERATED_AT).generate()
+            
+            for attempt in QuizAttempt.query.all():
+                answers = StudentAnswer.query.filter_by(attempt_id=attempt.id).all()
+                assert len(answers) == attempt.quiz.questions.count()
+                earned = sum(answer.points_earned for answer in answers)
+                assert attempt.score == round(earned / (len(answers) * 10) * 100, 2)
+                assert Enrollment.query.filter_by(student_id=attempt.student_id, course_id=attempt.quiz.course_id).count() == 1
+                for answer in answers:
+                    assert answer.question.quiz_id == attempt.quiz_id
+                    if answer.selected_option_id:
+                        assert AnswerOption.query.get(answer.selected_option_id).is_correct == answer.is_correct
+    
+    def test_refuses_non_empty_database(self, app, sample_users):
+        """Test the generator never mixes generated rows into existing data"""
+        with app.app_context():
+            with pytest.raises(ValueError):
+                ScaleDataGenerator(db.engine, 'tiny').generate()
+            
+            with pytest.raises(ValueError):
+                ScaleDataGenerator(db.engine, 'huge')
+
+
+class TestBenchmarks:
+    """Test the benchmark runner and its baseline comparison"""
+    
+    def test_runs_every_case_on_generated_data(self, app):
+        """Test each benchmark case runs and reports latency and query counts"""
+        from benchmarks.cases import BenchmarkCase
+        from benchmarks.run import run_benchmarks
+        
+        with app.app_context():
+            ScaleDataGenerator(db.engine, 'tiny', seed=1).generate()
+            results = run_benchmarks(app, iterations=3, warmup=1)
+            
+            assert list(results) == [case.name for case in BenchmarkCase.registry]
+            for result in results.values():
+                assert 0 < result['min_ms'] <= result['p50_ms'] <= result['p95_ms'] <= result['max_ms']
+                assert result['queries'] > 0
+            assert QuizAttempt.query.filter_by(status='in_progress').count() == 0
+    
+    def test_compare_flags_latency_and_query_regressions(self):
+        """Test regressions need both the relative threshold and the absolute delta"""
+        from benchmarks.run import compare_results, percentile
+        
+        baseline = {
+            'slower': {'p50_ms': 10.0, 'p95_ms': 12.0, 'queries': 5},
+            'noise': {'p50_ms': 1.0, 'p95_ms': 1.2, 'queries': 5},
+            'more_queries': {'p50_ms': 10.0, 'p95_ms': 12.0, 'queries': 5},
+        }
+        current = {
+            'slower': {'p50_ms': 13.0, 'p95_ms': 12.0, 'queries': 5},
+            'noise': {'p50_ms': 1.5, 'p95_ms': 5.0, 'queries': 5},
+            'more_queries': {'p50_ms': 9.0, 'p95_ms': 11.0, 'queries': 6},
+            'new_case': {'p50_ms': 50.0, 'p95_ms': 60.0, 'queries': 50},
+        }
+        
+        regressions = compare_results(baseline, current, threshold=0.2, min_delta_ms=1.0)
+        
+        assert len(regressions) == 2
+        assert regressions[0].startswith('slower: p50')
+        assert regressions[1] == 'more_queries: queries 5 -> 6'
+        assert percentile([4, 1, 3, 2], 50) == 2.5
+        assert percentile([7], 95) == 7
+    
+    def test_dataset_cache_follows_schema(self, app):
+        """Test a model change gives the cached dataset a different fingerprint"""
+        from benchmarks.run import schema_fingerprint
+        
+        with app.app_context():
+            before = schema_fingerprint()
+            assert schema_fingerprint() == before
+            
+            index = db.Index('ix_benchmark_probe', Message.__table__.c.subject)
+            try:
+                assert schema_fingerprint() != before
+            finally:
+                Message.__table__.indexes.discard(index)
+            assert schema_fingerprint() == before
+
+
 def run_specific_test_class(test_class_name):
     """Run a specific test class"""
     print(f"\n🧪 Running {test_class_name} tests...")
@@ -1323,7 +3243,23 @@ def run_specific_test_class(test_class_name):
         'messaging': 'TestMessagingService',
         'notification': 'TestNotificationService',
         'achievement': 'TestAchievementService',
-        'certificate': 'TestCertificateService'
+        'certificate': 'TestCertificateService',
+        'progress': 'TestProgressService',
+        'query_plans': 'TestQueryPlans',
+        'serialization': 'TestSerializationProfiles',
+        'instrumentation': 'TestSQLInstrumentation',
+        'token_claims': 'TestTokenClaims',
+        'frontend': 'TestFrontendRoutes',
+        'notification_stream': 'TestNotificationStream',
+        'notification_outbox': 'TestNotificationOutbox',
+        'unread_counters': 'TestUnreadCounters',
+        'notification_retention': 'TestNotificationRetention',
+        'keyset_pagination': 'TestKeysetPagination',
+        'conditional_requests': 'TestConditionalRequests',
+        'compression': 'TestResponseCompression',
+        'query_budgets': 'TestQueryBudgets',
+        'scale_data': 'TestScaleDataGenerator',
+        'benchmarks': 'TestBenchmarks'
     }
     
     if test_class_name.lower() in test_classes: